@@ -7,10 +7,10 @@ using the Hermes AI client.
 
 import os
 import sys
-import json
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from hermes_client import score_lead, deep_reason
+from hermes_client import score_lead, score_leads_batch, deep_reason
+from llm_json import loads_lenient
 
 
 def enrich_lead(
@@ -18,9 +18,11 @@ def enrich_lead(
     website: str = "",
     industry: str = "",
     signals: list = None,
+    lead_score: dict = None,
 ) -> dict:
     """
     Enrich a lead with AI-powered analysis.
+    Pass `lead_score` (e.g. from score_leads_batch) to skip the scoring pass.
 
     Returns: {
         icp_score, risk_level, recommended_tone, key_selling_points,
@@ -30,7 +32,8 @@ def enrich_lead(
     print(f"🔍 [Enrich] Analyzing: {company_name}")
 
     # First pass: quick scoring
-    lead_score = score_lead(company_name, website, industry, signals)
+    if lead_score is None:
+        lead_score = score_lead(company_name, website, industry, signals)
 
     # Second pass: deep analysis for high-value leads
     if lead_score.get("icp_score", 0) >= 60:
@@ -54,10 +57,12 @@ def enrich_lead(
             deep_analysis = deep_reason(deep_prompt)
 
             try:
-                # Try to parse the deep analysis as JSON
-                parsed = json.loads(deep_analysis)
+                # Reasoner replies are often fenced or wrapped in prose
+                parsed = loads_lenient(deep_analysis)
+                if not isinstance(parsed, dict):
+                    raise ValueError("expected a JSON object")
                 lead_score.update(parsed)
-            except json.JSONDecodeError:
+            except ValueError:
                 # If not valid JSON, store as raw reasoning
                 lead_score["deep_analysis"] = deep_analysis
 
@@ -75,15 +80,26 @@ def batch_enrich(leads: list) -> list:
 
     Returns the list with enrichment data added.
     """
+    # First pass for the whole list in a few batched prompts
+    print(f"📦 [Enrich] Batch-scoring {len(leads)} leads")
+    failed = set()
+    scores = score_leads_batch(leads, failed_out=failed)
+
     enriched = []
     for i, lead in enumerate(leads):
         print(f"\n[{i+1}/{len(leads)}] Enriching: {lead.get('name', 'Unknown')}")
+        if str(lead.get("id") or i) in failed:
+            # Already re-asked on its own inside the batch — don't pay for a third try
+            lead["enrichment"] = {"error": "scoring failed"}
+            enriched.append(lead)
+            continue
         try:
             result = enrich_lead(
                 company_name=lead.get("name", lead.get("company", "Unknown")),
                 website=lead.get("website", ""),
                 industry=lead.get("industry", ""),
                 signals=lead.get("signals", []),
+                lead_score=scores.get(str(lead.get("id") or i)),
             )
             lead["enrichment"] = result
             lead["icp_score"] = result.get("icp_score")
@@ -18,7 +18,6 @@ Run autonomously:
 Queen Bee (web chat) can inject work into `agent_tasks` table which the task_runner consumes.
 """
 import asyncio
-import json
 import os
 import re
 import sys
@@ -26,7 +25,6 @@ import time
 import threading
 import logging
 from datetime import datetime
-from pathlib import Path
 
 # Structured logging for autonomy
 logging.basicConfig(
@@ -37,18 +35,36 @@ logging.basicConfig(
 logger = logging.getLogger("cyberhound.autonomy")
 
 # Unified LLM
-from .llm import ask
+from .http_pool import arun
+from .llm import aask, aask_json
+from .llm_stream import email_or_not_found
+from .lead_store import DomainTaken, get_store
+from .lead_sync import SupabaseFlusher, SupabaseMirror
 
 # Supabase for shared state & hive_log (for autonomy)
-try:
-    from supabase import create_client, Client
-    SUPABASE_URL = os.getenv("NEXT_PUBLIC_SUPABASE_URL") or os.getenv("SUPABASE_URL")
-    SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
-except Exception:
-    supabase = None
+SUPABASE_URL = os.getenv("NEXT_PUBLIC_SUPABASE_URL") or os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+_supabase = None
+_supabase_attempted = False
+
+def get_supabase():
+    """Supabase client, created on first use (None without creds or the SDK)."""
+    global _supabase, _supabase_attempted
+    if not _supabase_attempted:
+        _supabase_attempted = True
+        if SUPABASE_URL and SUPABASE_KEY:
+            try:
+                from supabase import create_client
+                _supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+            except Exception as e:
+                print(f"[Supabase init warn] {e}")
+    return _supabase
+
+_supabase_mirror = SupabaseMirror(get_supabase)    # analyst_leads → lead store, deltas only
+_supabase_flusher = SupabaseFlusher(get_supabase)  # lead store dirty set → analyst_leads
 
 def log_to_hive(bee: str, action: str, details: dict = None, status: str = "success"):
+    supabase = get_supabase()
     if not supabase:
         print(f"[{bee}] {action} (no Supabase)")
         return
@@ -64,10 +80,9 @@ def log_to_hive(bee: str, action: str, details: dict = None, status: str = "succ
 
 # ── Config ───────────────────────────────────────────────────
 SCOUT_INTERVAL_HOURS = int(os.getenv("SCOUT_INTERVAL_HOURS", 6))
-SEQUENCE_INTERVAL_HOURS = int(os.getenv("SEQUENCE_INTERVAL_HOURS", 24))
 WATCHDOG_INTERVAL_SEC = int(os.getenv("WATCHDOG_INTERVAL_SEC", 60))
-LEADS_FILE = "PIPELINE_LEADS.json"
 MAX_DAILY_STRIKES = int(os.getenv("MAX_DAILY_STRIKES", 20))
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", 4))  # In-flight LLM calls per phase
 # ─────────────────────────────────────────────────────────────
 
 
@@ -75,85 +90,37 @@ MAX_DAILY_STRIKES = int(os.getenv("MAX_DAILY_STRIKES", 20))
 # LEAD STORE
 # ══════════════════════════════════════════════════════════════
 
+def _mirror_supabase_leads():
+    """Fold Supabase analyst_leads changed since the last pull into the local lead store."""
+    _supabase_mirror.pull()
+
 def load_leads() -> list:
-    """Load leads, preferring Supabase if available for shared state with web bees."""
-    supabase_leads = []
-    if supabase:
-        try:
-            # Use analyst_leads as shared leads table (populated by web analyst/hunt too)
-            res = supabase.table("analyst_leads").select("*").execute()
-            supabase_leads = res.data or []
-            # Normalize to our format
-            for l in supabase_leads:
-                l["id"] = l.get("id")
-                l["name"] = l.get("company") or l.get("title", "Unknown")
-                l["website"] = l.get("url") or ""
-                l["email"] = l.get("contact_email") or l.get("enriched_data", {}).get("email", "")
-                l["risk_score"] = l.get("score", 7) or 7
-                l["source"] = l.get("source", "supabase")
-                l["struck"] = l.get("status") in ["sent", "replied"]
-        except Exception as e:
-            print(f"[Supabase leads load warn] {e}")
-
-    # Load local as fallback/merge
-    local_leads = []
-    if not Path(LEADS_FILE).exists():
-        local_leads = []
-    else:
-        with open(LEADS_FILE) as f:
-            try:
-                local_leads = json.load(f)
-            except:
-                local_leads = []
-
-    # Merge, prefer Supabase data, dedup by website
-    merged = {}
-    for l in local_leads + supabase_leads:
-        key = (l.get("website") or "").lower().strip()
-        if key and key not in merged:
-            merged[key] = l
-        elif key in merged:
-            # Merge email etc
-            if not merged[key].get("email") and l.get("email"):
-                merged[key]["email"] = l["email"]
-            if l.get("struck"):
-                merged[key]["struck"] = True
-
-    return list(merged.values())
+    """Local leads plus Supabase's shared analyst_leads (mirrored incrementally)."""
+    _mirror_supabase_leads()
+    return get_store().all()
 
-def save_leads(leads: list):
-    with open(LEADS_FILE, "w") as f:
-        json.dump(leads, f, indent=2)
+def _sync_leads_to_supabase():
+    """Share local lead changes with the web bees (write-behind, bulk upsert on url)."""
+    _supabase_flusher.start().notify()
 
-    # Also persist key leads to Supabase analyst_leads for sharing with web
-    if supabase:
-        for lead in leads[-5:]:  # recent ones
+def save_leads(leads: list):
+    store = get_store()
+    with store.transaction():
+        for lead in leads:
             try:
-                data = {
-                    "source": lead.get("source", "python_scout"),
-                    "title": lead.get("name"),
-                    "url": lead.get("website"),
-                    "contact_email": lead.get("email"),
-                    "status": "sent" if lead.get("struck") else "new",
-                    "score": lead.get("risk_score", 50),
-                    "pain_point": "Autonomous scout lead",
-                    "urgency": "medium",
-                    "recommended_service": "CyberHound automation",
-                    "personalization_hook": lead.get("name"),
-                }
-                supabase.table("analyst_leads").upsert(data, on_conflict="url").execute()
-            except Exception as e:
-                print(f"[Supabase lead sync warn] {e}")
+                store.upsert(lead)
+            except DomainTaken as e:
+                print(f"  ⚠️  Lead not saved: {e}")
+    _sync_leads_to_supabase()
 
 def add_lead(name: str, website: str, email: str = "", risk_score: int = 7,
              source: str = "scout") -> dict:
-    leads = load_leads()
-    existing = next((l for l in leads if (l.get("website") or "").lower() == website.lower()), None)
+    store = get_store()
+    existing = store.find_by_website(website)
     if existing:
         return existing  # Already known
 
-    lead = {
-        "id": f"lead_{int(datetime.now().timestamp())}",
+    lead = store.add({
         "name": name,
         "website": website,
         "email": email,
@@ -162,29 +129,44 @@ def add_lead(name: str, website: str, email: str = "", risk_score: int = 7,
         "discovered_at": str(datetime.now()),
         "struck": False,
         "strike_at": None,
-    }
-    leads.append(lead)
-    save_leads(leads)
+    })
+    _sync_leads_to_supabase()
     print(f"  📋 Lead added: {name} | {website}")
     return lead
 
 def mark_lead_struck(lead_id: str):
-    leads = load_leads()
-    for l in leads:
-        if l["id"] == lead_id:
-            l["struck"] = True
-            l["strike_at"] = str(datetime.now())
-            break
-    save_leads(leads)
+    if get_store().update(lead_id, {"struck": True, "strike_at": str(datetime.now())}):
+        _sync_leads_to_supabase()
 
 def get_unstrucked_leads() -> list:
-    return [l for l in load_leads() if not l.get("struck") and l.get("email")]
+    _mirror_supabase_leads()
+    return get_store().by_status("unstruck")
 
 
 # ══════════════════════════════════════════════════════════════
 # SCOUT — finds leads via Gemini grounded search
 # ══════════════════════════════════════════════════════════════
 
+SCOUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "leads": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "website": {"type": "string"},
+                    "city": {"type": "string"},
+                    "risk_score": {"type": "number"},
+                },
+                "required": ["name", "website"],
+            },
+        },
+    },
+    "required": ["leads"],
+}
+
 async def run_scout() -> list:
     """Run the imperial scout to discover new Quebec leads"""
     logger.info("SCOUT — Running...")
@@ -194,22 +176,23 @@ async def run_scout() -> list:
             "Search for high-growth B2B SaaS opportunities and underserved niches in North America. "
             "Focus on: workflow automation, AI-driven logistics, specialized CRM tools, and automated "
             "financial reporting for SMEs. Identify 10 high-potential sectors with low competition. "
-            "For each, return ONLY a JSON array with this exact schema:\n"
-            '[{"name": "Niche/Sector Name", "website": "https://example.com/potential-targets", "city": "N/A", "risk_score": 85}]\n'
+            "Return ONLY a JSON object with this exact schema:\n"
+            '{"leads": [{"name": "Niche/Sector Name", "website": "https://example.com/potential-targets", "city": "N/A", "risk_score": 85}]}\n'
             "Note: risk_score here represents Revenue Opportunity Score (0-100)."
-            "Return ONLY the JSON array, no other text."
         )
 
-        raw = ask(prompt, system="You are the Scout Bee for CyberHound. Return strict JSON only.")
-        match = re.search(r'\[.*\]', raw, re.DOTALL)
-        if not match:
-            logger.warning("Scout: Could not parse JSON from response")
+        try:
+            result = await aask_json(prompt, system_prompt="You are the Scout Bee for CyberHound. Return strict JSON only.",
+                                     schema=SCOUT_SCHEMA, task="scout")
+        except ValueError as e:  # llm_json.StructuredOutputError: unrepairable even after a correction
+            logger.warning(f"Scout: Could not parse JSON from response ({e})")
             log_to_hive("scout", "scout_failed", {"reason": "parse_error"})
             return []
 
-        leads_raw = json.loads(match.group())
+        # Known and blocked (discarded / bounced) domains never reach enrichment
+        fresh, skipped = get_store().filter_new(result["leads"])
         new_leads = []
-        for l in leads_raw:
+        for l in fresh:
             lead = add_lead(
                 name=l.get("name", "Unknown"),
                 website=l.get("website", ""),
@@ -218,7 +201,8 @@ async def run_scout() -> list:
             )
             new_leads.append(lead)
 
-        logger.info(f"Scout found {len(new_leads)} leads")
+        logger.info(f"Scout found {len(new_leads)} new leads "
+                    f"(skipped {skipped['known']} known, {skipped['blocked']} blocked)")
         return new_leads
 
     except Exception as e:
@@ -250,17 +234,14 @@ async def enrich_lead(lead: dict) -> str:
             f"If no email found, return: NOT_FOUND"
         )
 
-        result = ask(prompt, system="You are a helpful research assistant. Return only the email or NOT_FOUND.")
+        result = await aask(prompt, system_prompt="You are a helpful research assistant. Return only the email or NOT_FOUND.",
+                            task="find_email", stop_when=email_or_not_found)
 
         email_match = re.search(r'[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}', result)
         if email_match:
             email = email_match.group()
-            leads = load_leads()
-            for l in leads:
-                if l["id"] == lead["id"]:
-                    l["email"] = email
-                    break
-            save_leads(leads)
+            if get_store().update(lead["id"], {"email": email}):
+                _sync_leads_to_supabase()
             print(f"    ✅ Email found: {email}")
             return email
         else:
@@ -274,12 +255,17 @@ async def enrich_lead(lead: dict) -> str:
 
 async def enrich_all_leads():
     """Enrich all leads that are missing emails"""
-    leads = load_leads()
-    unenriched = [l for l in leads if not l.get("email")]
+    _mirror_supabase_leads()
+    unenriched = get_store().by_status("missing_email")
     print(f"\n📧 [{_ts()}] ENRICHER — {len(unenriched)} leads need emails")
-    for lead in unenriched:
-        await enrich_lead(lead)
-        await asyncio.sleep(2)  # Rate limit
+    sem = asyncio.Semaphore(LLM_CONCURRENCY)
+
+    async def _enrich(lead: dict):
+        async with sem:
+            # Pacing comes from the shared per-host bucket in http_pool
+            await enrich_lead(lead)
+
+    await asyncio.gather(*(_enrich(lead) for lead in unenriched))
 
 
 # ══════════════════════════════════════════════════════════════
@@ -311,11 +297,11 @@ async def run_striker():
             continue
 
         print(f"  🎯 Striking: {name} <{email}>")
-        success = fire_touch_1(email, name, lead.get("risk_score", 7))
+        # Queued in the outbox; its workers deliver and then record the deal
+        success = await asyncio.to_thread(fire_touch_1, email, name, lead.get("risk_score", 7))
         if success:
             mark_lead_struck(lead["id"])
             struck += 1
-            await asyncio.sleep(5)  # Rate limit between sends
 
     print(f"  ✅ Striker done: {struck} emails sent")
 
@@ -343,9 +329,10 @@ def run_watchdog_thread():
 # ══════════════════════════════════════════════════════════════
 
 async def run_sequence():
+    """One pass over the touches due now (main_loop runs the scheduler continuously)."""
     from cyberhound.sequence_scheduler import run_sequence as _run
     print(f"\n📅 [{_ts()}] SEQUENCE — Running drip schedule")
-    _run()
+    await asyncio.to_thread(_run)
 
 
 # ══════════════════════════════════════════════════════════════
@@ -366,7 +353,7 @@ async def main_loop():
 ╚══════════════════════════════════════════════════════════════╝
 """)
     print(f"  Scout interval:    every {SCOUT_INTERVAL_HOURS}h")
-    print(f"  Sequence interval: every {SEQUENCE_INTERVAL_HOURS}h")
+    print(f"  Sequence:          due-time drip (wakes when a touch is due)")
     print(f"  Watchdog interval: every {WATCHDOG_INTERVAL_SEC}s")
     print(f"  Max daily strikes: {MAX_DAILY_STRIKES}")
     print("  State: Using local JSON + Supabase hive_log when available")
@@ -381,10 +368,16 @@ async def main_loop():
     watchdog_thread = threading.Thread(target=run_watchdog_thread, daemon=True)
     watchdog_thread.start()
 
+    # Drip scheduler sleeps until the next Touch 2/3 is due
+    from cyberhound.sequence_scheduler import start as start_sequence
+    start_sequence()
+
+    # Outbox workers deliver queued email (including any backlog from the last run)
+    from cyberhound.outbox import start as start_outbox
+    start_outbox()
+
     last_scout = 0
-    last_sequence = 0
     scout_interval_sec = SCOUT_INTERVAL_HOURS * 3600
-    sequence_interval_sec = SEQUENCE_INTERVAL_HOURS * 3600
 
     while True:
         try:
@@ -402,16 +395,6 @@ async def main_loop():
                     log_to_hive("scout", "cycle_error", {"error": str(e)}, "error")
                 last_scout = time.time()
 
-            # ── Sequence cycle ───────────────────────────────────
-            if now - last_sequence >= sequence_interval_sec:
-                try:
-                    await run_sequence()
-                    log_to_hive("scheduler", "sequence_tick")
-                except Exception as e:
-                    print(f"  ❌ Sequence error: {e}")
-                    log_to_hive("scheduler", "sequence_error", {"error": str(e)}, "error")
-                last_sequence = time.time()
-
             # ── Heartbeat ────────────────────────────────────────
             mins_to_next = max(0, int((scout_interval_sec - (time.time() - last_scout)) / 60))
             print(f"  💓 [{_ts()}] Alive — next scout in {mins_to_next}m")
@@ -432,16 +415,16 @@ if __name__ == "__main__":
     cmd = sys.argv[1] if len(sys.argv) > 1 else "all"
 
     if cmd == "scout":
-        asyncio.run(run_scout())
+        arun(run_scout())
     elif cmd == "enrich":
-        asyncio.run(enrich_all_leads())
+        arun(enrich_all_leads())
     elif cmd == "strike":
-        asyncio.run(run_striker())
+        arun(run_striker())
     elif cmd == "sequence":
-        asyncio.run(run_sequence())
+        arun(run_sequence())
     elif cmd == "watchdog":
         run_watchdog_thread()
     elif cmd == "all":
-        asyncio.run(main_loop())
+        arun(main_loop())
     else:
         print(__doc__)
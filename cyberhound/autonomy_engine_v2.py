@@ -25,25 +25,26 @@ import sys
 import time
 import threading
 import traceback
+from collections import deque
 from datetime import datetime, timedelta
-from pathlib import Path
 from typing import Dict, List, Optional
 
 # Add parent to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from hermes_client import (
-    chat, chat_json, deep_reason, score_lead,
-    generate_email, analyze_reply, ping as hermes_ping,
+    achat, achat_json, ascore_lead, ascore_leads_batch, agenerate_email, aanalyze_reply,
+    aping as hermes_aping,
 )
+from llm_stream import email_or_not_found
+from event_log import get_log
+from lead_store import get_store
 
 # ── Config ──────────────────────────────────────────────────────────────────
 
 SCOUT_INTERVAL_HOURS = int(os.getenv("SCOUT_INTERVAL_HOURS", 6))
-SEQUENCE_INTERVAL_HOURS = int(os.getenv("SEQUENCE_INTERVAL_HOURS", 24))
 WATCHDOG_INTERVAL_SEC = int(os.getenv("WATCHDOG_INTERVAL_SEC", 60))
 MAX_DAILY_STRIKES = int(os.getenv("MAX_DAILY_STRIKES", 20))
-LEADS_FILE = "PIPELINE_LEADS.json"
-OUTCOMES_FILE = "OUTCOMES_LOG.json"
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", 4))  # In-flight LLM calls per phase
 
 ICP_MIN_SCORE = int(os.getenv("ICP_MIN_SCORE", 60))  # Min score to pursue
 AUTO_STRIKE_ENABLED = os.getenv("AUTO_STRIKE_ENABLED", "true").lower() == "true"
@@ -51,39 +52,15 @@ REVENUE_TRACKING_ENABLED = os.getenv("REVENUE_TRACKING_ENABLED", "true").lower()
 
 # ── Lead Store ──────────────────────────────────────────────────────────────
 
-def load_json(path: str) -> list:
-    if not Path(path).exists():
-        return []
-    try:
-        with open(path) as f:
-            return json.load(f)
-    except:
-        return []
-
 def save_json(path: str, data):
     with open(path, "w") as f:
         json.dump(data, f, indent=2, default=str)
 
 def load_leads() -> list:
-    return load_json(LEADS_FILE)
-
-def save_leads(leads: list):
-    save_json(LEADS_FILE, leads)
+    return get_store().all()
 
 def add_lead(lead_data: dict) -> dict:
-    leads = load_leads()
-    existing = next(
-        (l for l in leads
-         if l.get("website", "").lower() == lead_data.get("website", "").lower()),
-        None
-    )
-    if existing:
-        existing.update({k: v for k, v in lead_data.items() if v})
-        save_leads(leads)
-        return existing
-
-    lead = {
-        "id": f"lead_{int(datetime.now().timestamp())}",
+    return get_store().add(lead_data, merge=True, defaults={
         "discovered_at": datetime.now().isoformat(),
         "pursued": False,
         "struck": False,
@@ -91,56 +68,59 @@ def add_lead(lead_data: dict) -> dict:
         "replies": [],
         "outcome": None,  # won / lost / ignored / bounced
         "revenue": None,
-        **lead_data,
-    }
-    leads.append(lead)
-    save_leads(leads)
-    return lead
+    })
 
 def update_lead(lead_id: str, updates: dict):
-    leads = load_leads()
-    for l in leads:
-        if l["id"] == lead_id:
-            l.update(updates)
-            break
-    save_leads(leads)
+    get_store().update(lead_id, updates)
 
 def get_leads_by_status(status: str) -> list:
-    if status == "pending_enrichment":
-        return [l for l in load_leads() if not l.get("icp_score")]
-    if status == "ready_to_strike":
-        return [
-            l for l in load_leads()
-            if l.get("pursued") and not l.get("struck") and l.get("email")
-        ]
-    if status == "pending_sequence":
-        return [
-            l for l in load_leads()
-            if l.get("struck") and l.get("outcome") is None
-        ]
-    return []
+    # pending_enrichment / ready_to_strike / pending_sequence (see lead_store.STATUSES)
+    return get_store().by_status(status)
 
 # ── Outcome Store ───────────────────────────────────────────────────────────
 
 def log_outcome(lead_id: str, outcome: str, revenue: float = None, notes: str = ""):
-    outcomes = load_json(OUTCOMES_FILE)
-    outcomes.append({
+    get_log("outcomes").append({
         "lead_id": lead_id,
         "outcome": outcome,
         "revenue": revenue,
         "notes": notes,
         "logged_at": datetime.now().isoformat(),
     })
-    save_json(OUTCOMES_FILE, outcomes)
 
     # Update the lead
-    update_lead(lead_id, {"outcome": outcome, "revenue": revenue})
+    lead = get_store().update(lead_id, {"outcome": outcome, "revenue": revenue})
+    if lead and outcome == "bounced":
+        get_store().block_domain(lead.get("website", ""), reason="bounced")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # PHASE 1: HERMES SCOUT — AI-powered niche/lead discovery
 # ═══════════════════════════════════════════════════════════════════════════════
 
+HERMES_SCOUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "leads": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "website": {"type": "string"},
+                    "industry": {"type": "string"},
+                    "risk_score": {"type": "number"},
+                    "revenue_signal": {"type": "string"},
+                    "why_target": {"type": "string"},
+                },
+                "required": ["name", "website"],
+            },
+        },
+    },
+    "required": ["leads"],
+}
+
+
 async def hermes_scout() -> List[Dict]:
     """Use Hermes to discover high-opportunity B2B leads."""
     print(f"\n🔍 [{_ts()}] HERMES SCOUT — Hunting for opportunities...")
@@ -156,53 +136,48 @@ async def hermes_scout() -> List[Dict]:
         - Show signals of needing automation/compliance services
         - Have English-only websites operating in Quebec/French markets (high risk)
 
-        Return ONLY a valid JSON array with this exact schema:
-        [{
+        Return ONLY a JSON object {"leads": [...]} where each lead has this exact schema:
+        {
           "name": "Company Name",
           "website": "https://company.com",
           "industry": "SaaS | Fintech | Healthtech | etc",
           "risk_score": 85,
           "revenue_signal": "recent funding | growing team | new product launch",
           "why_target": "Brief reason this company is a good prospect"
-        }]
+        }
 
         Return 5-10 leads. Risk score = opportunity score (0-100, higher = better target).
         """
 
-        result = chat_json(
+        result = await achat_json(
             prompt=prompt,
             system="You are an expert B2B lead generation and market research agent.",
             temperature=0.7,
             max_tokens=3000,
+            task="scout",
+            schema=HERMES_SCOUT_SCHEMA,  # validated; arrays and truncation are repaired locally
         )
 
+        # Drop discarded/bounced domains and ones already in the pipeline before
+        # they cost a scoring call
+        fresh, skipped = get_store().filter_new(result["leads"])
         new_leads = []
-        if isinstance(result, list):
-            for item in result:
-                lead = add_lead({
-                    "name": item.get("name", "Unknown"),
-                    "website": item.get("website", ""),
-                    "industry": item.get("industry", ""),
-                    "risk_score": item.get("risk_score", 70),
-                    "source": "hermes_scout",
-                    "scout_notes": {
-                        "revenue_signal": item.get("revenue_signal", ""),
-                        "why_target": item.get("why_target", ""),
-                    },
-                })
-                new_leads.append(lead)
-        elif isinstance(result, dict) and "leads" in result:
-            for item in result["leads"]:
-                lead = add_lead({
-                    "name": item.get("name", "Unknown"),
-                    "website": item.get("website", ""),
-                    "industry": item.get("industry", ""),
-                    "risk_score": item.get("risk_score", 70),
-                    "source": "hermes_scout",
-                })
-                new_leads.append(lead)
-
-        print(f"  ✅ Hermes Scout found {len(new_leads)} new leads")
+        for item in fresh:
+            lead = add_lead({
+                "name": item.get("name", "Unknown"),
+                "website": item.get("website", ""),
+                "industry": item.get("industry", ""),
+                "risk_score": item.get("risk_score", 70),
+                "source": "hermes_scout",
+                "scout_notes": {
+                    "revenue_signal": item.get("revenue_signal", ""),
+                    "why_target": item.get("why_target", ""),
+                },
+            })
+            new_leads.append(lead)
+
+        print(f"  ✅ Hermes Scout found {len(new_leads)} new leads "
+              f"(skipped {skipped['known']} known, {skipped['blocked']} blocked)")
         return new_leads
 
     except Exception as e:
@@ -215,19 +190,20 @@ async def hermes_scout() -> List[Dict]:
 # PHASE 2: HERMES ENRICH + DECIDE — Score, enrich, and decide per lead
 # ═══════════════════════════════════════════════════════════════════════════════
 
-async def hermes_enrich_and_decide(lead: dict) -> dict:
-    """Score a lead and decide: pursue, watch, or discard."""
+async def hermes_enrich_and_decide(lead: dict, score: Optional[dict] = None) -> dict:
+    """Score a lead (unless a batch already did) and decide: pursue, watch, or discard."""
     name = lead.get("name", "Unknown")
     website = lead.get("website", "")
     print(f"  📊 [{_ts()}] Hermes scoring: {name}")
 
     try:
         # Score the lead
-        score = score_lead(
-            company_name=name,
-            website=website,
-            industry=lead.get("industry", ""),
-        )
+        if score is None:
+            score = await ascore_lead(
+                company_name=name,
+                website=website,
+                industry=lead.get("industry", ""),
+            )
 
         icp_score = score.get("icp_score", 50)
         risk_level = score.get("risk_level", "medium")
@@ -261,6 +237,8 @@ async def hermes_enrich_and_decide(lead: dict) -> dict:
             "scored_at": datetime.now().isoformat(),
         }
         update_lead(lead["id"], updates)
+        if decision == "discard":
+            get_store().block_domain(website, reason="discarded")
 
         emoji = {"pursue": "🎯", "watch": "👁️", "discard": "🗑️"}
         print(f"    {emoji.get(decision, '?')} {decision.upper()} | ICP: {icp_score}/100 | {decision_reason}")
@@ -283,7 +261,9 @@ async def hermes_find_email(company_name: str, website: str) -> str:
         Check common patterns: info@, contact@, hello@, or first name patterns.
         Return ONLY the email address as plain text, or NOT_FOUND if none found.
         """
-        result = chat(prompt, max_tokens=100, temperature=0.2)
+        # Streamed: stop as soon as an address (or NOT_FOUND) has come through
+        result = await achat(prompt, max_tokens=100, temperature=0.2, task="find_email",
+                             stop_when=email_or_not_found)
         if "@" in result and "NOT_FOUND" not in result:
             return result.strip()
         return ""
@@ -293,12 +273,32 @@ async def hermes_find_email(company_name: str, website: str) -> str:
 
 async def enrich_all_pending():
     """Score and decide on all unenriched leads."""
-    pending = get_leads_by_status("pending_enrichment")
+    store = get_store()
+    pending = [l for l in get_leads_by_status("pending_enrichment")
+               if not store.is_blocked(l.get("website", ""))]
     print(f"\n📊 [{_ts()}] HERMES ENRICHER — {len(pending)} leads to score")
 
-    for lead in pending:
-        await hermes_enrich_and_decide(lead)
-        await asyncio.sleep(1)  # Rate limit
+    if not pending:
+        return
+
+    # One prompt per batch of leads; anything the batch could not score
+    # falls back to a single score_lead call inside hermes_enrich_and_decide,
+    # except leads the batch already retried on their own (next cycle)
+    failed = set()
+    scores = await ascore_leads_batch(pending, concurrency=LLM_CONCURRENCY, failed_out=failed)
+    print(f"  📦 [{_ts()}] Batch-scored {len(scores)}/{len(pending)} leads")
+    if failed:
+        print(f"  ⏭️  {len(failed)} lead(s) failed single scoring too — left pending for the next cycle")
+        pending = [l for l in pending if str(l["id"]) not in failed]
+
+    sem = asyncio.Semaphore(LLM_CONCURRENCY)
+
+    async def _score(lead: dict):
+        async with sem:
+            # Pacing comes from the shared per-host bucket in http_pool
+            await hermes_enrich_and_decide(lead, scores.get(str(lead["id"])))
+
+    await asyncio.gather(*(_score(lead) for lead in pending))
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -307,20 +307,20 @@ async def enrich_all_pending():
 
 async def hermes_striker():
     """Fire AI-personalized Touch 1 for pursued, unstruck leads."""
-    from email_envoy_v2 import _send_html
-    from deal_tracker import get_deal, upsert_deal, Stage
+    from email_envoy_v2 import already_queued, queue_html
+    from deal_tracker import get_deal, Stage
 
     ready = get_leads_by_status("ready_to_strike")
     print(f"\n⚡ [{_ts()}] AI STRIKER — {len(ready)} leads ready")
 
-    struck = 0
+    # Pick today's targets first so drafts only go to leads we will send
+    targets = []
     for lead in ready:
-        if struck >= MAX_DAILY_STRIKES:
+        if len(targets) >= MAX_DAILY_STRIKES:
             print(f"  🛑 Daily limit ({MAX_DAILY_STRIKES}) reached")
             break
 
         email = lead.get("email", "")
-        name = lead.get("name", "Unknown")
         if not email:
             continue
 
@@ -329,21 +329,41 @@ async def hermes_striker():
         if existing:
             update_lead(lead["id"], {"struck": True, "strike_at": datetime.now().isoformat()})
             continue
+        targets.append(lead)
 
-        print(f"  ✉️  Generating AI email for: {name}")
+    # Generate AI-personalized emails concurrently
+    sem = asyncio.Semaphore(LLM_CONCURRENCY)
 
-        try:
-            # Generate AI-personalized email
-            ai_email = generate_email(
-                to_name=name,
-                company_name=name,
-                icp_score=lead.get("icp_score", 70),
-                risk_level=lead.get("risk_level", "medium"),
-                selling_points=lead.get("key_selling_points", []),
-                tone=lead.get("recommended_tone", "consultative"),
-                touch_number=1,
-            )
+    async def _draft(lead: dict):
+        name = lead.get("name", "Unknown")
+        async with sem:
+            print(f"  ✉️  Generating AI email for: {name}")
+            try:
+                return await agenerate_email(
+                    to_name=name,
+                    company_name=name,
+                    icp_score=lead.get("icp_score", 70),
+                    risk_level=lead.get("risk_level", "medium"),
+                    selling_points=lead.get("key_selling_points", []),
+                    tone=lead.get("recommended_tone", "consultative"),
+                    touch_number=1,
+                )
+            except Exception as e:
+                print(f"    ❌ Strike error: {e}")
+                return None
 
+    drafts = await asyncio.gather(*(_draft(lead) for lead in targets))
+
+    # Hand off to the outbox: workers deliver over pooled SMTP connections, and the
+    # deal (stage + drip schedule) is recorded once each email is actually delivered
+    struck = 0
+    for lead, ai_email in zip(targets, drafts):
+        if ai_email is None:
+            continue
+        email = lead["email"]
+        name = lead.get("name", "Unknown")
+
+        try:
             subject = ai_email.get("subject", f"Strategic Advisory: {name}")
             body = ai_email.get("body", "")
             body_html = (
@@ -354,102 +374,103 @@ async def hermes_striker():
             )
 
             if AUTO_STRIKE_ENABLED:
-                success = _send_html(email, name, subject, body_html)
-                if success:
+                queued = queue_html(email, name, subject, body_html, "touch_1", deal=dict(
+                    email=email, name=name, stage=Stage.PROSPECT, touch=1,
+                    notes=f"AI Touch 1 sent {datetime.now().strftime('%Y-%m-%d')} | ICP: {lead.get('icp_score')}"))
+                if queued:
                     update_lead(lead["id"], {
                         "struck": True,
                         "strike_at": datetime.now().isoformat(),
                         "strike_subject": subject,
                     })
-                    upsert_deal(email, name, Stage.PROSPECT,
-                                notes=f"AI Touch 1 sent {datetime.now().strftime('%Y-%m-%d')} | ICP: {lead.get('icp_score')}")
                     struck += 1
-                    print(f"    ✅ Sent: {subject[:60]}")
-                    await asyncio.sleep(3)  # Rate limit
+                elif already_queued(email, "touch_1"):
+                    # Queued by an earlier run that died before marking the lead
+                    update_lead(lead["id"], {"struck": True, "strike_at": datetime.now().isoformat()})
             else:
                 print(f"    📝 Drafted (auto-send disabled): {subject[:60]}")
 
         except Exception as e:
             print(f"    ❌ Strike error: {e}")
 
-    print(f"  ✅ Striker done: {struck} emails sent")
+    print(f"  ✅ Striker done: {struck} emails queued")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # PHASE 4: HERMES WATCHDOG — Monitor replies, auto-respond
 # ═══════════════════════════════════════════════════════════════════════════════
 
-async def hermes_watchdog_cycle():
-    """Check for replies and auto-respond using Hermes."""
-    from config import check_config, IMAP_SERVER, IMAP_USER, IMAP_PASS, SMTP_USER
-    from email_envoy_v2 import _send_html
-    from deal_tracker import get_deal, upsert_deal, Stage
+async def _hermes_reply(msg, body, queue_html):
+    """Analyze one inbound message and queue Hermes' answer if it warrants one."""
+    sender = msg.from_addr
+    subject = msg.subject
 
-    if not check_config():
+    if not body:
         return
 
-    try:
-        import imaplib
-        import email as email_lib
-
-        mail = imaplib.IMAP4_SSL(IMAP_SERVER)
-        mail.login(IMAP_USER, IMAP_PASS)
-        mail.select("inbox")
-
-        # Search for unseen replies from tracked domains
-        status, messages = mail.search(None, "(UNSEEN)")
-        if not messages[0]:
-            return
-
-        for num in messages[0].split()[-5:]:  # Last 5 unread
-            status, data = mail.fetch(num, "(RFC822)")
-            raw_email = data[0][1]
-            msg = email_lib.message_from_bytes(raw_email)
-
-            sender = msg["From"]
-            subject = msg.get("Subject", "")
-            body = ""
-
-            if msg.is_multipart():
-                for part in msg.walk():
-                    if part.get_content_type() == "text/plain":
-                        body = part.get_payload(decode=True).decode(errors="ignore")
-                        break
-            else:
-                body = msg.get_payload(decode=True).decode(errors="ignore")
+    print(f"  📨 Reply from: {sender}")
 
-            if not body:
-                continue
+    # Hermes analyzes the reply
+    analysis = await aanalyze_reply(body)
+    sentiment = analysis.get("sentiment", "neutral")
+    should_respond = analysis.get("should_respond", False)
 
-            print(f"  📨 Reply from: {sender}")
+    print(f"    Sentiment: {sentiment} | Respond: {should_respond}")
 
-            # Hermes analyzes the reply
-            analysis = analyze_reply(body)
-            sentiment = analysis.get("sentiment", "neutral")
-            should_respond = analysis.get("should_respond", False)
+    if should_respond and AUTO_STRIKE_ENABLED:
+        # Generate response
+        response_email = await agenerate_email(
+            to_name=sender.split("@")[0],
+            company_name="",
+            touch_number=4,
+            previous_reply=body,
+        )
+        response_body = response_email.get("body", "Thank you for your reply.")
+        response_html = (
+            f"<html><body style='font-family:Georgia;color:#e8e0d0;'>"
+            f"<pre style='white-space:pre-wrap;'>{response_body}</pre>"
+            f"</body></html>"
+        )
+        # One auto-response per inbound message, delivered by the outbox workers
+        reply_key = f"ai_reply:{msg.message_id or subject}"
+        if await asyncio.to_thread(queue_html, sender, sender, f"Re: {subject}", response_html, reply_key):
+            print(f"    ✅ Auto-response queued")
+
+
+def _hermes_sync_pass(loop, queue_html):
+    """
+    Blocking IMAP pass (worker thread): each new message's body is fetched here
+    and handed to _hermes_reply on the event loop; the watermark moves past a
+    message only once its reply is handled.
+    """
+    import imaplib
+    from config import IMAP_SERVER, IMAP_USER, IMAP_PASS
+    from imap_idle import IMAP_TIMEOUT
+    from imap_sync import MailboxSync
+
+    mail = imaplib.IMAP4_SSL(IMAP_SERVER, timeout=IMAP_TIMEOUT)
+    mail.login(IMAP_USER, IMAP_PASS)
+    try:
+        # New mail since this watchdog's watermark, headers only; at most 5 per cycle
+        with MailboxSync(mail, "hermes_watchdog") as sync:
+            for msg in sync.new_messages(limit=5):
+                body = msg.body_text()  # text/plain part only, first IMAP_SYNC_BODY_BYTES
+                asyncio.run_coroutine_threadsafe(_hermes_reply(msg, body, queue_html), loop).result()
+    finally:
+        mail.logout()
 
-            print(f"    Sentiment: {sentiment} | Respond: {should_respond}")
 
-            if should_respond and AUTO_STRIKE_ENABLED:
-                # Generate response
-                response_email = generate_email(
-                    to_name=sender.split("@")[0],
-                    company_name="",
-                    touch_number=4,
-                    previous_reply=body,
-                )
-                response_body = response_email.get("body", "Thank you for your reply.")
-                response_html = (
-                    f"<html><body style='font-family:Georgia;color:#e8e0d0;'>"
-                    f"<pre style='white-space:pre-wrap;'>{response_body}</pre>"
-                    f"</body></html>"
-                )
-                _send_html(sender, sender, f"Re: {subject}", response_html)
-                print(f"    ✅ Auto-response sent")
+async def hermes_watchdog_cycle():
+    """Check for replies and auto-respond using Hermes."""
+    from config import check_config
+    from email_envoy_v2 import queue_html
 
-        mail.close()
-        mail.logout()
+    if not check_config():
+        return
 
+    try:
+        # imaplib blocks; keep it off the event loop like the other sync phases
+        await asyncio.to_thread(_hermes_sync_pass, asyncio.get_running_loop(), queue_html)
     except Exception as e:
         print(f"  ⚠️  Watchdog error: {e}")
 
@@ -459,41 +480,13 @@ async def hermes_watchdog_cycle():
 # ═══════════════════════════════════════════════════════════════════════════════
 
 async def run_sequence_drip():
-    """Fire Touch 2/3 for leads past their drip dates."""
-    from email_envoy_v2 import fire_touch_2, fire_touch_3
-    from deal_tracker import get_deal, Stage
-
-    leads = get_leads_by_status("pending_sequence")
-    if not leads:
+    """Fire Touch 2/3 for deals whose next touch is due (deal store due-time index)."""
+    if not AUTO_STRIKE_ENABLED:
         return
+    from cyberhound.sequence_scheduler import run_sequence
 
-    print(f"\n📅 [{_ts()}] SEQUENCE — Checking {len(leads)} leads for drip...")
-
-    for lead in leads:
-        struck_at = lead.get("strike_at", "")
-        if not struck_at:
-            continue
-
-        try:
-            days_since = (datetime.now() - datetime.fromisoformat(struck_at)).days
-        except:
-            continue
-
-        email = lead.get("email", "")
-        name = lead.get("name", "Unknown")
-        deal = get_deal(email)
-
-        if deal and deal.get("stage") in [Stage.REPLIED, Stage.CALLED, Stage.CLOSED_WON]:
-            continue
-
-        if days_since >= 7 and AUTO_STRIKE_ENABLED:
-            print(f"  📧 Touch 3 (Final) → {name} ({days_since}d)")
-            fire_touch_3(email, name)
-        elif days_since >= 3 and AUTO_STRIKE_ENABLED:
-            print(f"  📧 Touch 2 → {name} ({days_since}d)")
-            fire_touch_2(email, name)
-
-        await asyncio.sleep(1)
+    print(f"\n📅 [{_ts()}] SEQUENCE — Checking due touches...")
+    await asyncio.to_thread(run_sequence)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -502,28 +495,31 @@ async def run_sequence_drip():
 
 async def hermes_retrospective():
     """Weekly review: what worked, what didn't, adjust strategy."""
-    outcomes = load_json(OUTCOMES_FILE)
-    leads = load_leads()
-
-    if not outcomes:
-        return
+    # One streaming pass over the outcome log: counters plus the last 20 events
+    total, won, lost, total_revenue = 0, 0, 0, 0.0
+    recent = deque(maxlen=20)
+    for o in get_log("outcomes").read():
+        total += 1
+        recent.append(o)
+        if o.get("outcome") == "won":
+            won += 1
+            total_revenue += o.get("revenue", 0) or 0
+        elif o.get("outcome") == "lost":
+            lost += 1
 
     # Only run if we have enough data (at least 5 outcomes or 7 days)
-    if len(outcomes) < 5:
+    if total < 5:
         return
 
-    print(f"\n🧠 [{_ts()}] HERMES RETROSPECTIVE — Analyzing {len(outcomes)} outcomes...")
+    print(f"\n🧠 [{_ts()}] HERMES RETROSPECTIVE — Analyzing {total} outcomes...")
 
     try:
-        won = [o for o in outcomes if o.get("outcome") == "won"]
-        lost = [o for o in outcomes if o.get("outcome") == "lost"]
-        total_revenue = sum(o.get("revenue", 0) or 0 for o in won)
-
+        leads = get_store().recent(10)
         summary = {
-            "total_outcomes": len(outcomes),
-            "won": len(won),
-            "lost": len(lost),
-            "win_rate": f"{(len(won)/max(len(outcomes),1))*100:.1f}%",
+            "total_outcomes": total,
+            "won": won,
+            "lost": lost,
+            "win_rate": f"{(won/max(total,1))*100:.1f}%",
             "total_revenue": f"${total_revenue:,.2f}",
         }
 
@@ -535,7 +531,7 @@ async def hermes_retrospective():
             'outcome': o['outcome'],
             'revenue': o.get('revenue'),
             'notes': o.get('notes', '')
-        } for o in outcomes[-20:]], indent=2)}
+        } for o in recent], indent=2)}
 
         CURRENT LEADS (sample):
         {json.dumps([{
@@ -544,7 +540,7 @@ async def hermes_retrospective():
             'industry': l.get('industry'),
             'decision': l.get('decision'),
             'outcome': l.get('outcome')
-        } for l in leads[-10:]], indent=2)}
+        } for l in leads], indent=2)}
 
         SUMMARY: {json.dumps(summary)}
 
@@ -555,16 +551,18 @@ async def hermes_retrospective():
         - recommended_icp_threshold (int): suggested minimum ICP score
         """
 
-        result = chat_json(prompt, max_tokens=1500)
+        result = await achat_json(prompt, max_tokens=1500, task="retrospective")
         print(f"  📊 Insights: {json.dumps(result.get('insights', []), indent=2)}")
         print(f"  🎯 Strategy shifts: {json.dumps(result.get('strategy_shifts', []), indent=2)}")
 
-        # Save retrospective
-        save_json("RETROSPECTIVE_LATEST.json", {
+        # Save retrospective (history in the event log, latest as a snapshot)
+        retrospective = {
             "ran_at": datetime.now().isoformat(),
             "summary": summary,
             "insights": result,
-        })
+        }
+        get_log("retrospectives").append(retrospective)
+        save_json("RETROSPECTIVE_LATEST.json", retrospective)
 
     except Exception as e:
         print(f"  ⚠️  Retrospective error: {e}")
@@ -579,7 +577,7 @@ async def system_health_check():
     checks = {}
 
     # Hermes connectivity
-    ping = hermes_ping()
+    ping = await hermes_aping()
     checks["hermes"] = ping
 
     # SMTP check
@@ -587,8 +585,8 @@ async def system_health_check():
     checks["smtp"] = check_config()
 
     # File integrity
-    checks["leads_file"] = Path(LEADS_FILE).exists()
-    checks["lead_count"] = len(load_leads())
+    checks["lead_store"] = get_store().path
+    checks["lead_count"] = get_store().count()
 
     # Print health
     status_emoji = "✅" if ping["ok"] else "❌"
@@ -644,7 +642,7 @@ async def run_daemon():
 ║   Powered by: DeepSeek via Hermes AI Client                 ║
 ╚══════════════════════════════════════════════════════════════╝
     Scout interval:    every {SCOUT_INTERVAL_HOURS}h
-    Sequence interval: every {SEQUENCE_INTERVAL_HOURS}h
+    Sequence:          due-time drip (wakes when a touch is due)
     Watchdog interval: every {WATCHDOG_INTERVAL_SEC}s
     Max daily strikes: {MAX_DAILY_STRIKES}
     Auto-strike:       {'ENABLED' if AUTO_STRIKE_ENABLED else 'DISABLED'}
@@ -654,11 +652,18 @@ async def run_daemon():
     # Initial health check
     await system_health_check()
 
+    # Drip scheduler sleeps until the next Touch 2/3 is due
+    if AUTO_STRIKE_ENABLED:
+        from cyberhound.sequence_scheduler import start as start_sequence
+        start_sequence()
+
+    # Outbox workers deliver queued email (including any backlog from the last run)
+    from cyberhound.outbox import start as start_outbox
+    start_outbox()
+
     last_scout = 0
-    last_sequence = 0
     last_retrospective = 0
     scout_interval_sec = SCOUT_INTERVAL_HOURS * 3600
-    sequence_interval_sec = SEQUENCE_INTERVAL_HOURS * 3600
     retrospective_interval_sec = 7 * 24 * 3600  # Weekly
 
     while True:
@@ -674,14 +679,6 @@ async def run_daemon():
                 print(f"  ❌ Scout cycle error: {e}")
             last_scout = time.time()
 
-        # ── Sequence drip cycle ────────────────────────────
-        if now - last_sequence >= sequence_interval_sec:
-            try:
-                await run_sequence_drip()
-            except Exception as e:
-                print(f"  ❌ Sequence error: {e}")
-            last_sequence = time.time()
-
         # ── Watchdog (runs more frequently) ────────────────
         try:
             await hermes_watchdog_cycle()
@@ -698,7 +695,7 @@ async def run_daemon():
 
         # ── Heartbeat ──────────────────────────────────────
         next_scout_m = max(0, int((scout_interval_sec - (time.time() - last_scout)) / 60))
-        print(f"  💓 [{_ts()}] Alive — {len(load_leads())} leads | "
+        print(f"  💓 [{_ts()}] Alive — {get_store().count()} leads | "
               f"Next scout in {next_scout_m}m")
         await asyncio.sleep(60)  # Heartbeat every minute
 
@@ -709,23 +706,27 @@ async def run_daemon():
 
 if __name__ == "__main__":
     cmd = sys.argv[1] if len(sys.argv) > 1 else "daemon"
+    try:  # the same module hermes_client pools through
+        from cyberhound.http_pool import arun
+    except ImportError:
+        from http_pool import arun
 
     if cmd == "once":
-        asyncio.run(run_once())
+        arun(run_once())
     elif cmd == "daemon":
         try:
-            asyncio.run(run_daemon())
+            arun(run_daemon())
         except KeyboardInterrupt:
             print("\n👋 Autonomy engine stopped.")
     elif cmd == "scout":
-        asyncio.run(hermes_scout())
+        arun(hermes_scout())
     elif cmd == "enrich":
-        asyncio.run(enrich_all_pending())
+        arun(enrich_all_pending())
     elif cmd == "strike":
-        asyncio.run(hermes_striker())
+        arun(hermes_striker())
     elif cmd == "health":
-        asyncio.run(system_health_check())
+        arun(system_health_check())
     elif cmd == "retro":
-        asyncio.run(hermes_retrospective())
+        arun(hermes_retrospective())
     else:
         print(__doc__)
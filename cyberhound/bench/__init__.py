@@ -0,0 +1 @@
+"""Benchmarks for the CyberHound CLI and pipelines (not imported at runtime)."""
@@ -0,0 +1,89 @@
+"""
+autonomy_engine_v2.run_once benchmark against the offline LLM stand-in
+=====================================================================
+Starts an in-process llm_standin server, points HERMES_BASE_URL at it and
+runs `run_once()` a few times in a scratch directory (fresh lead store,
+no response cache, auto-strike off, no IMAP). Each cycle scouts 8 new leads,
+batch-scores them, looks up emails and drafts Touch 1, so cycles are
+comparable run to run and commit to commit.
+
+Reports wall time per cycle, LLM calls/sec and per-site p50/p95 from the
+telemetry ledger.
+
+Usage:
+    python -m cyberhound.bench.autonomy_v2 [--runs 3] [--latency lognormal:0.6,0.3]
+        [--tokens-per-sec 60] [--error-rate 0.02] [--rate-limit-rate 0.01]
+        [--truncate-rate 0.05] [--replay llm_cassette.jsonl] [--rate-limits] [--verbose]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from cyberhound.http_pool import arun
+from cyberhound.bench.llm_standin import server_from_args
+
+CYBERHOUND_DIR = str(Path(__file__).resolve().parents[1])
+
+
+def _prepare_env(base_url: str, workdir: str, keep_rate_limits: bool):
+    os.environ.update({
+        "HERMES_BASE_URL": base_url,
+        "HERMES_API_KEY": "standin",
+        "LLM_CACHE_ENABLED": "false",
+        "LLM_TELEMETRY_PATH": os.path.join(workdir, "llm_calls.jsonl"),
+        "RATE_LIMIT_PATH": os.path.join(workdir, "rate_limits.sqlite"),
+        "LEAD_STORE_PATH": os.path.join(workdir, "leads.sqlite"),
+        "DEAL_STORE_PATH": os.path.join(workdir, "deals.sqlite"),
+        "OUTBOX_PATH": os.path.join(workdir, "outbox.sqlite"),
+        "AUTO_STRIKE_ENABLED": "false",
+    })
+    if not keep_rate_limits:
+        os.environ["RATE_LIMIT_HERMES"] = "0"
+    for var in ("SMTP_USER", "SMTP_PASS", "GMAIL_USER", "GMAIL_PASS"):
+        os.environ.pop(var, None)  # keeps the watchdog and SMTP offline
+
+
+def main(args: List[str]):
+    runs = int(args[args.index("--runs") + 1]) if "--runs" in args else 3
+    server = server_from_args(["--port", "0"] + args).start()  # ephemeral port
+    workdir = tempfile.mkdtemp(prefix="cyberhound-bench-")
+    _prepare_env(server.base_url, workdir, "--rate-limits" in args)
+
+    os.chdir(workdir)
+    sys.path.insert(0, CYBERHOUND_DIR)
+    import autonomy_engine_v2 as engine
+    from llm_telemetry import aggregate, read_ledger
+
+    print(f"🧪 run_once × {runs} against {server.base_url} (latency {server.latency_spec}) in {workdir}\n")
+    walls = []
+    for i in range(runs):
+        requests_before = server.stats().get("requests", 0)
+        out = io.StringIO()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stdout if "--verbose" in args else out):
+            arun(engine.run_once())
+        wall = time.perf_counter() - started
+        walls.append(wall)
+        calls = server.stats().get("requests", 0) - requests_before
+        print(f"  cycle {i + 1}: {wall:6.2f}s  {calls:4d} LLM calls  {calls / wall:6.1f} calls/s  "
+              f"{engine.get_store().count()} leads in pipeline")
+
+    stats = server.stats()
+    server.stop()
+    print(f"\n⏱  mean cycle {sum(walls) / len(walls):.2f}s  (min {min(walls):.2f}s, max {max(walls):.2f}s)")
+    print(f"🧪 stand-in: {stats}\n")
+    print(f"{'SITE':<16} {'CALLS':>6} {'ERR':>4} {'P50':>6} {'P95':>6} {'RETRY':>5}")
+    for row in aggregate(read_ledger(os.environ["LLM_TELEMETRY_PATH"])):
+        p50 = f"{row['p50']:.2f}" if row["p50"] is not None else "-"
+        p95 = f"{row['p95']:.2f}" if row["p95"] is not None else "-"
+        print(f"{row['site']:<16} {row['calls']:>6} {row['errors']:>4} {p50:>6} {p95:>6} {row['retries']:>5}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
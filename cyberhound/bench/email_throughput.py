@@ -0,0 +1,250 @@
+"""
+Email throughput benchmark — envoy, striker and drip scheduler against the SMTP sink
+====================================================================================
+Measures how fast the send path drains: producers (fire_touch_1, the AI
+striker, the drip scheduler) enqueue into the outbox, outbox workers deliver
+over the SMTP pool, and an in-process smtp_sink (STARTTLS + AUTH, optional
+latency / failure injection) records what arrives. Nothing touches Gmail.
+
+Each deal-set size runs in a fresh interpreter and scratch directory: the deal
+store is seeded with N synthetic PROSPECT deals spread over --domains
+recipient domains, of which --due (a fraction) are past their Touch 2 date.
+Then, per scenario, the same number of messages is pushed through:
+
+  • envoy     — email_envoy_v2.fire_touch_1 to new prospects (ledger PDF attached)
+  • striker   — autonomy_engine_v2.hermes_striker over ready_to_strike leads
+                (drafts from the offline llm_standin)
+  • sequence  — sequence_scheduler.run_sequence over the due deals
+
+Reports, per size and scenario: messages delivered, producer enqueue rate,
+end-to-end msgs/s (first enqueue → outbox drained), p95 send latency as the
+pool sees it (last 2048 sends) and at the sink, and TCP connections opened.
+
+Usage:
+    python -m cyberhound.bench.email_throughput [--deals 1000,10000,100000] [--due 0.1]
+        [--scenarios envoy,striker,sequence] [--domains 50] [--pool-size 4] [--workers 4]
+        [--domain-concurrency 2] [--latency fixed:0.02] [--connect-latency fixed:0.05]
+        [--temp-fail-rate 0.01] [--perm-fail-rate 0] [--drop-rate 0] [--max-msgs-per-conn 0]
+        [--llm-latency fixed:0] [--timeout 900] [--rate-limits] [--no-tls] [--verbose]
+"""
+
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from cyberhound.http_pool import arun
+from cyberhound.bench.llm_standin import StandInServer
+from cyberhound.bench.smtp_sink import SMTPSink, _arg
+
+REPO_ROOT = str(Path(__file__).resolve().parents[2])
+CYBERHOUND_DIR = str(Path(__file__).resolve().parents[1])
+SCENARIOS = ("envoy", "striker", "sequence")
+BENCH_USER, BENCH_PASS = "bench@cyberhound.test", "bench-pass"
+
+
+# ── Child: one deal-set size ────────────────────────────────────────────────
+
+
+def _prepare_env(workdir: str, sink: SMTPSink, llm_url: str, args: List[str]):
+    pool_size = _arg(args, "--pool-size", "4")
+    os.environ.update({
+        "SMTP_SERVER": sink.host,
+        "SMTP_PORT": str(sink.port),
+        "SMTP_USER": BENCH_USER,
+        "SMTP_PASS": BENCH_PASS,
+        "SMTP_POOL_SIZE": pool_size,
+        "OUTBOX_WORKERS": _arg(args, "--workers", pool_size),
+        "OUTBOX_DOMAIN_CONCURRENCY": _arg(args, "--domain-concurrency", "2"),
+        "OUTBOX_BACKOFF_BASE_SEC": "0.2",   # injected 4xx retry within the run
+        "OUTBOX_BACKOFF_MAX_SEC": "2",
+        "OUTBOX_EXIT_DRAIN_SEC": "0",
+        "OUTBOX_PATH": os.path.join(workdir, "outbox.sqlite"),
+        "DEAL_STORE_PATH": os.path.join(workdir, "deals.sqlite"),
+        "LEAD_STORE_PATH": os.path.join(workdir, "leads.sqlite"),
+        "RATE_LIMIT_PATH": os.path.join(workdir, "rate_limits.sqlite"),
+        "HERMES_BASE_URL": llm_url,
+        "HERMES_API_KEY": "standin",
+        "LLM_CACHE_ENABLED": "false",
+        "LLM_TELEMETRY_PATH": os.path.join(workdir, "llm_calls.jsonl"),
+        "RATE_LIMIT_HERMES": "0",
+        "AUTO_STRIKE_ENABLED": "true",
+        "MAX_DAILY_STRIKES": "10000000",
+    })
+    if "--rate-limits" not in args:
+        os.environ["RATE_LIMIT_SMTP"] = "0"
+    for var in ("GMAIL_USER", "GMAIL_PASS"):
+        os.environ.pop(var, None)
+
+
+def _seed_deals(total: int, due: int, domains: int):
+    """`total` PROSPECT deals after Touch 1; the first `due` are past their Touch 2 date."""
+    from cyberhound.deal_store import get_deal_store, schedule
+
+    store = get_deal_store()
+    overdue = (datetime.now() - timedelta(days=4)).isoformat()
+    with store.transaction():
+        for i in range(total):
+            email = f"deal{i}@company{i % domains}.test"
+            deal = store.upsert(email, f"Deal {i}", "PROSPECT", notes="Touch 1 sent (seed)", touch=1)
+            if i < due:
+                deal["touch_1_at"] = overdue
+                store.update(email, schedule(deal))
+
+
+def _seed_leads(count: int):
+    from cyberhound.lead_store import get_store
+
+    store = get_store()
+    with store.transaction():
+        for i in range(count):
+            store.add({
+                "name": f"Striker {i} Inc", "website": f"https://striker{i}.test",
+                "email": f"ceo@striker{i}.test", "pursued": True, "icp_score": 80,
+                "risk_level": "medium", "recommended_tone": "consultative",
+            })
+
+
+def _run_scenario(name: str, count: int, domains: int, sink: SMTPSink, timeout: float) -> Dict:
+    from cyberhound import email_envoy_v2
+    from cyberhound.outbox import drain, get_outbox
+    from cyberhound.smtp_pool import get_pool
+
+    outbox = get_outbox()
+    before = outbox.stats()
+    pool = get_pool()
+    pool.reset_stats()
+    sink.reset()
+
+    started = time.perf_counter()
+    if name == "envoy":
+        for i in range(count):
+            email_envoy_v2.fire_touch_1(f"prospect{i}@company{i % domains}.test", f"Prospect {i}")
+    elif name == "striker":
+        _seed_leads(count)
+        started = time.perf_counter()
+        import autonomy_engine_v2
+        arun(autonomy_engine_v2.hermes_striker())
+    else:
+        from cyberhound.sequence_scheduler import run_sequence
+        run_sequence(quiet=True)
+    produced = time.perf_counter() - started
+    pending = drain(timeout)
+    elapsed = time.perf_counter() - started
+
+    after, sunk, pooled = outbox.stats(), sink.stats(), pool.stats()
+    delivered = sunk.get("messages", 0)
+    return {
+        "scenario": name,
+        "messages": delivered,
+        "queued": after["sent"] + after["failed"] + after["queued"] + after["sending"]
+                  - before["sent"] - before["failed"] - before["queued"] - before["sending"],
+        "failed": after["failed"] - before["failed"],
+        "pending": pending,
+        "produce_sec": round(produced, 3),
+        "enqueue_per_sec": round(count / produced, 1) if produced else None,
+        "elapsed_sec": round(elapsed, 3),
+        "msgs_per_sec": round(delivered / elapsed, 1) if elapsed else None,
+        "p95_send_ms": pooled.get("p95_ms"),
+        "sink_p95_ms": round(sunk["transaction_p95"] * 1000, 1) if sunk.get("transaction_p95") is not None else None,
+        "connections": sunk.get("connections", 0),
+        "reconnects": pooled.get("reconnects", 0),
+    }
+
+
+def child(total: int, args: List[str]):
+    due = max(1, int(total * float(_arg(args, "--due", 0.1))))
+    domains = int(_arg(args, "--domains", 50))
+    timeout = float(_arg(args, "--timeout", 900))
+    scenarios = [s for s in _arg(args, "--scenarios", ",".join(SCENARIOS)).split(",") if s]
+
+    workdir = tempfile.mkdtemp(prefix="cyberhound-email-bench-")
+    sink = SMTPSink(
+        tls="--no-tls" not in args, user=BENCH_USER, password=BENCH_PASS,
+        latency=_arg(args, "--latency", "fixed:0"),
+        connect_latency=_arg(args, "--connect-latency", "fixed:0"),
+        temp_fail_rate=float(_arg(args, "--temp-fail-rate", 0)),
+        perm_fail_rate=float(_arg(args, "--perm-fail-rate", 0)),
+        drop_rate=float(_arg(args, "--drop-rate", 0)),
+        max_msgs_per_conn=int(_arg(args, "--max-msgs-per-conn", 0)),
+        seed=int(_arg(args, "--seed", 0)),
+    ).start()
+    llm = StandInServer(latency=_arg(args, "--llm-latency", "fixed:0")).start() if "striker" in scenarios else None
+    _prepare_env(workdir, sink, llm.base_url if llm else "http://127.0.0.1:9/v1", args)
+
+    os.chdir(workdir)
+    sys.path.insert(0, CYBERHOUND_DIR)
+    with open("IMPERIAL_PREMIUM_LEDGER.pdf", "wb") as f:
+        f.write(os.urandom(200 * 1024))  # stands in for the Touch 1 audit attachment
+
+    out = sys.stdout if "--verbose" in args else io.StringIO()
+    with contextlib.redirect_stdout(out):
+        seeded = time.perf_counter()
+        _seed_deals(total, due, domains)
+        seeded = time.perf_counter() - seeded
+    print(f"RESULT {json.dumps({'deals': total, 'scenario': 'seed', 'elapsed_sec': round(seeded, 3)})}")
+    for name in scenarios:
+        with contextlib.redirect_stdout(out):
+            result = _run_scenario(name, due, domains, sink, timeout)
+        print(f"RESULT {json.dumps({'deals': total, **result})}", flush=True)
+        if isinstance(out, io.StringIO):
+            out.seek(0)
+            out.truncate()
+
+    sink.stop()
+    if llm:
+        llm.stop()
+
+
+# ── Parent: one child per size, combined table ──────────────────────────────
+
+
+def _fmt(value, spec: str) -> str:
+    return format(value, spec) if value is not None else format("-", spec[0] + spec[1:].split(".")[0])
+
+
+def main(args: List[str]):
+    sizes = [int(s) for s in _arg(args, "--deals", "1000,10000,100000").split(",") if s]
+    due = float(_arg(args, "--due", 0.1))
+    passthrough = [a for i, a in enumerate(args) if a != "--deals" and (i == 0 or args[i - 1] != "--deals")]
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [REPO_ROOT, os.getenv("PYTHONPATH")]))}
+
+    print(f"📬 email throughput — deal sets {', '.join(f'{s:,}' for s in sizes)}, {due:.0%} due per scenario\n")
+    print(f"{'DEALS':>8} {'SCENARIO':<9} {'MSGS':>6} {'FAIL':>4} {'ENQ/S':>8} {'MSGS/S':>8} "
+          f"{'P95 MS':>7} {'SINK P95':>8} {'CONNS':>5} {'SECS':>7}")
+    for size in sizes:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "cyberhound.bench.email_throughput", "--child", str(size)] + passthrough,
+            cwd=REPO_ROOT, env=env, stdout=subprocess.PIPE, text=True,
+        )
+        for line in proc.stdout:
+            if not line.startswith("RESULT "):
+                sys.stdout.write(line)
+                continue
+            row = json.loads(line[len("RESULT "):])
+            if row["scenario"] == "seed":
+                print(f"{row['deals']:>8,} {'seed':<9} {'':>6} {'':>4} {'':>8} {'':>8} {'':>7} {'':>8} {'':>5} "
+                      f"{row['elapsed_sec']:>7.2f}")
+                continue
+            print(f"{row['deals']:>8,} {row['scenario']:<9} {row['messages']:>6} {row['failed']:>4} "
+                  f"{_fmt(row['enqueue_per_sec'], '>8.0f')} {_fmt(row['msgs_per_sec'], '>8.1f')} "
+                  f"{_fmt(row['p95_send_ms'], '>7.1f')} {_fmt(row['sink_p95_ms'], '>8.1f')} "
+                  f"{row['connections']:>5} {row['elapsed_sec']:>7.2f}", flush=True)
+            if row["pending"]:
+                print(f"{'':>8} ⚠️  {row['pending']} message(s) still pending at --timeout")
+        if proc.wait():
+            print(f"❌ deal set {size:,} exited with {proc.returncode}")
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child(int(_arg(sys.argv, "--child")), sys.argv[1:])
+    else:
+        main(sys.argv[1:])
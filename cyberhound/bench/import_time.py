@@ -0,0 +1,102 @@
+"""
+Import-time benchmark — startup cost of each run.py subcommand
+==============================================================
+Cron containers run short commands (`status`, one `task-runner` pass) many
+times a day, so interpreter + import time is most of their runtime. Each
+subcommand's import path is run in a fresh interpreter several times and the
+median wall time is reported against a bare `python -c pass` baseline,
+together with the heaviest modules from `python -X importtime`.
+
+Usage:
+    python -m cyberhound.bench.import_time                  # all subcommands, 5 runs each
+    python -m cyberhound.bench.import_time status llm-stats --runs 10
+    python run.py bench-imports
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = str(Path(__file__).resolve().parents[2])
+
+# What each run.py branch imports (and builds) before doing any work
+COMMANDS: Dict[str, str] = {
+    "baseline": "pass",
+    "help": "import cyberhound.run",
+    "status": "from cyberhound.swarm.hound_manager import HoundManager; HoundManager()",
+    "hunt": "from cyberhound.swarm.hound_manager import HoundManager; m = HoundManager(); list(m.hounds.values())",
+    "dashboard": "from cyberhound.swarm.command_center import CommandCenter",
+    "autonomous": "import cyberhound.autonomy_engine",
+    "task-runner": "import cyberhound.task_runner",
+    "llm-stats": "import cyberhound.llm_telemetry",
+}
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+    return env
+
+
+def time_command(code: str, runs: int) -> Tuple[float, bool]:
+    """Median wall seconds of `python -c code` over `runs` fresh interpreters."""
+    samples: List[float] = []
+    ok = True
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", code], env=_env(), cwd=REPO_ROOT,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+        ok = ok and proc.returncode == 0
+    return statistics.median(samples), ok
+
+
+# Imported by every interpreter before the command runs
+_STARTUP_MODULES = {"site", "encodings", "io", "abc", "codecs", "stat", "os", "posixpath", "genericpath",
+                    "_collections_abc", "_sitebuiltins", "_distutils_hack", "time", "zipimport",
+                    "_frozen_importlib_external", "_frozen_importlib", "_io", "marshal", "posix",
+                    "_codecs", "_thread", "_warnings", "_weakref", "_signal", "encodings.utf_8"}
+
+
+def heaviest_imports(code: str, top: int = 3) -> List[Tuple[str, float]]:
+    """Top-level modules by cumulative import time (ms), from -X importtime."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=_env(), cwd=REPO_ROOT,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented; keep only what the command itself pulled in
+        if not cumulative.strip().isdigit() or name.startswith("  "):
+            continue
+        if name.strip() not in _STARTUP_MODULES:
+            rows.append((name.strip(), int(cumulative) / 1000))
+    return sorted(rows, key=lambda r: -r[1])[:top]
+
+
+def main(args: List[str]):
+    runs = int(args[args.index("--runs") + 1]) if "--runs" in args else 5
+    wanted = [a for a in args if a in COMMANDS] or list(COMMANDS)
+
+    # Warm the bytecode cache so the first command is not penalised
+    time_command(COMMANDS["help"], 1)
+    baseline, _ = time_command(COMMANDS["baseline"], runs)
+
+    print(f"⏱  Import time per run.py subcommand (median of {runs}, python -c pass = {baseline * 1000:.0f} ms)\n")
+    print(f"{'COMMAND':<12} {'WALL ms':>8} {'IMPORT ms':>10}  HEAVIEST IMPORTS")
+    for name in wanted:
+        if name == "baseline":
+            continue
+        wall, ok = time_command(COMMANDS[name], runs)
+        top = ", ".join(f"{mod} {ms:.0f}" for mod, ms in heaviest_imports(COMMANDS[name]))
+        flag = "" if ok else "  ⚠️  failed (missing dependency?)"
+        print(f"{name:<12} {wall * 1000:>8.0f} {(wall - baseline) * 1000:>10.0f}  {top}{flag}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,554 @@
+"""
+LLM Stand-in — offline OpenAI-compatible server for benchmarks and replay
+=========================================================================
+Serves `/v1/chat/completions` (plain and SSE streaming) and Ollama's
+`/api/generate`, so cyberhound.llm, hermes_client and the legacy router can
+run end to end without spending DeepSeek credits and with latency you choose:
+
+  • latency distributions: fixed / uniform / normal / lognormal, plus an
+    optional decode speed (tokens/sec) for streamed replies
+  • error injection: HTTP 500s, 429s with Retry-After, truncated replies
+    (finish_reason "length") and hung requests
+  • responses: canned rules (regex → reply) first, then a recorded cassette,
+    then built-in replies shaped like the autonomy_engine_v2 prompts
+    (scout, batch/single scoring, find_email, generate_email, analyze_reply,
+    retrospective, ping) or synthesised from the request's JSON schema
+  • record mode: proxy to a real provider and append every exchange to a
+    JSONL cassette; replay serves them back (by prompt, in recorded order)
+
+Every random draw is seeded by (seed, request content, occurrence), so the
+same run against the same stand-in gets the same replies and latencies.
+
+Usage:
+    python -m cyberhound.bench.llm_standin --port 8011 --latency lognormal:0.8,0.4 --error-rate 0.02
+    HERMES_BASE_URL=http://127.0.0.1:8011/v1 HERMES_API_KEY=x python cyberhound/autonomy_engine_v2.py once
+    OLLAMA_HOST=http://127.0.0.1:8011/v1 python -m cyberhound.task_runner
+
+    # record real traffic, then replay it offline
+    python -m cyberhound.bench.llm_standin --record https://api.deepseek.com/v1 --cassette llm_cassette.jsonl
+    python -m cyberhound.bench.llm_standin --replay llm_cassette.jsonl --latency replay
+
+    from cyberhound.bench.llm_standin import StandInServer
+    server = StandInServer(latency="fixed:0.2").start()   # server.base_url, server.stats(), server.stop()
+"""
+
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+# ── Latency ─────────────────────────────────────────────────────────────────
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], Optional[float]]:
+    """
+    "fixed:0.3" | "uniform:0.1,0.9" | "normal:0.5,0.1" | "lognormal:median,sigma"
+    | "replay" (the latency recorded in the cassette; None otherwise).
+    """
+    kind, _, args = (spec or "fixed:0").partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda rng: values[0] if values else 0.0
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        import math
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    if kind == "replay":
+        return lambda rng: None
+    raise ValueError(f"unknown latency distribution: {spec}")
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+# ── Request normalisation ───────────────────────────────────────────────────
+
+
+def _request_key(kind: str, body: Dict[str, Any]) -> str:
+    """Stable key for replay: what was asked, not which model or how hot."""
+    if kind == "generate":
+        ask = {"prompt": body.get("prompt"), "system": body.get("system"), "format": body.get("format")}
+    else:
+        ask = {"messages": body.get("messages"), "response_format": body.get("response_format")}
+    return hashlib.sha256(json.dumps([kind, ask], sort_keys=True).encode()).hexdigest()
+
+
+def _prompt_text(kind: str, body: Dict[str, Any]) -> Tuple[str, str]:
+    """(system, last user message) of a request."""
+    if kind == "generate":
+        return body.get("system") or "", body.get("prompt") or ""
+    messages = body.get("messages") or []
+    system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+    user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+    return system, user
+
+
+def _wants_json(kind: str, body: Dict[str, Any]) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    if kind == "generate":
+        fmt = body.get("format")
+        return bool(fmt), fmt if isinstance(fmt, dict) else None
+    rf = body.get("response_format") or {}
+    if rf.get("type") == "json_schema":
+        return True, (rf.get("json_schema") or {}).get("schema")
+    return rf.get("type") == "json_object", None
+
+
+# ── Built-in replies ────────────────────────────────────────────────────────
+
+
+def _from_schema(schema: Dict[str, Any], rng: random.Random, name: str = "") -> Any:
+    types = schema.get("type")
+    kind = types[0] if isinstance(types, list) else types
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if kind == "object":
+        return {k: _from_schema(s, rng, k) for k, s in (schema.get("properties") or {}).items()}
+    if kind == "array":
+        count = max(schema.get("minItems", 0), rng.randint(2, 5))
+        return [_from_schema(schema.get("items") or {"type": "string"}, rng, name) for _ in range(count)]
+    if kind == "integer":
+        return rng.randint(int(schema.get("minimum", 40)), int(schema.get("maximum", 95)))
+    if kind == "number":
+        return round(rng.uniform(schema.get("minimum", 40), schema.get("maximum", 95)), 1)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if name in ("website", "url"):
+        return f"https://standin-{rng.randint(1000, 9999)}.example"
+    return f"{name or 'value'} {rng.randint(1, 999)}"
+
+
+def _score(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "icp_score": rng.randint(35, 95),
+        "risk_level": rng.choice(["low", "medium", "high"]),
+        "recommended_tone": rng.choice(["consultative", "formal", "technical"]),
+        "key_selling_points": ["Automates manual reporting", "Bill 96 compliance", "Fast payback"],
+        "reasoning": "Growing team with manual workflows and compliance exposure.",
+    }
+
+
+def _scout_leads(rng: random.Random, occurrence: int) -> List[Dict[str, Any]]:
+    industries = ["SaaS", "Fintech", "Healthtech", "Logistics", "Devtools"]
+    return [
+        {
+            "name": f"Standin {occurrence}-{i} Inc",
+            "website": f"https://standin-{occurrence}-{i}.example",  # one registrable domain each
+            "industry": rng.choice(industries),
+            "city": "Montreal",
+            "risk_score": rng.randint(50, 95),
+            "revenue_signal": "growing team",
+            "why_target": "Manual processes at scale",
+        }
+        for i in range(8)
+    ]
+
+
+def builtin_reply(kind: str, body: Dict[str, Any], rng: random.Random, occurrence: int) -> str:
+    """A plausible reply for the prompts the pipeline sends (deterministic per rng)."""
+    system, user = _prompt_text(kind, body)
+    wants_json, schema = _wants_json(kind, body)
+    text = f"{system}\n{user}"
+
+    if "PONG" in text:
+        return "PONG"
+    match = re.search(r"contact email for .+? at ([\w.-]+)", text)
+    if match:
+        return f"info@{match.group(1)}"
+    if '"scores"' in text and "LEADS:" in text:
+        try:
+            items = json.loads(text.split("LEADS:", 1)[1].split("Return valid JSON", 1)[0].strip())
+        except ValueError:
+            items = []
+        return json.dumps({"scores": {item["id"]: _score(random.Random(f"{item['id']}")) for item in items}})
+    if "outreach scoring" in text:
+        return json.dumps(_score(rng))
+    if "sales email" in text:
+        return json.dumps({
+            "subject": "Quick idea for your compliance workflow",
+            "body": "Hi,\n\nWe automate Bill 96 compliance reporting for teams like yours. "
+                    "Worth a 15-minute call next week?\n\nBest,\nNorthern",
+        })
+    if "prospect's reply" in text:
+        return json.dumps({
+            "sentiment": "positive", "intent": "meeting_request", "should_respond": True,
+            "suggested_response_type": "schedule_call", "confidence": 0.9, "brief": "Wants a call",
+        })
+    if "extract learnings" in text:
+        return json.dumps({
+            "insights": ["Fintech closes fastest"], "strategy_shifts": ["Raise ICP threshold"],
+            "best_performing_industry": "Fintech", "recommended_icp_threshold": 65,
+        })
+    if "lead" in text.lower() and ("scout" in text.lower() or "lead generation" in text.lower()):
+        leads = _scout_leads(rng, occurrence)
+        return json.dumps({"leads": leads}) if wants_json else json.dumps(leads)
+    if schema:
+        return json.dumps(_from_schema(schema, rng))
+    if wants_json:
+        return json.dumps({"ok": True})
+    return "Acknowledged. This is an offline stand-in reply from the CyberHound benchmark server."
+
+
+# ── Server ──────────────────────────────────────────────────────────────────
+
+
+class StandInServer:
+    """Threaded stand-in; see the module docstring for the knobs."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: str = "fixed:0",
+        tokens_per_sec: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        truncate_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        hang_sec: float = 30.0,
+        seed: int = 0,
+        canned: Optional[str] = None,
+        replay: Optional[str] = None,
+        record: Optional[str] = None,
+        cassette: str = "llm_cassette.jsonl",
+        strict: bool = False,
+    ):
+        self.host, self.port = host, port
+        self.latency_spec = latency
+        self._latency = parse_latency(latency)
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.truncate_rate = truncate_rate
+        self.hang_rate = hang_rate
+        self.hang_sec = hang_sec
+        self.seed = seed
+        self.rules = self._load_rules(canned) if canned else []
+        self.recorded: Dict[str, List[Dict[str, Any]]] = self._load_cassette(replay) if replay else {}
+        self.record = record.rstrip("/") if record else None
+        self.cassette = cassette
+        self.strict = strict
+
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+        self._counts: Dict[str, int] = {}
+        self._latencies: List[float] = []
+        self._httpd: Optional[ThreadingHTTPServer] = None
+
+    # ── Setup ───────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _load_rules(path: str) -> List[Tuple[re.Pattern, Any]]:
+        """[{"match": "regex on system+user text", "response": "text" | {...json...}}, ...]"""
+        with open(path, encoding="utf-8") as f:
+            return [(re.compile(r["match"], re.I | re.S), r["response"]) for r in json.load(f)]
+
+    @staticmethod
+    def _load_cassette(path: str) -> Dict[str, List[Dict[str, Any]]]:
+        recorded: Dict[str, List[Dict[str, Any]]] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                recorded.setdefault(row["key"], []).append(row)
+        return recorded
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def start(self) -> "StandInServer":
+        server = self
+
+        class Handler(_Handler):
+            standin = server
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_port
+        threading.Thread(target=self._httpd.serve_forever, name="llm-standin", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def serve_forever(self):
+        self.start()
+        print(f"🧪 LLM stand-in on {self.base_url} (latency {self.latency_spec}, "
+              f"{'recording → ' + self.cassette if self.record else 'replay' if self.recorded else 'canned'})")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            self.stop()
+            print(json.dumps(self.stats(), indent=2))
+
+    # ── Bookkeeping ─────────────────────────────────────────────────────────
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def _occurrence(self, key: str) -> int:
+        with self._lock:
+            n = self._seen.get(key, 0)
+            self._seen[key] = n + 1
+            return n
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = list(self._latencies)
+            counts = dict(self._counts)
+        return {
+            **counts,
+            "latency_p50": _percentile(latencies, 50),
+            "latency_p95": _percentile(latencies, 95),
+        }
+
+    # ── Replies ─────────────────────────────────────────────────────────────
+
+    def reply_for(self, kind: str, body: Dict[str, Any], auth: str = "") -> Dict[str, Any]:
+        """
+        Decide one reply: {"status", "content", "finish_reason", "latency",
+        "usage", "retry_after"?}. Called on the handler thread.
+        """
+        key = _request_key(kind, body)
+        occurrence = self._occurrence(key)
+        rng = random.Random(f"{self.seed}:{key}:{occurrence}")
+        self._count("requests")
+
+        roll = rng.random()
+        if roll < self.error_rate:
+            self._count("injected_500")
+            return {"status": 500, "content": "injected failure", "latency": self._latency(rng) or 0.0}
+        roll -= self.error_rate
+        if roll < self.rate_limit_rate:
+            self._count("injected_429")
+            return {"status": 429, "content": "rate limited", "latency": 0.0, "retry_after": "1"}
+        roll -= self.rate_limit_rate
+        if roll < self.hang_rate:
+            self._count("injected_hang")
+            time.sleep(self.hang_sec)
+
+        recorded = None
+        if self.record:
+            recorded = self._proxy(kind, body, auth, key)
+        elif key in self.recorded:
+            rows = self.recorded[key]
+            recorded = rows[occurrence % len(rows)]
+            self._count("replayed")
+
+        if recorded is not None:
+            content = recorded["content"]
+            finish_reason = recorded.get("finish_reason") or "stop"
+            usage = recorded.get("usage") or {}
+            latency = self._latency(rng)
+            if latency is None:
+                latency = recorded.get("latency", 0.0)
+        else:
+            if self.strict and not self.rules:
+                self._count("misses")
+                return {"status": 404, "content": "no recording for this request", "latency": 0.0}
+            system, user = _prompt_text(kind, body)
+            content = next((r for pattern, r in self.rules if pattern.search(f"{system}\n{user}")), None)
+            if content is not None:
+                self._count("canned")
+                content = content if isinstance(content, str) else json.dumps(content)
+            else:
+                self._count("builtin")
+                content = builtin_reply(kind, body, rng, occurrence)
+            finish_reason = "stop"
+            usage = {}
+            latency = self._latency(rng) or 0.0
+
+        if finish_reason == "stop" and rng.random() < self.truncate_rate:
+            self._count("injected_truncation")
+            content, finish_reason = content[: max(1, len(content) // 2)], "length"
+
+        tokens = max(1, len(content) // 4)
+        usage = {
+            "prompt_tokens": usage.get("prompt_tokens") or len(json.dumps(body)) // 4,
+            "completion_tokens": usage.get("completion_tokens") or tokens,
+        }
+        if self.tokens_per_sec and not body.get("stream"):
+            latency += tokens / self.tokens_per_sec
+        with self._lock:
+            self._latencies.append(latency)
+        return {"status": 200, "content": content, "finish_reason": finish_reason,
+                "latency": latency, "usage": usage}
+
+    def _proxy(self, kind: str, body: Dict[str, Any], auth: str, key: str) -> Dict[str, Any]:
+        """Forward to the real provider (non-streamed) and append the exchange to the cassette."""
+        if kind == "generate":
+            url = re.sub(r"/v1$", "", self.record) + "/api/generate"
+        else:
+            url = self.record + "/chat/completions"
+        headers = {"Content-Type": "application/json"}
+        if auth:
+            headers["Authorization"] = auth
+        upstream = {k: v for k, v in body.items() if k not in ("stream", "stream_options")}
+        upstream["stream"] = False
+        started = time.monotonic()
+        resp = requests.post(url, headers=headers, json=upstream, timeout=300)
+        latency = time.monotonic() - started
+        resp.raise_for_status()
+        data = resp.json()
+        if kind == "generate":
+            content, finish_reason = data.get("response") or "", data.get("done_reason") or "stop"
+            usage = {"prompt_tokens": data.get("prompt_eval_count"), "completion_tokens": data.get("eval_count")}
+        else:
+            choice = data["choices"][0]
+            content, finish_reason = choice["message"].get("content") or "", choice.get("finish_reason")
+            usage = data.get("usage") or {}
+        row = {"key": key, "kind": kind, "request": upstream, "content": content,
+               "finish_reason": finish_reason, "usage": usage, "latency": round(latency, 3)}
+        with self._lock, open(self.cassette, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._count("recorded")
+        return row
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    standin: StandInServer = None  # bound per server in StandInServer.start()
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any], extra: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (extra or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            self._send_json(200, self.standin.stats())
+        elif self.path.rstrip("/").endswith("/models") or self.path.startswith("/api/tags"):
+            self._send_json(200, {"data": [{"id": "standin"}], "models": [{"name": "standin"}]})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "invalid JSON body"}})
+            return
+        path = self.path.rstrip("/")
+        if path.endswith("/chat/completions"):
+            kind = "chat"
+        elif path.endswith("/api/generate"):
+            kind = "generate"
+        else:
+            self._send_json(404, {"error": {"message": f"unknown endpoint {self.path}"}})
+            return
+
+        try:
+            reply = self.standin.reply_for(kind, body, self.headers.get("Authorization", ""))
+        except Exception as e:  # upstream failure while recording
+            self._send_json(502, {"error": {"message": str(e)}})
+            return
+        time.sleep(reply["latency"])
+
+        if reply["status"] != 200:
+            extra = {"Retry-After": reply["retry_after"]} if reply.get("retry_after") else None
+            self._send_json(reply["status"], {"error": {"message": reply["content"]}}, extra)
+        elif kind == "generate":
+            self._send_json(200, {
+                "model": body.get("model", "standin"), "response": reply["content"], "done": True,
+                "done_reason": reply["finish_reason"],
+                "prompt_eval_count": reply["usage"]["prompt_tokens"],
+                "eval_count": reply["usage"]["completion_tokens"],
+            })
+        elif body.get("stream"):
+            self._stream(body, reply)
+        else:
+            self._send_json(200, {
+                "id": f"standin-{int(time.time() * 1000)}",
+                "object": "chat.completion",
+                "model": body.get("model", "standin"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply["content"]},
+                             "finish_reason": reply["finish_reason"]}],
+                "usage": {**reply["usage"],
+                          "total_tokens": reply["usage"]["prompt_tokens"] + reply["usage"]["completion_tokens"]},
+            })
+
+    def _stream(self, body: Dict[str, Any], reply: Dict[str, Any]):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        model = body.get("model", "standin")
+        delay = 1 / self.standin.tokens_per_sec if self.standin.tokens_per_sec else 0.0
+        try:
+            for piece in re.findall(r"\S+\s*|\s+", reply["content"]):
+                chunk = {"model": model, "choices": [{"index": 0, "delta": {"content": piece}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+                if delay:
+                    time.sleep(delay)
+            final = {"model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": reply["finish_reason"]}]}
+            self.wfile.write(f"data: {json.dumps(final)}\n\n".encode())
+            if (body.get("stream_options") or {}).get("include_usage"):
+                self.wfile.write(f"data: {json.dumps({'choices': [], 'usage': reply['usage']})}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.standin._count("client_aborts")  # stop_when closed the stream early
+
+
+# ── CLI ─────────────────────────────────────────────────────────────────────
+
+
+def _arg(args: List[str], name: str, default=None):
+    return args[args.index(name) + 1] if name in args else default
+
+
+def server_from_args(args: List[str]) -> StandInServer:
+    return StandInServer(
+        host=_arg(args, "--host", "127.0.0.1"),
+        port=int(_arg(args, "--port", 8011)),
+        latency=_arg(args, "--latency", "fixed:0"),
+        tokens_per_sec=float(_arg(args, "--tokens-per-sec", 0)),
+        error_rate=float(_arg(args, "--error-rate", 0)),
+        rate_limit_rate=float(_arg(args, "--rate-limit-rate", 0)),
+        truncate_rate=float(_arg(args, "--truncate-rate", 0)),
+        hang_rate=float(_arg(args, "--hang-rate", 0)),
+        hang_sec=float(_arg(args, "--hang-sec", 30)),
+        seed=int(_arg(args, "--seed", 0)),
+        canned=_arg(args, "--canned"),
+        replay=_arg(args, "--replay"),
+        record=_arg(args, "--record"),
+        cassette=_arg(args, "--cassette", "llm_cassette.jsonl"),
+        strict="--strict" in args,
+    )
+
+
+if __name__ == "__main__":
+    server_from_args(sys.argv[1:]).serve_forever()
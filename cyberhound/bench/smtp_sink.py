@@ -0,0 +1,428 @@
+"""
+SMTP Sink — local SMTP stand-in for throughput benchmarks and failure drills
+============================================================================
+Accepts mail the way Gmail's submission port does (EHLO, STARTTLS, AUTH
+PLAIN/LOGIN, MAIL/RCPT/DATA over persistent connections) and records it
+instead of delivering it, so the SMTP pool, the outbox and the envoys can be
+driven at full speed without touching a real account:
+
+  • STARTTLS with a throwaway self-signed certificate (generated with the
+    openssl CLI, or --cert/--key), and optional credential checks (--user /
+    --password; otherwise any login is accepted)
+  • recording: per-message metadata in memory (sender, recipients, size,
+    subject, connection, TLS/auth state), optionally the raw bytes or one
+    .eml file per message in --record-dir
+  • latency injection on connect and on the DATA reply (same distributions
+    as llm_standin: fixed / uniform / normal / lognormal)
+  • failure injection: 451 on DATA (transient), 550 on RCPT (permanent),
+    421 + disconnect after DATA, and a 421 after N messages per connection
+
+Every injected draw is seeded by (seed, message number), so a run against the
+same sink fails the same messages.
+
+Usage:
+    python -m cyberhound.bench.smtp_sink --port 2525 --latency lognormal:0.05,0.5 --temp-fail-rate 0.02
+    SMTP_SERVER=127.0.0.1 SMTP_PORT=2525 SMTP_USER=bench@example.com SMTP_PASS=x \\
+        RATE_LIMIT_SMTP=0 python -m cyberhound.outbox drain
+
+    from cyberhound.bench.smtp_sink import SMTPSink
+    sink = SMTPSink(latency="fixed:0.02", tls=True).start()   # sink.port, sink.stats(), sink.messages, sink.stop()
+"""
+
+import base64
+import email
+import email.policy
+import os
+import random
+import socketserver
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from cyberhound.bench.llm_standin import _percentile, parse_latency
+
+MAX_MESSAGE_SIZE = 50 * 1024 * 1024
+
+
+def self_signed_cert(directory: str, host: str = "127.0.0.1") -> Optional[tuple]:
+    """(cert, key) paths for a fresh self-signed certificate, or None if openssl is unavailable."""
+    cert, key = os.path.join(directory, "sink-cert.pem"), os.path.join(directory, "sink-key.pem")
+    try:
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "2",
+             "-subj", f"/CN={host}", "-keyout", key, "-out", cert],
+            check=True, capture_output=True, timeout=60,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return cert, key
+
+
+class SMTPSink:
+    """Threaded SMTP stand-in; see the module docstring for the knobs."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        tls: bool = True,
+        cert: Optional[str] = None,
+        key: Optional[str] = None,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        latency: str = "fixed:0",
+        connect_latency: str = "fixed:0",
+        temp_fail_rate: float = 0.0,
+        perm_fail_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        max_msgs_per_conn: int = 0,
+        keep_data: bool = False,
+        record_dir: Optional[str] = None,
+        seed: int = 0,
+    ):
+        self.host, self.port = host, port
+        self.user, self.password = user, password
+        self.latency_spec = latency
+        self._latency = parse_latency(latency)
+        self._connect_latency = parse_latency(connect_latency)
+        self.temp_fail_rate = temp_fail_rate
+        self.perm_fail_rate = perm_fail_rate
+        self.drop_rate = drop_rate
+        self.max_msgs_per_conn = max_msgs_per_conn
+        self.keep_data = keep_data
+        self.record_dir = record_dir
+        self.seed = seed
+
+        self.ssl_context: Optional[ssl.SSLContext] = None
+        if tls:
+            if not (cert and key):
+                pair = self_signed_cert(tempfile.mkdtemp(prefix="smtp-sink-"), host)
+                cert, key = pair if pair else (None, None)
+            if cert and key:
+                self.ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+                self.ssl_context.load_cert_chain(cert, key)
+            else:
+                print("[smtp_sink] ⚠️  openssl not found — STARTTLS disabled")
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+
+        self.messages: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._latencies: List[float] = []
+        self._sequence = 0
+        self._active = 0
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+
+    # ── Lifecycle ───────────────────────────────────────────────────────────
+
+    def start(self) -> "SMTPSink":
+        sink = self
+
+        class Handler(_Handler):
+            pass
+
+        Handler.sink = sink
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+            request_queue_size = 128
+
+        self._server = Server((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="smtp-sink", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def serve_forever(self):
+        self.start()
+        print(f"📬 SMTP sink on {self.host}:{self.port} (STARTTLS {'on' if self.ssl_context else 'off'}, "
+              f"latency {self.latency_spec}, auth {'checked' if self.user else 'any'})")
+        try:
+            while True:
+                time.sleep(60)
+                print(f"📬 {self.stats()}")
+        except KeyboardInterrupt:
+            self.stop()
+            print(self.stats())
+
+    # ── Bookkeeping ─────────────────────────────────────────────────────────
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + n
+
+    def connection_opened(self) -> float:
+        with self._lock:
+            self._counts["connections"] = self._counts.get("connections", 0) + 1
+            self._active += 1
+            self._counts["max_concurrent"] = max(self._counts.get("max_concurrent", 0), self._active)
+        return self._connect_latency(random.Random(f"{self.seed}:connect:{time.monotonic_ns()}")) or 0.0
+
+    def connection_closed(self):
+        with self._lock:
+            self._active -= 1
+
+    def next_roll(self) -> random.Random:
+        """Seeded RNG for the next message transaction."""
+        with self._lock:
+            self._sequence += 1
+            return random.Random(f"{self.seed}:{self._sequence}")
+
+    def check_login(self, user: str, password: str) -> bool:
+        return self.user is None or (user == self.user and password == (self.password or ""))
+
+    def record(self, conn_id: int, mail_from: str, rcpts: List[str], data: bytes,
+               tls: bool, user: Optional[str], elapsed: float):
+        headers = email.message_from_bytes(data.split(b"\r\n\r\n", 1)[0] + b"\r\n\r\n",
+                                           policy=email.policy.compat32)
+        entry = {
+            "conn": conn_id, "mail_from": mail_from, "rcpt_to": list(rcpts), "size": len(data),
+            "subject": str(headers.get("Subject", "")), "message_id": headers.get("Message-ID"),
+            "tls": tls, "user": user, "at": time.time(),
+        }
+        if self.keep_data:
+            entry["data"] = data
+        with self._lock:
+            self.messages.append(entry)
+            self._latencies.append(elapsed)
+            self._counts["messages"] = self._counts.get("messages", 0) + 1
+            self._counts["bytes"] = self._counts.get("bytes", 0) + len(data)
+            n = self._counts["messages"]
+        if self.record_dir:
+            with open(os.path.join(self.record_dir, f"{n:07d}.eml"), "wb") as f:
+                f.write(data)
+
+    def reset(self):
+        """Forget recorded messages and counters (between benchmark phases)."""
+        with self._lock:
+            self.messages.clear()
+            self._latencies.clear()
+            self._counts = {"max_concurrent": self._active}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = list(self._latencies)
+            counts = dict(self._counts)
+        return {
+            **counts,
+            "transaction_p50": _percentile(latencies, 50),
+            "transaction_p95": _percentile(latencies, 95),
+        }
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    sink: SMTPSink = None  # bound per server in SMTPSink.start()
+    timeout = 300
+
+    def _reply(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+        self.wfile.flush()
+
+    def _readline(self) -> Optional[str]:
+        line = self.rfile.readline(65536)
+        return line.decode("utf-8", "replace").rstrip("\r\n") if line else None
+
+    def _reset_transaction(self):
+        self.mail_from, self.rcpts, self.started = None, [], None
+
+    def handle(self):
+        sink = self.sink
+        delay = sink.connection_opened()
+        self.conn_id = id(self)
+        self.tls, self.user, self.sent = False, None, 0
+        self._reset_transaction()
+        try:
+            if delay:
+                time.sleep(delay)
+            self._reply("220 smtp-sink ESMTP ready")
+            while True:
+                line = self._readline()
+                if line is None:
+                    return
+                verb, _, arg = line.partition(" ")
+                handler = getattr(self, f"smtp_{verb.upper()}", None)
+                if handler is None:
+                    self._reply("502 5.5.2 command not recognized")
+                elif handler(arg) is False:
+                    return
+        except (ConnectionError, ssl.SSLError, OSError):
+            sink.count("aborted_connections")
+        finally:
+            sink.connection_closed()
+
+    # ── Commands ────────────────────────────────────────────────────────────
+
+    def smtp_EHLO(self, arg: str):
+        lines = ["smtp-sink", f"SIZE {MAX_MESSAGE_SIZE}", "8BITMIME", "PIPELINING"]
+        if self.sink.ssl_context and not self.tls:
+            lines.append("STARTTLS")
+        lines.append("AUTH PLAIN LOGIN")
+        for extension in lines[:-1]:
+            self.wfile.write(f"250-{extension}\r\n".encode())
+        self._reply(f"250 {lines[-1]}")
+
+    def smtp_HELO(self, arg: str):
+        self._reply("250 smtp-sink")
+
+    def smtp_STARTTLS(self, arg: str):
+        if not self.sink.ssl_context or self.tls:
+            self._reply("454 4.7.0 TLS not available")
+            return
+        self._reply("220 2.0.0 ready to start TLS")
+        self.connection = self.sink.ssl_context.wrap_socket(self.request, server_side=True)
+        self.request = self.connection
+        self.rfile = self.connection.makefile("rb")
+        self.wfile = self.connection.makefile("wb")
+        self.tls = True
+        self.user = None
+        self._reset_transaction()
+        self.sink.count("tls_sessions")
+
+    def smtp_AUTH(self, arg: str):
+        mechanism, _, initial = arg.partition(" ")
+        mechanism = mechanism.upper()
+        try:
+            if mechanism == "PLAIN":
+                if not initial:
+                    self._reply("334 ")
+                    initial = self._readline() or ""
+                _, user, password = base64.b64decode(initial).decode().split("\0", 2)
+            elif mechanism == "LOGIN":
+                if initial:
+                    user = base64.b64decode(initial).decode()
+                else:
+                    self._reply("334 " + base64.b64encode(b"Username:").decode())
+                    user = base64.b64decode(self._readline() or "").decode()
+                self._reply("334 " + base64.b64encode(b"Password:").decode())
+                password = base64.b64decode(self._readline() or "").decode()
+            else:
+                self._reply("504 5.5.4 unrecognized authentication type")
+                return
+        except (ValueError, UnicodeDecodeError):
+            self._reply("501 5.5.2 cannot decode credentials")
+            return
+        if not self.sink.check_login(user, password):
+            self.sink.count("auth_failures")
+            self._reply("535 5.7.8 authentication credentials invalid")
+            return
+        self.user = user
+        self.sink.count("logins")
+        self._reply("235 2.7.0 accepted")
+
+    def smtp_MAIL(self, arg: str):
+        if self.sink.user is not None and self.user is None:
+            self._reply("530 5.7.0 authentication required")
+            return
+        self._reset_transaction()
+        self.mail_from = arg.partition(":")[2].split(" ")[0].strip("<>")
+        self.started = time.monotonic()
+        self._reply("250 2.1.0 ok")
+
+    def smtp_RCPT(self, arg: str):
+        if self.mail_from is None:
+            self._reply("503 5.5.1 MAIL first")
+            return
+        rcpt = arg.partition(":")[2].split(" ")[0].strip("<>")
+        if self.sink.next_roll().random() < self.sink.perm_fail_rate:
+            self.sink.count("injected_550")
+            self._reply(f"550 5.1.1 <{rcpt}>: mailbox unavailable (injected)")
+            return
+        self.rcpts.append(rcpt)
+        self._reply("250 2.1.5 ok")
+
+    def smtp_DATA(self, arg: str):
+        sink = self.sink
+        if not self.rcpts:
+            self._reply("503 5.5.1 RCPT first")
+            return
+        self._reply("354 end data with <CR><LF>.<CR><LF>")
+        lines = []
+        while True:
+            line = self.rfile.readline(MAX_MESSAGE_SIZE)
+            if not line or line in (b".\r\n", b".\n"):
+                break
+            lines.append(line[1:] if line.startswith(b"..") else line)
+        data = b"".join(lines)
+
+        rng = sink.next_roll()
+        delay = sink._latency(rng) or 0.0
+        if delay:
+            time.sleep(delay)
+        roll = rng.random()
+        self.sent += 1
+        if sink.max_msgs_per_conn and self.sent > sink.max_msgs_per_conn:
+            sink.count("injected_421_conn_limit")
+            self._reply("421 4.7.0 too many messages on this connection")
+            return False
+        if roll < sink.drop_rate:
+            sink.count("injected_421_drop")
+            self._reply("421 4.4.2 connection dropped (injected)")
+            return False
+        roll -= sink.drop_rate
+        if roll < sink.temp_fail_rate:
+            sink.count("injected_451")
+            self._reply("451 4.3.0 temporary failure (injected)")
+            self._reset_transaction()
+            return
+        sink.record(self.conn_id, self.mail_from, self.rcpts, data, self.tls, self.user,
+                    time.monotonic() - (self.started or time.monotonic()))
+        self._reset_transaction()
+        self._reply("250 2.0.0 queued")
+
+    def smtp_RSET(self, arg: str):
+        self._reset_transaction()
+        self._reply("250 2.0.0 ok")
+
+    def smtp_NOOP(self, arg: str):
+        self.sink.count("noops")
+        self._reply("250 2.0.0 ok")
+
+    def smtp_VRFY(self, arg: str):
+        self._reply("252 2.1.5 cannot verify")
+
+    def smtp_QUIT(self, arg: str):
+        self._reply("221 2.0.0 bye")
+        return False
+
+
+# ── CLI ─────────────────────────────────────────────────────────────────────
+
+
+def _arg(args: List[str], name: str, default=None):
+    return args[args.index(name) + 1] if name in args else default
+
+
+def sink_from_args(args: List[str]) -> SMTPSink:
+    return SMTPSink(
+        host=_arg(args, "--host", "127.0.0.1"),
+        port=int(_arg(args, "--port", 2525)),
+        tls="--no-tls" not in args,
+        cert=_arg(args, "--cert"),
+        key=_arg(args, "--key"),
+        user=_arg(args, "--user"),
+        password=_arg(args, "--password"),
+        latency=_arg(args, "--latency", "fixed:0"),
+        connect_latency=_arg(args, "--connect-latency", "fixed:0"),
+        temp_fail_rate=float(_arg(args, "--temp-fail-rate", 0)),
+        perm_fail_rate=float(_arg(args, "--perm-fail-rate", 0)),
+        drop_rate=float(_arg(args, "--drop-rate", 0)),
+        max_msgs_per_conn=int(_arg(args, "--max-msgs-per-conn", 0)),
+        keep_data="--keep-data" in args,
+        record_dir=_arg(args, "--record-dir"),
+        seed=int(_arg(args, "--seed", 0)),
+    )
+
+
+if __name__ == "__main__":
+    sink_from_args(sys.argv[1:]).serve_forever()
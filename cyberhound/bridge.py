@@ -18,19 +18,24 @@ Required env vars:
 """
 
 import asyncio
-import json
 import os
 import re
 import time
 import imaplib
-import email
-from email.header import decode_header
 from datetime import datetime
-from pathlib import Path
 from dotenv import load_dotenv
 
 import requests
 
+try:
+    from cyberhound.lead_store import get_store
+    from cyberhound.llm_json import loads_lenient
+    from cyberhound.imap_sync import MailboxSync
+except ImportError:  # run as a script from cyberhound/
+    from lead_store import get_store
+    from llm_json import loads_lenient
+    from imap_sync import MailboxSync
+
 load_dotenv()
 
 # ── Config ────────────────────────────────────────────────────
@@ -41,8 +46,6 @@ WATCHDOG_INTERVAL_SEC  = int(os.getenv("WATCHDOG_INTERVAL_SEC", 60))
 MAX_DAILY_STRIKES      = int(os.getenv("MAX_DAILY_STRIKES", 20))
 IMAP_USER   = os.getenv("GMAIL_USER", os.getenv("SMTP_USER", ""))
 IMAP_PASS   = os.getenv("GMAIL_PASS", os.getenv("SMTP_PASS", ""))
-LEADS_FILE  = "PIPELINE_LEADS.json"
-WATCHDOG_CACHE = ".watchdog_cache.json"
 # ─────────────────────────────────────────────────────────────
 
 
@@ -58,27 +61,18 @@ def _headers() -> dict:
 
 
 # ══════════════════════════════════════════════════════════════
-# LEAD STORE  (flat file — source of truth is Supabase via API)
+# LEAD STORE  (lead_store.py — source of truth is Supabase via API)
 # ══════════════════════════════════════════════════════════════
 
-def _load_leads() -> list:
-    if not Path(LEADS_FILE).exists():
-        return []
-    with open(LEADS_FILE) as f:
-        try: return json.load(f)
-        except: return []
-
-def _save_leads(leads: list):
-    with open(LEADS_FILE, "w") as f:
-        json.dump(leads, f, indent=2)
+def _pending_leads() -> list:
+    return get_store().by_status("pending_bridge")
 
 def _add_lead(name: str, website: str, city: str = "", risk_score: int = 7) -> dict:
-    leads = _load_leads()
-    existing = next((l for l in leads if l.get("website","").lower() == website.lower()), None)
+    store = get_store()
+    existing = store.find_by_website(website)
     if existing:
         return existing
-    lead = {
-        "id": f"lead_{int(datetime.now().timestamp())}",
+    lead = store.add({
         "name": name,
         "website": website,
         "city": city,
@@ -86,21 +80,16 @@ def _add_lead(name: str, website: str, city: str = "", risk_score: int = 7) -> d
         "discovered_at": str(datetime.now()),
         "bridged": False,
         "supabase_lead_id": None,
-    }
-    leads.append(lead)
-    _save_leads(leads)
+    })
     print(f"  📋 Lead stored: {name} | {website}")
     return lead
 
 def _mark_bridged(lead_id: str, supabase_id: str = ""):
-    leads = _load_leads()
-    for l in leads:
-        if l["id"] == lead_id:
-            l["bridged"] = True
-            l["supabase_lead_id"] = supabase_id
-            l["bridged_at"] = str(datetime.now())
-            break
-    _save_leads(leads)
+    get_store().update(lead_id, {
+        "bridged": True,
+        "supabase_lead_id": supabase_id,
+        "bridged_at": str(datetime.now()),
+    })
 
 
 # ══════════════════════════════════════════════════════════════
@@ -138,15 +127,18 @@ async def run_scout() -> list:
             )
         )
 
-        raw = response.text.strip()
-        match = re.search(r'\[.*\]', raw, re.DOTALL)
-        if not match:
+        # Grounded search can't be combined with a response schema, so repair locally
+        try:
+            results = loads_lenient(response.text)
+        except ValueError:
             print(f"  ⚠️  Scout: could not parse JSON")
             return []
-
-        results = json.loads(match.group())
+        if isinstance(results, dict):
+            results = next((v for v in results.values() if isinstance(v, list)), [])
+        # Known and blocked (discarded / bounced) domains are not bridged again
+        fresh, skipped = get_store().filter_new(results)
         new_leads = []
-        for r in results:
+        for r in fresh:
             lead = _add_lead(
                 name=r.get("name", "Unknown"),
                 website=r.get("website", ""),
@@ -155,7 +147,8 @@ async def run_scout() -> list:
             )
             new_leads.append(lead)
 
-        print(f"  ✅ Scout found {len(new_leads)} leads")
+        print(f"  ✅ Scout found {len(new_leads)} new leads "
+              f"(skipped {skipped['known']} known, {skipped['blocked']} blocked)")
         return new_leads
 
     except Exception as e:
@@ -298,21 +291,8 @@ def bridge_lead(lead: dict) -> bool:
 # REPLY BRIDGE — routes Gmail replies into Brain 1's /api/replies
 # ══════════════════════════════════════════════════════════════
 
-def _load_watchdog_cache() -> set:
-    if Path(WATCHDOG_CACHE).exists():
-        with open(WATCHDOG_CACHE) as f:
-            try: return set(json.load(f))
-            except: return set()
-    return set()
-
-def _save_watchdog_cache(ids: set):
-    with open(WATCHDOG_CACHE, "w") as f:
-        json.dump(list(ids), f)
-
-def _decode_str(value) -> str:
-    if isinstance(value, bytes):
-        return value.decode(errors="replace")
-    return value or ""
+OUTREACH_KEYWORDS = ["bill 96", "compliance", "northern ventures",
+                     "imperial", "audit", "loi 96", "cyberhound"]
 
 def check_replies_and_bridge():
     """
@@ -321,86 +301,63 @@ def check_replies_and_bridge():
       - Gemini classification (interested/objection/question/etc)
       - Supabase storage
       - Telegram alert with suggested reply
+    Only mail that arrived since the last scan is read (imap_sync watermark),
+    and of each message only its headers and the start of its text/plain
+    part are fetched — never attachments.
     """
     if not IMAP_USER or not IMAP_PASS:
         print(f"  ⚠️  IMAP not configured — skipping reply check")
         return
 
-    processed = _load_watchdog_cache()
-
     try:
         mail = imaplib.IMAP4_SSL("imap.gmail.com")
         mail.login(IMAP_USER, IMAP_PASS)
-        mail.select("inbox")
-        _, search_data = mail.search(None, "UNSEEN")
-
-        for num in search_data[0].split():
-            _, data = mail.fetch(num, "(RFC822)")
-            raw = data[0][1]
-            msg = email.message_from_bytes(raw)
-
-            msg_id = msg.get("Message-ID", str(num))
-            if msg_id in processed:
-                continue
-
-            from_raw = decode_header(msg.get("From", ""))[0]
-            from_addr = _decode_str(from_raw[0])
-
-            subject_raw = decode_header(msg.get("Subject", "No Subject"))[0]
-            subject = _decode_str(subject_raw[0])
-
-            # Extract body
-            body = ""
-            if msg.is_multipart():
-                for part in msg.walk():
-                    if part.get_content_type() == "text/plain":
-                        body = part.get_payload(decode=True).decode(errors="replace")
-                        break
-            else:
-                body = msg.get_payload(decode=True).decode(errors="replace")
-
-            # Only process replies to our outreach subjects
-            outreach_keywords = ["bill 96", "compliance", "northern ventures",
-                                  "imperial", "audit", "loi 96", "cyberhound"]
-            is_outreach_reply = any(kw in subject.lower() or kw in body.lower()
-                                    for kw in outreach_keywords)
-            if not is_outreach_reply:
-                processed.add(msg_id)
-                continue
-
-            print(f"\n  📨 Reply detected from {from_addr}: \"{subject}\"")
-
-            # Bridge to /api/replies
-            if APP_URL:
-                try:
-                    reply_res = requests.post(
-                        f"{APP_URL}/api/replies",
-                        headers=_headers(),
-                        json={
-                            "from_email": from_addr,
-                            "raw_body":   body[:2000],
-                            "lead_id":    None,
-                            "campaign_id": None,
-                        },
-                        timeout=20
-                    )
-                    reply_data = reply_res.json()
-                    classification = reply_data.get("classification", {})
-                    print(f"    🧠 Classified: {classification.get('classification')} "
-                          f"| sentiment: {classification.get('sentiment')}")
-                    print(f"    💬 Suggested reply: {classification.get('suggested_reply', '')[:80]}...")
-                except Exception as e:
-                    print(f"    ❌ Reply bridge error: {e}")
-
-            processed.add(msg_id)
-
+        with MailboxSync(mail, "bridge") as sync:
+            for msg in sync.new_messages():
+                _bridge_message(msg)
         mail.logout()
-        _save_watchdog_cache(processed)
 
     except Exception as e:
         print(f"  ❌ IMAP error: {e}")
 
 
+def _bridge_message(msg):
+    """Route one inbound message to /api/replies if it answers our outreach."""
+    from_addr = msg.from_addr
+    subject = msg.subject or "No Subject"
+
+    # Only process replies to our outreach subjects
+    is_outreach_reply = (any(kw in subject.lower() for kw in OUTREACH_KEYWORDS)
+                         or any(kw in msg.body_text().lower() for kw in OUTREACH_KEYWORDS))
+    if not is_outreach_reply:
+        return
+    body = msg.body_text()
+
+    print(f"\n  📨 Reply detected from {from_addr}: \"{subject}\"")
+
+    # Bridge to /api/replies
+    if APP_URL:
+        try:
+            reply_res = requests.post(
+                f"{APP_URL}/api/replies",
+                headers=_headers(),
+                json={
+                    "from_email": from_addr,
+                    "raw_body":   body[:2000],
+                    "lead_id":    None,
+                    "campaign_id": None,
+                },
+                timeout=20
+            )
+            reply_data = reply_res.json()
+            classification = reply_data.get("classification", {})
+            print(f"    🧠 Classified: {classification.get('classification')} "
+                  f"| sentiment: {classification.get('sentiment')}")
+            print(f"    💬 Suggested reply: {classification.get('suggested_reply', '')[:80]}...")
+        except Exception as e:
+            print(f"    ❌ Reply bridge error: {e}")
+
+
 # ══════════════════════════════════════════════════════════════
 # MAIN LOOP
 # ══════════════════════════════════════════════════════════════
@@ -444,7 +401,7 @@ async def main_loop():
             last_scout = time.time()
 
         # ── Bridge pending leads ─────────────────────────────
-        pending = [l for l in _load_leads() if not l.get("bridged")]
+        pending = _pending_leads()
         if pending and strikes_today < MAX_DAILY_STRIKES:
             print(f"\n⚡ [{_ts()}] BRIDGE — {len(pending)} leads to bridge")
             for lead in pending:
@@ -480,7 +437,7 @@ if __name__ == "__main__":
         asyncio.run(run_scout())
     elif cmd == "bridge":
         # Bridge all pending leads right now
-        pending = [l for l in _load_leads() if not l.get("bridged")]
+        pending = _pending_leads()
         print(f"⚡ Bridging {len(pending)} pending leads...")
         for lead in pending:
             bridge_lead(lead)
@@ -0,0 +1,516 @@
+"""
+Deal Store — indexed, concurrency-safe CRM backing deal_tracker
+===============================================================
+Replaces deals.json, which get_deal / upsert_deal / list_deals loaded and
+scanned in full on every call (once per lead in hermes_striker, once per
+prospect in the sequence scheduler) while the watchdog thread rewrote the
+same file with no locking.
+
+  • One row per deal (JSON document) with a unique index on the normalized
+    email address — get_deal() is a single index probe instead of a scan
+  • Stage index — list_deals(stage) and the pipeline dashboard read one index
+    range instead of filtering every deal
+  • Bounded history — each deal keeps at most DEAL_HISTORY_MAX entries. When
+    it overflows, same-stage notes (touch sent, bounce, ...) are compacted
+    first, oldest first; the creation entry and stage transitions are kept as
+    long as possible. The number of dropped entries is kept in
+    `history_compacted`.
+  • Drip schedule — every deal carries touch_stage (last touch sent) and
+    next_touch_at, kept in an indexed column: due() and next_due_at() read
+    only the deals whose next touch is due, so the sequence scheduler does
+    O(due) work per pass and can sleep until the next touch
+  • Thread index — the Message-ID of every delivered outbound email maps to
+    its deal, so a reply is matched through its In-Reply-To / References
+    headers with one index probe (entries older than DEAL_THREAD_DAYS are
+    pruned)
+  • Thread- and process-safe — one RLock-guarded connection per process,
+    read-modify-write in BEGIN IMMEDIATE transactions over WAL, so the
+    watchdog thread, the engine and a cron'd scheduler can all write at once
+  • One-shot migration: on first open, an existing deals.json is imported
+    (duplicate emails: the first record wins, later ones fill gaps). The JSON
+    file is left in place as a backup and never read again.
+
+Env vars:
+  DEAL_STORE_PATH   — SQLite file (default: .deals.sqlite)
+  DEAL_HISTORY_MAX  — history entries kept per deal (default: 25)
+  DRIP_TOUCH_2_DAYS — days after Touch 1 that Touch 2 is due (default: 3)
+  DRIP_TOUCH_3_DAYS — days after Touch 1 that Touch 3 is due (default: 7)
+  DEAL_THREAD_DAYS  — days an outbound Message-ID stays matchable (default: 365)
+
+CLI:
+  python -m cyberhound.deal_store stats
+  python -m cyberhound.deal_store export [deals.json]
+  python -m cyberhound.deal_store migrate [deals.json]   # re-run the import
+"""
+
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+DEAL_STORE_PATH = os.getenv("DEAL_STORE_PATH", ".deals.sqlite")
+DEAL_HISTORY_MAX = max(2, int(os.getenv("DEAL_HISTORY_MAX", "25")))
+DEAL_THREAD_DAYS = float(os.getenv("DEAL_THREAD_DAYS", "365"))
+LEGACY_JSON = "deals.json"
+
+# Drip sequence: touch number → days after Touch 1. The last key is the final touch.
+TOUCH_OFFSETS_DAYS = {
+    2: float(os.getenv("DRIP_TOUCH_2_DAYS", "3")),
+    3: float(os.getenv("DRIP_TOUCH_3_DAYS", "7")),
+}
+FINAL_TOUCH = max(TOUCH_OFFSETS_DAYS)
+SCHEDULE_VERSION = 1
+_LEGACY_TOUCH_NOTE = re.compile(r"Touch (\d+) sent")
+_MESSAGE_ID = re.compile(r"<[^<>\s]+>")
+
+
+def email_key(email: str) -> str:
+    """Index key for an email address: trimmed and lower-cased."""
+    return (email or "").strip().lower()
+
+
+def message_ids(*headers: Optional[str]) -> List[str]:
+    """'<a@x> <b@y>' style header values → ['<a@x>', '<b@y>'], in order, de-duplicated."""
+    return list(dict.fromkeys(m for value in headers for m in _MESSAGE_ID.findall(value or "")))
+
+
+def stage_value(stage) -> str:
+    """Plain string for a deal_tracker.Stage member or a stage name."""
+    return str(getattr(stage, "value", stage) or "")
+
+
+def new_deal_id() -> str:
+    """deal_<unix ts>_<random>: sortable like the old ids, unique within a second."""
+    # 48 random bits: bulk imports create tens of thousands of deals per second
+    return f"deal_{int(time.time())}_{secrets.token_hex(6)}"
+
+
+def _epoch(value) -> Optional[float]:
+    """ISO timestamp (or epoch) → epoch seconds; None if missing or unparseable."""
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts).isoformat() if ts is not None else None
+
+
+def next_touch(deal: dict, now: Optional[float] = None) -> Optional[int]:
+    """
+    The touch to send next. A deal that fell behind jumps straight to the
+    latest touch already due (Day 8 without Touch 2 → Touch 3, as before).
+    """
+    stage = int(deal.get("touch_stage") or 0)
+    if stage >= FINAL_TOUCH:
+        return None
+    start = _epoch(deal.get("touch_1_at"))
+    now = time.time() if now is None else now
+    due = [t for t, days in TOUCH_OFFSETS_DAYS.items()
+           if t > stage and start is not None and now >= start + days * 86400]
+    return max(due) if due else stage + 1
+
+
+def schedule(deal: dict) -> dict:
+    """Set deal["next_touch_at"] from touch_stage / touch_1_at. Only prospects are scheduled."""
+    stage = int(deal.get("touch_stage") or 0)
+    start = _epoch(deal.get("touch_1_at"))
+    pending = [t for t in TOUCH_OFFSETS_DAYS if t > stage]
+    if stage < 1 or start is None or not pending or stage_value(deal.get("stage")) != "PROSPECT":
+        deal["next_touch_at"] = None
+    else:
+        deal["next_touch_at"] = _iso(start + TOUCH_OFFSETS_DAYS[min(pending)] * 86400)
+    return deal
+
+
+def compact_history(deal: dict, limit: int = DEAL_HISTORY_MAX) -> dict:
+    """
+    Trim deal["history"] to `limit` entries in place. Same-stage entries go
+    first (oldest first), then the oldest transitions; the creation entry
+    (from=None) is always kept.
+    """
+    history = deal.get("history") or []
+    excess = len(history) - limit
+    if excess <= 0:
+        return deal
+    removable = [i for i, h in enumerate(history) if h.get("from") is not None and h.get("from") == h.get("to")]
+    removable += [i for i, h in enumerate(history) if h.get("from") is not None and h.get("from") != h.get("to")]
+    drop = set(removable[:excess])
+    deal["history"] = [h for i, h in enumerate(history) if i not in drop]
+    deal["history_compacted"] = deal.get("history_compacted", 0) + len(drop)
+    return deal
+
+
+class DealStore:
+    """SQLite-backed deal pipeline with email and stage indexes."""
+
+    def __init__(self, path: str = DEAL_STORE_PATH, legacy_json: Optional[str] = LEGACY_JSON):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS deals (
+                id            TEXT PRIMARY KEY,
+                email         TEXT NOT NULL UNIQUE,
+                stage         TEXT NOT NULL,
+                data          TEXT NOT NULL,
+                updated_at    REAL NOT NULL,
+                touch_stage   INTEGER NOT NULL DEFAULT 0,
+                next_touch_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS threads (
+                message_id TEXT PRIMARY KEY,
+                email      TEXT NOT NULL,
+                sent_at    REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS threads_sent ON threads(sent_at);
+            CREATE TABLE IF NOT EXISTS meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+        with self.transaction():
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(deals)")}
+            if "touch_stage" not in columns:
+                self._db.execute("ALTER TABLE deals ADD COLUMN touch_stage INTEGER NOT NULL DEFAULT 0")
+            if "next_touch_at" not in columns:
+                self._db.execute("ALTER TABLE deals ADD COLUMN next_touch_at REAL")
+            self._db.execute("CREATE INDEX IF NOT EXISTS deals_stage ON deals(stage)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS deals_due ON deals(next_touch_at) "
+                             "WHERE next_touch_at IS NOT NULL")
+            if legacy_json and self._meta("migrated_from") is None:
+                self._set_meta("migrated_from", legacy_json)
+                if os.path.exists(legacy_json):
+                    self.migrate_json(legacy_json)
+            if self._meta("schedule_version") != str(SCHEDULE_VERSION):
+                self._backfill_schedule()
+            self._db.execute("DELETE FROM threads WHERE sent_at < ?", (time.time() - DEAL_THREAD_DAYS * 86400,))
+
+    # ── Transactions ────────────────────────────────────────────────────────
+
+    @contextmanager
+    def transaction(self):
+        """Group writes atomically. Nested calls join the outer transaction."""
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self
+                finally:
+                    self._depth -= 1
+                return
+            self._db.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield self
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            finally:
+                self._depth = 0
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self._db.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+
+    # ── Row I/O ─────────────────────────────────────────────────────────────
+
+    def _write(self, deal: dict, insert: bool):
+        deal["stage"] = stage_value(deal.get("stage"))
+        if deal["stage"] != "PROSPECT":
+            deal["next_touch_at"] = None  # replied, called, closed: the drip stops
+        compact_history(deal)
+        blob = json.dumps(deal, ensure_ascii=False, default=str)
+        touch_stage = int(deal.get("touch_stage") or 0)
+        next_at = _epoch(deal.get("next_touch_at"))
+        if insert:
+            self._db.execute(
+                "INSERT INTO deals(id, email, stage, data, updated_at, touch_stage, next_touch_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (deal["id"], email_key(deal["email"]), deal["stage"], blob, time.time(), touch_stage, next_at),
+            )
+        else:
+            self._db.execute(
+                "UPDATE deals SET stage = ?, data = ?, updated_at = ?, touch_stage = ?, next_touch_at = ? "
+                "WHERE email = ?",
+                (deal["stage"], blob, time.time(), touch_stage, next_at, email_key(deal["email"])),
+            )
+
+    def _rows(self, sql: str, params: Iterable = ()) -> List[dict]:
+        with self._lock:
+            return [json.loads(data) for (data,) in self._db.execute(sql, tuple(params)).fetchall()]
+
+    @staticmethod
+    def _legacy_schedule(deal: dict) -> dict:
+        """
+        Give a pre-schedule deal its touch_stage / next_touch_at. The last touch
+        sent is read once from the old "Touch N sent" notes; a deal without one
+        is assumed to be at Touch 1, timed from created_at.
+        """
+        if "touch_stage" in deal:
+            return deal
+        notes = [h.get("notes") or "" for h in deal.get("history") or []] + [deal.get("notes") or ""]
+        sent = [int(n) for note in notes for n in _LEGACY_TOUCH_NOTE.findall(note)]
+        deal["touch_stage"] = max(sent, default=1)
+        deal.setdefault("touch_1_at", deal.get("created_at"))
+        return schedule(deal)
+
+    def _backfill_schedule(self):
+        for (data,) in self._db.execute("SELECT data FROM deals").fetchall():
+            deal = json.loads(data)
+            if "touch_stage" not in deal:
+                self._write(self._legacy_schedule(deal), insert=False)
+        self._set_meta("schedule_version", str(SCHEDULE_VERSION))
+
+    # ── Lookups ─────────────────────────────────────────────────────────────
+
+    def get(self, email: str) -> Optional[dict]:
+        rows = self._rows("SELECT data FROM deals WHERE email = ?", (email_key(email),))
+        return rows[0] if rows else None
+
+    def list(self, stage=None) -> List[dict]:
+        """All deals (or those in `stage`), oldest first."""
+        if stage:
+            return self._rows("SELECT data FROM deals WHERE stage = ? ORDER BY rowid", (stage_value(stage),))
+        return self._rows("SELECT data FROM deals ORDER BY rowid")
+
+    def count(self, stage=None) -> int:
+        with self._lock:
+            if stage:
+                return self._db.execute(
+                    "SELECT COUNT(*) FROM deals WHERE stage = ?", (stage_value(stage),)
+                ).fetchone()[0]
+            return self._db.execute("SELECT COUNT(*) FROM deals").fetchone()[0]
+
+    def counts_by_stage(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._db.execute("SELECT stage, COUNT(*) FROM deals GROUP BY stage").fetchall())
+
+    def __len__(self) -> int:
+        return self.count()
+
+    # ── Drip schedule ───────────────────────────────────────────────────────
+
+    def due(self, now: Optional[float] = None, limit: int = 100) -> List[dict]:
+        """Up to `limit` deals whose next touch is due at `now`, most overdue first."""
+        now = time.time() if now is None else now
+        return self._rows(
+            "SELECT data FROM deals WHERE next_touch_at <= ? ORDER BY next_touch_at LIMIT ?",
+            (now, limit),
+        )
+
+    def next_due_at(self) -> Optional[float]:
+        """Epoch of the earliest scheduled touch (None when nothing is scheduled)."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT MIN(next_touch_at) FROM deals WHERE next_touch_at IS NOT NULL"
+            ).fetchone()[0]
+
+    def claim(self, email: str, touch_stage: int, lease_sec: float) -> bool:
+        """
+        Take a due deal for sending: pushes next_touch_at `lease_sec` ahead so
+        other schedulers skip it. Returns False if it is no longer due at
+        `touch_stage` (sent or claimed elsewhere, or left PROSPECT). If the
+        send fails the lease simply expires and the touch is retried.
+        """
+        now = time.time()
+        with self.transaction():
+            deal = self.get(email)
+            next_at = _epoch(deal.get("next_touch_at")) if deal else None
+            if next_at is None or next_at > now or int(deal.get("touch_stage") or 0) != touch_stage:
+                return False
+            deal["next_touch_at"] = _iso(now + lease_sec)
+            self._write(deal, insert=False)
+            return True
+
+    # ── Thread index ────────────────────────────────────────────────────────
+
+    def record_message(self, message_id: str, email: str):
+        """Remember that outbound `message_id` went to `email`."""
+        ids = message_ids(message_id)
+        if not ids or not email_key(email):
+            return
+        with self.transaction():
+            self._db.execute("INSERT OR REPLACE INTO threads(message_id, email, sent_at) VALUES (?, ?, ?)",
+                             (ids[0], email_key(email), time.time()))
+
+    def find_thread(self, ids: Iterable[str]) -> Optional[dict]:
+        """The deal our most recent message among `ids` was sent to (None if none are ours)."""
+        ids = list(ids)
+        if not ids:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT email FROM threads WHERE message_id IN ({','.join('?' * len(ids))}) "
+                "ORDER BY sent_at DESC LIMIT 1",
+                ids,
+            ).fetchone()
+        return self.get(row[0]) if row else None
+
+    # ── Writes ──────────────────────────────────────────────────────────────
+
+    def upsert(self, email: str, name: str, stage, notes: str = "", stripe_link: str = "",
+               touch: Optional[int] = None) -> dict:
+        """
+        Create the deal for `email`, or move it to `stage` and append a history
+        entry. `touch` records that drip Touch N was just sent and schedules
+        the next one.
+        """
+        now = str(datetime.now())
+        stage = stage_value(stage)
+        with self.transaction():
+            deal = self.get(email)
+            insert = deal is None
+            if insert:
+                deal = {
+                    "id": new_deal_id(),
+                    "email": email,
+                    "name": name,
+                    "stage": stage,
+                    "created_at": now,
+                    "updated_at": now,
+                    "notes": notes,
+                    "stripe_link": stripe_link,
+                    "history": [{"from": None, "to": stage, "at": now, "notes": notes}],
+                }
+            else:
+                prev_stage = deal["stage"]
+                deal["stage"] = stage
+                deal["updated_at"] = now
+                if notes:
+                    deal["notes"] = notes
+                if stripe_link:
+                    deal["stripe_link"] = stripe_link
+                deal.setdefault("history", []).append({
+                    "from": prev_stage,
+                    "to": stage,
+                    "at": now,
+                    "notes": notes,
+                })
+            if touch:
+                deal["touch_stage"] = max(touch, int(deal.get("touch_stage") or 0))
+                deal.setdefault("touch_1_at", datetime.now().isoformat())
+                schedule(deal)
+            self._write(deal, insert=insert)
+            return deal
+
+    def update(self, email: str, updates: dict) -> Optional[dict]:
+        """Apply `updates` to one deal without a history entry. None if unknown."""
+        with self.transaction():
+            deal = self.get(email)
+            if deal is None:
+                return None
+            deal.update({k: v for k, v in updates.items() if k not in ("id", "email")})
+            self._write(deal, insert=False)
+            return deal
+
+    def delete(self, email: str) -> bool:
+        with self.transaction():
+            return self._db.execute("DELETE FROM deals WHERE email = ?", (email_key(email),)).rowcount > 0
+
+    # ── Migration / export ──────────────────────────────────────────────────
+
+    def migrate_json(self, path: str = LEGACY_JSON) -> int:
+        """Import a deals.json list. Returns the number of new deals."""
+        try:
+            with open(path) as f:
+                deals = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[deal_store] ⚠️  could not read {path}: {e}")
+            return 0
+        before = self.count()
+        with self.transaction():
+            for deal in deals if isinstance(deals, list) else []:
+                if not isinstance(deal, dict) or not email_key(deal.get("email", "")):
+                    continue
+                existing = self.get(deal["email"])
+                if existing is None:
+                    deal = {**deal, "stage": deal.get("stage") or "PROSPECT"}
+                    if not deal.get("id") or self._db.execute(
+                        "SELECT 1 FROM deals WHERE id = ?", (str(deal["id"]),)
+                    ).fetchone():
+                        deal["id"] = new_deal_id()
+                    self._write(self._legacy_schedule(deal), insert=True)
+                    continue
+                # Duplicate email: the first record wins, later ones only fill gaps
+                missing = {k: v for k, v in deal.items() if v and not existing.get(k)}
+                if missing:
+                    self.update(existing["email"], missing)
+        imported = self.count() - before
+        print(f"[deal_store] 📦 migrated {imported} deals from {path} → {self.path}")
+        return imported
+
+    def export_json(self, path: str = LEGACY_JSON) -> int:
+        deals = self.list()
+        with open(path, "w") as f:
+            json.dump(deals, f, indent=2, default=str)
+        return len(deals)
+
+    def _scheduled_count(self) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM deals WHERE next_touch_at IS NOT NULL"
+            ).fetchone()[0]
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            last = self._db.execute("SELECT MAX(updated_at) FROM deals").fetchone()[0]
+            threads = self._db.execute("SELECT COUNT(*) FROM threads").fetchone()[0]
+        return {
+            "path": self.path,
+            "deals": self.count(),
+            "stages": self.counts_by_stage(),
+            "history_max": DEAL_HISTORY_MAX,
+            "scheduled": self._scheduled_count(),
+            "next_touch_at": _iso(self.next_due_at()),
+            "threads": threads,
+            "last_write": datetime.fromtimestamp(last).isoformat() if last else None,
+        }
+
+
+_stores: Dict[str, DealStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_deal_store(path: Optional[str] = None) -> DealStore:
+    """Process-wide store for `path` (default DEAL_STORE_PATH, opened on first use)."""
+    path = path or DEAL_STORE_PATH
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = _stores[path] = DealStore(path)
+    return store
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    target = sys.argv[2] if len(sys.argv) > 2 else LEGACY_JSON
+    if cmd == "export":
+        print(f"📤 {get_deal_store().export_json(target)} deals written to {target}")
+    elif cmd == "migrate":
+        get_deal_store().migrate_json(target)
+    else:
+        print(json.dumps(get_deal_store().stats(), indent=2))
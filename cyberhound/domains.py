@@ -0,0 +1,105 @@
+"""
+Domains — canonical registrable-domain normalizer for lead dedup
+================================================================
+`https://acme.com/`, `http://www.acme.com`, `acme.com/about`,
+`shop.acme.com` and `jane@acme.com` all map to `acme.com`, so the lead store,
+the scout filter and the negative cache agree on what "the same company" is.
+
+The registrable domain is the public suffix plus one label ("eTLD+1").
+Rather than ship the full Public Suffix List, MULTI_LABEL_SUFFIXES covers the
+second-level registries our markets use (UK, AU/NZ, Canadian provinces, ...);
+any other host is treated as having a single-label suffix.
+
+Marketplaces, forums and social sites (AGGREGATOR_DOMAINS) are the
+exception: a lead found on upwork.com or reddit.com is one job post or
+thread, not the site's owner, so listing_key() identifies it by its URL.
+
+Usage:
+    from cyberhound.domains import registrable_domain
+
+    registrable_domain("https://www.Shop.Acme.co.uk/about")   # "acme.co.uk"
+    listing_key("https://www.upwork.com/jobs/~01ab/")         # "upwork.com/jobs/~01ab"
+"""
+
+import ipaddress
+from urllib.parse import urlsplit
+
+# Public suffixes with more than one label (checked longest first)
+MULTI_LABEL_SUFFIXES = frozenset({
+    # United Kingdom
+    "co.uk", "org.uk", "me.uk", "ltd.uk", "plc.uk", "net.uk", "ac.uk", "gov.uk", "nhs.uk",
+    # Canada (provincial registries)
+    "ab.ca", "bc.ca", "mb.ca", "nb.ca", "nf.ca", "nl.ca", "ns.ca", "nt.ca", "nu.ca",
+    "on.ca", "pe.ca", "qc.ca", "sk.ca", "yk.ca", "gc.ca",
+    # Australia / New Zealand
+    "com.au", "net.au", "org.au", "edu.au", "gov.au", "asn.au", "id.au",
+    "co.nz", "net.nz", "org.nz", "govt.nz", "ac.nz",
+    # Elsewhere
+    "com.br", "net.br", "org.br", "com.mx", "org.mx", "gob.mx", "co.in", "net.in", "org.in",
+    "co.jp", "ne.jp", "or.jp", "co.za", "org.za", "com.sg", "com.hk", "com.cn", "co.il",
+    "com.tr", "com.ar", "co.kr", "com.tw", "com.my", "com.ph", "com.ng",
+    # Shared hosting — each customer subdomain is its own site
+    "github.io", "herokuapp.com", "vercel.app", "netlify.app", "pages.dev",
+    "wixsite.com", "myshopify.com", "blogspot.com",
+})
+
+# Sites hosting many unrelated signals (job posts, threads, profiles): a
+# lead on one of these is a listing, never the whole registrable domain
+AGGREGATOR_DOMAINS = frozenset({
+    "upwork.com", "fiverr.com", "freelancer.com", "guru.com", "peopleperhour.com",
+    "indeed.com", "glassdoor.com", "monster.com", "ziprecruiter.com", "jobboom.com", "jobillico.com",
+    "reddit.com", "ycombinator.com", "quora.com", "stackexchange.com",
+    "stackoverflow.com", "medium.com", "substack.com", "producthunt.com",
+    "linkedin.com", "facebook.com", "twitter.com", "x.com", "instagram.com", "youtube.com",
+    "craigslist.org", "kijiji.ca", "google.com", "yelp.com", "yelp.ca",
+})
+
+
+def hostname(value: str) -> str:
+    """Lower-cased host of a URL, bare domain or email address ('' if none)."""
+    value = (value or "").strip().lower()
+    if not value:
+        return ""
+    if "@" in value and "//" not in value:
+        value = value.rsplit("@", 1)[1]
+    host = urlsplit(value if "//" in value else "//" + value).hostname or ""
+    host = host.rstrip(".")
+    try:
+        host = host.encode("idna").decode("ascii")
+    except UnicodeError:
+        pass
+    return host
+
+
+def registrable_domain(value: str) -> str:
+    """eTLD+1 of a URL, host or email address; IPs and single labels are returned as-is."""
+    host = hostname(value)
+    if not host or "." not in host:
+        return host
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+    labels = host.split(".")
+    suffix_len = 2 if len(labels) > 2 and ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES else 1
+    return ".".join(labels[-(suffix_len + 1):])
+
+
+def is_aggregator(value: str) -> bool:
+    """Is this URL/host on a marketplace, forum or social site (AGGREGATOR_DOMAINS)?"""
+    return registrable_domain(value) in AGGREGATOR_DOMAINS
+
+
+def listing_key(value: str) -> str:
+    """Host (minus www.) + path + query of a URL: one listing on an aggregator site."""
+    value = (value or "").strip()
+    host = hostname(value)
+    if not host:
+        return ""
+    if host.startswith("www."):
+        host = host[4:]
+    if "@" in value and "//" not in value:
+        return host
+    parts = urlsplit(value if "//" in value else "//" + value)
+    return host + parts.path.rstrip("/") + (f"?{parts.query}" if parts.query else "")
@@ -3,7 +3,6 @@ Email Envoy - Sends Imperial Intelligence & AdGenXai Pitches
 Uses centralized config - NO hardcoded credentials
 Attaches BOTH audit report and pitch deck for maximum impact
 """
-import smtplib
 import os
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -11,9 +10,10 @@ from email.mime.base import MIMEBase
 from email import encoders
 from pathlib import Path
 from config import (
-    SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASS,
+    SMTP_SERVER, SMTP_USER,
     DEFAULT_FROM_NAME, check_config
 )
+from smtp_pool import send_message
 
 def deploy_envoy(target_email, target_name, target_data=None):
     """
@@ -101,14 +101,10 @@ Northern Ventures Intelligence Division
             print(f"   ⚠️  File not found: {file_path}")
             continue
     
-    # Connect and send
+    # Send over the shared pooled (already authenticated) connection
     try:
-        print(f"📧 Connecting to {SMTP_SERVER}...")
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SMTP_USER, SMTP_PASS)
-        server.send_message(msg)
-        server.quit()
+        print(f"📧 Sending via {SMTP_SERVER}...")
+        send_message(msg)
         
         print(f"✅ ENVOY DELIVERED: {target_name}")
         print(f"   Documents: {len(attachments)}")
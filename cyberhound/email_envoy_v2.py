@@ -1,17 +1,30 @@
 """
 Email Envoy V2 - HTML Sequence Engine
 No Calendly — direct reply/call CTAs only.
+fire_* queue into the durable outbox (outbox.py) and return immediately;
+deal stages move when the outbox reports the email delivered.
+Templates are precompiled (email_templates) and attachments are read and
+base64-encoded once per file version, so building a message is just
+substitution plus MIME framing.
+Every message carries our own Message-ID, indexed against the deal once
+delivered, so replies are matched by thread (deal_tracker.find_reply_deal).
+Drip touches (1-3) are one per recipient; the reply auto-response is one per
+inbound message and the post-call email one per call.
 """
-import smtplib
+import base64
 import os
+import uuid
+from functools import lru_cache
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
-from email import encoders
+from email.utils import make_msgid
 from datetime import datetime
-from cyberhound.config import SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASS, DEFAULT_FROM_NAME, check_config
+from cyberhound.config import SMTP_USER, DEFAULT_FROM_NAME, check_config
 from cyberhound.email_templates import touch_1_strike, touch_2_followup, touch_3_final, touch_4_reply_autoresponse, touch_5_post_call
-from cyberhound.deal_tracker import upsert_deal, get_deal, Stage
+from cyberhound.deal_tracker import upsert_deal, get_deal, record_outbound, Stage
+from cyberhound.smtp_pool import send_message, send_many
+from cyberhound.outbox import enqueue_email, get_outbox, outbox_key
 
 # ── Configure in .env ────────────────────────────────────────
 REPLY_EMAIL  = os.getenv("REPLY_EMAIL",  SMTP_USER)
@@ -20,41 +33,103 @@ STRIPE_AUDIT_LINK    = os.getenv("STRIPE_AUDIT_LINK",    "https://buy.stripe.com
 STRIPE_RETAINER_LINK = os.getenv("STRIPE_RETAINER_LINK", "https://buy.stripe.com/YOUR_RETAINER_LINK")
 # ────────────────────────────────────────────────────────────
 
-def _send_html(to_email: str, to_name: str, subject: str, html_body: str,
-               attachments: list = []) -> bool:
-    if not check_config():
-        return False
+# make_msgid() without a domain does a getfqdn() lookup per call
+_MSGID_DOMAIN = SMTP_USER.rpartition("@")[2] or "cyberhound.local"
+
+@lru_cache(maxsize=16)
+def _encoded_file(file_path: str, mtime_ns: int, size: int) -> str:
+    # Keyed by mtime/size so an updated file is re-read on its next send
+    with open(file_path, "rb") as f:
+        return base64.encodebytes(f.read()).decode("ascii")
+
+
+def _attachment_part(file_path: str, display_name: str) -> MIMEBase:
+    st = os.stat(file_path)
+    part = MIMEBase("application", "octet-stream")
+    part.set_payload(_encoded_file(file_path, st.st_mtime_ns, st.st_size))
+    part["Content-Transfer-Encoding"] = "base64"
+    part.add_header("Content-Disposition", f"attachment; filename={display_name}")
+    return part
 
+
+def _build_html(to_email: str, subject: str, html_body: str, attachments: list = []) -> MIMEMultipart:
     msg = MIMEMultipart("alternative")
     msg["From"] = f"{DEFAULT_FROM_NAME} <{SMTP_USER}>"
     msg["To"] = to_email
     msg["Subject"] = subject
+    msg["Message-ID"] = make_msgid(domain=_MSGID_DOMAIN)
     msg.attach(MIMEText(html_body, "html"))
 
     for file_path, display_name in attachments:
         try:
-            with open(file_path, "rb") as f:
-                part = MIMEBase("application", "octet-stream")
-                part.set_payload(f.read())
-                encoders.encode_base64(part)
-                part.add_header("Content-Disposition", f"attachment; filename={display_name}")
-                msg.attach(part)
+            msg.attach(_attachment_part(file_path, display_name))
         except FileNotFoundError:
             print(f"   ⚠️  Attachment not found: {file_path}")
+    return msg
+
 
+def _send_html(to_email: str, to_name: str, subject: str, html_body: str,
+               attachments: list = []) -> bool:
+    if not check_config():
+        return False
+
+    msg = _build_html(to_email, subject, html_body, attachments)
+    # Pooled, already-authenticated connection; paced by the shared smtp:<host> bucket
     try:
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SMTP_USER, SMTP_PASS)
-        server.send_message(msg)
-        server.quit()
+        send_message(msg)
         print(f"✅ EMAIL SENT → {to_name} <{to_email}> | {subject[:55]}")
+        record_outbound(msg["Message-ID"], to_email)
         return True
     except Exception as e:
         print(f"❌ Send failed: {e}")
         return False
 
 
+def send_many_html(emails: list) -> list:
+    """
+    Batch send over the SMTP pool's parallel connections.
+    emails: [(to_email, to_name, subject, html_body), ...] → [success, ...]
+    """
+    if not emails or not check_config():
+        return [False] * len(emails)
+
+    messages = [_build_html(to_email, subject, html_body) for to_email, _, subject, html_body in emails]
+    errors = send_many(messages)
+    for (to_email, to_name, subject, _), msg, error in zip(emails, messages, errors):
+        if error is None:
+            print(f"✅ EMAIL SENT → {to_name} <{to_email}> | {subject[:55]}")
+            record_outbound(msg["Message-ID"], to_email)
+        else:
+            print(f"❌ Send failed → {to_email}: {error}")
+    return [error is None for error in errors]
+
+
+def queue_html(to_email: str, to_name: str, subject: str, html_body: str, touch: str,
+               attachments: list = [], deal: dict = None, skip_stages: list = None) -> bool:
+    """
+    Spool an email in the outbox (one per recipient + touch) for background delivery.
+    deal: upsert_deal kwargs applied once delivered; skip_stages: deal stages that cancel it.
+    False if not configured or this recipient + touch is already queued/sent (see already_queued).
+    """
+    if not check_config():
+        return False
+
+    msg = _build_html(to_email, subject, html_body, attachments)
+    if not enqueue_email(outbox_key(to_email, touch), msg, to_email, deal=deal, skip_stages=skip_stages):
+        print(f"⏭️  {touch} already queued/sent → {to_email}")
+        return False
+    print(f"📮 QUEUED → {to_name} <{to_email}> | {subject[:55]}")
+    return True
+
+
+def already_queued(to_email: str, touch: str) -> bool:
+    """True if this recipient + touch is in the outbox (queued, sent or failed)."""
+    return get_outbox().exists(outbox_key(to_email, touch))
+
+
+_ENGAGED = [Stage.REPLIED, Stage.CALLED, Stage.CLOSED_WON]
+
+
 def fire_touch_1(target_email: str, target_name: str, risk_score: int = 7,
                  bill96_issues: list = None, attach_ledger: bool = True) -> bool:
     template = touch_1_strike(target_name, risk_score, REPLY_EMAIL, PHONE, bill96_issues)
@@ -62,46 +137,44 @@ def fire_touch_1(target_email: str, target_name: str, risk_score: int = 7,
     if attach_ledger and os.path.exists("IMPERIAL_PREMIUM_LEDGER.pdf"):
         attachments.append(("IMPERIAL_PREMIUM_LEDGER.pdf",
                             f"{target_name.replace(' ','_')}_Compliance_Audit.pdf"))
-    success = _send_html(target_email, target_name, template["subject"], template["html"], attachments)
-    if success:
-        upsert_deal(target_email, target_name, Stage.PROSPECT,
-                    notes=f"Touch 1 sent {datetime.now().strftime('%Y-%m-%d')} | Risk: {risk_score}/10")
-    return success
+    return queue_html(target_email, target_name, template["subject"], template["html"], "touch_1",
+                      attachments, deal=dict(
+                          email=target_email, name=target_name, stage=Stage.PROSPECT, touch=1,
+                          notes=f"Touch 1 sent {datetime.now().strftime('%Y-%m-%d')} | Risk: {risk_score}/10"))
 
 
 def fire_touch_2(target_email: str, target_name: str) -> bool:
     deal = get_deal(target_email)
-    if deal and deal["stage"] in [Stage.REPLIED, Stage.CALLED, Stage.CLOSED_WON]:
+    if deal and deal["stage"] in _ENGAGED:
         print(f"⏭️  Skipping Touch 2 — {target_name} already at {deal['stage']}")
         return False
     template = touch_2_followup(target_name, REPLY_EMAIL, PHONE)
-    success = _send_html(target_email, target_name, template["subject"], template["html"])
-    if success:
-        upsert_deal(target_email, target_name, Stage.PROSPECT,
-                    notes=f"Touch 2 sent {datetime.now().strftime('%Y-%m-%d')}")
-    return success
+    return queue_html(target_email, target_name, template["subject"], template["html"], "touch_2",
+                      skip_stages=_ENGAGED, deal=dict(
+                          email=target_email, name=target_name, stage=Stage.PROSPECT, touch=2,
+                          notes=f"Touch 2 sent {datetime.now().strftime('%Y-%m-%d')}"))
 
 
 def fire_touch_3(target_email: str, target_name: str) -> bool:
     deal = get_deal(target_email)
-    if deal and deal["stage"] in [Stage.REPLIED, Stage.CALLED, Stage.CLOSED_WON]:
+    if deal and deal["stage"] in _ENGAGED:
         print(f"⏭️  Skipping Touch 3 — {target_name} already at {deal['stage']}")
         return False
     template = touch_3_final(target_name, REPLY_EMAIL, PHONE)
-    success = _send_html(target_email, target_name, template["subject"], template["html"])
-    if success:
-        upsert_deal(target_email, target_name, Stage.PROSPECT,
-                    notes=f"Touch 3 sent {datetime.now().strftime('%Y-%m-%d')} — final push")
-    return success
+    return queue_html(target_email, target_name, template["subject"], template["html"], "touch_3",
+                      skip_stages=_ENGAGED, deal=dict(
+                          email=target_email, name=target_name, stage=Stage.PROSPECT, touch=3,
+                          notes=f"Touch 3 sent {datetime.now().strftime('%Y-%m-%d')} — final push"))
 
 
-def fire_reply_autoresponse(target_email: str, target_name: str) -> bool:
+def fire_reply_autoresponse(target_email: str, target_name: str, reply_to: str = None) -> bool:
+    # One auto-response per inbound message (its Message-ID); a later reply gets its own
     template = touch_4_reply_autoresponse(target_name, REPLY_EMAIL, PHONE)
-    success = _send_html(target_email, target_name, template["subject"], template["html"])
-    if success:
-        upsert_deal(target_email, target_name, Stage.REPLIED,
-                    notes=f"Reply detected + auto-response {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-    return success
+    return queue_html(target_email, target_name, template["subject"], template["html"],
+                      f"touch_4:{reply_to or uuid.uuid4().hex}",
+                      deal=dict(
+                          email=target_email, name=target_name, stage=Stage.REPLIED,
+                          notes=f"Reply detected + auto-response {datetime.now().strftime('%Y-%m-%d %H:%M')}"))
 
 
 def fire_post_call(target_email: str, target_name: str,
@@ -109,12 +182,12 @@ def fire_post_call(target_email: str, target_name: str,
                    use_retainer: bool = True) -> bool:
     stripe_link = STRIPE_RETAINER_LINK if use_retainer else STRIPE_AUDIT_LINK
     template = touch_5_post_call(target_name, offer, stripe_link, REPLY_EMAIL)
-    success = _send_html(target_email, target_name, template["subject"], template["html"])
-    if success:
-        upsert_deal(target_email, target_name, Stage.CALLED,
-                    notes=f"Post-call email {datetime.now().strftime('%Y-%m-%d')} | {offer}",
-                    stripe_link=stripe_link)
-    return success
+    # One per call — a second call with the same prospect gets its own follow-up
+    return queue_html(target_email, target_name, template["subject"], template["html"],
+                      f"touch_5:{uuid.uuid4().hex}",
+                      deal=dict(
+                          email=target_email, name=target_name, stage=Stage.CALLED, stripe_link=stripe_link,
+                          notes=f"Post-call email {datetime.now().strftime('%Y-%m-%d')} | {offer}"))
 
 
 def mark_closed_won(target_email: str, target_name: str, amount: str = "") -> bool:
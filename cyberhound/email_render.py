@@ -0,0 +1,190 @@
+"""
+Email Render — compile-once HTML email templates with inlined CSS
+=================================================================
+The touch_* templates used to rebuild the whole document (stylesheet
+included) by f-string for every recipient. A template is now compiled once:
+
+  • The <style> sheet is applied to each element as an inline `style`
+    attribute (what mail clients that strip <style> blocks actually render)
+    and then dropped; declarations are minified and inter-tag whitespace
+    collapsed
+  • The result is split into literal chunks and `{field}` slots, so rendering
+    is a single join of the per-recipient values
+
+The inliner understands the selectors our templates use: tag, .class,
+tag.class and descendant chains of those (`.risk-box p`). Later and more
+specific rules win; an element's own `style` attribute wins over both.
+
+Usage:
+    from cyberhound.email_render import compile_template
+
+    TOUCH = compile_template('<html><head><style>p { color: #333; }</style></head>'
+                             '<body><p>Bonjour {name},</p></body></html>')
+    TOUCH.fields                      # ('name',)
+    TOUCH.render(name="Acme")         # '<html><head></head><body><p style="color:#333">Bonjour Acme,</p></body></html>'
+"""
+
+import re
+from string import Formatter
+from typing import Dict, List, Tuple
+
+VOID_TAGS = frozenset({"area", "base", "br", "col", "hr", "img", "input", "link", "meta", "source", "wbr"})
+
+_STYLE_BLOCK = re.compile(r"<style[^>]*>(.*?)</style>", re.S | re.I)
+_TAG = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9]*)([^>]*?)(/?)>")
+_CLASS_ATTR = re.compile(r'\sclass="([^"]*)"')
+_STYLE_ATTR = re.compile(r'\sstyle="([^"]*)"')
+_SIMPLE = re.compile(r"^([a-zA-Z][a-zA-Z0-9]*)?((?:\.[\w-]+)*)$")
+
+# One compound selector: (tag or None, {classes})
+Compound = Tuple[str, frozenset]
+
+
+# ── CSS ─────────────────────────────────────────────────────────────────────
+
+def parse_declarations(css: str) -> Dict[str, str]:
+    """'color: #333;  margin:0' → {'color': '#333', 'margin': '0'} (whitespace normalized)."""
+    decls = {}
+    for item in css.split(";"):
+        prop, sep, value = item.partition(":")
+        if sep and prop.strip():
+            decls[prop.strip().lower()] = " ".join(value.split())
+    return decls
+
+
+def minify_declarations(decls: Dict[str, str]) -> str:
+    return ";".join(f"{prop}:{value}" for prop, value in decls.items())
+
+
+def parse_stylesheet(css: str) -> List[Tuple[Tuple[Compound, ...], Tuple[int, int], int, Dict[str, str]]]:
+    """Rules as (selector chain, specificity, source order, declarations); one entry per selector."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    rules = []
+    for order, (selectors, body) in enumerate(re.findall(r"([^{}]+)\{([^}]*)\}", css)):
+        decls = parse_declarations(body)
+        for selector in selectors.split(","):
+            chain = []
+            for part in selector.split():
+                m = _SIMPLE.match(part)
+                if m is None:
+                    raise ValueError(f"unsupported CSS selector: {selector.strip()!r}")
+                tag, classes = m.group(1), frozenset(filter(None, m.group(2).split(".")))
+                chain.append((tag.lower() if tag else None, classes))
+            if chain:
+                specificity = (sum(len(c) for _, c in chain), sum(1 for t, _ in chain if t))
+                rules.append((tuple(chain), specificity, order, decls))
+    return rules
+
+
+def _matches(compound: Compound, tag: str, classes: frozenset) -> bool:
+    want_tag, want_classes = compound
+    return (want_tag is None or want_tag == tag) and want_classes <= classes
+
+
+def _selects(chain: Tuple[Compound, ...], stack: List[Tuple[str, frozenset]]) -> bool:
+    """Does `chain` select the last element of `stack` (its ancestors before it)?"""
+    if not _matches(chain[-1], *stack[-1]):
+        return False
+    i = len(stack) - 2
+    for compound in reversed(chain[:-1]):
+        while i >= 0 and not _matches(compound, *stack[i]):
+            i -= 1
+        if i < 0:
+            return False
+        i -= 1
+    return True
+
+
+def inline_css(html: str) -> str:
+    """Move every <style> block's rules onto the matching elements and drop the blocks."""
+    rules = []
+    for css in _STYLE_BLOCK.findall(html):
+        rules.extend(parse_stylesheet(css))
+    html = _STYLE_BLOCK.sub("", html)
+    rules.sort(key=lambda rule: (rule[1], rule[2]))
+
+    stack: List[Tuple[str, frozenset]] = []
+    out, pos = [], 0
+    for m in _TAG.finditer(html):
+        closing, tag, attrs, self_closing = m.group(1), m.group(2).lower(), m.group(3), m.group(4)
+        if closing:
+            # Pop back to the matching open tag (tolerates unclosed children)
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i][0] == tag:
+                    del stack[i:]
+                    break
+            continue
+        class_attr = _CLASS_ATTR.search(attrs)
+        stack.append((tag, frozenset(class_attr.group(1).split()) if class_attr else frozenset()))
+        decls: Dict[str, str] = {}
+        for chain, _, _, rule_decls in rules:
+            if _selects(chain, stack):
+                decls.update(rule_decls)
+        if tag in VOID_TAGS or self_closing:
+            stack.pop()
+        style_attr = _STYLE_ATTR.search(attrs)
+        if style_attr:
+            decls.update(parse_declarations(style_attr.group(1)))
+            attrs = attrs[:style_attr.start()] + attrs[style_attr.end():]
+        if not decls:
+            continue
+        out.append(html[pos:m.start()])
+        out.append(f'<{tag}{attrs} style="{minify_declarations(decls)}"{self_closing}>')
+        pos = m.end()
+    out.append(html[pos:])
+    return "".join(out)
+
+
+def collapse_whitespace(html: str) -> str:
+    """Drop indentation between tags; runs of whitespace inside text become one space."""
+    return re.sub(r"\s+", " ", re.sub(r">\s+<", "><", html.strip()))
+
+
+# ── Templates ───────────────────────────────────────────────────────────────
+
+class CompiledTemplate:
+    """Literal chunks interleaved with `{field}` slots; render() is one join."""
+
+    __slots__ = ("_literals", "_slots", "fields")
+
+    def __init__(self, source: str):
+        literals, slots = [""], []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            literals[-1] += literal  # `{{` / `}}` split a literal without adding a slot
+            if field is None:
+                continue
+            if spec or conversion or not field.isidentifier():
+                raise ValueError(f"template fields must be plain names: {{{field}}}")
+            slots.append(field)
+            literals.append("")
+        self._literals = tuple(literals)
+        self._slots = tuple(slots)
+        self.fields = tuple(dict.fromkeys(slots))
+
+    def render(self, **values) -> str:
+        """Fill every slot; a missing field raises KeyError."""
+        literals = self._literals
+        out = [literals[0]]
+        for i, field in enumerate(self._slots, 1):
+            out.append(str(values[field]))
+            out.append(literals[i])
+        return "".join(out)
+
+
+def compile_template(html: str) -> CompiledTemplate:
+    """
+    Inline the stylesheet, minify, and pre-split `{field}` slots. The <style>
+    blocks are consumed before fields are parsed, so CSS braces need no
+    escaping; elsewhere a literal brace is written `{{` / `}}`.
+    """
+    return CompiledTemplate(collapse_whitespace(inline_css(html)))
+
+
+def compile_fragment(html: str, stylesheet: str, within: str = "") -> CompiledTemplate:
+    """
+    Compile a snippet that is substituted into a compiled document, styled as
+    if it sat inside `within` (the opening tags of its ancestors, e.g.
+    '<div class="risk-box">') in a document carrying `stylesheet` (a <style> block).
+    """
+    document = inline_css(f"{stylesheet}{within}\0{html}")
+    return CompiledTemplate(collapse_whitespace(document.split("\0", 1)[1]))
@@ -7,7 +7,15 @@ Touch 2: Day 3 Follow-up (value add)
 Touch 3: Day 7 Final Push (urgency + foot-in-door)
 Touch 4: Reply Auto-Response (warm + book call)
 Touch 5: Post-Call Follow-up (agreement + Stripe link)
+
+Each touch is compiled once at import (email_render): BASE_STYLE is inlined
+onto the elements and minified, so a send only substitutes the recipient's
+fields into the prebuilt chunks.
 """
+try:
+    from cyberhound.email_render import compile_fragment, compile_template
+except ImportError:
+    from email_render import compile_fragment, compile_template
 
 BASE_STYLE = """
 <style>
@@ -31,16 +39,23 @@ BASE_STYLE = """
 </style>
 """
 
-def touch_1_strike(name: str, risk_score: int, reply_email: str, phone: str,
-                   bill96_issues: list = None) -> dict:
-    """Initial cold outreach — compliance hook"""
-    issues_html = ""
-    if bill96_issues:
-        issues_html = "".join([f"<p>⚠️ {i}</p>" for i in bill96_issues])
-    else:
-        issues_html = "<p>⚠️ English-only digital presence detected</p><p>⚠️ No French language policy page found</p><p>⚠️ OQLF compliance gap: HIGH</p>"
+_DOC_OPEN = f"""<!DOCTYPE html><html><head><meta charset="UTF-8">{BASE_STYLE}</head><body>"""
+_DOC_CLOSE = "</body></html>"
+
+# One flagged issue inside Touch 1's risk box
+_ISSUE = compile_fragment("<p>⚠️ {issue}</p>", BASE_STYLE, '<div class="body"><div class="risk-box">')
+DEFAULT_BILL96_ISSUES = [
+    "English-only digital presence detected",
+    "No French language policy page found",
+    "OQLF compliance gap: HIGH",
+]
+
 
-    html = f"""<!DOCTYPE html><html><head><meta charset="UTF-8">{BASE_STYLE}</head><body>
+def _tel(phone: str) -> str:
+    return phone.replace(' ', '').replace('-', '')
+
+
+_TOUCH_1 = compile_template(_DOC_OPEN + """
 <div class="wrapper">
   <div class="header"><h1>NORTHERN <span>VENTURES</span></h1></div>
   <div class="body">
@@ -55,7 +70,7 @@ def touch_1_strike(name: str, risk_score: int, reply_email: str, phone: str,
     <p>We've prepared a full 5-page compliance audit specific to your firm. Reply to this email and I'll send it immediately — then we can schedule a 15-minute call to walk through it together.</p>
     <div style="text-align:center; padding: 8px 0;">
       <a href="mailto:{reply_email}?subject=Re: Bill 96 Audit Request — {name}" class="cta-primary">✉️ REPLY TO GET YOUR FREE AUDIT</a><br/>
-      <a href="tel:{phone.replace(' ','').replace('-','')}" class="cta-secondary">📞 Call Us: {phone}</a>
+      <a href="tel:{phone_tel}" class="cta-secondary">📞 Call Us: {phone}</a>
     </div>
     <hr class="divider"/>
     <p style="font-size:13px; color:#666;">We also offer an autonomous AI solution that generates Bill 96-compliant Quebec French creative at 100x the speed of a traditional agency — at 90% lower cost. But compliance first.</p>
@@ -64,7 +79,16 @@ def touch_1_strike(name: str, risk_score: int, reply_email: str, phone: str,
     <p><strong>Bee — Northern Ventures Intelligence Division</strong></p>
     <p>This report was generated by our Cyber-Hound scanning system and is confidential to your organization.</p>
   </div>
-</div></body></html>"""
+</div>""" + _DOC_CLOSE)
+
+
+def touch_1_strike(name: str, risk_score: int, reply_email: str, phone: str,
+                   bill96_issues: list = None) -> dict:
+    """Initial cold outreach — compliance hook"""
+    issues_html = "".join([_ISSUE.render(issue=i) for i in bill96_issues or DEFAULT_BILL96_ISSUES])
+
+    html = _TOUCH_1.render(name=name, risk_score=risk_score, issues_html=issues_html,
+                           reply_email=reply_email, phone=phone, phone_tel=_tel(phone))
 
     return {
         "subject": f"⚠️ Bill 96 Risk Alert: {name} — {risk_score}/10 Exposure Score",
@@ -73,9 +97,7 @@ def touch_1_strike(name: str, risk_score: int, reply_email: str, phone: str,
     }
 
 
-def touch_2_followup(name: str, reply_email: str, phone: str) -> dict:
-    """Day 3 follow-up — value add, no pressure"""
-    html = f"""<!DOCTYPE html><html><head><meta charset="UTF-8">{BASE_STYLE}</head><body>
+_TOUCH_2 = compile_template(_DOC_OPEN + """
 <div class="wrapper">
   <div class="header"><h1>NORTHERN <span>VENTURES</span></h1></div>
   <div class="body">
@@ -92,13 +114,18 @@ def touch_2_followup(name: str, reply_email: str, phone: str) -> dict:
     <p>Just hit reply — I'll send the full audit PDF and we can find 15 minutes that work for you.</p>
     <div style="text-align:center; padding: 8px 0;">
       <a href="mailto:{reply_email}?subject=Re: Bill 96 Follow-Up — {name}" class="cta-primary">✉️ REPLY TO REQUEST THE FULL AUDIT</a><br/>
-      <a href="tel:{phone.replace(' ','').replace('-','')}" class="cta-secondary">📞 {phone}</a>
+      <a href="tel:{phone_tel}" class="cta-secondary">📞 {phone}</a>
     </div>
   </div>
   <div class="footer">
     <p><strong>Bee — Northern Ventures Intelligence Division</strong></p>
   </div>
-</div></body></html>"""
+</div>""" + _DOC_CLOSE)
+
+
+def touch_2_followup(name: str, reply_email: str, phone: str) -> dict:
+    """Day 3 follow-up — value add, no pressure"""
+    html = _TOUCH_2.render(name=name, reply_email=reply_email, phone=phone, phone_tel=_tel(phone))
 
     return {
         "subject": f"Re: Bill 96 Alert — One thing worth seeing, {name}",
@@ -107,11 +134,7 @@ def touch_2_followup(name: str, reply_email: str, phone: str) -> dict:
     }
 
 
-def touch_3_final(name: str, reply_email: str, phone: str,
-                  audit_price: str = "$750 CAD") -> dict:
-    """Day 7 final push — foot-in-door offer"""
-    retainer_price = audit_price.replace("750", "3,500")
-    html = f"""<!DOCTYPE html><html><head><meta charset="UTF-8">{BASE_STYLE}</head><body>
+_TOUCH_3 = compile_template(_DOC_OPEN + """
 <div class="wrapper">
   <div class="header"><h1>NORTHERN <span>VENTURES</span></h1></div>
   <div class="body">
@@ -139,7 +162,15 @@ def touch_3_final(name: str, reply_email: str, phone: str,
     <p><strong>Bee — Northern Ventures Intelligence Division</strong></p>
     <p>Northern Ventures | Montreal, Quebec | {phone}</p>
   </div>
-</div></body></html>"""
+</div>""" + _DOC_CLOSE)
+
+
+def touch_3_final(name: str, reply_email: str, phone: str,
+                  audit_price: str = "$750 CAD") -> dict:
+    """Day 7 final push — foot-in-door offer"""
+    retainer_price = audit_price.replace("750", "3,500")
+    html = _TOUCH_3.render(name=name, reply_email=reply_email, phone=phone,
+                           audit_price=audit_price, retainer_price=retainer_price)
 
     return {
         "subject": f"Last message: Option A or B — your call, {name}",
@@ -148,9 +179,7 @@ def touch_3_final(name: str, reply_email: str, phone: str,
     }
 
 
-def touch_4_reply_autoresponse(name: str, reply_email: str, phone: str) -> dict:
-    """Auto-response when watchdog detects a reply — fires within 5 minutes"""
-    html = f"""<!DOCTYPE html><html><head><meta charset="UTF-8">{BASE_STYLE}</head><body>
+_TOUCH_4 = compile_template(_DOC_OPEN + """
 <div class="wrapper">
   <div class="header"><h1>NORTHERN <span>VENTURES</span></h1></div>
   <div class="body">
@@ -159,7 +188,7 @@ def touch_4_reply_autoresponse(name: str, reply_email: str, phone: str) -> dict:
     <p>Got your reply — thank you. I'll be back in touch personally within the hour.</p>
     <p>If you'd like to move faster, call me directly and we can sort everything in 15 minutes:</p>
     <div style="text-align:center; padding: 8px 0;">
-      <a href="tel:{phone.replace(' ','').replace('-','')}" class="cta-primary">📞 CALL NOW: {phone}</a><br/>
+      <a href="tel:{phone_tel}" class="cta-primary">📞 CALL NOW: {phone}</a><br/>
       <a href="mailto:{reply_email}" class="cta-secondary">✉️ Or keep the conversation by email</a>
     </div>
     <p>The call covers:</p>
@@ -173,7 +202,12 @@ def touch_4_reply_autoresponse(name: str, reply_email: str, phone: str) -> dict:
   <div class="footer">
     <p><strong>Bee — Northern Ventures Intelligence Division</strong></p>
   </div>
-</div></body></html>"""
+</div>""" + _DOC_CLOSE)
+
+
+def touch_4_reply_autoresponse(name: str, reply_email: str, phone: str) -> dict:
+    """Auto-response when watchdog detects a reply — fires within 5 minutes"""
+    html = _TOUCH_4.render(name=name, reply_email=reply_email, phone=phone, phone_tel=_tel(phone))
 
     return {
         "subject": f"Re: Got your message — call me directly, {name}",
@@ -182,9 +216,7 @@ def touch_4_reply_autoresponse(name: str, reply_email: str, phone: str) -> dict:
     }
 
 
-def touch_5_post_call(name: str, offer: str, stripe_link: str, reply_email: str) -> dict:
-    """Post-call follow-up — agreement + Stripe payment link"""
-    html = f"""<!DOCTYPE html><html><head><meta charset="UTF-8">{BASE_STYLE}</head><body>
+_TOUCH_5 = compile_template(_DOC_OPEN + """
 <div class="wrapper">
   <div class="header"><h1>NORTHERN <span>VENTURES</span></h1></div>
   <div class="body">
@@ -208,7 +240,12 @@ def touch_5_post_call(name: str, offer: str, stripe_link: str, reply_email: str)
     <p><strong>Bee — Northern Ventures Intelligence Division</strong></p>
     <p>Northern Ventures | Montreal, Quebec | <a href="mailto:{reply_email}" style="color:#999;">{reply_email}</a></p>
   </div>
-</div></body></html>"""
+</div>""" + _DOC_CLOSE)
+
+
+def touch_5_post_call(name: str, offer: str, stripe_link: str, reply_email: str) -> dict:
+    """Post-call follow-up — agreement + Stripe payment link"""
+    html = _TOUCH_5.render(name=name, offer=offer, stripe_link=stripe_link, reply_email=reply_email)
 
     return {
         "subject": f"Your Northern Ventures Package — Payment Link Inside, {name}",
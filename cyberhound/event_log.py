@@ -0,0 +1,357 @@
+"""
+Event Log — append-only JSONL segments with rotation and compaction
+===================================================================
+Replaces the "load the whole JSON list, append one entry, rewrite the file"
+pattern used for OUTCOMES_LOG.json (autonomy_engine_v2.log_outcome) and
+Empire_Comms.log (EmpireWatchdog / EmpireWatchdogV2), whose cost grew with
+every event the daemon had ever seen. An append is now one write() to the
+active segment, however long the process has been running.
+
+Layout — one directory per log under EVENT_LOG_DIR:
+    .event_logs/outcomes/000001-1760000000.jsonl      closed segment
+    .event_logs/outcomes/000002-1760086400.jsonl      active segment
+    .event_logs/outcomes/000001-1760000000.jsonl.gz   compacted archive
+
+  • Rotation    — a new segment once the active one passes EVENT_LOG_SEGMENT_MB
+                  or EVENT_LOG_SEGMENT_HOURS (start time is in the file name)
+  • fsync       — "always" (every append), "interval" (at most once per
+                  EVENT_LOG_FSYNC_SEC, plus on rotate/exit) or "never"
+  • Compaction  — a background thread gzips closed segments into archives of up
+                  to EVENT_LOG_ARCHIVE_MB and drops files older than
+                  EVENT_LOG_RETENTION_DAYS (0 keeps everything)
+  • Readers     — read() streams events oldest-first across archives and
+                  segments; tail(n) keeps only the last n in memory
+
+Writers in several processes can share a log: appends are single O_APPEND
+writes, a writer follows the newest segment when another process rotates,
+and compaction only touches segments idle for EVENT_LOG_COMPACT_AFTER_SEC.
+
+On first use a legacy JSON list (OUTCOMES_LOG.json, Empire_Comms.log) is
+imported once; the old file is left in place as a backup.
+
+Env vars:
+  EVENT_LOG_DIR               — default: .event_logs
+  EVENT_LOG_FSYNC             — always / interval / never (default: interval)
+  EVENT_LOG_FSYNC_SEC         — default 1
+  EVENT_LOG_SEGMENT_MB        — default 8
+  EVENT_LOG_SEGMENT_HOURS     — default 24
+  EVENT_LOG_ARCHIVE_MB        — default 64 (uncompressed bytes per archive)
+  EVENT_LOG_RETENTION_DAYS    — default 0 (keep forever)
+  EVENT_LOG_COMPACT_AFTER_SEC — default 3600
+  EVENT_LOG_COMPACT_INTERVAL  — seconds between background compactions (default 3600)
+
+Usage:
+    from cyberhound.event_log import get_log
+
+    get_log("outcomes").append({"lead_id": "lead_1", "outcome": "won"})
+    for event in get_log("outcomes").read():
+        ...
+
+CLI:
+    python -m cyberhound.event_log stats
+    python -m cyberhound.event_log tail comms [20]
+    python -m cyberhound.event_log compact [outcomes]
+"""
+
+import atexit
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+EVENT_LOG_DIR = os.getenv("EVENT_LOG_DIR", ".event_logs")
+FSYNC_POLICY = os.getenv("EVENT_LOG_FSYNC", "interval").lower()
+FSYNC_SEC = float(os.getenv("EVENT_LOG_FSYNC_SEC", 1))
+SEGMENT_BYTES = int(float(os.getenv("EVENT_LOG_SEGMENT_MB", 8)) * 1024 * 1024)
+SEGMENT_SEC = float(os.getenv("EVENT_LOG_SEGMENT_HOURS", 24)) * 3600
+ARCHIVE_BYTES = int(float(os.getenv("EVENT_LOG_ARCHIVE_MB", 64)) * 1024 * 1024)
+RETENTION_SEC = float(os.getenv("EVENT_LOG_RETENTION_DAYS", 0)) * 86400
+COMPACT_AFTER_SEC = float(os.getenv("EVENT_LOG_COMPACT_AFTER_SEC", 3600))
+COMPACT_INTERVAL = float(os.getenv("EVENT_LOG_COMPACT_INTERVAL", 3600))
+
+# Legacy whole-file JSON lists imported on first use
+LEGACY_FILES = {
+    "outcomes": "OUTCOMES_LOG.json",
+    "comms": "Empire_Comms.log",
+}
+
+SEGMENT_RE = re.compile(r"^(\d{6,})-(\d+)\.jsonl(\.gz)?$")
+FOLLOW_CHECK_SEC = 5     # how often a writer looks for a newer segment from another process
+LOCK_STALE_SEC = 600     # an import/compaction lock older than this is assumed abandoned
+
+
+def _segments(directory: str) -> List[Tuple[int, int, bool, str]]:
+    """(seq, start_ts, is_archive, path) for every segment/archive, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    found = []
+    for name in os.listdir(directory):
+        m = SEGMENT_RE.match(name)
+        if m:
+            found.append((int(m.group(1)), int(m.group(2)), bool(m.group(3)),
+                          os.path.join(directory, name)))
+    return sorted(found)
+
+
+def _open_text(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+class EventLog:
+    """One append-only log (a directory of JSONL segments)."""
+
+    def __init__(self, name: str, root: str = EVENT_LOG_DIR, legacy_file: Optional[str] = None):
+        self.name = name
+        self.dir = os.path.join(root, name)
+        self._lock = threading.RLock()
+        self._fd: Optional[int] = None
+        self._seq = 0
+        self._started = 0
+        self._path = ""
+        self._last_fsync = 0.0
+        self._dirty = False
+        self._last_follow = 0.0
+        os.makedirs(self.dir, exist_ok=True)
+        if legacy_file and not _segments(self.dir) and os.path.exists(legacy_file):
+            lock = self._acquire_lock()
+            if lock:  # another process holding it is already importing
+                try:
+                    if not _segments(self.dir):
+                        self._import_legacy(legacy_file)
+                finally:
+                    os.remove(lock)
+
+    # ── Writing ─────────────────────────────────────────────────────────────
+
+    def _open_segment(self, seq: int, started: int):
+        self._close_fd()
+        self._seq, self._started = seq, started
+        self._path = os.path.join(self.dir, f"{seq:06d}-{started}.jsonl")
+        self._fd = os.open(self._path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._last_follow = time.time()
+
+    def _close_fd(self):
+        if self._fd is not None:
+            if self._dirty and FSYNC_POLICY != "never":
+                os.fsync(self._fd)
+            os.close(self._fd)
+            self._fd = None
+            self._dirty = False
+
+    def _ensure_segment(self, now: float):
+        """Open, follow or rotate the active segment before an append."""
+        if self._fd is None or now - self._last_follow >= FOLLOW_CHECK_SEC:
+            newest = next((s for s in reversed(_segments(self.dir)) if not s[2]), None)
+            if newest and (self._fd is None or newest[0] > self._seq):
+                self._open_segment(newest[0], newest[1])
+            elif self._fd is None:
+                self._open_segment(1, int(now))
+            self._last_follow = now
+        if os.fstat(self._fd).st_size >= SEGMENT_BYTES or now - self._started >= SEGMENT_SEC:
+            self._open_segment(self._seq + 1, int(now))
+
+    def append(self, event: Dict[str, Any]):
+        """Append one event (a JSON-serialisable dict) as a single line."""
+        line = (json.dumps(event, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            now = time.time()
+            self._ensure_segment(now)
+            os.write(self._fd, line)
+            self._dirty = True
+            if FSYNC_POLICY == "always" or (
+                    FSYNC_POLICY == "interval" and now - self._last_fsync >= FSYNC_SEC):
+                os.fsync(self._fd)
+                self._last_fsync = now
+                self._dirty = False
+
+    def rotate(self):
+        """Close the active segment and start a new one."""
+        with self._lock:
+            self._ensure_segment(time.time())
+            self._open_segment(self._seq + 1, int(time.time()))
+
+    def close(self):
+        with self._lock:
+            self._close_fd()
+
+    def _import_legacy(self, legacy_file: str):
+        try:
+            with open(legacy_file) as f:
+                events = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[event_log] ⚠️  could not read {legacy_file}: {e}")
+            return
+        events = events if isinstance(events, list) else []
+        with self._lock:
+            for event in events:
+                self.append(event)
+            self.close()
+        print(f"[event_log] 📦 imported {len(events)} events from {legacy_file} → {self.dir}")
+
+    # ── Reading ─────────────────────────────────────────────────────────────
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        """Stream every event, oldest first. Torn or malformed lines are skipped."""
+        for _, _, _, path in _segments(self.dir):
+            try:
+                with _open_text(path) as f:
+                    for line in f:
+                        if not line.endswith("\n"):
+                            break  # partial write still in flight
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            continue
+            except (FileNotFoundError, EOFError, OSError):
+                continue  # compacted away (or truncated archive) while iterating
+
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        return list(deque(self.read(), maxlen=n))
+
+    def count(self) -> int:
+        return sum(1 for _ in self.read())
+
+    # ── Compaction ──────────────────────────────────────────────────────────
+
+    def _acquire_lock(self) -> Optional[str]:
+        lock = os.path.join(self.dir, ".lock")
+        try:
+            if time.time() - os.path.getmtime(lock) > LOCK_STALE_SEC:
+                os.remove(lock)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return lock
+        except FileExistsError:
+            return None
+
+    def compact(self) -> Dict[str, int]:
+        """Gzip idle closed segments into archives and apply retention."""
+        result = {"archived": 0, "archives": 0, "expired": 0}
+        lock = self._acquire_lock()
+        if not lock:
+            return result
+        try:
+            now = time.time()
+            segments = _segments(self.dir)
+            newest_seq = max((s[0] for s in segments if not s[2]), default=0)
+
+            if RETENTION_SEC:
+                for seg in segments[:-1]:
+                    if now - os.path.getmtime(seg[3]) > RETENTION_SEC:
+                        os.remove(seg[3])
+                        result["expired"] += 1
+                segments = _segments(self.dir)
+
+            idle = [s for s in segments
+                    if not s[2] and s[0] < newest_seq and s[0] != self._seq
+                    and now - os.path.getmtime(s[3]) >= COMPACT_AFTER_SEC]
+            batch: List[Tuple[int, int, bool, str]] = []
+            size = 0
+            for seg in idle + [None]:
+                seg_size = os.path.getsize(seg[3]) if seg else 0
+                if batch and (seg is None or size + seg_size > ARCHIVE_BYTES):
+                    self._archive(batch)
+                    result["archived"] += len(batch)
+                    result["archives"] += 1
+                    batch, size = [], 0
+                if seg:
+                    batch.append(seg)
+                    size += seg_size
+        finally:
+            os.remove(lock)
+        return result
+
+    def _archive(self, batch: List[Tuple[int, int, bool, str]]):
+        seq, started = batch[0][0], batch[0][1]
+        final = os.path.join(self.dir, f"{seq:06d}-{started}.jsonl.gz")
+        tmp = final + ".tmp"
+        with gzip.open(tmp, "wb") as out:
+            for _, _, _, path in batch:
+                with open(path, "rb") as f:
+                    for line in f:
+                        if line.endswith(b"\n"):
+                            out.write(line)
+        os.replace(tmp, final)
+        for _, _, _, path in batch:
+            os.remove(path)
+
+    def stats(self) -> Dict[str, Any]:
+        segments = _segments(self.dir)
+        return {
+            "dir": self.dir,
+            "segments": sum(1 for s in segments if not s[2]),
+            "archives": sum(1 for s in segments if s[2]),
+            "bytes": sum(os.path.getsize(s[3]) for s in segments),
+            "active": os.path.basename(self._path) if self._path else None,
+        }
+
+
+# ── Registry + background compactor ─────────────────────────────────────────
+
+_logs: Dict[str, EventLog] = {}
+_logs_lock = threading.Lock()
+_compactor: Optional[threading.Thread] = None
+
+
+def get_log(name: str) -> EventLog:
+    """Process-wide EventLog for `name` (imports its legacy file on first use)."""
+    log = _logs.get(name)
+    if log is None:
+        with _logs_lock:
+            log = _logs.get(name)
+            if log is None:
+                log = _logs[name] = EventLog(name, legacy_file=LEGACY_FILES.get(name))
+                _start_compactor()
+    return log
+
+
+def compact_all() -> Dict[str, Dict[str, int]]:
+    return {name: log.compact() for name, log in list(_logs.items())}
+
+
+def _compact_loop():
+    while True:
+        time.sleep(COMPACT_INTERVAL)
+        try:
+            compact_all()
+        except Exception as e:
+            print(f"[event_log] ⚠️  compaction failed: {e}")
+
+
+def _start_compactor():
+    global _compactor
+    if _compactor is None and COMPACT_INTERVAL > 0:
+        _compactor = threading.Thread(target=_compact_loop, name="event-log-compactor", daemon=True)
+        _compactor.start()
+
+
+@atexit.register
+def _close_all():
+    for log in list(_logs.values()):
+        log.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    names = sys.argv[2:3]
+    if not names:
+        existing = os.listdir(EVENT_LOG_DIR) if os.path.isdir(EVENT_LOG_DIR) else []
+        names = sorted(set(existing) | set(LEGACY_FILES))
+    if cmd == "tail":
+        for event in get_log(names[0]).tail(int(sys.argv[3]) if len(sys.argv) > 3 else 20):
+            print(json.dumps(event, ensure_ascii=False))
+    elif cmd == "compact":
+        print(json.dumps({name: get_log(name).compact() for name in names}, indent=2))
+    else:
+        print(json.dumps({name: {**get_log(name).stats(), "events": get_log(name).count()}
+                          for name in names}, indent=2))
@@ -9,15 +9,37 @@ Env vars:
   HERMES_API_KEY    — API key (falls back to DEEPSEEK_API_KEY)
   HERMES_MODEL      — Model name (default: deepseek-chat)
   HERMES_MAX_MODEL  — Heavy reasoning model (default: deepseek-reasoner)
+  HERMES_SCORE_BATCH_SIZE — Leads packed into one score_leads_batch prompt (default: 8)
+
+Every public method has an awaitable twin prefixed with "a" (achat,
+achat_json, ascore_lead, ...) for use inside the async autonomy engines.
+stream_chat / astream_chat yield the reply as it streams (SSE), and
+chat(..., stop_when=pred) stops the generation once pred(text) holds.
 """
 
+import asyncio
 import os
 import json
 import time
 import requests
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, AsyncIterator, Callable, Iterator, List, Set
 from dotenv import load_dotenv
 
+try:
+    from cyberhound.http_pool import post as _pooled_post, apost as _pooled_apost
+    from cyberhound.llm_cache import get_cache, make_key, ttl_for
+    from cyberhound.llm_json import (JSON_RETRIES, StructuredOutputError, adapt_request, correction_messages,
+                                     json_schema_format, loads_lenient, parse_structured)
+    from cyberhound.llm_stream import acollect, astream_completion, collect, stream_completion
+    from cyberhound.llm_telemetry import start as _telemetry_start
+except ImportError:  # imported flat via sys.path (autonomy_engine_v2, hermes_worker)
+    from http_pool import post as _pooled_post, apost as _pooled_apost
+    from llm_cache import get_cache, make_key, ttl_for
+    from llm_json import (JSON_RETRIES, StructuredOutputError, adapt_request, correction_messages,
+                          json_schema_format, loads_lenient, parse_structured)
+    from llm_stream import acollect, astream_completion, collect, stream_completion
+    from llm_telemetry import start as _telemetry_start
+
 load_dotenv(".env.local")
 load_dotenv(".env")
 
@@ -30,29 +52,29 @@ MAX_MODEL = os.getenv("HERMES_MAX_MODEL", "deepseek-reasoner")
 
 MAX_RETRIES = 3
 RETRY_DELAY = 2  # seconds
+SCORE_BATCH_SIZE = int(os.getenv("HERMES_SCORE_BATCH_SIZE", 8))  # Leads per score_leads_batch call
 
 
 # ── Core Client ──────────────────────────────────────────────────────────────
 
-def _call_api(
+def _prepare(
     messages: List[Dict[str, str]],
-    model: str = None,
-    temperature: float = 0.7,
-    max_tokens: int = 2048,
-    response_format: Optional[Dict] = None,
-) -> Dict[str, Any]:
-    """Low-level API call with retry logic."""
+    model: Optional[str],
+    temperature: float,
+    max_tokens: int,
+    response_format: Optional[Dict],
+):
     if not API_KEY:
         raise RuntimeError(
             "HERMES_API_KEY or DEEPSEEK_API_KEY not set. "
             "Add to .env: HERMES_API_KEY=sk-..."
         )
 
-    model = model or STANDARD_MODEL
     endpoint = f"{BASE_URL.rstrip('/')}/chat/completions"
+    messages, response_format = adapt_request("hermes", messages, response_format)
 
     payload: Dict[str, Any] = {
-        "model": model,
+        "model": model or STANDARD_MODEL,
         "messages": messages,
         "temperature": temperature,
         "max_tokens": max_tokens,
@@ -65,18 +87,40 @@ def _call_api(
         "Authorization": f"Bearer {API_KEY}",
         "Content-Type": "application/json",
     }
+    return endpoint, headers, payload
 
+
+def _cacheable(result: Dict[str, Any], response_format: Optional[Dict]) -> bool:
+    """Only cache complete answers — never an empty or unparseable JSON reply."""
+    try:
+        content = result["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return False
+    if not content:
+        return False
+    if response_format:
+        try:
+            loads_lenient(content)
+        except ValueError:
+            return False
+    return True
+
+
+def _post_with_retries(endpoint: str, headers: Dict[str, str], payload: Dict[str, Any],
+                       rec=None) -> Dict[str, Any]:
     last_error = None
     for attempt in range(MAX_RETRIES):
         try:
-            response = requests.post(
-                endpoint, headers=headers, json=payload, timeout=60
+            response = _pooled_post(
+                "hermes", endpoint, headers=headers, json=payload, timeout=60
             )
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             last_error = e
             if attempt < MAX_RETRIES - 1:
+                if rec:
+                    rec.retry()
                 wait = RETRY_DELAY * (2**attempt)
                 print(f"  ⚠️  API call failed (attempt {attempt+1}/{MAX_RETRIES}), "
                       f"retrying in {wait}s...")
@@ -85,6 +129,179 @@ def _call_api(
     raise RuntimeError(f"Hermes API call failed after {MAX_RETRIES} attempts: {last_error}")
 
 
+async def _apost_with_retries(endpoint: str, headers: Dict[str, str], payload: Dict[str, Any],
+                              rec=None) -> Dict[str, Any]:
+    import httpx
+
+    last_error = None
+    for attempt in range(MAX_RETRIES):
+        try:
+            response = await _pooled_apost(
+                "hermes", endpoint, headers=headers, json=payload, timeout=60
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            last_error = e
+            if attempt < MAX_RETRIES - 1:
+                if rec:
+                    rec.retry()
+                wait = RETRY_DELAY * (2**attempt)
+                print(f"  ⚠️  API call failed (attempt {attempt+1}/{MAX_RETRIES}), "
+                      f"retrying in {wait}s...")
+                await asyncio.sleep(wait)
+
+    raise RuntimeError(f"Hermes API call failed after {MAX_RETRIES} attempts: {last_error}")
+
+
+def _streamed_result(payload: Dict[str, Any], text: str, aborted: bool,
+                     usage: Dict[str, Any]) -> Dict[str, Any]:
+    # Same shape as a non-streamed response so callers and the cache don't care
+    return {
+        "model": payload["model"],
+        "choices": [{"message": {"content": text}, "finish_reason": "abort" if aborted else "stop"}],
+        "usage": usage,
+    }
+
+
+def _stream_with_retries(endpoint: str, headers: Dict[str, str], payload: Dict[str, Any],
+                         stop_when: Callable[[str], bool], rec=None) -> Dict[str, Any]:
+    last_error = None
+    for attempt in range(MAX_RETRIES):
+        usage: Dict[str, Any] = {}
+        try:
+            text, aborted = collect(
+                stream_completion("hermes", endpoint, headers, payload, timeout=60, usage_out=usage),
+                stop_when,
+            )
+            return _streamed_result(payload, text, aborted, usage)
+        except requests.exceptions.RequestException as e:
+            last_error = e
+            if attempt < MAX_RETRIES - 1:
+                if rec:
+                    rec.retry()
+                wait = RETRY_DELAY * (2**attempt)
+                print(f"  ⚠️  API stream failed (attempt {attempt+1}/{MAX_RETRIES}), "
+                      f"retrying in {wait}s...")
+                time.sleep(wait)
+
+    raise RuntimeError(f"Hermes API call failed after {MAX_RETRIES} attempts: {last_error}")
+
+
+async def _astream_with_retries(endpoint: str, headers: Dict[str, str], payload: Dict[str, Any],
+                                stop_when: Callable[[str], bool], rec=None) -> Dict[str, Any]:
+    import httpx
+
+    last_error = None
+    for attempt in range(MAX_RETRIES):
+        usage: Dict[str, Any] = {}
+        try:
+            text, aborted = await acollect(
+                astream_completion("hermes", endpoint, headers, payload, timeout=60, usage_out=usage),
+                stop_when,
+            )
+            return _streamed_result(payload, text, aborted, usage)
+        except httpx.HTTPError as e:
+            last_error = e
+            if attempt < MAX_RETRIES - 1:
+                if rec:
+                    rec.retry()
+                wait = RETRY_DELAY * (2**attempt)
+                print(f"  ⚠️  API stream failed (attempt {attempt+1}/{MAX_RETRIES}), "
+                      f"retrying in {wait}s...")
+                await asyncio.sleep(wait)
+
+    raise RuntimeError(f"Hermes API call failed after {MAX_RETRIES} attempts: {last_error}")
+
+
+def _call_api(
+    messages: List[Dict[str, str]],
+    model: str = None,
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+    response_format: Optional[Dict] = None,
+    task: Optional[str] = None,
+    stop_when: Optional[Callable[[str], bool]] = None,
+) -> Dict[str, Any]:
+    """
+    Low-level API call with retry logic.
+    When `task` has a cache TTL (see llm_cache.TASK_TTLS) identical requests
+    are answered from the response cache. With `stop_when` the reply is
+    streamed and cut off as soon as stop_when(text) is true. Every call is
+    recorded in llm_telemetry under `task`.
+    """
+    endpoint, headers, payload = _prepare(
+        messages, model, temperature, max_tokens, response_format
+    )
+    rec = _telemetry_start(task)
+
+    def _fetch():
+        try:
+            if stop_when:
+                result = _stream_with_retries(endpoint, headers, payload, stop_when, rec)
+            else:
+                result = _post_with_retries(endpoint, headers, payload, rec)
+        except Exception as e:
+            rec.fail(e)
+            raise
+        rec.finish("hermes", result.get("model") or payload["model"], result.get("usage"))
+        return result
+
+    ttl = ttl_for(task)
+    if not ttl:
+        return _fetch()
+
+    key = make_key(payload["model"], messages, temperature, response_format)
+    result = get_cache().get_or_call(
+        key, ttl,
+        _fetch,
+        cacheable=lambda r: _cacheable(r, response_format),
+    )
+    rec.finish("cache", payload["model"], cached=True)  # no-op after a real fetch
+    return result
+
+
+async def _acall_api(
+    messages: List[Dict[str, str]],
+    model: str = None,
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+    response_format: Optional[Dict] = None,
+    task: Optional[str] = None,
+    stop_when: Optional[Callable[[str], bool]] = None,
+) -> Dict[str, Any]:
+    """Awaitable _call_api() on the shared httpx pool."""
+    endpoint, headers, payload = _prepare(
+        messages, model, temperature, max_tokens, response_format
+    )
+    rec = _telemetry_start(task)
+
+    async def _fetch():
+        try:
+            if stop_when:
+                result = await _astream_with_retries(endpoint, headers, payload, stop_when, rec)
+            else:
+                result = await _apost_with_retries(endpoint, headers, payload, rec)
+        except Exception as e:
+            rec.fail(e)
+            raise
+        rec.finish("hermes", result.get("model") or payload["model"], result.get("usage"))
+        return result
+
+    ttl = ttl_for(task)
+    if not ttl:
+        return await _fetch()
+
+    key = make_key(payload["model"], messages, temperature, response_format)
+    result = await get_cache().aget_or_call(
+        key, ttl,
+        _fetch,
+        cacheable=lambda r: _cacheable(r, response_format),
+    )
+    rec.finish("cache", payload["model"], cached=True)
+    return result
+
+
 # ── High-Level Methods ───────────────────────────────────────────────────────
 
 def chat(
@@ -93,6 +310,8 @@ def chat(
     model: str = None,
     temperature: float = 0.7,
     max_tokens: int = 2048,
+    task: Optional[str] = None,
+    stop_when: Optional[Callable[[str], bool]] = None,
 ) -> str:
     """Simple chat completion. Returns text response."""
     result = _call_api(
@@ -103,6 +322,8 @@ def chat(
         model=model,
         temperature=temperature,
         max_tokens=max_tokens,
+        task=task,
+        stop_when=stop_when,
     )
     return result["choices"][0]["message"]["content"]
 
@@ -113,9 +334,45 @@ def chat_json(
     model: str = None,
     temperature: float = 0.3,
     max_tokens: int = 2048,
+    task: Optional[str] = None,
+    schema: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
-    """Chat completion that returns parsed JSON."""
-    result = _call_api(
+    """
+    Chat completion that returns parsed JSON (validated against `schema` if given).
+
+    Fenced or truncated replies are repaired locally; one corrective retry
+    is made only when that fails (see llm_json).
+    """
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": prompt},
+    ]
+    response_format = json_schema_format(schema) if schema else {"type": "json_object"}
+    content = _call_api(messages=messages, model=model, temperature=temperature, max_tokens=max_tokens,
+                        task=task, response_format=response_format)["choices"][0]["message"]["content"]
+    for attempt in range(JSON_RETRIES + 1):
+        try:
+            return parse_structured(content, schema)
+        except StructuredOutputError as e:
+            if attempt == JSON_RETRIES:
+                raise
+            print(f"[Hermes] Unrepairable JSON ({e}) — asking for a correction")
+            content = _call_api(messages=correction_messages(messages, content or "", e), model=model,
+                                temperature=0.0, max_tokens=max_tokens, task=task,
+                                response_format=response_format)["choices"][0]["message"]["content"]
+
+
+async def achat(
+    prompt: str,
+    system: str = "You are a helpful AI assistant.",
+    model: str = None,
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+    task: Optional[str] = None,
+    stop_when: Optional[Callable[[str], bool]] = None,
+) -> str:
+    """Awaitable chat()."""
+    result = await _acall_api(
         messages=[
             {"role": "system", "content": system},
             {"role": "user", "content": prompt},
@@ -123,10 +380,72 @@ def chat_json(
         model=model,
         temperature=temperature,
         max_tokens=max_tokens,
-        response_format={"type": "json_object"},
+        task=task,
+        stop_when=stop_when,
     )
+    return result["choices"][0]["message"]["content"]
+
+
+async def achat_json(
+    prompt: str,
+    system: str = "You are a helpful AI assistant. Always respond with valid JSON.",
+    model: str = None,
+    temperature: float = 0.3,
+    max_tokens: int = 2048,
+    task: Optional[str] = None,
+    schema: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Awaitable chat_json()."""
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": prompt},
+    ]
+    response_format = json_schema_format(schema) if schema else {"type": "json_object"}
+    result = await _acall_api(messages=messages, model=model, temperature=temperature, max_tokens=max_tokens,
+                              task=task, response_format=response_format)
     content = result["choices"][0]["message"]["content"]
-    return json.loads(content)
+    for attempt in range(JSON_RETRIES + 1):
+        try:
+            return parse_structured(content, schema)
+        except StructuredOutputError as e:
+            if attempt == JSON_RETRIES:
+                raise
+            print(f"[Hermes] Unrepairable JSON ({e}) — asking for a correction")
+            result = await _acall_api(messages=correction_messages(messages, content or "", e), model=model,
+                                      temperature=0.0, max_tokens=max_tokens, task=task,
+                                      response_format=response_format)
+            content = result["choices"][0]["message"]["content"]
+
+
+def stream_chat(
+    prompt: str,
+    system: str = "You are a helpful AI assistant.",
+    model: str = None,
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+) -> Iterator[str]:
+    """Yield the reply as it streams in. Break out of the loop to abort the generation."""
+    endpoint, headers, payload = _prepare(
+        [{"role": "system", "content": system}, {"role": "user", "content": prompt}],
+        model, temperature, max_tokens, None,
+    )
+    yield from stream_completion("hermes", endpoint, headers, payload, timeout=60)
+
+
+async def astream_chat(
+    prompt: str,
+    system: str = "You are a helpful AI assistant.",
+    model: str = None,
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+) -> AsyncIterator[str]:
+    """Async twin of stream_chat()."""
+    endpoint, headers, payload = _prepare(
+        [{"role": "system", "content": system}, {"role": "user", "content": prompt}],
+        model, temperature, max_tokens, None,
+    )
+    async for delta in astream_completion("hermes", endpoint, headers, payload, timeout=60):
+        yield delta
 
 
 def deep_reason(
@@ -141,19 +460,32 @@ def deep_reason(
         model=MAX_MODEL,
         temperature=0.3,
         max_tokens=max_tokens,
+        task="deep_reason",
+    )
+
+
+async def adeep_reason(
+    prompt: str,
+    system: str = "You are an expert analyst. Think deeply before responding.",
+    max_tokens: int = 4096,
+) -> str:
+    """Awaitable deep_reason()."""
+    return await achat(
+        prompt=prompt,
+        system=system,
+        model=MAX_MODEL,
+        temperature=0.3,
+        max_tokens=max_tokens,
+        task="deep_reason",
     )
 
 
 # ── Cyberhound-Specific Methods ──────────────────────────────────────────────
 
-def research_market(
+def _research_market_request(
     niche: str,
     market: str = "North America",
 ) -> Dict[str, Any]:
-    """
-    Deep market research for a niche in a target market.
-    Returns: score, demand_signals, competition_level, mrr_potential, price_point, reasoning
-    """
     prompt = f"""
     You are an autonomous market research agent. Deep-dive on the '{niche}' niche in '{market}'.
     Search the web, analyze competitor pricing, and evaluate market demand.
@@ -166,24 +498,40 @@ def research_market(
     - recommended_price_point (string)
     - reasoning (string): strategic analysis paragraph
     """
-    return chat_json(
+    return dict(
         prompt=prompt,
         system="You are an expert market analyst and research agent.",
         temperature=0.3,
         max_tokens=2048,
+        task="research_market",
     )
 
 
-def score_lead(
+def research_market(
+    niche: str,
+    market: str = "North America",
+) -> Dict[str, Any]:
+    """
+    Deep market research for a niche in a target market.
+    Returns: score, demand_signals, competition_level, mrr_potential, price_point, reasoning
+    """
+    return chat_json(**_research_market_request(niche, market))
+
+
+async def aresearch_market(
+    niche: str,
+    market: str = "North America",
+) -> Dict[str, Any]:
+    """Awaitable research_market()."""
+    return await achat_json(**_research_market_request(niche, market))
+
+
+def _score_lead_request(
     company_name: str,
     website: str = "",
     industry: str = "",
     signals: List[str] = None,
 ) -> Dict[str, Any]:
-    """
-    Score a lead for outreach priority.
-    Returns: icp_score, risk_level, recommended_tone, key_selling_points, reasoning
-    """
     signals_str = "\n".join(f"- {s}" for s in (signals or []))
     prompt = f"""
     Analyze this lead for outreach scoring:
@@ -201,15 +549,210 @@ def score_lead(
     - key_selling_points (list of strings): 3-5 points to emphasize
     - reasoning (string): brief strategic analysis
     """
-    return chat_json(
+    return dict(
         prompt=prompt,
         system="You are an expert B2B sales strategist and lead qualifier.",
         temperature=0.4,
         max_tokens=1500,
+        task="score_lead",
     )
 
 
-def generate_email(
+def score_lead(
+    company_name: str,
+    website: str = "",
+    industry: str = "",
+    signals: List[str] = None,
+) -> Dict[str, Any]:
+    """
+    Score a lead for outreach priority.
+    Returns: icp_score, risk_level, recommended_tone, key_selling_points, reasoning
+    """
+    return chat_json(**_score_lead_request(company_name, website, industry, signals))
+
+
+async def ascore_lead(
+    company_name: str,
+    website: str = "",
+    industry: str = "",
+    signals: List[str] = None,
+) -> Dict[str, Any]:
+    """Awaitable score_lead()."""
+    return await achat_json(**_score_lead_request(company_name, website, industry, signals))
+
+
+class _BatchError(ValueError):
+    """A batch reply was truncated or malformed — split the batch and retry."""
+
+
+def _lead_fields(lead: Dict[str, Any], index: int) -> Dict[str, Any]:
+    return {
+        "id": str(lead.get("id") or index),
+        "company": lead.get("company_name") or lead.get("name") or lead.get("company") or "Unknown",
+        "website": lead.get("website") or "N/A",
+        "industry": lead.get("industry") or "Unknown",
+        "signals": lead.get("signals") or [],
+    }
+
+
+def _score_leads_batch_request(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    prompt = f"""
+    Analyze each of these leads for outreach scoring. Each lead has an "id".
+
+    LEADS:
+    {json.dumps(items, ensure_ascii=False)}
+
+    Return valid JSON: an object with a single key "scores" mapping every lead id to:
+    - icp_score (integer 0-100): Ideal Customer Profile fit score
+    - risk_level ("low", "medium", or "high"): regulatory/compliance risk
+    - recommended_tone (string): suggested email tone (formal, casual, technical, consultative)
+    - key_selling_points (list of strings): 3-5 points to emphasize
+    - reasoning (string): one or two sentences
+
+    Score every lead, use the ids exactly as given, and keep reasoning brief.
+    """
+    return dict(
+        prompt=prompt,
+        system="You are an expert B2B sales strategist and lead qualifier.",
+        temperature=0.4,
+        max_tokens=min(8000, 300 + 350 * len(items)),
+        task="score_lead",
+    )
+
+
+def _parse_batch(result: Dict[str, Any], items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    choice = result["choices"][0]
+    if choice.get("finish_reason") == "length":
+        raise _BatchError(f"reply truncated at {len(items)} leads")
+    try:
+        data = loads_lenient(choice["message"]["content"])
+    except (TypeError, ValueError) as e:
+        raise _BatchError(f"malformed batch reply: {e}")
+    scores = data.get("scores", data) if isinstance(data, dict) else {}
+    return {
+        item["id"]: scores[item["id"]]
+        for item in items
+        if isinstance(scores.get(item["id"]), dict) and "icp_score" in scores[item["id"]]
+    }
+
+
+def _batch_messages(items: List[Dict[str, Any]]):
+    req = _score_leads_batch_request(items)
+    return dict(
+        messages=[
+            {"role": "system", "content": req["system"]},
+            {"role": "user", "content": req["prompt"]},
+        ],
+        temperature=req["temperature"],
+        max_tokens=req["max_tokens"],
+        response_format={"type": "json_object"},
+        task=req["task"],
+    )
+
+
+def _score_chunk(items: List[Dict[str, Any]], failed: Set[str]) -> Dict[str, Dict[str, Any]]:
+    if len(items) == 1:
+        item = items[0]
+        try:
+            return {item["id"]: score_lead(item["company"], item["website"], item["industry"], item["signals"])}
+        except ValueError as e:
+            print(f"  ⚠️  Could not score {item['company']}: {e}")
+            failed.add(item["id"])
+            return {}
+    try:
+        scored = _parse_batch(_call_api(**_batch_messages(items)), items)
+    except _BatchError as e:
+        print(f"  ⚠️  Batch of {len(items)} failed ({e}) — splitting")
+        scored = {}
+    missing = [item for item in items if item["id"] not in scored]
+    if missing and len(missing) < len(items):
+        scored.update(_score_chunk(missing, failed))
+    elif missing:
+        half = len(missing) // 2
+        scored.update(_score_chunk(missing[:half], failed))
+        scored.update(_score_chunk(missing[half:], failed))
+    return scored
+
+
+async def _ascore_chunk(items: List[Dict[str, Any]], failed: Set[str]) -> Dict[str, Dict[str, Any]]:
+    if len(items) == 1:
+        item = items[0]
+        try:
+            return {item["id"]: await ascore_lead(item["company"], item["website"], item["industry"], item["signals"])}
+        except ValueError as e:
+            print(f"  ⚠️  Could not score {item['company']}: {e}")
+            failed.add(item["id"])
+            return {}
+    try:
+        scored = _parse_batch(await _acall_api(**_batch_messages(items)), items)
+    except _BatchError as e:
+        print(f"  ⚠️  Batch of {len(items)} failed ({e}) — splitting")
+        scored = {}
+    missing = [item for item in items if item["id"] not in scored]
+    if missing and len(missing) < len(items):
+        scored.update(await _ascore_chunk(missing, failed))
+    elif missing:
+        half = len(missing) // 2
+        for part in await asyncio.gather(_ascore_chunk(missing[:half], failed),
+                                         _ascore_chunk(missing[half:], failed)):
+            scored.update(part)
+    return scored
+
+
+def score_leads_batch(
+    leads: List[Dict[str, Any]],
+    batch_size: int = SCORE_BATCH_SIZE,
+    failed_out: Optional[Set[str]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Score many leads with one prompt per `batch_size` leads instead of one
+    call each. Leads are dicts with id, name (or company_name), website,
+    industry, signals; leads without an id are keyed by their list index.
+    A truncated or malformed reply is split in half and retried, and any
+    lead the model skipped is re-asked on its own.
+    Returns: { lead_id: score_lead()-shaped dict } — failed leads are absent.
+    `failed_out` collects the ids that already failed a single-lead
+    score_lead() retry, so callers need not ask for them again.
+    """
+    items = [_lead_fields(lead, i) for i, lead in enumerate(leads)]
+    failed = failed_out if failed_out is not None else set()
+    scores: Dict[str, Dict[str, Any]] = {}
+    for start in range(0, len(items), max(1, batch_size)):
+        chunk = items[start:start + max(1, batch_size)]
+        try:
+            scores.update(_score_chunk(chunk, failed))
+        except Exception as e:
+            print(f"  ❌ Batch scoring failed for {len(chunk)} leads: {e}")
+    return scores
+
+
+async def ascore_leads_batch(
+    leads: List[Dict[str, Any]],
+    batch_size: int = SCORE_BATCH_SIZE,
+    concurrency: int = 4,
+    failed_out: Optional[Set[str]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Awaitable score_leads_batch(); up to `concurrency` batches in flight."""
+    items = [_lead_fields(lead, i) for i, lead in enumerate(leads)]
+    failed = failed_out if failed_out is not None else set()
+    size = max(1, batch_size)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _run(chunk: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        async with sem:
+            try:
+                return await _ascore_chunk(chunk, failed)
+            except Exception as e:
+                print(f"  ❌ Batch scoring failed for {len(chunk)} leads: {e}")
+                return {}
+
+    scores: Dict[str, Dict[str, Any]] = {}
+    for part in await asyncio.gather(*(_run(items[i:i + size]) for i in range(0, len(items), size))):
+        scores.update(part)
+    return scores
+
+
+def _generate_email_request(
     to_name: str,
     company_name: str,
     sender_name: str = "Northern Ventures Intelligence Division",
@@ -221,11 +764,7 @@ def generate_email(
     tone: str = "consultative",
     touch_number: int = 1,
     previous_reply: str = "",
-) -> Dict[str, str]:
-    """
-    Generate a personalized outreach email.
-    Returns: { subject, body }
-    """
+) -> Dict[str, Any]:
     points_str = "\n".join(f"- {p}" for p in (selling_points or []))
 
     touch_context = {
@@ -265,22 +804,62 @@ def generate_email(
     - subject (string): email subject line
     - body (string): plain text email body
     """
-    return chat_json(
+    return dict(
         prompt=prompt,
         system="You are an expert B2B sales copywriter. Write concise, effective cold outreach emails.",
         temperature=0.7,
         max_tokens=1500,
+        task="generate_email",
     )
 
 
-def analyze_reply(
+def generate_email(
+    to_name: str,
+    company_name: str,
+    sender_name: str = "Northern Ventures Intelligence Division",
+    sender_email: str = "",
+    phone: str = "",
+    icp_score: int = 70,
+    risk_level: str = "medium",
+    selling_points: List[str] = None,
+    tone: str = "consultative",
+    touch_number: int = 1,
+    previous_reply: str = "",
+) -> Dict[str, str]:
+    """
+    Generate a personalized outreach email.
+    Returns: { subject, body }
+    """
+    return chat_json(**_generate_email_request(
+        to_name, company_name, sender_name, sender_email, phone, icp_score,
+        risk_level, selling_points, tone, touch_number, previous_reply,
+    ))
+
+
+async def agenerate_email(
+    to_name: str,
+    company_name: str,
+    sender_name: str = "Northern Ventures Intelligence Division",
+    sender_email: str = "",
+    phone: str = "",
+    icp_score: int = 70,
+    risk_level: str = "medium",
+    selling_points: List[str] = None,
+    tone: str = "consultative",
+    touch_number: int = 1,
+    previous_reply: str = "",
+) -> Dict[str, str]:
+    """Awaitable generate_email()."""
+    return await achat_json(**_generate_email_request(
+        to_name, company_name, sender_name, sender_email, phone, icp_score,
+        risk_level, selling_points, tone, touch_number, previous_reply,
+    ))
+
+
+def _analyze_reply_request(
     reply_text: str,
     original_context: str = "",
 ) -> Dict[str, Any]:
-    """
-    Analyze a prospect's reply to determine sentiment and next action.
-    Returns: sentiment, intent, should_respond, suggested_response_type, confidence
-    """
     prompt = f"""
     Analyze this prospect's reply to our outreach email:
 
@@ -298,14 +877,34 @@ def analyze_reply(
     - confidence (float 0-1)
     - brief (string): one-line summary for the dashboard
     """
-    return chat_json(
+    return dict(
         prompt=prompt,
         system="You are an expert sales analyst. Classify prospect replies accurately.",
         temperature=0.2,
         max_tokens=800,
+        task="analyze_reply",
     )
 
 
+def analyze_reply(
+    reply_text: str,
+    original_context: str = "",
+) -> Dict[str, Any]:
+    """
+    Analyze a prospect's reply to determine sentiment and next action.
+    Returns: sentiment, intent, should_respond, suggested_response_type, confidence
+    """
+    return chat_json(**_analyze_reply_request(reply_text, original_context))
+
+
+async def aanalyze_reply(
+    reply_text: str,
+    original_context: str = "",
+) -> Dict[str, Any]:
+    """Awaitable analyze_reply()."""
+    return await achat_json(**_analyze_reply_request(reply_text, original_context))
+
+
 # ── Health Check ─────────────────────────────────────────────────────────────
 
 def ping() -> Dict[str, Any]:
@@ -316,6 +915,26 @@ def ping() -> Dict[str, Any]:
             messages=[{"role": "user", "content": "Reply with the single word: PONG"}],
             max_tokens=10,
             temperature=0,
+            task="ping",
+        )
+        return {
+            "ok": True,
+            "model": result.get("model", "unknown"),
+            "latency_ms": int((time.time() - start) * 1000),
+        }
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+
+async def aping() -> Dict[str, Any]:
+    """Awaitable ping()."""
+    start = time.time()
+    try:
+        result = await _acall_api(
+            messages=[{"role": "user", "content": "Reply with the single word: PONG"}],
+            max_tokens=10,
+            temperature=0,
+            task="ping",
         )
         return {
             "ok": True,
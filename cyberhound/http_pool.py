@@ -0,0 +1,225 @@
+"""
+HTTP Session Pool — shared keep-alive connections for LLM providers
+===================================================================
+Every provider (Ollama, OpenClaw, DeepSeek, Hermes) gets one long-lived
+`requests.Session` with its own urllib3 connection pool, so repeated chat
+completions reuse the same TCP/TLS connection instead of handshaking on
+every call. Async callers get the same thing through a shared
+`httpx.AsyncClient` per provider (one set per running event loop); entry
+points run their coroutine with arun() so that set is closed with the loop.
+
+Every request first takes a token from the rate-limit bucket of the host it
+goes to (see rate_limit) and reports 429 / Retry-After back to it. Providers
+pointed at the same upstream therefore share one budget and one backoff; the
+limits themselves are still looked up by provider (RATE_LIMIT_<PROVIDER>).
+
+Env vars:
+  LLM_POOL_MAXSIZE             — connections kept alive per host (default: 8)
+  LLM_POOL_MAXSIZE_<PROVIDER>  — per-provider override, e.g. LLM_POOL_MAXSIZE_OLLAMA=2
+
+Usage:
+    from cyberhound.http_pool import post, apost, stream, astream, pool_stats
+
+    resp = post("deepseek", url, headers=headers, json=payload, timeout=60)
+    resp = await apost("deepseek", url, headers=headers, json=payload, timeout=60)
+    resp = stream("deepseek", url, headers=headers, json={**payload, "stream": True})
+    print(pool_stats())
+
+    arun(main_loop())   # asyncio.run() that closes this loop's httpx clients on exit
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Dict, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from cyberhound.rate_limit import aacquire, acquire, observe_status
+except ImportError:  # imported flat via sys.path (autonomy_engine_v2, hermes_worker)
+    from rate_limit import aacquire, acquire, observe_status
+
+DEFAULT_POOL_MAXSIZE = int(os.getenv("LLM_POOL_MAXSIZE", 8))
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+# httpx clients are bound to the loop they were created on, so keep one set
+# per loop (asyncio.run() in run.py creates a fresh loop for every phase);
+# arun() closes a loop's set before the loop goes away.
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_async_requests: Dict[str, int] = {}
+_async_connections: Dict[str, int] = {}
+_traces: Dict[str, Any] = {}
+
+
+def _pool_maxsize(provider: str) -> int:
+    override = os.getenv(f"LLM_POOL_MAXSIZE_{provider.upper()}")
+    return int(override) if override else DEFAULT_POOL_MAXSIZE
+
+
+def get_session(provider: str) -> requests.Session:
+    """Return the shared keep-alive session for a provider (created on first use)."""
+    session = _sessions.get(provider)
+    if session is not None:
+        return session
+
+    with _lock:
+        session = _sessions.get(provider)
+        if session is None:
+            size = _pool_maxsize(provider)
+            session = requests.Session()
+            # Retries are handled by the callers, never silently by urllib3
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=size, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["Connection"] = "keep-alive"
+            _sessions[provider] = session
+    return session
+
+
+def rate_bucket(provider: str, url: str) -> str:
+    """Rate-limit bucket for a request: its upstream host (the provider if the URL has none)."""
+    return urlsplit(url).netloc.lower() or provider
+
+
+def post(provider: str, url: str, **kwargs: Any) -> requests.Response:
+    """POST through the provider's pooled session (rate limited per upstream host)."""
+    bucket = rate_bucket(provider, url)
+    acquire(bucket, limits_key=provider)
+    resp = get_session(provider).post(url, **kwargs)
+    observe_status(bucket, resp.status_code, resp.headers.get("Retry-After"), limits_key=provider)
+    return resp
+
+
+def stream(provider: str, url: str, **kwargs: Any) -> requests.Response:
+    """Streaming POST (SSE) through the provider's pooled session. Close the response when done."""
+    bucket = rate_bucket(provider, url)
+    acquire(bucket, limits_key=provider)
+    resp = get_session(provider).post(url, stream=True, **kwargs)
+    observe_status(bucket, resp.status_code, resp.headers.get("Retry-After"), limits_key=provider)
+    return resp
+
+
+def get_async_client(provider: str):
+    """Return the shared keep-alive httpx.AsyncClient for a provider on the running loop."""
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.setdefault(loop, {})
+    client = clients.get(provider)
+    if client is None or client.is_closed:
+        size = _pool_maxsize(provider)
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+            timeout=None,
+        )
+        clients[provider] = client
+    return client
+
+
+def _trace(provider: str):
+    """httpx `trace` extension counting the connections the provider's async pool opens."""
+    trace = _traces.get(provider)
+    if trace is None:
+        async def trace(event_name: str, info: Dict[str, Any]):
+            # httpcore only connects when no idle keep-alive connection was reusable
+            if event_name in ("connection.connect_tcp.complete", "connection.connect_unix_socket.complete"):
+                _async_connections[provider] = _async_connections.get(provider, 0) + 1
+        _traces[provider] = trace
+    return trace
+
+
+async def apost(provider: str, url: str, timeout: float = 120, **kwargs: Any):
+    """Async POST through the provider's pooled client. Returns an httpx.Response."""
+    bucket = rate_bucket(provider, url)
+    await aacquire(bucket, limits_key=provider)
+    client = get_async_client(provider)
+    _async_requests[provider] = _async_requests.get(provider, 0) + 1
+    resp = await client.post(url, timeout=timeout, extensions={"trace": _trace(provider)}, **kwargs)
+    observe_status(bucket, resp.status_code, resp.headers.get("Retry-After"), limits_key=provider)
+    return resp
+
+
+@asynccontextmanager
+async def astream(provider: str, url: str, timeout: float = 120, **kwargs: Any):
+    """Async streaming POST: `async with astream(...) as resp: async for line in resp.aiter_lines()`."""
+    bucket = rate_bucket(provider, url)
+    await aacquire(bucket, limits_key=provider)
+    client = get_async_client(provider)
+    _async_requests[provider] = _async_requests.get(provider, 0) + 1
+    async with client.stream("POST", url, timeout=timeout, extensions={"trace": _trace(provider)},
+                             **kwargs) as resp:
+        observe_status(bucket, resp.status_code, resp.headers.get("Retry-After"), limits_key=provider)
+        yield resp
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Connection reuse metrics per provider: sync `requests` sessions, plus the
+    async httpx clients (summed over every event loop) when used.
+    Returns: { provider: { requests, connections, reused, hosts,
+                           [async_requests, async_connections, async_reused] } }
+    """
+    stats: Dict[str, Dict[str, int]] = {}
+    for provider, session in list(_sessions.items()):
+        requests_made = connections = hosts = 0
+        seen = set()
+        for adapter in session.adapters.values():
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                hosts += 1
+                requests_made += pool.num_requests
+                connections += pool.num_connections
+        stats[provider] = {
+            "requests": requests_made,
+            "connections": connections,
+            "reused": max(0, requests_made - connections),
+            "hosts": hosts,
+        }
+    for provider, count in list(_async_requests.items()):
+        stats.setdefault(provider, {"requests": 0, "connections": 0, "reused": 0, "hosts": 0})
+        connections = _async_connections.get(provider, 0)
+        stats[provider].update(async_requests=count, async_connections=connections,
+                               async_reused=max(0, count - connections))
+    return stats
+
+
+def close_all():
+    """Close every pooled sync session (e.g. before fork or at shutdown)."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+async def aclose_all():
+    """Close the async clients owned by the running loop."""
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+T = TypeVar("T")
+
+
+def arun(main: Awaitable[T]) -> T:
+    """asyncio.run(main), closing the httpx clients the loop opened once `main` finishes (or fails)."""
+    async def _main() -> T:
+        try:
+            return await main
+        finally:
+            await aclose_all()
+
+    return asyncio.run(_main())
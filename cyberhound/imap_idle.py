@@ -0,0 +1,187 @@
+"""
+IMAP IDLE — push notification of new mail, with polling fallback
+================================================================
+The reply watchdogs used to poll the inbox every 30–60 s over one IMAP
+session that was never refreshed: replies waited up to a minute, and once the
+server dropped the session the loop ended silently. watch_mailbox() keeps a
+session open and reacts within seconds:
+
+  • IMAP IDLE (RFC 2177) when the server advertises it — the server pushes
+    EXISTS/RECENT the moment mail lands and nothing is polled meanwhile.
+    The IDLE is re-issued every IMAP_IDLE_REFRESH_SEC, before the 29-minute
+    cutoff after which servers may silently drop an idling client. The socket
+    is read in short slices, so setting `stop` ends an IDLE within a second
+  • Polling every `poll_interval` seconds on servers without IDLE (or with
+    IMAP_IDLE=false)
+  • Reconnect with exponential backoff and jitter (1 s doubling up to
+    IMAP_RECONNECT_MAX_SEC) whenever the connection fails or is dropped;
+    `on_mail` runs once after every (re)connect so nothing that arrived while
+    disconnected is missed
+
+Env vars:
+  IMAP_IDLE               — use IDLE when the server supports it (default: true)
+  IMAP_IDLE_REFRESH_SEC   — re-issue IDLE this often (default: 1500, i.e. 25 min)
+  IMAP_RECONNECT_MAX_SEC  — longest wait between reconnect attempts (default: 300)
+  IMAP_TIMEOUT            — socket timeout for ordinary commands (default: 60)
+
+Usage:
+    from cyberhound.imap_idle import watch_mailbox
+
+    watch_mailbox(connect, lambda mail: check_for_replies(mail), poll_interval=60)
+    # connect() -> logged-in imaplib.IMAP4 or None; the callback gets the selected session
+"""
+
+import imaplib
+import os
+import random
+import re
+import socket
+import threading
+import time
+from typing import Callable, Optional
+
+IMAP_IDLE = os.getenv("IMAP_IDLE", "true").lower() == "true"
+IMAP_IDLE_REFRESH_SEC = float(os.getenv("IMAP_IDLE_REFRESH_SEC", 25 * 60))
+IMAP_RECONNECT_MAX_SEC = float(os.getenv("IMAP_RECONNECT_MAX_SEC", 300))
+IMAP_TIMEOUT = float(os.getenv("IMAP_TIMEOUT", 60))
+
+_NEW_MAIL = re.compile(rb"^\* \d+ (EXISTS|RECENT)\b", re.I)
+_MAILBOX_SIZE = re.compile(rb"^\* (\d+) (EXISTS|RECENT|EXPUNGE)\b", re.I)
+_STOP_CHECK_SEC = 1.0
+
+# Errors that mean the session is gone and a reconnect is needed
+CONNECTION_ERRORS = (imaplib.IMAP4.abort, imaplib.IMAP4.error, OSError, EOFError)
+
+
+def supports_idle(mail: imaplib.IMAP4) -> bool:
+    return "IDLE" in getattr(mail, "capabilities", ())
+
+
+def idle(mail: imaplib.IMAP4, timeout: float, stop: Optional[threading.Event] = None) -> bool:
+    """
+    IDLE on the selected mailbox until new mail arrives (True), or `timeout`
+    seconds pass or `stop` is set (False). Raises a CONNECTION_ERRORS member if the session
+    drops. Reads the socket directly so imaplib's buffered reader stays in step;
+    EXISTS/RECENT/EXPUNGE seen meanwhile are handed to imaplib's untagged
+    responses, as if a NOOP had returned them (imap_sync relies on this).
+    """
+    sock = mail.socket()
+    tag = mail._new_tag()
+    buffer = b""
+
+    def read_line(deadline: Optional[float]) -> Optional[bytes]:
+        nonlocal buffer
+        while b"\r\n" not in buffer:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            sock.settimeout(remaining)
+            try:
+                chunk = sock.recv(4096)
+            except socket.timeout:
+                return None
+            if not chunk:
+                raise imaplib.IMAP4.abort("connection closed during IDLE")
+            buffer += chunk
+        line, buffer = buffer.split(b"\r\n", 1)
+        size = _MAILBOX_SIZE.match(line)
+        if size:
+            mail._append_untagged(size.group(2).upper().decode(), size.group(1))
+        return line
+
+    previous_timeout = sock.gettimeout()
+    try:
+        mail.send(tag + b" IDLE\r\n")
+        line = read_line(time.monotonic() + 30)
+        if line is None or not line.startswith(b"+"):
+            raise imaplib.IMAP4.error(f"IDLE refused: {line!r}")
+
+        arrived = False
+        deadline = time.monotonic() + timeout
+        while not arrived and not (stop is not None and stop.is_set()):
+            line = read_line(min(deadline, time.monotonic() + _STOP_CHECK_SEC))
+            if line is None:
+                if time.monotonic() >= deadline:
+                    break
+                continue
+            if line.startswith(b"* BYE"):
+                raise imaplib.IMAP4.abort(line.decode(errors="replace"))
+            arrived = bool(_NEW_MAIL.match(line))
+
+        mail.send(b"DONE\r\n")
+        while True:
+            line = read_line(time.monotonic() + 30)
+            if line is None:
+                raise imaplib.IMAP4.abort("no reply to DONE")
+            if line.startswith(tag + b" "):
+                if not line[len(tag) + 1:].upper().startswith(b"OK"):
+                    raise imaplib.IMAP4.error(line.decode(errors="replace"))
+                return arrived
+            arrived = arrived or bool(_NEW_MAIL.match(line))
+    finally:
+        try:
+            sock.settimeout(previous_timeout)
+        except OSError:
+            pass
+
+
+def _backoff(attempt: int) -> float:
+    return min(2 ** attempt, IMAP_RECONNECT_MAX_SEC) * random.uniform(0.5, 1.0)
+
+
+def _logout(mail: imaplib.IMAP4):
+    try:
+        mail.logout()
+    except Exception:
+        pass
+
+
+def _handle(on_mail: Callable[[imaplib.IMAP4], object], mail: imaplib.IMAP4, name: str):
+    # A bad message must not end the watch; a dead session propagates and reconnects
+    try:
+        on_mail(mail)
+    except CONNECTION_ERRORS:
+        raise
+    except Exception as e:
+        print(f"[{name}] ❌ handler error: {type(e).__name__}: {e}")
+
+
+def watch_mailbox(connect: Callable[[], Optional[imaplib.IMAP4]],
+                  on_mail: Callable[[imaplib.IMAP4], object],
+                  poll_interval: float = 60, mailbox: str = "inbox",
+                  stop: Optional[threading.Event] = None, name: str = "imap"):
+    """
+    Run `on_mail(mail)` after every (re)connect and whenever new mail arrives,
+    until `stop` is set. Never returns on connection errors — it reconnects.
+    """
+    stop = stop or threading.Event()
+    failures = 0
+    while not stop.is_set():
+        mail = connect()
+        if mail is None:
+            delay = _backoff(failures)
+            failures += 1
+            print(f"[{name}] 🔌 reconnecting in {delay:.0f}s")
+            stop.wait(delay)
+            continue
+        try:
+            mail.select(mailbox)
+            failures = 0
+            push = IMAP_IDLE and supports_idle(mail)
+            print(f"[{name}] 👁️  {'IDLE push' if push else f'polling every {poll_interval:g}s'} on {mailbox}")
+            _handle(on_mail, mail, name)
+            while not stop.is_set():
+                if push:
+                    if not idle(mail, IMAP_IDLE_REFRESH_SEC, stop):
+                        continue  # refresh window passed with no mail (or stopping): re-IDLE
+                else:
+                    if stop.wait(poll_interval):
+                        break
+                _handle(on_mail, mail, name)
+        except CONNECTION_ERRORS as e:
+            delay = _backoff(failures)
+            failures += 1
+            print(f"[{name}] ⚠️  IMAP session lost ({type(e).__name__}: {e}) — reconnecting in {delay:.0f}s")
+            stop.wait(delay)
+        finally:
+            _logout(mail)
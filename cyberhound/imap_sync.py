@@ -0,0 +1,439 @@
+"""
+IMAP Sync — incremental, header-first inbox sync with a bounded watermark
+========================================================================
+The reply watchdogs each ran `SEARCH UNSEEN` and fetched whole RFC822
+messages (attachments included) just to read From/Subject and a few hundred
+characters of body, and remembered what they had handled in an ever-growing
+`.watchdog_cache.json` id list rewritten after every message. MailboxSync
+replaces that for every consumer:
+
+  • UID watermark — per consumer and mailbox we keep (UIDVALIDITY, last UID
+    handled, HIGHESTMODSEQ) in one SQLite row. Only UIDs above the watermark
+    are fetched; a UIDVALIDITY change resets it. The state never grows.
+  • Cheap "nothing new" — the mailbox is SELECTed once per connection and
+    its UIDVALIDITY / UIDNEXT / HIGHESTMODSEQ are read from the untagged
+    SELECT responses; later syncs on the same connection send one NOOP, and
+    unless it (or an IDLE in between) reported EXISTS/EXPUNGE, nothing is new
+    and no SEARCH is needed. (RFC 3501 discourages STATUS on the selected
+    mailbox.) HIGHESTMODSEQ is used when the server supports CONDSTORE.
+  • Header-first — new messages are fetched in one round trip as
+    BODY.PEEK[HEADER.FIELDS (From Subject Message-ID In-Reply-To References
+    Date)]. Nothing is marked \\Seen.
+  • Body on demand — InboundMail.body_text() fetches BODYSTRUCTURE and then
+    only the first IMAP_SYNC_BODY_BYTES of the text/plain part (decoded
+    from base64 / quoted-printable), and only for messages a consumer cares
+    about.
+  • Progress is saved when the sync block exits. If a consumer raises on a
+    message, that message is retried next time, and skipped after
+    IMAP_SYNC_MAX_ATTEMPTS failures so one bad message cannot wedge a watchdog.
+
+A consumer with no state yet (or after a UIDVALIDITY change) starts with the
+newest IMAP_SYNC_BOOTSTRAP unseen messages, matching the old UNSEEN
+behaviour, then follows the watermark.
+
+Env vars:
+  IMAP_SYNC_PATH          — SQLite state file (default: .imap_sync.sqlite)
+  IMAP_SYNC_BATCH         — most messages handled per sync (default: 200)
+  IMAP_SYNC_BODY_BYTES    — bytes of text/plain fetched per message (default: 4096)
+  IMAP_SYNC_BOOTSTRAP     — unseen messages taken on a consumer's first sync (default: 50)
+  IMAP_SYNC_MAX_ATTEMPTS  — failures before a message is skipped (default: 3)
+
+Usage:
+    from cyberhound.imap_sync import MailboxSync
+
+    with MailboxSync(mail, "watchdog_v2") as sync:
+        for msg in sync.new_messages():
+            if not interesting(msg.sender, msg.subject):
+                continue
+            body = msg.body_text()
+"""
+
+import base64
+import email
+import imaplib
+import os
+import quopri
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from email.header import decode_header, make_header
+from email.message import Message
+from email.utils import getaddresses, parseaddr
+from typing import Dict, Iterator, List, Optional, Tuple
+
+IMAP_SYNC_PATH = os.getenv("IMAP_SYNC_PATH", ".imap_sync.sqlite")
+IMAP_SYNC_BATCH = int(os.getenv("IMAP_SYNC_BATCH", 200))
+IMAP_SYNC_BODY_BYTES = int(os.getenv("IMAP_SYNC_BODY_BYTES", 4096))
+IMAP_SYNC_BOOTSTRAP = int(os.getenv("IMAP_SYNC_BOOTSTRAP", 50))
+IMAP_SYNC_MAX_ATTEMPTS = int(os.getenv("IMAP_SYNC_MAX_ATTEMPTS", 3))
+
+HEADER_FIELDS = ("From", "Subject", "Message-ID", "In-Reply-To", "References", "Date")
+
+# What the last SELECT (and NOOPs since) told us, per connection
+_selected: "weakref.WeakKeyDictionary[imaplib.IMAP4, Dict[str, object]]" = weakref.WeakKeyDictionary()
+
+
+# ── IMAP response parsing ───────────────────────────────────────────────────
+
+_ATOM_END = b' ()"\r\n'
+
+
+def parse_sexp(data: bytes, pos: int = 0) -> Tuple[object, int]:
+    """
+    Parse one IMAP value at `pos`: a parenthesized list, quoted string,
+    {n} literal, NIL, or atom (section specs like BODY[HEADER.FIELDS (FROM)]<0>
+    stay one atom). Strings come back as bytes, NIL as None.
+    """
+    while pos < len(data) and data[pos:pos + 1] == b" ":
+        pos += 1
+    c = data[pos:pos + 1]
+    if c == b"(":
+        items, pos = [], pos + 1
+        while True:
+            while data[pos:pos + 1] == b" ":
+                pos += 1
+            if data[pos:pos + 1] == b")":
+                return items, pos + 1
+            if pos >= len(data):
+                raise ValueError("unterminated list")
+            item, pos = parse_sexp(data, pos)
+            items.append(item)
+    if c == b'"':
+        out, pos = bytearray(), pos + 1
+        while data[pos:pos + 1] != b'"':
+            if data[pos:pos + 1] == b"\\":
+                pos += 1
+            out += data[pos:pos + 1]
+            pos += 1
+            if pos >= len(data):
+                raise ValueError("unterminated string")
+        return bytes(out), pos + 1
+    if c == b"{":
+        end = data.index(b"}", pos)
+        size = int(data[pos + 1:end].rstrip(b"+"))
+        start = end + 1
+        if data[start:start + 2] == b"\r\n":
+            start += 2
+        return data[start:start + size], start + size
+    start = pos
+    depth = 0
+    while pos < len(data):
+        ch = data[pos:pos + 1]
+        if ch in (b"[", b"<"):
+            depth += 1
+        elif ch in (b"]", b">"):
+            depth -= 1
+        elif depth == 0 and ch in _ATOM_END:
+            break
+        pos += 1
+    atom = data[start:pos]
+    return (None if atom.upper() == b"NIL" else atom), pos
+
+
+def parse_fetch(data: list) -> Dict[int, Dict[bytes, object]]:
+    """imaplib UID FETCH data → {uid: {ITEM-NAME: value}} (item names upper-cased)."""
+    # imaplib splits each literal out as (prefix-with-{n}, literal); stitch the raw lines back
+    responses: List[bytearray] = []
+    for piece in data:
+        head = piece[0] if isinstance(piece, tuple) else piece
+        if head is None:
+            continue
+        if re.match(rb"^\d+ \(", head) or not responses:
+            responses.append(bytearray())
+        if isinstance(piece, tuple):
+            responses[-1] += piece[0] + b"\r\n" + piece[1]
+        else:
+            responses[-1] += piece
+    out = {}
+    for raw in responses:
+        raw = bytes(raw)
+        start = raw.find(b"(")
+        if start < 0:
+            continue
+        items, _ = parse_sexp(raw, start)
+        fields = {items[i].upper(): items[i + 1] for i in range(0, len(items) - 1, 2)
+                  if isinstance(items[i], bytes)}
+        if b"UID" in fields:
+            out[int(fields[b"UID"])] = fields
+    return out
+
+
+def find_text_part(structure, prefix: str = "") -> Optional[Tuple[str, str, str]]:
+    """(section, transfer encoding, charset) of the first text/plain part of a BODYSTRUCTURE."""
+    if not isinstance(structure, list) or not structure:
+        return None
+    if isinstance(structure[0], list):  # multipart: children, then subtype + extensions
+        for i, child in enumerate(c for c in structure if isinstance(c, list)):
+            found = find_text_part(child, f"{prefix}{i + 1}.")
+            if found:
+                return found
+        return None
+    kind = (structure[0] or b"").decode(errors="replace").lower()
+    subtype = (structure[1] or b"").decode(errors="replace").lower() if len(structure) > 1 else ""
+    if (kind, subtype) != ("text", "plain"):
+        return None
+    params = structure[2] if len(structure) > 2 and isinstance(structure[2], list) else []
+    charset = "utf-8"
+    for i in range(0, len(params) - 1, 2):
+        if (params[i] or b"").lower() == b"charset" and params[i + 1]:
+            charset = params[i + 1].decode(errors="replace")
+    encoding = (structure[5] or b"7bit").decode(errors="replace").lower() if len(structure) > 5 else "7bit"
+    return (prefix or "1.").rstrip("."), encoding, charset
+
+
+def decode_partial(data: bytes, encoding: str, charset: str) -> str:
+    """Decode a (possibly truncated) part body: base64 / quoted-printable, then charset."""
+    if encoding == "base64":
+        compact = re.sub(rb"[^A-Za-z0-9+/=]", b"", data)
+        data = base64.b64decode(compact[: len(compact) // 4 * 4] or b"")
+    elif encoding == "quoted-printable":
+        data = quopri.decodestring(re.sub(rb"=[0-9A-Fa-f]?$", b"", data))
+    try:
+        return data.decode(charset, errors="replace")
+    except LookupError:
+        return data.decode("utf-8", errors="replace")
+
+
+def _header_str(value) -> str:
+    if value is None:
+        return ""
+    try:
+        return str(make_header(decode_header(str(value))))
+    except Exception:
+        return str(value)
+
+
+# ── Messages ────────────────────────────────────────────────────────────────
+
+class InboundMail:
+    """One new message: decoded headers now, text/plain body on demand."""
+
+    def __init__(self, mail: imaplib.IMAP4, uid: int, headers: Message):
+        self._mail = mail
+        self.uid = uid
+        self.headers = headers
+        self.from_addr = _header_str(headers.get("From"))
+        self.sender = parseaddr(self.from_addr)[1].lower()
+        self.subject = _header_str(headers.get("Subject"))
+        self.message_id = (headers.get("Message-ID") or "").strip()
+        self.in_reply_to = (headers.get("In-Reply-To") or "").strip()
+        self.references = (headers.get("References") or "").split()
+        self._body: Optional[str] = None
+
+    def body_text(self, max_bytes: int = IMAP_SYNC_BODY_BYTES) -> str:
+        """First `max_bytes` of the text/plain part, decoded ('' if there is none)."""
+        if self._body is not None:
+            return self._body
+        _, data = self._mail.uid("FETCH", str(self.uid), "(BODYSTRUCTURE)")
+        structure = parse_fetch(data).get(self.uid, {}).get(b"BODYSTRUCTURE")
+        part = find_text_part(structure)
+        if part is None:
+            self._body = ""
+            return self._body
+        section, encoding, charset = part
+        _, data = self._mail.uid("FETCH", str(self.uid), f"(BODY.PEEK[{section}]<0.{max_bytes}>)")
+        fields = parse_fetch(data).get(self.uid, {})
+        raw = next((v for k, v in fields.items() if k.startswith(b"BODY[")), None) or b""
+        self._body = decode_partial(raw, encoding, charset)
+        return self._body
+
+    def __repr__(self):
+        return f"<InboundMail uid={self.uid} from={self.sender!r} subject={self.subject[:40]!r}>"
+
+
+# ── Sync state ──────────────────────────────────────────────────────────────
+
+_db_lock = threading.Lock()
+_dbs: Dict[str, sqlite3.Connection] = {}
+
+
+def _db(path: str) -> sqlite3.Connection:
+    with _db_lock:
+        db = _dbs.get(path)
+        if db is None:
+            db = _dbs[path] = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                              isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    consumer    TEXT PRIMARY KEY,
+                    uidvalidity INTEGER,
+                    last_uid    INTEGER NOT NULL DEFAULT 0,
+                    modseq      INTEGER,
+                    stuck_uid   INTEGER,
+                    stuck_count INTEGER NOT NULL DEFAULT 0,
+                    updated_at  REAL
+                )
+            """)
+        return db
+
+
+class MailboxSync:
+    """Incremental sync of one mailbox for one consumer; use as a context manager."""
+
+    def __init__(self, mail: imaplib.IMAP4, consumer: str, mailbox: str = "inbox",
+                 path: Optional[str] = None):
+        self.mail = mail
+        self.mailbox = mailbox
+        self.key = f"{consumer}:{mailbox}"
+        self._db = _db(path or IMAP_SYNC_PATH)
+        row = self._db.execute(
+            "SELECT uidvalidity, last_uid, modseq, stuck_uid, stuck_count FROM sync_state WHERE consumer = ?",
+            (self.key,),
+        ).fetchone()
+        self.uidvalidity, self.last_uid, self.modseq, self.stuck_uid, self.stuck_count = row or (None, 0, None, None, 0)
+        self._current: Optional[int] = None
+        self._done_to: Optional[int] = None
+        self._status: Dict[str, int] = {}
+        self.stats = {"checked": 0, "fetched_headers": 0, "skipped_poison": 0}
+
+    def __enter__(self) -> "MailboxSync":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._ack_current()
+        elif self._current is not None:
+            # The consumer failed on this message: retry it next sync, give up after a few
+            same = self.stuck_uid == self._current
+            self.stuck_uid, self.stuck_count = self._current, (self.stuck_count + 1 if same else 1)
+        self.save()
+        return False
+
+    # ── Server state ────────────────────────────────────────────────────────
+
+    def _responses(self, name: str) -> List[int]:
+        _, data = self.mail.response(name)
+        return [int(d.split()[0]) for d in data if d and d.split()[0].isdigit()]
+
+    def status(self) -> Dict[str, int]:
+        """
+        UIDVALIDITY / UIDNEXT (/ HIGHESTMODSEQ) of the mailbox, selecting it if
+        this connection has not yet. Once selected, a NOOP collects what changed:
+        new EXISTS/EXPUNGE responses make UIDNEXT and HIGHESTMODSEQ unknown
+        again unless the server sent fresh ones.
+        """
+        known = _selected.get(self.mail)
+        if self.mail.state == "SELECTED" and known is not None and known.get("mailbox") == self.mailbox:
+            typ, data = self.mail.noop()
+            if typ != "OK":
+                raise imaplib.IMAP4.error(f"NOOP failed: {data}")
+        else:
+            typ, data = self.mail.select(self.mailbox)
+            if typ != "OK":
+                raise imaplib.IMAP4.error(f"SELECT {self.mailbox} failed: {data}")
+            known = _selected[self.mail] = {"mailbox": self.mailbox}
+        fresh = {name: self._responses(name) for name in ("UIDVALIDITY", "UIDNEXT", "HIGHESTMODSEQ")}
+        changed = [self._responses(name) for name in ("EXISTS", "EXPUNGE")]
+        if any(changed):
+            known.pop("UIDNEXT", None)
+            known.pop("HIGHESTMODSEQ", None)
+        known.update({name: values[-1] for name, values in fresh.items() if values})
+        return {k: v for k, v in known.items() if k != "mailbox"}
+
+    def _learn_uidnext(self, uids: List[int]):
+        # After `UID n:*` the highest UID present is known even if UIDNEXT is not
+        if uids and "UIDNEXT" not in self._status:
+            self._status["UIDNEXT"] = max(uids) + 1
+            known = _selected.get(self.mail)
+            if known is not None:
+                known["UIDNEXT"] = self._status["UIDNEXT"]
+
+    def _search(self, criteria: str) -> List[int]:
+        typ, data = self.mail.uid("SEARCH", None, criteria)
+        if typ != "OK":
+            raise imaplib.IMAP4.error(f"UID SEARCH {criteria} failed: {data}")
+        return sorted(int(u) for u in b" ".join(d for d in data if d).split())
+
+    def pending_uids(self) -> List[int]:
+        """UIDs to hand out this sync (oldest first, at most IMAP_SYNC_BATCH)."""
+        self._status = status = self.status()
+        validity = status.get("UIDVALIDITY")
+        if validity is not None and validity == self.uidvalidity:
+            if self.modseq is not None and status.get("HIGHESTMODSEQ") == self.modseq:
+                return []  # CONDSTORE: nothing in the mailbox changed
+            if "UIDNEXT" in status and status["UIDNEXT"] - 1 <= self.last_uid:
+                return []
+            found = self._search(f"UID {self.last_uid + 1}:*")
+            self._learn_uidnext(found)
+            uids = [u for u in found if u > self.last_uid]
+        else:
+            if self.uidvalidity is not None:
+                print(f"[imap_sync] ↻ {self.key}: UIDVALIDITY changed — re-syncing from unseen mail")
+            uids = self._search("UNSEEN")[-IMAP_SYNC_BOOTSTRAP:]
+            self.uidvalidity, self.last_uid, self.modseq = validity, 0, None
+            self._bootstrap_to = status.get("UIDNEXT", (max(uids) + 1) if uids else 1) - 1
+        return uids[:IMAP_SYNC_BATCH]
+
+    # ── Consumers ───────────────────────────────────────────────────────────
+
+    def _ack_current(self):
+        if self._current is not None:
+            self.last_uid = max(self.last_uid, self._current)
+            if self.stuck_uid == self._current:
+                self.stuck_uid, self.stuck_count = None, 0
+            self._current = None
+
+    def new_messages(self, limit: Optional[int] = None) -> Iterator[InboundMail]:
+        """
+        Yield messages above the watermark, oldest first, headers only. A
+        message counts as handled once the loop moves past it (or the sync
+        block exits without an error).
+        """
+        self._bootstrap_to = None
+        uids = self.pending_uids()
+        if limit is not None:
+            uids = uids[:limit]
+        if uids:
+            fields = " ".join(HEADER_FIELDS).upper()
+            typ, data = self.mail.uid("FETCH", ",".join(map(str, uids)),
+                                      f"(UID BODY.PEEK[HEADER.FIELDS ({fields})])")
+            if typ != "OK":
+                raise imaplib.IMAP4.error(f"UID FETCH failed: {data}")
+            fetched = parse_fetch(data)
+            self.stats["fetched_headers"] += len(fetched)
+            for uid in uids:
+                item = fetched.get(uid)
+                if item is None:
+                    continue  # expunged since SEARCH
+                if uid == self.stuck_uid and self.stuck_count >= IMAP_SYNC_MAX_ATTEMPTS:
+                    print(f"[imap_sync] ⏭️  {self.key}: skipping UID {uid} after {self.stuck_count} failed attempts")
+                    self.stats["skipped_poison"] += 1
+                    self._current = uid
+                    self._ack_current()
+                    continue
+                raw = next((v for k, v in item.items() if k.startswith(b"BODY[")), None) or b""
+                self._current = uid
+                self.stats["checked"] += 1
+                yield InboundMail(self.mail, uid, email.message_from_bytes(raw))
+                self._ack_current()
+        # Fully drained: jump the watermark over UIDs that were not ours to handle
+        if self._bootstrap_to is not None and (limit is None or len(uids) < limit):
+            self.last_uid = max(self.last_uid, self._bootstrap_to)
+        if "HIGHESTMODSEQ" in self._status and self.last_uid >= self._status.get("UIDNEXT", 0) - 1:
+            self.modseq = self._status["HIGHESTMODSEQ"]
+
+    def save(self):
+        self._db.execute(
+            "INSERT INTO sync_state(consumer, uidvalidity, last_uid, modseq, stuck_uid, stuck_count, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(consumer) DO UPDATE SET uidvalidity = excluded.uidvalidity, "
+            "last_uid = excluded.last_uid, modseq = excluded.modseq, stuck_uid = excluded.stuck_uid, "
+            "stuck_count = excluded.stuck_count, updated_at = excluded.updated_at",
+            (self.key, self.uidvalidity, self.last_uid, self.modseq, self.stuck_uid, self.stuck_count, time.time()),
+        )
+
+
+def sync_state(path: Optional[str] = None) -> List[dict]:
+    """Every consumer's watermark (for stats / debugging)."""
+    rows = _db(path or IMAP_SYNC_PATH).execute(
+        "SELECT consumer, uidvalidity, last_uid, modseq, stuck_uid, stuck_count, updated_at FROM sync_state"
+    ).fetchall()
+    keys = ("consumer", "uidvalidity", "last_uid", "modseq", "stuck_uid", "stuck_count", "updated_at")
+    return [dict(zip(keys, row)) for row in rows]
+
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(sync_state(), indent=2))
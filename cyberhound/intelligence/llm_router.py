@@ -1,8 +1,9 @@
-import json
 import os
-from typing import Optional
+from typing import Any, Dict, Optional
 
-import requests
+from ..http_pool import post as _pooled_post
+from ..llm_json import parse_structured
+from ..llm_telemetry import current as _telemetry_current, start as _telemetry_start
 
 try:
     from dotenv import load_dotenv
@@ -10,13 +11,6 @@ try:
 except Exception:
     pass
 
-try:
-    import vertexai
-    from vertexai.generative_models import GenerativeModel
-except Exception:
-    vertexai = None
-    GenerativeModel = None
-
 
 AI_PROVIDER = os.getenv("CYBERHOUND_AI_PROVIDER", "auto").lower()
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434").rstrip("/")
@@ -38,7 +32,11 @@ def _get_vertex_model() -> Optional[object]:
         return _vertex_model
 
     _vertex_init_attempted = True
-    if not vertexai or not GenerativeModel:
+    # The Vertex SDK takes seconds to import; only pay for it on the first paid fallback
+    try:
+        import vertexai
+        from vertexai.generative_models import GenerativeModel
+    except Exception:
         return None
 
     try:
@@ -51,7 +49,8 @@ def _get_vertex_model() -> Optional[object]:
     return _vertex_model
 
 
-def ollama_generate(prompt: str, system: Optional[str] = None) -> str:
+def ollama_generate(prompt: str, system: Optional[str] = None, usage_out: Optional[dict] = None,
+                    format=None) -> str:
     payload = {
         "model": OLLAMA_MODEL,
         "prompt": prompt,
@@ -60,71 +59,101 @@ def ollama_generate(prompt: str, system: Optional[str] = None) -> str:
     }
     if system:
         payload["system"] = system
+    if format:
+        payload["format"] = format  # "json" or a JSON schema (constrained decoding)
 
-    response = requests.post(
+    response = _pooled_post(
+        "ollama",
         f"{OLLAMA_HOST}/api/generate",
         json=payload,
         timeout=120,
     )
     response.raise_for_status()
     data = response.json()
+    if usage_out is not None:
+        usage_out.update(prompt_tokens=data.get("prompt_eval_count"), completion_tokens=data.get("eval_count"))
     text = (data.get("response") or "").strip()
     if not text:
         raise RuntimeError("Ollama returned an empty response")
     return text
 
 
-def vertex_generate(prompt: str) -> str:
+def vertex_generate(prompt: str, usage_out: Optional[dict] = None, json_mode: bool = False) -> str:
     model = _get_vertex_model()
     if not model:
         raise RuntimeError("Vertex AI not initialized")
-    response = model.generate_content(prompt)
+    if json_mode:
+        response = model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
+    else:
+        response = model.generate_content(prompt)
+    meta = getattr(response, "usage_metadata", None)
+    if usage_out is not None and meta is not None:
+        usage_out.update(prompt_tokens=meta.prompt_token_count, completion_tokens=meta.candidates_token_count)
     return response.text.strip()
 
 
-def generate_text(prompt: str, system: Optional[str] = None) -> str:
+def generate_text(prompt: str, system: Optional[str] = None, unified: bool = True, format=None) -> str:
     """
     Legacy entry point. Now delegates to the unified client (cyberhound.llm)
     for consistency with the Next.js side (OpenClaw → DeepSeek priority).
     Falls back to old providers for full flexibility.
+
+    The unified client passes unified=False when it falls back here, so a
+    dead provider chain does not bounce between the two until RecursionError.
+    `format` ("json" or a JSON schema) constrains Ollama / Vertex output.
     """
-    try:
-        from ..llm import ask
-        return ask(prompt, system_prompt=system)
-    except Exception as e:
-        print(f"[llm_router] Unified client unavailable, using legacy: {e}")
+    if unified:
+        try:
+            from ..llm import ask
+            return ask(prompt, system_prompt=system)
+        except Exception as e:
+            print(f"[llm_router] Unified client unavailable, using legacy: {e}")
 
     # Original legacy logic
     prefer_ollama = AI_PROVIDER in {"auto", "ollama", "ollama-first"}
+    # Record on the enclosing llm.chat call when there is one
+    rec = _telemetry_current() or _telemetry_start("legacy")
+    usage: dict = {}
 
     if prefer_ollama:
         try:
-            return ollama_generate(prompt, system=system)
+            text = ollama_generate(prompt, system=system, usage_out=usage, format=format)
+            rec.finish("ollama", OLLAMA_MODEL, usage)
+            return text
         except Exception as e:
             print(f"Warning: Ollama generation failed: {e}")
+            rec.hop()
             if AI_PROVIDER == "ollama" and DISABLE_PAID_FALLBACKS:
+                rec.fail(e)
                 raise
 
     if not DISABLE_PAID_FALLBACKS:
         try:
-            return vertex_generate(prompt)
+            text = vertex_generate(prompt, usage_out=usage, json_mode=bool(format))
+            rec.finish("vertex", "gemini-1.5-flash-001", usage)
+            return text
         except Exception as e:
             print(f"Warning: Vertex generation failed: {e}")
+            rec.hop()
 
     if not prefer_ollama:
-        return ollama_generate(prompt, system=system)
+        try:
+            text = ollama_generate(prompt, system=system, usage_out=usage, format=format)
+        except Exception as e:
+            rec.fail(e)
+            raise
+        rec.finish("ollama", OLLAMA_MODEL, usage)
+        return text
 
+    rec.fail(RuntimeError("No AI provider available"))
     raise RuntimeError("No AI provider available")
 
 
-def generate_json(prompt: str, system: Optional[str] = None) -> dict:
-    raw = generate_text(prompt, system=system)
-    cleaned = raw.strip()
-    if cleaned.startswith("```json"):
-        cleaned = cleaned[7:]
-    if cleaned.startswith("```"):
-        cleaned = cleaned[3:]
-    if cleaned.endswith("```"):
-        cleaned = cleaned[:-3]
-    cleaned = cleaned.strip()
-    return json.loads(cleaned)
+def generate_json(prompt: str, system: Optional[str] = None, unified: bool = True,
+                  schema: Optional[Dict[str, Any]] = None) -> Any:
+    if unified:
+        # ask_json already ends its chain in the legacy providers below
+        from ..llm import ask_json
+        return ask_json(prompt, system_prompt=system, schema=schema)
+    raw = generate_text(prompt, system=system, unified=False, format=schema or "json")
+    return parse_structured(raw, schema)
@@ -2,14 +2,20 @@
 K-Email Envoy - Korean Market Strike System
 Sends compliance audits with bridge to Korean SaaS platform
 """
-import smtplib
 import os
+import sys
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
 from email import encoders
 from datetime import datetime
 
+try:
+    from cyberhound.smtp_pool import send_message
+except ImportError:  # run from k_120_module/
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from smtp_pool import send_message
+
 # SaaS Platform Bridge URL
 # IMPORTANT: Update this URL after deploying Korean SaaS
 # Get URL from: github.com/brandonlacoste9-tech/Korean-basic-AI-act-
@@ -105,13 +111,9 @@ K-120 AI Compliance Team
     except Exception as e:
         print(f"   ⚠️  PDF generation failed: {e}")
     
-    # Send email
+    # Send email (pooled connection: one handshake for the whole batch strike)
     try:
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(smtp_user, smtp_pass)
-        server.send_message(msg)
-        server.quit()
+        send_message(msg, host='smtp.gmail.com', port=587, user=smtp_user, password=smtp_pass)
         
         print(f"✅ K-STRIKE DELIVERED: {company_name}")
         print(f"   Bridge URL included: {KOREAN_SAAS_URL}")
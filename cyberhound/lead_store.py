@@ -0,0 +1,548 @@
+"""
+Lead Store — indexed SQLite pipeline shared by every engine
+===========================================================
+Replaces the PIPELINE_LEADS.json flat file that autonomy_engine,
+autonomy_engine_v2 and bridge each loaded, scanned and rewrote in full
+(indent=2) for every single change.
+
+  • One row per lead (JSON document) keyed by id, with a unique index on the
+    website's registrable domain (domains.registrable_domain: scheme, www.,
+    subdomains and paths ignored) — add() dedupes in O(log n) instead of a
+    linear scan over website.lower(). Leads on marketplaces, forums and social
+    sites (domains.AGGREGATOR_DOMAINS) are keyed by their listing URL
+    instead, so every upwork job or reddit thread stays its own lead
+  • Negative cache — domains we discarded or that bounced are kept in
+    blocked_domains, so filter_new() drops them (and already-known domains)
+    from scout results before any LLM scoring is spent on them. On an
+    aggregator only the listing is blocked, never the whole site
+  • Status index — each lead's pipeline statuses (see STATUSES) are derived on
+    write and stored in lead_status, so get_leads_by_status() is an index range
+    scan instead of reload + rescan
+  • update() touches one row; transaction() groups writes (BEGIN IMMEDIATE,
+    safe across processes via WAL). A write that would move a lead onto a
+    domain another lead holds raises DomainTaken and changes nothing
+  • Change tracking — every write marks the lead dirty; lead_sync's
+    write-behind flusher pushes dirty leads to Supabase and marks them clean
+  • One-shot migration: on first open, an existing PIPELINE_LEADS.json is
+    imported (duplicate websites merged, colliding ids re-issued). The JSON
+    file is left in place as a backup and never read again.
+
+Env vars:
+  LEAD_STORE_PATH  — SQLite file (default: .leads.sqlite)
+
+CLI:
+  python -m cyberhound.lead_store stats
+  python -m cyberhound.lead_store export [PIPELINE_LEADS.json]
+  python -m cyberhound.lead_store migrate [PIPELINE_LEADS.json]   # re-run the import
+"""
+
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from cyberhound.domains import AGGREGATOR_DOMAINS, listing_key, registrable_domain
+except ImportError:  # run as a script from cyberhound/
+    from domains import AGGREGATOR_DOMAINS, listing_key, registrable_domain
+
+LEAD_STORE_PATH = os.getenv("LEAD_STORE_PATH", ".leads.sqlite")
+LEGACY_JSON = "PIPELINE_LEADS.json"
+
+# Derived statuses kept in the lead_status index. Bump STATUS_VERSION when a
+# predicate changes so existing rows are re-indexed on the next open.
+STATUSES: Dict[str, Callable[[dict], bool]] = {
+    # autonomy_engine_v2
+    "pending_enrichment": lambda l: not l.get("icp_score"),
+    "ready_to_strike": lambda l: bool(l.get("pursued") and not l.get("struck") and l.get("email")),
+    "pending_sequence": lambda l: bool(l.get("struck")) and l.get("outcome") is None,
+    # autonomy_engine
+    "unstruck": lambda l: bool(not l.get("struck") and l.get("email")),
+    "missing_email": lambda l: not l.get("email"),
+    # bridge
+    "pending_bridge": lambda l: not l.get("bridged"),
+}
+STATUS_VERSION = 1
+DOMAIN_VERSION = 3  # 1: host minus www.; 2: registrable domain; 3: listing URL on aggregators
+
+
+def domain_key(website: str) -> str:
+    """
+    Canonical dedup key for a website/URL/email: its registrable domain, or
+    on an aggregator site the listing URL (domains.listing_key). '' if none.
+    """
+    domain = registrable_domain(website)
+    return listing_key(website) if domain in AGGREGATOR_DOMAINS else domain
+
+
+class DomainTaken(ValueError):
+    """A write would give a lead the domain key another lead already holds."""
+
+    def __init__(self, lead_id: str, domain: str, owner_id: str):
+        super().__init__(f"lead {lead_id}: domain {domain!r} already belongs to lead {owner_id}")
+        self.lead_id, self.domain, self.owner_id = lead_id, domain, owner_id
+
+
+def new_lead_id() -> str:
+    """lead_<unix ts>_<random>: sortable like the old ids, unique within a second."""
+    return f"lead_{int(time.time())}_{secrets.token_hex(3)}"
+
+
+def statuses_of(lead: dict) -> List[str]:
+    return [name for name, matches in STATUSES.items() if matches(lead)]
+
+
+class LeadStore:
+    """SQLite-backed lead pipeline with domain/id/status indexes."""
+
+    def __init__(self, path: str = LEAD_STORE_PATH, legacy_json: Optional[str] = LEGACY_JSON):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS leads (
+                id         TEXT PRIMARY KEY,
+                domain     TEXT NOT NULL DEFAULT '',
+                data       TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS leads_domain ON leads(domain) WHERE domain <> '';
+            CREATE TABLE IF NOT EXISTS lead_status (
+                status  TEXT NOT NULL,
+                lead_id TEXT NOT NULL,
+                PRIMARY KEY (status, lead_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS lead_status_lead ON lead_status(lead_id);
+            CREATE TABLE IF NOT EXISTS meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS dirty_leads (
+                lead_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS synced (
+                lead_id TEXT PRIMARY KEY,
+                hash    TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS blocked_domains (
+                domain     TEXT PRIMARY KEY,
+                reason     TEXT NOT NULL,
+                blocked_at REAL NOT NULL
+            ) WITHOUT ROWID;
+        """)
+        self._blocked: Optional[set] = None  # in-memory copy for batch filtering
+        with self.transaction():
+            if self._meta("status_version") != str(STATUS_VERSION):
+                self._reindex()
+            if self._meta("domain_version") != str(DOMAIN_VERSION):
+                self._rekey_domains()
+            if self._meta("dirty_tracking") is None:
+                # Stores created before dirty tracking: everything is unsynced
+                self._db.execute("INSERT OR IGNORE INTO dirty_leads(lead_id, version) SELECT id, 1 FROM leads")
+                self._set_meta("dirty_tracking", "1")
+            if legacy_json and self._meta("migrated_from") is None:
+                self._set_meta("migrated_from", legacy_json)
+                if os.path.exists(legacy_json):
+                    self.migrate_json(legacy_json)
+
+    # ── Transactions ────────────────────────────────────────────────────────
+
+    @contextmanager
+    def transaction(self):
+        """Group writes atomically. Nested calls join the outer transaction."""
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self
+                finally:
+                    self._depth -= 1
+                return
+            self._db.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield self
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            finally:
+                self._depth = 0
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self._db.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._meta(key)
+
+    def set_meta(self, key: str, value: str):
+        with self.transaction():
+            self._set_meta(key, value)
+
+    # ── Row I/O ─────────────────────────────────────────────────────────────
+
+    def _index(self, lead_id: str, lead: dict):
+        self._db.execute("DELETE FROM lead_status WHERE lead_id = ?", (lead_id,))
+        self._db.executemany(
+            "INSERT INTO lead_status(status, lead_id) VALUES (?, ?)",
+            [(status, lead_id) for status in statuses_of(lead)],
+        )
+
+    def _write(self, lead: dict, insert: bool):
+        lead_id = str(lead["id"])
+        domain = domain_key(lead.get("website", ""))
+        if domain:
+            owner = self._db.execute(
+                "SELECT id FROM leads WHERE domain = ? AND id <> ?", (domain, lead_id)
+            ).fetchone()
+            if owner:
+                raise DomainTaken(lead_id, domain, owner[0])
+        blob = json.dumps(lead, ensure_ascii=False, default=str)
+        if insert:
+            self._db.execute(
+                "INSERT INTO leads(id, domain, data, updated_at) VALUES (?, ?, ?, ?)",
+                (lead_id, domain, blob, time.time()),
+            )
+        else:
+            self._db.execute(
+                "UPDATE leads SET domain = ?, data = ?, updated_at = ? WHERE id = ?",
+                (domain, blob, time.time(), lead_id),
+            )
+        self._index(lead_id, lead)
+        self._db.execute(
+            "INSERT INTO dirty_leads(lead_id, version) VALUES (?, 1) "
+            "ON CONFLICT(lead_id) DO UPDATE SET version = version + 1",
+            (lead_id,),
+        )
+
+    def _rows(self, sql: str, params: Iterable = ()) -> List[dict]:
+        with self._lock:
+            return [json.loads(data) for (data,) in self._db.execute(sql, tuple(params)).fetchall()]
+
+    def _rekey_domains(self):
+        """
+        Recompute every lead's domain key. Nothing is merged or deleted: when
+        leads now share a key the oldest keeps it and the others are left
+        unkeyed (kept and listed, but not used for dedup).
+        """
+        self._db.execute("DROP INDEX IF EXISTS leads_domain")
+        keep: Dict[str, str] = {}
+        unkeyed: List[str] = []
+        for lead_id, data in self._db.execute("SELECT id, data FROM leads ORDER BY rowid").fetchall():
+            key = domain_key(json.loads(data).get("website", ""))
+            if key and key in keep:
+                unkeyed.append(lead_id)
+                key = ""
+            elif key:
+                keep[key] = lead_id
+            self._db.execute("UPDATE leads SET domain = ? WHERE id = ?", (key, lead_id))
+        self._db.execute("CREATE UNIQUE INDEX IF NOT EXISTS leads_domain ON leads(domain) WHERE domain <> ''")
+        if unkeyed:
+            print(f"[lead_store] ⚠️  {len(unkeyed)} lead(s) share a domain with an older lead and were "
+                  f"left unkeyed: {', '.join(unkeyed[:10])}{' ...' if len(unkeyed) > 10 else ''}")
+        # A block on a whole marketplace/forum came from one listing: lift it
+        sites = sorted(AGGREGATOR_DOMAINS)
+        lifted = self._db.execute(
+            f"DELETE FROM blocked_domains WHERE domain IN ({','.join('?' * len(sites))})", sites
+        ).rowcount
+        if lifted:
+            print(f"[lead_store] ↺ lifted {lifted} site-wide block(s) on aggregator domains")
+        self._blocked = None
+        self._set_meta("domain_version", str(DOMAIN_VERSION))
+
+    def _reindex(self):
+        self._db.execute("DELETE FROM lead_status")
+        for lead_id, data in self._db.execute("SELECT id, data FROM leads").fetchall():
+            self._index(lead_id, json.loads(data))
+        self._set_meta("status_version", str(STATUS_VERSION))
+
+    # ── Lookups ─────────────────────────────────────────────────────────────
+
+    def get(self, lead_id: str) -> Optional[dict]:
+        rows = self._rows("SELECT data FROM leads WHERE id = ?", (str(lead_id),))
+        return rows[0] if rows else None
+
+    def find_by_website(self, website: str) -> Optional[dict]:
+        """Lead with the same domain key as `website` (see domain_key)."""
+        key = domain_key(website)
+        if not key:
+            return None
+        rows = self._rows("SELECT data FROM leads WHERE domain = ?", (key,))
+        return rows[0] if rows else None
+
+    def by_status(self, status: str) -> List[dict]:
+        """Leads currently in a derived status (see STATUSES), oldest first."""
+        if status not in STATUSES:
+            return []
+        return self._rows(
+            "SELECT l.data FROM lead_status s JOIN leads l ON l.id = s.lead_id "
+            "WHERE s.status = ? ORDER BY l.rowid",
+            (status,),
+        )
+
+    def all(self) -> List[dict]:
+        return self._rows("SELECT data FROM leads ORDER BY rowid")
+
+    def recent(self, limit: int) -> List[dict]:
+        """The `limit` most recently added leads, oldest first."""
+        rows = self._rows("SELECT data FROM leads ORDER BY rowid DESC LIMIT ?", (limit,))
+        return rows[::-1]
+
+    def count(self, status: Optional[str] = None) -> int:
+        with self._lock:
+            if status:
+                return self._db.execute(
+                    "SELECT COUNT(*) FROM lead_status WHERE status = ?", (status,)
+                ).fetchone()[0]
+            return self._db.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self.count()
+
+    # ── Negative cache ──────────────────────────────────────────────────────
+
+    def _blocked_set(self) -> set:
+        with self._lock:
+            if self._blocked is None:
+                self._blocked = {d for (d,) in self._db.execute("SELECT domain FROM blocked_domains")}
+            return self._blocked
+
+    def block_domain(self, website: str, reason: str = "discarded"):
+        """Never consider this domain again (discarded by scoring, bounced, ...)."""
+        key = domain_key(website)
+        if not key:
+            return
+        with self.transaction():
+            self._db.execute(
+                "INSERT OR REPLACE INTO blocked_domains(domain, reason, blocked_at) VALUES (?, ?, ?)",
+                (key, reason, time.time()),
+            )
+            self._blocked_set().add(key)
+
+    def unblock_domain(self, website: str):
+        key = domain_key(website)
+        with self.transaction():
+            self._db.execute("DELETE FROM blocked_domains WHERE domain = ?", (key,))
+            self._blocked_set().discard(key)
+
+    def is_blocked(self, website: str) -> bool:
+        # Re-read the table rather than the in-memory set: another process may have blocked it
+        key = domain_key(website)
+        with self._lock:
+            return bool(key) and self._db.execute(
+                "SELECT 1 FROM blocked_domains WHERE domain = ?", (key,)
+            ).fetchone() is not None
+
+    def filter_new(self, items: Iterable[dict], key: str = "website") -> Tuple[List[dict], Dict[str, int]]:
+        """
+        Split scout results into the ones worth scoring. Drops items without a
+        domain, on the negative cache, already in the store, or repeated within
+        the batch. Returns (fresh items, counts per reason).
+        """
+        self._blocked = None  # pick up blocks written by other processes
+        blocked = self._blocked_set()
+        fresh: List[dict] = []
+        seen: set = set()
+        skipped = {"blocked": 0, "known": 0, "duplicate": 0, "no_domain": 0}
+        with self._lock:
+            for item in items:
+                domain = domain_key(item.get(key, ""))
+                if not domain:
+                    skipped["no_domain"] += 1
+                elif domain in blocked:
+                    skipped["blocked"] += 1
+                elif domain in seen:
+                    skipped["duplicate"] += 1
+                elif self._db.execute("SELECT 1 FROM leads WHERE domain = ?", (domain,)).fetchone():
+                    skipped["known"] += 1
+                else:
+                    seen.add(domain)
+                    fresh.append(item)
+        return fresh, skipped
+
+    # ── Writes ──────────────────────────────────────────────────────────────
+
+    def add(self, lead: dict, merge: bool = False, defaults: Optional[dict] = None) -> dict:
+        """
+        Insert a lead unless one with the same domain exists. The existing lead
+        is returned as-is, or with `lead`'s non-empty fields merged in when
+        merge=True. `defaults` only apply to a new lead. A missing or
+        already-taken id is replaced by new_lead_id().
+        """
+        with self.transaction():
+            existing = self.find_by_website(lead.get("website", ""))
+            if existing:
+                if merge:
+                    existing.update({k: v for k, v in lead.items() if v and k != "id"})
+                    self._write(existing, insert=False)
+                return existing
+            lead = {**(defaults or {}), **lead}
+            if not lead.get("id") or self.get(lead["id"]) is not None:
+                lead["id"] = new_lead_id()
+            self._write(lead, insert=True)
+            return lead
+
+    def update(self, lead_id: str, updates: dict) -> Optional[dict]:
+        """
+        Apply `updates` to one lead. Returns the updated lead, or None if unknown.
+        Raises DomainTaken (nothing written) if a new website's domain belongs
+        to another lead.
+        """
+        with self.transaction():
+            lead = self.get(lead_id)
+            if lead is None:
+                return None
+            lead.update(updates)
+            self._write(lead, insert=False)
+            return lead
+
+    def upsert(self, lead: dict) -> dict:
+        """Replace the lead with this id, or add() it when the id is unknown. Raises DomainTaken like update()."""
+        with self.transaction():
+            if self.get(lead["id"]) is None:
+                return self.add(lead, merge=True)
+            self._write(lead, insert=False)
+            return lead
+
+    def delete(self, lead_id: str) -> bool:
+        with self.transaction():
+            for table in ("lead_status", "dirty_leads", "synced"):
+                self._db.execute(f"DELETE FROM {table} WHERE lead_id = ?", (str(lead_id),))
+            return self._db.execute("DELETE FROM leads WHERE id = ?", (str(lead_id),)).rowcount > 0
+
+    # ── Change tracking ─────────────────────────────────────────────────────
+    # Every write adds the lead to dirty_leads (bumping its version). A sink
+    # such as lead_sync.SupabaseFlusher reads a batch with dirty(), pushes it,
+    # then calls mark_clean() with the versions it read, so a lead rewritten
+    # mid-push stays dirty. `synced` keeps the content hash last pushed.
+
+    def dirty(self, limit: int = 100) -> List[Tuple[dict, int]]:
+        """Up to `limit` (lead, version) pairs changed since they were last marked clean."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT l.data, d.version FROM dirty_leads d JOIN leads l ON l.id = d.lead_id "
+                "ORDER BY l.rowid LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [(json.loads(data), version) for data, version in rows]
+
+    def dirty_count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM dirty_leads").fetchone()[0]
+
+    def synced_hashes(self, lead_ids: Iterable[str]) -> Dict[str, str]:
+        ids = [str(i) for i in lead_ids]
+        if not ids:
+            return {}
+        with self._lock:
+            return dict(self._db.execute(
+                f"SELECT lead_id, hash FROM synced WHERE lead_id IN ({','.join('?' * len(ids))})", ids
+            ).fetchall())
+
+    def set_synced(self, hashes: Dict[str, str]):
+        """Record the content hash last pushed (or pulled) for each lead id."""
+        with self.transaction():
+            self._db.executemany(
+                "INSERT OR REPLACE INTO synced(lead_id, hash) VALUES (?, ?)",
+                [(str(k), v) for k, v in hashes.items()],
+            )
+
+    def mark_clean(self, versions: Dict[str, int]):
+        """Drop leads from the dirty set unless they were rewritten after `version`."""
+        with self.transaction():
+            self._db.executemany(
+                "DELETE FROM dirty_leads WHERE lead_id = ? AND version = ?",
+                [(str(k), v) for k, v in versions.items()],
+            )
+
+    # ── Migration / export ──────────────────────────────────────────────────
+
+    def migrate_json(self, path: str = LEGACY_JSON) -> int:
+        """Import a PIPELINE_LEADS.json list. Returns the number of new leads."""
+        try:
+            with open(path) as f:
+                leads = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[lead_store] ⚠️  could not read {path}: {e}")
+            return 0
+        before = self.count()
+        with self.transaction():
+            for lead in leads if isinstance(leads, list) else []:
+                if not isinstance(lead, dict):
+                    continue
+                existing = self.find_by_website(lead.get("website", ""))
+                if existing is None:
+                    self.add(lead)
+                    continue
+                # Duplicate website: the first record wins, later ones only fill gaps
+                missing = {k: v for k, v in lead.items() if v and not existing.get(k)}
+                if missing:
+                    self.update(existing["id"], missing)
+        imported = self.count() - before
+        print(f"[lead_store] 📦 migrated {imported} leads from {path} → {self.path}")
+        return imported
+
+    def export_json(self, path: str = LEGACY_JSON) -> int:
+        leads = self.all()
+        with open(path, "w") as f:
+            json.dump(leads, f, indent=2, default=str)
+        return len(leads)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            by_status = dict(self._db.execute(
+                "SELECT status, COUNT(*) FROM lead_status GROUP BY status"
+            ).fetchall())
+            last = self._db.execute("SELECT MAX(updated_at) FROM leads").fetchone()[0]
+        return {
+            "path": self.path,
+            "leads": self.count(),
+            "statuses": {name: by_status.get(name, 0) for name in STATUSES},
+            "dirty": self.dirty_count(),
+            "blocked_domains": len(self._blocked_set()),
+            "last_write": datetime.fromtimestamp(last).isoformat() if last else None,
+        }
+
+
+_stores: Dict[str, LeadStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: Optional[str] = None) -> LeadStore:
+    """Process-wide store for `path` (default LEAD_STORE_PATH, opened on first use)."""
+    path = path or LEAD_STORE_PATH
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = _stores[path] = LeadStore(path)
+    return store
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    target = sys.argv[2] if len(sys.argv) > 2 else LEGACY_JSON
+    if cmd == "export":
+        print(f"📤 {get_store().export_json(target)} leads written to {target}")
+    elif cmd == "migrate":
+        get_store().migrate_json(target)
+    else:
+        print(json.dumps(get_store().stats(), indent=2))
@@ -0,0 +1,337 @@
+"""
+Lead Sync — two-way sync between Supabase analyst_leads and the lead store
+==========================================================================
+Pull: autonomy_engine used to `select("*")` the whole analyst_leads table on
+every load_leads() call — several times per scout cycle — and re-normalise
+every row. SupabaseMirror pulls only rows changed since the last pull and
+folds them into the local lead store, which serves all reads from its indexes.
+
+  • Cursor   — (updated_at, id) of the newest row seen, kept in the lead
+               store's meta table, so restarts resume where they left off.
+               analyst_leads.updated_at is maintained by a trigger
+               (migration 002) and indexed with id (migration 012).
+  • Paging   — keyset pages of SUPABASE_MIRROR_PAGE_SIZE rows ordered by
+               (updated_at, id); ties on updated_at never repeat or skip rows
+  • Interval — pull() is a no-op for SUPABASE_MIRROR_INTERVAL_SEC after the
+               last pull, so back-to-back load_leads() calls stay local
+  • Deletes  — not visible to a high-water mark; `resync` resets the cursor
+               and re-pulls the table once
+
+Push: save_leads used to upsert the last 5 leads, one request each, on every
+call — older changes never synced and unchanged rows were re-sent forever.
+SupabaseFlusher is a write-behind worker over the store's dirty set:
+
+  • Batches  — up to SUPABASE_FLUSH_BATCH dirty leads per bulk
+               upsert(on_conflict="url"), every SUPABASE_FLUSH_INTERVAL_SEC
+  • Skip     — rows whose payload hash matches the last push (or pull) are
+               marked clean without a request
+  • Retries  — a failed batch is retried SUPABASE_FLUSH_RETRIES times with
+               exponential backoff; if it still fails it stays dirty (on disk)
+               for the next tick or the next process
+  • A lead rewritten while its batch is in flight stays dirty
+
+Env vars:
+  SUPABASE_MIRROR_INTERVAL_SEC — minimum seconds between pulls (default 60)
+  SUPABASE_MIRROR_PAGE_SIZE    — rows per request (default 500)
+  SUPABASE_FLUSH_BATCH         — rows per upsert (default 100)
+  SUPABASE_FLUSH_INTERVAL_SEC  — seconds between background flushes (default 10)
+  SUPABASE_FLUSH_RETRIES       — retries per failed batch (default 3)
+
+Usage:
+    from cyberhound.lead_sync import SupabaseFlusher, SupabaseMirror
+
+    mirror = SupabaseMirror(get_supabase)   # client factory; None = offline
+    mirror.pull()                           # deltas since the cursor
+
+    flusher = SupabaseFlusher(get_supabase)
+    flusher.start()                         # background thread + flush at exit
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    from cyberhound.lead_store import LeadStore, get_store
+except ImportError:  # run as a script from cyberhound/
+    from lead_store import LeadStore, get_store
+
+MIRROR_INTERVAL_SEC = float(os.getenv("SUPABASE_MIRROR_INTERVAL_SEC", 60))
+PAGE_SIZE = int(os.getenv("SUPABASE_MIRROR_PAGE_SIZE", 500))
+FLUSH_BATCH = int(os.getenv("SUPABASE_FLUSH_BATCH", 100))
+FLUSH_INTERVAL_SEC = float(os.getenv("SUPABASE_FLUSH_INTERVAL_SEC", 10))
+FLUSH_RETRIES = int(os.getenv("SUPABASE_FLUSH_RETRIES", 3))
+
+
+def normalize_analyst_lead(row: dict) -> dict:
+    """analyst_leads row → local lead format."""
+    row["name"] = row.get("company") or row.get("title", "Unknown")
+    row["website"] = row.get("url") or ""
+    row["email"] = row.get("contact_email") or (row.get("enriched_data") or {}).get("email", "")
+    row["risk_score"] = row.get("score", 7) or 7
+    row["source"] = row.get("source", "supabase")
+    row["struck"] = row.get("status") in ["sent", "replied"]
+    return row
+
+
+def analyst_lead_payload(lead: dict) -> dict:
+    """Local lead → analyst_leads upsert row (keyed by url)."""
+    status = lead.get("status") or "new"
+    if lead.get("struck") and status not in ("sent", "replied", "converted"):
+        status = "sent"
+    return {
+        "source": lead.get("source", "python_scout"),
+        "title": lead.get("name"),
+        "url": lead.get("website"),
+        "contact_email": lead.get("email"),
+        "status": status,
+        "score": lead.get("risk_score", 50),
+        "pain_point": "Autonomous scout lead",
+        "urgency": "medium",
+        "recommended_service": "CyberHound automation",
+        "personalization_hook": lead.get("name"),
+    }
+
+
+def payload_hash(payload: dict) -> str:
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def merge_remote_lead(store: LeadStore, lead: dict) -> Optional[dict]:
+    """
+    Fold one normalised remote lead into the store; returns the stored lead.
+    analyst_leads holds one row per signal (url UNIQUE), so a row is matched
+    by its remote id first: a lead mirrored earlier takes the remote fields.
+    Otherwise it is matched by domain key — the listing URL on aggregator
+    sites, so upwork/reddit signals never fold into each other — and a lead
+    discovered locally only gains a missing email and the struck flag.
+    """
+    if not lead["website"]:
+        return None
+    existing = store.get(lead["id"]) if lead.get("id") is not None else None
+    if existing is not None:
+        # Remote wins, except that an empty remote value never clears local state
+        # (e.g. struck=True written locally but not yet pushed)
+        return store.update(existing["id"], {
+            k: v for k, v in lead.items() if k != "id" and (v or not existing.get(k))
+        })
+    existing = store.find_by_website(lead["website"])
+    if existing is None:
+        return store.add(lead)
+    updates = {}
+    if not existing.get("email") and lead.get("email"):
+        updates["email"] = lead["email"]
+    if lead.get("struck") and not existing.get("struck"):
+        updates["struck"] = True
+    return store.update(existing["id"], updates) if updates else existing
+
+
+class SupabaseMirror:
+    """Pulls analyst_leads deltas into a LeadStore using an updated_at cursor."""
+
+    def __init__(self, client_factory: Callable[[], object], store: Optional[LeadStore] = None,
+                 table: str = "analyst_leads", interval: float = MIRROR_INTERVAL_SEC,
+                 page_size: int = PAGE_SIZE):
+        self.client_factory = client_factory
+        self._store = store
+        self.table = table
+        self.interval = interval
+        self.page_size = page_size
+        self.cursor_key = f"supabase_cursor:{table}"
+        self._lock = threading.Lock()
+        self._last_pull = 0.0
+        self.stats: Dict[str, int] = {"pulls": 0, "rows": 0, "requests": 0, "skipped": 0}
+
+    @property
+    def store(self) -> LeadStore:
+        # `is not None`: an empty LeadStore is falsy (__len__)
+        return self._store if self._store is not None else get_store()  # opened on first use, not at import
+
+    # ── Cursor ──────────────────────────────────────────────────────────────
+
+    def cursor(self) -> Optional[Dict[str, str]]:
+        raw = self.store.get_meta(self.cursor_key)
+        return json.loads(raw) if raw else None
+
+    def _save_cursor(self, row: dict):
+        self.store.set_meta(self.cursor_key, json.dumps(
+            {"updated_at": row["updated_at"], "id": str(row["id"])}
+        ))
+
+    def reset(self):
+        """Forget the cursor: the next pull re-reads the whole table."""
+        self.store.set_meta(self.cursor_key, "")
+        self._last_pull = 0.0
+
+    # ── Pull ────────────────────────────────────────────────────────────────
+
+    def _page(self, client, cursor: Optional[Dict[str, str]]) -> List[dict]:
+        query = client.table(self.table).select("*")
+        if cursor:
+            ts, last_id = cursor["updated_at"], cursor["id"]
+            query = query.or_(
+                f'updated_at.gt."{ts}",and(updated_at.eq."{ts}",id.gt.{last_id})'
+            )
+        res = query.order("updated_at").order("id").limit(self.page_size).execute()
+        self.stats["requests"] += 1
+        return res.data or []
+
+    def pull(self, force: bool = False) -> int:
+        """Fold rows changed since the cursor into the store. Returns rows applied."""
+        if not force and time.time() - self._last_pull < self.interval:
+            return 0
+        client = self.client_factory()
+        if client is None:
+            return 0
+        with self._lock:
+            if not force and time.time() - self._last_pull < self.interval:
+                return 0  # another thread pulled while we waited
+            applied = 0
+            cursor = self.cursor()
+            try:
+                while True:
+                    rows = self._page(client, cursor)
+                    skipped = self.stats["skipped"]
+                    with self.store.transaction():
+                        for row in rows:
+                            try:
+                                merged = merge_remote_lead(self.store, normalize_analyst_lead(dict(row)))
+                            except (KeyError, TypeError, ValueError) as e:
+                                # Malformed, or its url moved onto another lead's domain
+                                # (DomainTaken): skip it so the cursor still moves past it
+                                print(f"[Supabase leads] ⏭️  row {row.get('id')} skipped: {e}")
+                                self.stats["skipped"] += 1
+                                continue
+                            if merged:  # what Supabase already has — no need to echo it back
+                                self.store.set_synced({merged["id"]: payload_hash(analyst_lead_payload(merged))})
+                        if rows:
+                            self._save_cursor(rows[-1])
+                    applied += len(rows) - (self.stats["skipped"] - skipped)
+                    if len(rows) < self.page_size:
+                        break
+                    cursor = self.cursor()
+            except Exception as e:
+                print(f"[Supabase leads load warn] {e}")
+            self._last_pull = time.time()
+            self.stats["pulls"] += 1
+            self.stats["rows"] += applied
+            return applied
+
+
+class SupabaseFlusher:
+    """Write-behind worker: bulk-upserts the lead store's dirty set to analyst_leads."""
+
+    def __init__(self, client_factory: Callable[[], object], store: Optional[LeadStore] = None,
+                 table: str = "analyst_leads", batch_size: int = FLUSH_BATCH,
+                 interval: float = FLUSH_INTERVAL_SEC, retries: int = FLUSH_RETRIES):
+        self.client_factory = client_factory
+        self._store = store
+        self.table = table
+        self.batch_size = batch_size
+        self.interval = interval
+        self.retries = retries
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats: Dict[str, int] = {"batches": 0, "rows": 0, "skipped": 0, "retries": 0, "failed": 0}
+
+    @property
+    def store(self) -> LeadStore:
+        return self._store if self._store is not None else get_store()
+
+    def _upsert(self, client, rows: List[dict]) -> bool:
+        for attempt in range(self.retries + 1):
+            try:
+                client.table(self.table).upsert(rows, on_conflict="url").execute()
+                return True
+            except Exception as e:
+                if attempt == self.retries:
+                    print(f"[Supabase lead sync warn] {len(rows)} rows failed after "
+                          f"{attempt + 1} attempts: {e}")
+                    return False
+                self.stats["retries"] += 1
+                time.sleep(min(30.0, 2 ** attempt))
+
+    def flush(self) -> int:
+        """Push every dirty lead now. Returns rows upserted."""
+        client = self.client_factory()
+        if client is None:
+            return 0
+        pushed = 0
+        with self._lock:
+            while True:
+                batch = self.store.dirty(self.batch_size)
+                if not batch:
+                    break
+                synced = self.store.synced_hashes(lead["id"] for lead, _ in batch)
+                clean: Dict[str, int] = {}
+                rows: Dict[str, dict] = {}  # url → payload (one row per conflict key)
+                hashes: Dict[str, str] = {}
+                for lead, version in batch:
+                    lead_id = str(lead["id"])
+                    payload = analyst_lead_payload(lead)
+                    digest = payload_hash(payload)
+                    clean[lead_id] = version
+                    if not payload["url"] or synced.get(lead_id) == digest:
+                        self.stats["skipped"] += 1
+                        continue
+                    rows[payload["url"]] = payload
+                    hashes[lead_id] = digest
+                if rows and not self._upsert(client, list(rows.values())):
+                    self.stats["failed"] += 1
+                    break  # stays dirty for the next flush
+                if rows:
+                    self.store.set_synced(hashes)
+                    self.stats["batches"] += 1
+                    self.stats["rows"] += len(rows)
+                    pushed += len(rows)
+                self.store.mark_clean(clean)
+                if len(batch) < self.batch_size:
+                    break
+        return pushed
+
+    def notify(self):
+        """Flush soon instead of waiting for the next interval."""
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[Supabase lead sync warn] {e}")
+
+    def start(self) -> "SupabaseFlusher":
+        """Start the background thread once (no-op without a Supabase client)."""
+        if self._thread is None and self.client_factory() is not None:
+            self._thread = threading.Thread(target=self._run, name="lead-flusher", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+        return self
+
+
+if __name__ == "__main__":
+    import sys
+
+    try:
+        from cyberhound.autonomy_engine import get_supabase
+    except ImportError:
+        sys.exit("run as: python -m cyberhound.lead_sync [pull|resync|cursor|push]")
+
+    mirror = SupabaseMirror(get_supabase)
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "pull"
+    if cmd == "cursor":
+        print(mirror.cursor())
+    elif cmd == "push":
+        print(f"⬆️  {SupabaseFlusher(get_supabase).flush()} leads upserted to analyst_leads")
+    else:
+        if cmd == "resync":
+            mirror.reset()
+        print(f"🔄 {mirror.pull(force=True)} analyst_leads rows applied (cursor {mirror.cursor()})")
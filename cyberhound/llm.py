@@ -9,20 +9,30 @@ Priority (same as web):
 3. Fallback to existing router (Ollama / Vertex) for flexibility
 
 Usage:
-    from cyberhound.llm import chat, ask
+    from cyberhound.llm import chat, ask, achat, aask_json
 
-    text = await chat(...)   # or sync version
-    or
-    text = ask("user prompt", system="...")
+    text = chat(messages)                      # sync
+    text = await achat(messages)               # async (pooled httpx client)
+    text = ask("user prompt", system_prompt="...")
+    for delta in stream_chat(messages): ...    # SSE, break to abort
+    data = await aask_json("user prompt", system_prompt="...", schema={...})  # see llm_json
 
 Both sync and async variants provided.
 """
 
-import json
+import asyncio
 import os
-from typing import Any, Dict, List, Optional
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
 
-import requests
+from .http_pool import post as _pooled_post, apost as _pooled_apost
+from .llm_cache import get_cache, make_key, ttl_for
+from .llm_health import get_health
+from .llm_json import (JSON_RETRIES, StructuredOutputError, adapt_request, correction_messages,
+                       json_schema_format, ollama_format, parse_structured)
+from .llm_stream import acollect, astream_completion, collect, stream_completion
+from .llm_telemetry import CallRecord, active as _telemetry_active, start as _telemetry_start
 
 try:
     from dotenv import load_dotenv
@@ -43,8 +53,15 @@ OLLAMA_BASE = (os.getenv("OLLAMA_HOST") or os.getenv("OLLAMA_BASE_URL") or "http
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
 OLLAMA_ENABLED = bool(os.getenv("OLLAMA_HOST") or os.getenv("OLLAMA_BASE_URL")) or os.getenv("AI_PROVIDER", "").lower() in ("ollama", "local")
 
-# Legacy router (keep for full flexibility)
-from .intelligence.llm_router import generate_text, generate_json as _legacy_generate_json
+# Hedging: once the current provider runs past its p95, race the next one
+HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+
+
+# Legacy router (keep for full flexibility). Imported on first fallback so that
+# `import cyberhound.llm` stays cheap and silent.
+def generate_text(prompt: str, system: Optional[str] = None, unified: bool = True, format=None) -> str:
+    from .intelligence.llm_router import generate_text as _generate_text
+    return _generate_text(prompt, system=system, unified=unified, format=format)
 
 # ---------------------------------------------------------
 # Core chat / ask (OpenAI compatible)
@@ -66,16 +83,15 @@ def _get_deepseek_client():
         "model": "deepseek-chat",
     }
 
-def _call_openai_compatible(
-    messages: List[Dict[str, str]],
+def _build_request(
     base_url: str,
     api_key: str,
     model: str,
-    temperature: float = 0.7,
-    max_tokens: int = 2048,
-    response_format: Optional[Dict] = None,
-    timeout: int = 120,
-) -> str:
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+    response_format: Optional[Dict],
+):
     url = f"{base_url.rstrip('/')}/chat/completions"
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -89,18 +105,106 @@ def _call_openai_compatible(
     }
     if response_format:
         payload["response_format"] = response_format
+    return url, headers, payload
 
-    resp = requests.post(url, headers=headers, json=payload, timeout=timeout)
+def _call_openai_compatible(
+    messages: List[Dict[str, str]],
+    base_url: str,
+    api_key: str,
+    model: str,
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+    response_format: Optional[Dict] = None,
+    timeout: int = 120,
+    provider: str = "openai",
+    stop_when: Optional[Callable[[str], bool]] = None,
+    usage_out: Optional[Dict[str, Any]] = None,
+) -> str:
+    messages, response_format = adapt_request(provider, messages, response_format)
+    url, headers, payload = _build_request(
+        base_url, api_key, model, messages, temperature, max_tokens, response_format
+    )
+    if stop_when:
+        # Stream so the generation can be cut off once the answer is in
+        text, _ = collect(stream_completion(provider, url, headers, payload, timeout, usage_out), stop_when)
+        return text
+    resp = _pooled_post(provider, url, headers=headers, json=payload, timeout=timeout)
     resp.raise_for_status()
     data = resp.json()
+    if usage_out is not None:
+        usage_out.update(data.get("usage") or {})
     return data["choices"][0]["message"]["content"] or ""
 
+async def _acall_openai_compatible(
+    messages: List[Dict[str, str]],
+    base_url: str,
+    api_key: str,
+    model: str,
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+    response_format: Optional[Dict] = None,
+    timeout: int = 120,
+    provider: str = "openai",
+    stop_when: Optional[Callable[[str], bool]] = None,
+    usage_out: Optional[Dict[str, Any]] = None,
+) -> str:
+    messages, response_format = adapt_request(provider, messages, response_format)
+    url, headers, payload = _build_request(
+        base_url, api_key, model, messages, temperature, max_tokens, response_format
+    )
+    if stop_when:
+        text, _ = await acollect(astream_completion(provider, url, headers, payload, timeout, usage_out), stop_when)
+        return text
+    resp = await _pooled_apost(provider, url, headers=headers, json=payload, timeout=timeout)
+    resp.raise_for_status()
+    data = resp.json()
+    if usage_out is not None:
+        usage_out.update(data.get("usage") or {})
+    return data["choices"][0]["message"]["content"] or ""
+
+def _providers() -> List[Dict[str, str]]:
+    """
+    OpenAI-compatible providers in priority order:
+      1. Ollama (if OLLAMA_HOST set or AI_PROVIDER=ollama)
+      2. OpenClaw (dev or OPENCLAW_BASE_URL set)
+      3. DeepSeek (if DEEPSEEK_API_KEY set)
+    """
+    providers: List[Dict[str, str]] = []
+    if OLLAMA_ENABLED:
+        providers.append({
+            "name": "ollama",
+            "label": f"Ollama ({OLLAMA_MODEL})",
+            "base_url": OLLAMA_BASE,
+            "api_key": "ollama",  # Ollama ignores the key
+            "model": OLLAMA_MODEL,
+        })
+    if os.getenv("NODE_ENV") == "development" or bool(os.getenv("OPENCLAW_BASE_URL")):
+        providers.append({"name": "openclaw", "label": "OpenClaw (python)", **_get_openclaw_client()})
+    if DEEPSEEK_KEY:
+        providers.append({"name": "deepseek", "label": "DeepSeek (python)", **_get_deepseek_client()})
+    return providers
+
+def _legacy_prompt(messages: List[Dict[str, str]]):
+    system = next((m["content"] for m in messages if m["role"] == "system"), None)
+    user = next((m["content"] for m in messages if m["role"] == "user"), "")
+    prompt = f"{system}\n\n{user}" if system else user
+    return prompt, system
+
+def _cache_key(messages: List[Dict[str, str]], temperature: float,
+               response_format: Optional[Dict]) -> str:
+    # Any provider in the chain may answer, so the chain itself is the "model"
+    chain = ",".join(f"{p['name']}:{p['model']}" for p in _providers()) or "legacy"
+    return make_key(chain, messages, temperature, response_format)
+
+
 def chat(
     messages: List[Dict[str, str]],
     temperature: float = 0.7,
     max_tokens: int = 2048,
     response_format: Optional[Dict] = None,
     timeout: int = 120,
+    task: Optional[str] = None,
+    stop_when: Optional[Callable[[str], bool]] = None,
 ) -> str:
     """
     Unified chat with Ollama support for fully local/autonomous runs.
@@ -110,64 +214,366 @@ def chat(
       2. OpenClaw
       3. DeepSeek
       4. Legacy router (Ollama/Vertex/etc)
+
+    Pass `task` (e.g. "scout", "find_email") to serve repeats from the
+    response cache for that task's TTL; it also tags the call in
+    llm_telemetry (see `run.py llm-stats`).
+
+    Providers with an open breaker (see llm_health) are skipped, and
+    `timeout` is only the ceiling: each attempt gets a deadline derived from
+    that provider's observed p95. With LLM_HEDGE_ENABLED=true a request still
+    running past p95 is raced against the next provider.
+
+    `stop_when(text)` streams the completion and stops it as soon as the
+    predicate holds (e.g. llm_stream.email_or_not_found).
     """
-    # --- 1. Ollama (local, free, great for autonomous mode) ---
-    if OLLAMA_ENABLED:
-        try:
-            text = _call_openai_compatible(
-                messages,
-                OLLAMA_BASE,
-                "ollama",  # Ollama ignores the key
-                OLLAMA_MODEL,
-                temperature,
-                max_tokens,
-                response_format,
-                timeout,
-            )
-            if text:
-                print(f"[LLM] ✓ Ollama ({OLLAMA_MODEL})")
+    rec = _telemetry_start(task)
+    ttl = ttl_for(task)
+    if ttl:
+        text = get_cache().get_or_call(
+            _cache_key(messages, temperature, response_format), ttl,
+            lambda: _chat_uncached(messages, temperature, max_tokens, response_format, timeout, stop_when, rec),
+        )
+        rec.finish("cache", cached=True)  # no-op when the provider call above already recorded
+        return text
+    return _chat_uncached(messages, temperature, max_tokens, response_format, timeout, stop_when, rec)
+
+
+def _admit(cfg: Dict[str, str]) -> bool:
+    """Ask the provider's breaker for a slot (checked lazily, so a half-open probe is only spent when used)."""
+    if get_health(cfg["name"]).allow_request():
+        return True
+    print(f"[LLM] ⏭  {cfg['label']} skipped (breaker open)")
+    return False
+
+
+def _next_admitted(chain: List[Dict[str, str]], start: int):
+    """Index of the next provider after `start` whose breaker admits a request, else None."""
+    for j in range(start, len(chain)):
+        if _admit(chain[j]):
+            return j
+    return None
+
+
+def _hedge_delay(cfg: Dict[str, str], has_next: bool) -> Optional[float]:
+    if not (HEDGE_ENABLED and has_next):
+        return None
+    return get_health(cfg["name"]).p95()
+
+
+def _timed_call(cfg: Dict[str, str], messages, temperature, max_tokens,
+                response_format, timeout, stop_when=None, usage_out=None) -> str:
+    """One provider attempt; records latency/outcome on the provider's breaker."""
+    health = get_health(cfg["name"])
+    started = time.monotonic()
+    try:
+        text = _call_openai_compatible(
+            messages, cfg["base_url"], cfg["api_key"], cfg["model"],
+            temperature, max_tokens, response_format, health.deadline(timeout),
+            provider=cfg["name"], stop_when=stop_when, usage_out=usage_out,
+        )
+    except Exception:
+        health.record_failure(time.monotonic() - started)
+        raise
+    if not text:
+        health.record_failure(time.monotonic() - started)
+        raise RuntimeError("empty completion")
+    health.record_success(time.monotonic() - started)
+    return text
+
+
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    if _hedge_pool is None:
+        _hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+    return _hedge_pool
+
+
+def _chat_uncached(
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+    response_format: Optional[Dict],
+    timeout: int,
+    stop_when: Optional[Callable[[str], bool]] = None,
+    rec: Optional[CallRecord] = None,
+) -> str:
+    args = (messages, temperature, max_tokens, response_format, timeout, stop_when)
+    rec = rec or _telemetry_start(None)
+    chain = _providers()
+    i = _next_admitted(chain, 0)
+    while i is not None:
+        cfg = chain[i]
+        delay = _hedge_delay(cfg, i + 1 < len(chain))
+        if delay is None:
+            usage: Dict[str, Any] = {}
+            try:
+                text = _timed_call(cfg, *args, usage_out=usage)
+                print(f"[LLM] ✓ {cfg['label']}")
+                rec.finish(cfg["name"], cfg["model"], usage)
                 return text.strip()
-        except Exception as e:
-            print(f"[LLM] Ollama failed: {e}")
+            except Exception as e:
+                print(f"[LLM] {cfg['label']} failed: {e}")
+                rec.hop()
+            i = _next_admitted(chain, i + 1)
+            continue
 
-    # --- 2. OpenClaw ---
-    try_openclaw = (
-        os.getenv("NODE_ENV") == "development"
-        or bool(os.getenv("OPENCLAW_BASE_URL"))
-    )
-    if try_openclaw:
-        try:
-            cfg = _get_openclaw_client()
-            text = _call_openai_compatible(
-                messages, cfg["base_url"], cfg["api_key"], cfg["model"],
-                temperature, max_tokens, response_format, timeout
-            )
-            if text:
-                print("[LLM] ✓ OpenClaw (python)")
+        pool = _get_hedge_pool()
+        usages: Dict[str, Dict[str, Any]] = {cfg["name"]: {}}
+        pending = {pool.submit(_timed_call, cfg, *args, usage_out=usages[cfg["name"]]): cfg}
+        done, _ = wait(list(pending), timeout=delay)
+        if not done:
+            j = _next_admitted(chain, i + 1)
+            if j is not None:
+                hedge = chain[j]
+                print(f"[LLM] ⏱  {cfg['label']} past p95 ({delay:.1f}s) — hedging to {hedge['label']}")
+                usages[hedge["name"]] = {}
+                pending[pool.submit(_timed_call, hedge, *args, usage_out=usages[hedge["name"]])] = hedge
+                i = j
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for fut in done:
+                winner = pending.pop(fut)
+                try:
+                    text = fut.result()
+                except Exception as e:
+                    print(f"[LLM] {winner['label']} failed: {e}")
+                    rec.hop()
+                    continue
+                # The loser keeps running in the pool and still feeds its breaker
+                print(f"[LLM] ✓ {winner['label']}")
+                rec.finish(winner["name"], winner["model"], usages[winner["name"]])
                 return text.strip()
+        i = _next_admitted(chain, i + 1)
+
+    # --- Final fallback ---
+    print("[LLM] Falling back to legacy router")
+    prompt, system = _legacy_prompt(messages)
+    try:
+        with _telemetry_active(rec):  # the router records provider/model/tokens on rec
+            text = generate_text(prompt, system=system, unified=False,
+                                 format=ollama_format(response_format))
+    except Exception as e:
+        rec.fail(e)
+        raise
+    rec.finish("legacy")
+    return text.strip()
+
+
+async def achat(
+    messages: List[Dict[str, str]],
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+    response_format: Optional[Dict] = None,
+    timeout: int = 120,
+    task: Optional[str] = None,
+    stop_when: Optional[Callable[[str], bool]] = None,
+) -> str:
+    """Awaitable chat(): same provider priority and cache, never blocks the event loop."""
+    rec = _telemetry_start(task)
+    ttl = ttl_for(task)
+    if ttl:
+        text = await get_cache().aget_or_call(
+            _cache_key(messages, temperature, response_format), ttl,
+            lambda: _achat_uncached(messages, temperature, max_tokens, response_format, timeout, stop_when, rec),
+        )
+        rec.finish("cache", cached=True)
+        return text
+    return await _achat_uncached(messages, temperature, max_tokens, response_format, timeout, stop_when, rec)
+
+
+async def _atimed_call(cfg: Dict[str, str], messages, temperature, max_tokens,
+                       response_format, timeout, stop_when=None, usage_out=None) -> str:
+    """Awaitable _timed_call(). A cancelled hedge loser is not held against its provider."""
+    health = get_health(cfg["name"])
+    started = time.monotonic()
+    try:
+        text = await _acall_openai_compatible(
+            messages, cfg["base_url"], cfg["api_key"], cfg["model"],
+            temperature, max_tokens, response_format, health.deadline(timeout),
+            provider=cfg["name"], stop_when=stop_when, usage_out=usage_out,
+        )
+    except asyncio.CancelledError:
+        # No verdict either way, but a half-open probe must not stay checked out
+        health.release_probe()
+        raise
+    except Exception:
+        health.record_failure(time.monotonic() - started)
+        raise
+    if not text:
+        health.record_failure(time.monotonic() - started)
+        raise RuntimeError("empty completion")
+    health.record_success(time.monotonic() - started)
+    return text
+
+
+async def _achat_uncached(
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+    response_format: Optional[Dict],
+    timeout: int,
+    stop_when: Optional[Callable[[str], bool]] = None,
+    rec: Optional[CallRecord] = None,
+) -> str:
+    args = (messages, temperature, max_tokens, response_format, timeout, stop_when)
+    rec = rec or _telemetry_start(None)
+    chain = _providers()
+    i = _next_admitted(chain, 0)
+    while i is not None:
+        cfg = chain[i]
+        delay = _hedge_delay(cfg, i + 1 < len(chain))
+        if delay is None:
+            usage: Dict[str, Any] = {}
+            try:
+                text = await _atimed_call(cfg, *args, usage_out=usage)
+                print(f"[LLM] ✓ {cfg['label']}")
+                rec.finish(cfg["name"], cfg["model"], usage)
+                return text.strip()
+            except Exception as e:
+                print(f"[LLM] {cfg['label']} failed: {e}")
+                rec.hop()
+            i = _next_admitted(chain, i + 1)
+            continue
+
+        usages: Dict[str, Dict[str, Any]] = {cfg["name"]: {}}
+        pending = {asyncio.ensure_future(_atimed_call(cfg, *args, usage_out=usages[cfg["name"]])): cfg}
+        done, _ = await asyncio.wait(list(pending), timeout=delay)
+        if not done:
+            j = _next_admitted(chain, i + 1)
+            if j is not None:
+                hedge = chain[j]
+                print(f"[LLM] ⏱  {cfg['label']} past p95 ({delay:.1f}s) — hedging to {hedge['label']}")
+                usages[hedge["name"]] = {}
+                pending[asyncio.ensure_future(_atimed_call(hedge, *args, usage_out=usages[hedge["name"]]))] = hedge
+                i = j
+        try:
+            while pending:
+                done, _ = await asyncio.wait(list(pending), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    winner = pending.pop(task)
+                    try:
+                        text = task.result()
+                    except Exception as e:
+                        print(f"[LLM] {winner['label']} failed: {e}")
+                        rec.hop()
+                        continue
+                    print(f"[LLM] ✓ {winner['label']}")
+                    rec.finish(winner["name"], winner["model"], usages[winner["name"]])
+                    return text.strip()
+        finally:
+            for task in pending:
+                task.cancel()
+        i = _next_admitted(chain, i + 1)
+
+    # Legacy router is sync-only (Vertex SDK) — keep it off the loop
+    print("[LLM] Falling back to legacy router")
+    prompt, system = _legacy_prompt(messages)
+    try:
+        with _telemetry_active(rec):  # to_thread copies the context, so the router sees rec
+            text = await asyncio.to_thread(generate_text, prompt, system=system, unified=False,
+                                           format=ollama_format(response_format))
+    except Exception as e:
+        rec.fail(e)
+        raise
+    rec.finish("legacy")
+    return text.strip()
+
+
+def stream_chat(
+    messages: List[Dict[str, str]],
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+    timeout: int = 120,
+) -> Iterator[str]:
+    """
+    Yield completion text as it streams in (same provider priority as chat()).
+    A provider that fails before its first token falls through to the next;
+    break out of the loop to abort the generation.
+    """
+    chain = _providers()
+    i = _next_admitted(chain, 0)
+    while i is not None:
+        cfg = chain[i]
+        health = get_health(cfg["name"])
+        url, headers, payload = _build_request(
+            cfg["base_url"], cfg["api_key"], cfg["model"], messages, temperature, max_tokens, None
+        )
+        started, streamed = time.monotonic(), False
+        try:
+            for delta in stream_completion(cfg["name"], url, headers, payload, health.deadline(timeout)):
+                streamed = True
+                yield delta
+        except GeneratorExit:
+            # The consumer broke out mid-stream: the provider was answering fine
+            health.record_success(time.monotonic() - started)
+            raise
         except Exception as e:
-            print(f"[LLM] OpenClaw failed: {e}")
+            health.record_failure(time.monotonic() - started)
+            if streamed:
+                raise
+            print(f"[LLM] {cfg['label']} stream failed: {e}")
+            i = _next_admitted(chain, i + 1)
+            continue
+        health.record_success(time.monotonic() - started)
+        return
 
-    # --- 3. DeepSeek ---
-    if DEEPSEEK_KEY:
+    print("[LLM] Falling back to legacy router")
+    prompt, system = _legacy_prompt(messages)
+    yield generate_text(prompt, system=system, unified=False).strip()
+
+
+async def astream_chat(
+    messages: List[Dict[str, str]],
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+    timeout: int = 120,
+) -> AsyncIterator[str]:
+    """Async twin of stream_chat()."""
+    chain = _providers()
+    i = _next_admitted(chain, 0)
+    while i is not None:
+        cfg = chain[i]
+        health = get_health(cfg["name"])
+        url, headers, payload = _build_request(
+            cfg["base_url"], cfg["api_key"], cfg["model"], messages, temperature, max_tokens, None
+        )
+        started, streamed = time.monotonic(), False
         try:
-            cfg = _get_deepseek_client()
-            text = _call_openai_compatible(
-                messages, cfg["base_url"], cfg["api_key"], cfg["model"],
-                temperature, max_tokens, response_format, timeout
-            )
-            if text:
-                print("[LLM] ✓ DeepSeek (python)")
-                return text.strip()
+            async for delta in astream_completion(cfg["name"], url, headers, payload, health.deadline(timeout)):
+                streamed = True
+                yield delta
+        except GeneratorExit:
+            health.record_success(time.monotonic() - started)
+            raise
+        except asyncio.CancelledError:
+            health.release_probe()
+            raise
         except Exception as e:
-            print(f"[LLM] DeepSeek failed: {e}")
+            health.record_failure(time.monotonic() - started)
+            if streamed:
+                raise
+            print(f"[LLM] {cfg['label']} stream failed: {e}")
+            i = _next_admitted(chain, i + 1)
+            continue
+        health.record_success(time.monotonic() - started)
+        return
 
-    # --- 4. Final fallback ---
     print("[LLM] Falling back to legacy router")
-    system = next((m["content"] for m in messages if m["role"] == "system"), None)
-    user = next((m["content"] for m in messages if m["role"] == "user"), "")
-    prompt = f"{system}\n\n{user}" if system else user
-    return generate_text(prompt, system=system).strip()
+    prompt, system = _legacy_prompt(messages)
+    text = await asyncio.to_thread(generate_text, prompt, system=system, unified=False)
+    yield text.strip()
+
+
+def _messages(user_prompt: str, system_prompt: Optional[str]) -> List[Dict[str, str]]:
+    messages: List[Dict[str, str]] = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": user_prompt})
+    return messages
 
 
 def ask(
@@ -176,35 +582,72 @@ def ask(
     **kwargs,
 ) -> str:
     """Convenience single-turn ask (matches web client)."""
-    messages: List[Dict[str, str]] = []
-    if system_prompt:
-        messages.append({"role": "system", "content": system_prompt})
-    messages.append({"role": "user", "content": user_prompt})
-    return chat(messages, **kwargs)
+    return chat(_messages(user_prompt, system_prompt), **kwargs)
+
+
+async def aask(
+    user_prompt: str,
+    system_prompt: Optional[str] = None,
+    **kwargs,
+) -> str:
+    """Awaitable ask()."""
+    return await achat(_messages(user_prompt, system_prompt), **kwargs)
+
+
+def _json_format(schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return json_schema_format(schema) if schema else {"type": "json_object"}
 
 
 def ask_json(
     user_prompt: str,
     system_prompt: Optional[str] = None,
+    schema: Optional[Dict[str, Any]] = None,
     **kwargs,
-) -> dict:
-    """Ask and parse as JSON. Uses response_format when provider supports it."""
-    messages: List[Dict[str, str]] = []
-    if system_prompt:
-        messages.append({"role": "system", "content": system_prompt})
-    messages.append({"role": "user", "content": user_prompt})
+) -> Any:
+    """
+    Ask and parse as JSON. `schema` is enforced by providers that support it,
+    spelled out in the prompt for the rest, and validated on the reply.
 
-    try:
-        raw = chat(messages, response_format={"type": "json_object"}, **kwargs)
-        return json.loads(raw)
-    except Exception:
-        # Fallback: ask legacy to parse
-        prompt = f"{system_prompt}\n\n{user_prompt}" if system_prompt else user_prompt
-        return _legacy_generate_json(prompt, system=system_prompt)
+    Fenced, wrapped or truncated replies are repaired locally (llm_json); only
+    a reply that still fails is retried — once, with the errors fed back.
+    """
+    messages = _messages(user_prompt, system_prompt)
+    response_format = _json_format(schema)
+    raw = chat(messages, response_format=response_format, **kwargs)
+    for attempt in range(JSON_RETRIES + 1):
+        try:
+            return parse_structured(raw, schema)
+        except StructuredOutputError as e:
+            if attempt == JSON_RETRIES:
+                raise
+            print(f"[LLM] Unrepairable JSON ({e}) — asking for a correction")
+            raw = chat(correction_messages(messages, raw, e), response_format=response_format,
+                       **{**kwargs, "temperature": 0.0})
+
+
+async def aask_json(
+    user_prompt: str,
+    system_prompt: Optional[str] = None,
+    schema: Optional[Dict[str, Any]] = None,
+    **kwargs,
+) -> Any:
+    """Awaitable ask_json()."""
+    messages = _messages(user_prompt, system_prompt)
+    response_format = _json_format(schema)
+    raw = await achat(messages, response_format=response_format, **kwargs)
+    for attempt in range(JSON_RETRIES + 1):
+        try:
+            return parse_structured(raw, schema)
+        except StructuredOutputError as e:
+            if attempt == JSON_RETRIES:
+                raise
+            print(f"[LLM] Unrepairable JSON ({e}) — asking for a correction")
+            raw = await achat(correction_messages(messages, raw, e), response_format=response_format,
+                              **{**kwargs, "temperature": 0.0})
 
 
 # Backwards compat exports
 generate = ask
 generate_json = ask_json
-
-print("[cyberhound.llm] Unified LLM client loaded (Ollama → OpenClaw → DeepSeek → legacy)")
\ No newline at end of file
+agenerate = aask
+agenerate_json = aask_json
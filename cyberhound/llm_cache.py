@@ -0,0 +1,302 @@
+"""
+LLM Response Cache — persistent, content-addressed, shared across processes
+===========================================================================
+Sits in front of hermes_client._call_api and cyberhound.llm.chat so that
+score_lead / research_market / find_email / analyze_reply calls repeated by
+scout cycles, task_runner retries or hermes_worker re-runs are answered from
+disk instead of the provider.
+
+  • Key      — sha256 of (model, messages, temperature, response_format)
+  • TTL      — per task (see TASK_TTLS); tasks without a TTL bypass the cache
+  • Eviction — LRU by last access once LLM_CACHE_MAX_ENTRIES / LLM_CACHE_MAX_MB is exceeded
+  • Singleflight — identical concurrent requests (threads or coroutines) share one upstream call
+
+Env vars:
+  LLM_CACHE_ENABLED      — "false" disables the cache (default: true)
+  LLM_CACHE_PATH         — SQLite file (default: .llm_cache.sqlite)
+  LLM_CACHE_MAX_ENTRIES  — default 5000
+  LLM_CACHE_MAX_MB       — default 64
+  LLM_CACHE_TTL_<TASK>   — TTL override in seconds, e.g. LLM_CACHE_TTL_SCORE_LEAD=3600
+
+CLI:
+  python -m cyberhound.llm_cache stats
+  python -m cyberhound.llm_cache clear
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite")
+MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000))
+MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", 64)) * 1024 * 1024)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Default TTL (seconds) per task. Anything not listed is never cached —
+# e.g. generate_email wants a fresh draft every time.
+TASK_TTLS: Dict[str, int] = {
+    "scout": 1 * HOUR,           # dedupes task_runner retries, fresh each scout cycle
+    "research_market": 3 * DAY,
+    "score_lead": 7 * DAY,
+    "find_email": 30 * DAY,
+    "analyze_reply": 30 * DAY,
+}
+
+COUNTERS = ("hits", "misses", "evictions", "expired", "coalesced")
+
+_MISS = object()
+
+
+class _Flight:
+    """One in-progress upstream call that concurrent threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = _MISS
+
+
+def ttl_for(task: Optional[str]) -> int:
+    """TTL in seconds for a task (0 = do not cache)."""
+    if not task or not CACHE_ENABLED:
+        return 0
+    override = os.getenv(f"LLM_CACHE_TTL_{task.upper()}")
+    if override:
+        return int(override)
+    return TASK_TTLS.get(task, 0)
+
+
+def make_key(
+    model: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    response_format: Optional[Dict] = None,
+) -> str:
+    """Content address for a completion request."""
+    blob = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "temperature": round(float(temperature), 4),
+            "response_format": response_format,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed response cache with TTL, LRU eviction and singleflight."""
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = MAX_ENTRIES,
+                 max_bytes: int = MAX_BYTES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._inflight: Dict[str, _Flight] = {}
+        self._ainflight: Dict[str, asyncio.Future] = {}
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key         TEXT PRIMARY KEY,
+                value       TEXT NOT NULL,
+                size        INTEGER NOT NULL,
+                created_at  REAL NOT NULL,
+                expires_at  REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access);
+            CREATE TABLE IF NOT EXISTS counters (
+                name  TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+
+    # ── Storage ─────────────────────────────────────────────────────────────
+
+    def _bump(self, name: str, n: int = 1):
+        self._db.execute(
+            "INSERT INTO counters(name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, n),
+        )
+
+    def get(self, key: str) -> Any:
+        """Return the cached value or the _MISS sentinel."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._bump("misses")
+                return _MISS
+            value, expires_at = row
+            if expires_at <= now:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._bump("expired")
+                self._bump("misses")
+                return _MISS
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._bump("hits")
+        return json.loads(value)
+
+    def put(self, key: str, value: Any, ttl: int):
+        now = time.time()
+        blob = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries(key, value, size, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now + ttl, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        expired = self._db.execute("DELETE FROM entries WHERE expires_at <= ?", (now,)).rowcount
+        if expired:
+            self._bump("expired", expired)
+
+        count, total = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        evicted = 0
+        for key, size in self._db.execute(
+            "SELECT key, size FROM entries ORDER BY last_access ASC"
+        ).fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            evicted += 1
+        if evicted:
+            self._bump("evictions", evicted)
+
+    # ── Singleflight ────────────────────────────────────────────────────────
+
+    def get_or_call(self, key: str, ttl: int, fn: Callable[[], Any],
+                    cacheable: Callable[[Any], bool] = bool) -> Any:
+        """Return the cached value, or call fn() once for all concurrent callers."""
+        hit = self.get(key)
+        if hit is not _MISS:
+            return hit
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+
+        if not leader:
+            flight.done.wait()
+            with self._lock:
+                self._bump("coalesced")
+            if flight.value is _MISS:
+                return fn()  # leader failed — try on our own
+            return flight.value
+
+        try:
+            value = fn()
+            if cacheable(value):
+                self.put(key, value, ttl)
+            flight.value = value
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    async def aget_or_call(self, key: str, ttl: int, fn: Callable[[], Awaitable[Any]],
+                           cacheable: Callable[[Any], bool] = bool) -> Any:
+        """Awaitable get_or_call(): concurrent coroutines share one upstream call."""
+        hit = self.get(key)
+        if hit is not _MISS:
+            return hit
+
+        loop = asyncio.get_running_loop()
+        fut = self._ainflight.get(key)
+        if fut is not None and fut.get_loop() is loop and not fut.done():
+            with self._lock:
+                self._bump("coalesced")
+            return await asyncio.shield(fut)
+
+        fut = loop.create_future()
+        self._ainflight[key] = fut
+        try:
+            value = await fn()
+            if cacheable(value):
+                self.put(key, value, ttl)
+            fut.set_result(value)
+            return value
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            if self._ainflight.get(key) is fut:
+                del self._ainflight[key]
+
+    # ── Reporting ───────────────────────────────────────────────────────────
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._db.execute("SELECT name, value FROM counters").fetchall())
+            count, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        stats = {name: counters.get(name, 0) for name in COUNTERS}
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({
+            "entries": count,
+            "bytes": total,
+            "hit_rate": round(stats["hits"] / lookups, 3) if lookups else 0.0,
+        })
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM counters")
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache:
+    """Process-wide cache instance (opened on first use)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache()
+    return _cache
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    if cmd == "clear":
+        get_cache().clear()
+        print(f"🧹 LLM cache cleared ({CACHE_PATH})")
+    else:
+        print(json.dumps(get_cache().stats(), indent=2))
@@ -0,0 +1,196 @@
+"""
+LLM Provider Health — circuit breakers and latency tracking per provider
+========================================================================
+cyberhound.llm.chat records every provider attempt here. Each provider keeps
+a rolling window of outcomes, from which we derive:
+
+  • error rate and p50/p95 latency of successful calls
+  • a breaker: closed → open (after repeated failures) → half-open (one probe
+    after a cooldown) → closed again on success, or back to open with a
+    doubled cooldown on failure
+  • a request deadline from observed latency instead of a fixed 120 s
+  • time-to-first-token and tokens/sec of streamed completions (llm_stream)
+
+Env vars:
+  LLM_BREAKER_WINDOW            — outcomes kept per provider (default: 50)
+  LLM_BREAKER_MIN_SAMPLES       — samples before error rate / p95 are trusted (default: 5)
+  LLM_BREAKER_ERROR_RATE        — error rate that opens the breaker (default: 0.5)
+  LLM_BREAKER_CONSECUTIVE       — consecutive failures that open it (default: 3)
+  LLM_BREAKER_COOLDOWN_SEC      — first open period (default: 30, doubles up to LLM_BREAKER_MAX_COOLDOWN_SEC=600)
+  LLM_DEADLINE_MULTIPLIER       — deadline = p95 × this (default: 3)
+  LLM_DEADLINE_MIN_SEC          — floor for derived deadlines (default: 10)
+  LLM_BREAKER_PROBE_TIMEOUT_SEC — a half-open probe never recorded (lost caller)
+                                  is written off after this long (default: 120)
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", 50))
+MIN_SAMPLES = int(os.getenv("LLM_BREAKER_MIN_SAMPLES", 5))
+ERROR_RATE_THRESHOLD = float(os.getenv("LLM_BREAKER_ERROR_RATE", 0.5))
+CONSECUTIVE_FAILURES = int(os.getenv("LLM_BREAKER_CONSECUTIVE", 3))
+COOLDOWN_SEC = float(os.getenv("LLM_BREAKER_COOLDOWN_SEC", 30))
+MAX_COOLDOWN_SEC = float(os.getenv("LLM_BREAKER_MAX_COOLDOWN_SEC", 600))
+DEADLINE_MULTIPLIER = float(os.getenv("LLM_DEADLINE_MULTIPLIER", 3))
+DEADLINE_MIN_SEC = float(os.getenv("LLM_DEADLINE_MIN_SEC", 10))
+PROBE_TIMEOUT_SEC = float(os.getenv("LLM_BREAKER_PROBE_TIMEOUT_SEC", 120))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+class ProviderHealth:
+    """Rolling health state and circuit breaker for one provider."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.cooldown = COOLDOWN_SEC
+        self.consecutive_failures = 0
+        self._outcomes: deque = deque(maxlen=WINDOW)   # (ok, latency)
+        self._streams: deque = deque(maxlen=WINDOW)    # (ttft, tokens_per_sec)
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    # ── Breaker ─────────────────────────────────────────────────────────────
+
+    def allow_request(self) -> bool:
+        """False while the breaker is open (or its half-open probe is still out)."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.time() - self.opened_at < self.cooldown:
+                    return False
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            # HALF_OPEN: let exactly one probe through (a stale one is written off)
+            if self._probe_in_flight and time.time() - self._probe_started < PROBE_TIMEOUT_SEC:
+                return False
+            self._probe_in_flight = True
+            self._probe_started = time.time()
+            return True
+
+    def release_probe(self):
+        """Hand back a half-open probe that ended with no verdict (cancelled call)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self._outcomes.append((True, latency))
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                print(f"[LLM] 🟢 {self.name} breaker closed (probe ok in {latency:.1f}s)")
+            self.state = CLOSED
+            self.cooldown = COOLDOWN_SEC
+            self._probe_in_flight = False
+
+    def record_failure(self, latency: Optional[float] = None):
+        with self._lock:
+            self._outcomes.append((False, latency))
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, MAX_COOLDOWN_SEC)
+                self._trip()
+            elif self.state == CLOSED and self._should_trip():
+                self._trip()
+
+    def _should_trip(self) -> bool:
+        if self.consecutive_failures >= CONSECUTIVE_FAILURES:
+            return True
+        return len(self._outcomes) >= MIN_SAMPLES and self._error_rate() >= ERROR_RATE_THRESHOLD
+
+    def _trip(self):
+        self.state = OPEN
+        self.opened_at = time.time()
+        self._probe_in_flight = False
+        print(f"[LLM] 🔴 {self.name} breaker open for {self.cooldown:.0f}s "
+              f"({self.consecutive_failures} consecutive failures)")
+
+    # ── Latency ─────────────────────────────────────────────────────────────
+
+    def _error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for ok, _ in self._outcomes if not ok) / len(self._outcomes)
+
+    def _latencies(self) -> List[float]:
+        return [lat for ok, lat in self._outcomes if ok and lat is not None]
+
+    def p50(self) -> Optional[float]:
+        with self._lock:
+            return _percentile(self._latencies(), 50)
+
+    def p95(self) -> Optional[float]:
+        """p95 latency once enough successes have been seen, else None."""
+        with self._lock:
+            latencies = self._latencies()
+            if len(latencies) < MIN_SAMPLES:
+                return None
+            return _percentile(latencies, 95)
+
+    def deadline(self, cap: float) -> float:
+        """Timeout for the next call: p95 × multiplier, clamped to [min, cap]."""
+        p95 = self.p95()
+        if p95 is None:
+            return cap
+        return max(DEADLINE_MIN_SEC, min(cap, p95 * DEADLINE_MULTIPLIER))
+
+    # ── Streaming ───────────────────────────────────────────────────────────
+
+    def record_stream(self, ttft: float, tokens: int, generation_sec: float):
+        """One streamed completion: time to first token and decode speed."""
+        tps = tokens / generation_sec if generation_sec > 0 else None
+        with self._lock:
+            self._streams.append((ttft, tps))
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            latencies = self._latencies()
+            ttfts = [t for t, _ in self._streams]
+            rates = [r for _, r in self._streams if r is not None]
+            return {
+                "state": self.state,
+                "samples": len(self._outcomes),
+                "error_rate": round(self._error_rate(), 3),
+                "p50": _percentile(latencies, 50),
+                "p95": _percentile(latencies, 95),
+                "consecutive_failures": self.consecutive_failures,
+                "cooldown_sec": self.cooldown,
+                "ttft_p50": _percentile(ttfts, 50),
+                "ttft_p95": _percentile(ttfts, 95),
+                "tokens_per_sec": round(sum(rates) / len(rates), 1) if rates else None,
+            }
+
+
+_registry: Dict[str, ProviderHealth] = {}
+_registry_lock = threading.Lock()
+
+
+def get_health(provider: str) -> ProviderHealth:
+    health = _registry.get(provider)
+    if health is None:
+        with _registry_lock:
+            health = _registry.setdefault(provider, ProviderHealth(provider))
+    return health
+
+
+def health_report() -> Dict[str, Dict]:
+    """Snapshot of every provider seen by this process."""
+    return {name: h.snapshot() for name, h in list(_registry.items())}
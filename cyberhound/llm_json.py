@@ -0,0 +1,333 @@
+"""
+LLM JSON — structured output: schema-constrained requests, local repair, validation
+===================================================================================
+One layer for every "answer in JSON" call (llm.ask_json, hermes_client.chat_json,
+the legacy router):
+
+  • request side: a JSON schema is sent as an OpenAI-style
+    `response_format: {"type": "json_schema", ...}` to providers that enforce it
+    (Ollama, OpenClaw), as Ollama's native `format` on /api/generate, and as
+    `json_object` + the schema spelled out in the system prompt elsewhere
+    (DeepSeek only supports json_object)
+  • response side: <think> blocks, markdown fences and prose around the JSON are
+    stripped, trailing commas dropped, and output truncated by max_tokens is
+    closed at the last complete element — all locally, no second round trip
+  • the repaired value is coerced (numeric strings, array ↔ {"leads": [...]}
+    wrappers) and validated against the schema; only a value that still does
+    not validate is worth one corrective retry (see correction_messages)
+
+Env vars:
+  LLM_JSON_SCHEMA_PROVIDERS — providers that enforce json_schema natively (default: ollama,openclaw)
+  LLM_JSON_RETRIES          — corrective retries after a failed repair (default: 1)
+
+Usage:
+    from cyberhound.llm_json import json_schema_format, parse_structured
+
+    schema = {"type": "object", "properties": {"leads": {"type": "array"}}, "required": ["leads"]}
+    data = parse_structured(raw_text, schema)
+"""
+
+import json
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SCHEMA_PROVIDERS = {
+    p.strip() for p in os.getenv("LLM_JSON_SCHEMA_PROVIDERS", "ollama,openclaw").split(",") if p.strip()
+}
+JSON_RETRIES = int(os.getenv("LLM_JSON_RETRIES", 1))
+
+MAX_REPAIR_CUTS = 64   # truncation cut points tried, newest first
+MAX_START_TRIES = 3    # "{" / "[" positions tried when prose precedes the JSON
+
+_MISSING = object()
+
+_THINK = re.compile(r"<think>.*?</think>", re.DOTALL)
+_FENCE = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)(?:```|$)", re.DOTALL)
+
+
+class StructuredOutputError(ValueError):
+    """The model's reply could not be repaired into JSON matching the schema."""
+
+    def __init__(self, message: str, raw: str = "", errors: Optional[List[str]] = None):
+        super().__init__(message)
+        self.raw = raw
+        self.errors = errors or []
+
+    def feedback(self) -> str:
+        problems = "; ".join(self.errors[:5]) or str(self)
+        return f"Your previous reply was not valid: {problems}. Reply again with ONLY the corrected JSON."
+
+
+# ── Request side ────────────────────────────────────────────────────────────
+
+def json_schema_format(schema: Dict[str, Any], name: str = "response") -> Dict[str, Any]:
+    """OpenAI-style response_format carrying a JSON schema."""
+    return {"type": "json_schema", "json_schema": {"name": name, "schema": schema}}
+
+
+def schema_of(response_format: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if response_format and response_format.get("type") == "json_schema":
+        return (response_format.get("json_schema") or {}).get("schema")
+    return None
+
+
+def schema_instructions(schema: Dict[str, Any]) -> str:
+    return ("Respond with a single JSON value matching this JSON schema, with no prose or code fences:\n"
+            + json.dumps(schema, separators=(",", ":")))
+
+
+def adapt_request(provider: str, messages: List[Dict[str, str]],
+                  response_format: Optional[Dict[str, Any]]) -> Tuple[List[Dict[str, str]], Optional[Dict]]:
+    """Downgrade json_schema to json_object + prompt instructions for providers that lack it."""
+    schema = schema_of(response_format)
+    if schema is None or provider in SCHEMA_PROVIDERS:
+        return messages, response_format
+    hint = schema_instructions(schema)
+    if messages and messages[0].get("role") == "system":
+        messages = [{**messages[0], "content": f"{messages[0]['content']}\n\n{hint}"}] + messages[1:]
+    else:
+        messages = [{"role": "system", "content": hint}] + messages
+    return messages, {"type": "json_object"}
+
+
+def ollama_format(response_format: Optional[Dict[str, Any]]):
+    """Value for Ollama's native `format` field: the schema, "json", or None."""
+    if not response_format:
+        return None
+    return schema_of(response_format) or "json"
+
+
+def correction_messages(messages: List[Dict[str, str]], raw: str,
+                        error: StructuredOutputError) -> List[Dict[str, str]]:
+    """Conversation for the one corrective retry: the bad reply plus what was wrong with it."""
+    return messages + [
+        {"role": "assistant", "content": raw[-4000:]},
+        {"role": "user", "content": error.feedback()},
+    ]
+
+
+# ── Repair ──────────────────────────────────────────────────────────────────
+
+def _strip_wrappers(text: str) -> str:
+    text = _THINK.sub("", text)
+    if "<think>" in text and "</think>" not in text:
+        text = text.split("<think>", 1)[0]   # reasoning cut off before the answer
+    elif "</think>" in text:
+        text = text.rsplit("</think>", 1)[1]
+    fence = _FENCE.search(text)
+    if fence and fence.group(1).lstrip()[:1] in ("{", "["):
+        return fence.group(1).strip()
+    return text.strip()
+
+
+def _scan(text: str, start: int):
+    """
+    Walk one JSON value from `start`. Returns (end, stack, in_string, cuts):
+    end is the index of the closing bracket (None when truncated), cuts are
+    positions where the text can be cut and still close cleanly.
+    """
+    stack: List[str] = []
+    in_string = escape = False
+    cuts: List[int] = []
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            cuts.append(i + 1)
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                return i, stack, False, cuts
+            cuts.append(i + 1)
+        elif ch == ",":
+            cuts.append(i)
+    return None, stack, in_string, cuts
+
+
+def _drop_trailing_commas(text: str) -> str:
+    out = []
+    in_string = escape = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "," and text[i + 1:].lstrip()[:1] in ("}", "]"):
+            continue
+        out.append(ch)
+    return "".join(out)
+
+
+def _close(fragment: str) -> str:
+    """Append the quotes/brackets a truncated fragment is missing."""
+    fragment = fragment.rstrip().rstrip(",")
+    _, stack, in_string, _ = _scan(fragment, 0)
+    return fragment + ('"' if in_string else "") + "".join(reversed(stack))
+
+
+def _repair_truncated(text: str, cuts: List[int], accept: Optional[Callable[[Any], bool]] = None):
+    """
+    Close a truncated value at the newest cut point that parses (and that
+    `accept` likes, so a half-written last element is dropped, not kept).
+    A cut mid-string is only used as a last resort: "Acm" is not a name.
+    """
+    _, _, in_string, _ = _scan(text, 0)
+    fragments = ([] if in_string else [text]) + [text[:cut] for cut in reversed(cuts[-MAX_REPAIR_CUTS:])]
+    if in_string:
+        fragments.append(text)
+    fallback = _MISSING
+    for fragment in fragments:
+        try:
+            value = json.loads(_drop_trailing_commas(_close(fragment)))
+        except ValueError:
+            continue
+        if accept is None or accept(value):
+            return value
+        if fallback is _MISSING:
+            fallback = value
+    if fallback is not _MISSING:
+        return fallback
+    raise StructuredOutputError("truncated JSON could not be closed", raw=text)
+
+
+def loads_lenient(text: str, accept: Optional[Callable[[Any], bool]] = None) -> Any:
+    """
+    json.loads that tolerates fences, <think> blocks, surrounding prose,
+    trailing commas and truncation. `accept(value)` steers which repair of a
+    truncated reply is kept (parse_structured passes the schema check).
+    """
+    if text is None:
+        raise StructuredOutputError("empty reply")
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    body = _strip_wrappers(text)
+    starts = [m.start() for m in re.finditer(r"[\[{]", body)][:MAX_START_TRIES]
+    if not starts:
+        raise StructuredOutputError("no JSON object or array in reply", raw=text)
+
+    for start in starts:
+        end, _, _, cuts = _scan(body, start)
+        if end is not None:
+            candidate = body[start:end + 1]
+            for attempt in (candidate, _drop_trailing_commas(candidate)):
+                try:
+                    return json.loads(attempt)
+                except ValueError:
+                    continue
+        else:
+            try:
+                return _repair_truncated(body[start:], [c - start for c in cuts], accept)
+            except StructuredOutputError:
+                continue
+    raise StructuredOutputError("reply is not valid JSON", raw=text)
+
+
+# ── Schema ──────────────────────────────────────────────────────────────────
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+def _is_type(value: Any, name: str) -> bool:
+    if name == "integer":
+        return isinstance(value, int) and not isinstance(value, bool)
+    if name == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, _TYPES.get(name, object))
+
+
+def _types(schema: Dict[str, Any]) -> List[str]:
+    t = schema.get("type")
+    return t if isinstance(t, list) else [t] if t else []
+
+
+def coerce(value: Any, schema: Dict[str, Any]) -> Any:
+    """Fix the shape mistakes models make most often, without another call."""
+    types = _types(schema)
+    if "array" in types and isinstance(value, dict):
+        lists = [v for v in value.values() if isinstance(v, list)]
+        if len(lists) == 1:
+            value = lists[0]                      # {"leads": [...]} when a bare array was asked for
+    if "object" in types and isinstance(value, list):
+        arrays = [k for k, s in (schema.get("properties") or {}).items() if "array" in _types(s)]
+        if len(arrays) == 1:
+            value = {arrays[0]: value}            # bare array when {"leads": [...]} was asked for
+    if isinstance(value, str) and ("number" in types or "integer" in types) and "string" not in types:
+        try:
+            number = float(value.strip().rstrip("%"))
+            value = int(number) if "integer" in types or number.is_integer() else number
+        except ValueError:
+            pass
+    if isinstance(value, dict):
+        props = schema.get("properties") or {}
+        value = {k: coerce(v, props[k]) if k in props else v for k, v in value.items()}
+    elif isinstance(value, list) and isinstance(schema.get("items"), dict):
+        value = [coerce(v, schema["items"]) for v in value]
+    return value
+
+
+def validate(value: Any, schema: Dict[str, Any], path: str = "$") -> List[str]:
+    """Errors for the JSON-schema subset we use (type, enum, properties, required, items, bounds)."""
+    errors: List[str] = []
+    types = _types(schema)
+    if types and not any(_is_type(value, t) for t in types):
+        return [f"{path} should be {'/'.join(types)}, got {type(value).__name__}"]
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path} must be one of {schema['enum']}")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if "minimum" in schema and value < schema["minimum"]:
+            errors.append(f"{path} is below {schema['minimum']}")
+        if "maximum" in schema and value > schema["maximum"]:
+            errors.append(f"{path} is above {schema['maximum']}")
+    if isinstance(value, dict):
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}.{key} is required")
+        for key, sub in (schema.get("properties") or {}).items():
+            if key in value:
+                errors.extend(validate(value[key], sub, f"{path}.{key}"))
+    if isinstance(value, list):
+        if "minItems" in schema and len(value) < schema["minItems"]:
+            errors.append(f"{path} needs at least {schema['minItems']} items")
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            errors.append(f"{path} allows at most {schema['maxItems']} items")
+        if isinstance(schema.get("items"), dict):
+            for i, item in enumerate(value):
+                errors.extend(validate(item, schema["items"], f"{path}[{i}]"))
+    return errors
+
+
+def parse_structured(text: str, schema: Optional[Dict[str, Any]] = None) -> Any:
+    """Repair, coerce and validate a reply. Raises StructuredOutputError (a ValueError)."""
+    if not schema:
+        return loads_lenient(text)
+    value = coerce(loads_lenient(text, accept=lambda v: not validate(coerce(v, schema), schema)), schema)
+    errors = validate(value, schema)
+    if errors:
+        raise StructuredOutputError(f"reply does not match schema: {errors[0]}", raw=text, errors=errors)
+    return value
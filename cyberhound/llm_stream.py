@@ -0,0 +1,176 @@
+"""
+LLM Streaming — SSE chat completions with time-to-first-token metrics
+=====================================================================
+OpenAI-compatible providers (Ollama, OpenClaw, DeepSeek, Hermes) stream
+`data: {...}` chunks when the payload carries "stream": true. These helpers
+turn that into plain iterators of text deltas, record time-to-first-token
+and tokens/sec on the provider's health entry (see llm_health), and let the
+caller stop a generation early — closing the response stops the provider
+from spending the rest of its max_tokens budget.
+
+Usage:
+    from cyberhound.llm_stream import stream_completion, collect, email_or_not_found
+
+    for delta in stream_completion("deepseek", url, headers, payload):
+        print(delta, end="")
+
+    text, aborted = collect(stream_completion(...), stop_when=email_or_not_found)
+"""
+
+import json
+import re
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+
+try:
+    from cyberhound.http_pool import stream as _pooled_stream, astream as _pooled_astream
+    from cyberhound.llm_health import get_health
+except ImportError:  # imported flat via sys.path (autonomy_engine_v2, hermes_worker)
+    from http_pool import stream as _pooled_stream, astream as _pooled_astream
+    from llm_health import get_health
+
+StopWhen = Callable[[str], bool]
+
+_DONE = object()
+
+# A complete address: the match must be followed by a delimiter, so a
+# half-streamed "info@acme.co" does not stop the stream before the "m".
+_EMAIL_DONE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+(?=\.?[\s,;:>)\]\"'])")
+
+
+def email_or_not_found(text: str) -> bool:
+    """Stop predicate for find-email prompts: a finished address or NOT_FOUND."""
+    return "NOT_FOUND" in text or bool(_EMAIL_DONE.search(text))
+
+
+class _Meter:
+    """Times one streamed completion and reports it to the provider's health."""
+
+    def __init__(self, provider: str, usage_out: Optional[Dict[str, Any]] = None):
+        self.provider = provider
+        self.usage_out = usage_out
+        self.started = time.monotonic()
+        self.first_token: Optional[float] = None
+        self.chunks = 0
+        self.completion_tokens: Optional[int] = None
+
+    def on_event(self, event: Dict[str, Any]) -> str:
+        usage = event.get("usage")
+        if usage and usage.get("completion_tokens") is not None:
+            self.completion_tokens = usage["completion_tokens"]
+            if self.usage_out is not None:
+                self.usage_out.update(usage)
+        choices = event.get("choices") or []
+        if not choices:
+            return ""
+        delta = (choices[0].get("delta") or {}).get("content") or ""
+        if delta:
+            if self.first_token is None:
+                self.first_token = time.monotonic()
+            self.chunks += 1
+        return delta
+
+    def record(self):
+        if self.first_token is None:
+            return
+        ttft = self.first_token - self.started
+        tokens = self.completion_tokens or self.chunks  # one SSE chunk ≈ one token
+        get_health(self.provider).record_stream(ttft, tokens, time.monotonic() - self.first_token)
+
+
+def _parse_line(line: str):
+    if not line or not line.startswith("data:"):
+        return None
+    data = line[5:].strip()
+    if data == "[DONE]":
+        return _DONE
+    try:
+        return json.loads(data)
+    except ValueError:
+        return None
+
+
+def _stream_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {**payload, "stream": True, "stream_options": {"include_usage": True}}
+
+
+def stream_completion(
+    provider: str,
+    url: str,
+    headers: Dict[str, str],
+    payload: Dict[str, Any],
+    timeout: float = 120,
+    usage_out: Optional[Dict[str, Any]] = None,
+) -> Iterator[str]:
+    """Yield content deltas from a streamed chat completion (usage, if sent, lands in usage_out)."""
+    meter = _Meter(provider, usage_out)
+    resp = _pooled_stream(provider, url, headers=headers, json=_stream_payload(payload), timeout=timeout)
+    try:
+        resp.raise_for_status()
+        for line in resp.iter_lines(decode_unicode=True):
+            event = _parse_line(line)
+            if event is _DONE:
+                break
+            if event is not None:
+                delta = meter.on_event(event)
+                if delta:
+                    yield delta
+    finally:
+        resp.close()
+        meter.record()
+
+
+async def astream_completion(
+    provider: str,
+    url: str,
+    headers: Dict[str, str],
+    payload: Dict[str, Any],
+    timeout: float = 120,
+    usage_out: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[str]:
+    """Async twin of stream_completion() on the shared httpx pool."""
+    meter = _Meter(provider, usage_out)
+    try:
+        async with _pooled_astream(provider, url, headers=headers,
+                                   json=_stream_payload(payload), timeout=timeout) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                event = _parse_line(line)
+                if event is _DONE:
+                    break
+                if event is not None:
+                    delta = meter.on_event(event)
+                    if delta:
+                        yield delta
+    finally:
+        meter.record()
+
+
+def collect(deltas: Iterator[str], stop_when: Optional[StopWhen] = None) -> Tuple[str, bool]:
+    """Join deltas, closing the stream as soon as stop_when(text) is true. Returns (text, aborted)."""
+    text = ""
+    try:
+        for delta in deltas:
+            text += delta
+            if stop_when and stop_when(text):
+                return text, True
+    finally:
+        close = getattr(deltas, "close", None)
+        if close:
+            close()
+    return text, False
+
+
+async def acollect(deltas: AsyncIterator[str], stop_when: Optional[StopWhen] = None) -> Tuple[str, bool]:
+    """Awaitable collect()."""
+    text = ""
+    try:
+        async for delta in deltas:
+            text += delta
+            if stop_when and stop_when(text):
+                return text, True
+    finally:
+        aclose = getattr(deltas, "aclose", None)
+        if aclose:
+            await aclose()
+    return text, False
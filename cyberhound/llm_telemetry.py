@@ -0,0 +1,268 @@
+"""
+LLM Telemetry — per-call-site latency, token usage and cost ledger
+==================================================================
+Every completion through cyberhound.llm, hermes_client and llm_router is
+recorded with the call site that asked for it (the same `task` name the
+response cache uses: scout, score_lead, generate_email, analyze_reply,
+retrospective, ...), plus provider, model, prompt/completion tokens from
+`usage`, latency, retries and fallback hops.
+
+Each record is appended as one JSON line to LLM_TELEMETRY_PATH (shared by
+every worker on the host) and folded into in-process rolling histograms.
+`python run.py llm-stats` aggregates the file into a per-site report.
+
+Env vars:
+  LLM_TELEMETRY_ENABLED  — "false" disables recording (default: true)
+  LLM_TELEMETRY_PATH     — JSONL ledger (default: llm_calls.jsonl)
+  LLM_PRICE_<MODEL>      — "input,output" USD per 1M tokens, e.g. LLM_PRICE_DEEPSEEK_CHAT=0.27,1.10
+
+Usage:
+    from cyberhound.llm_telemetry import start
+
+    rec = start("score_lead")
+    ...
+    rec.finish("deepseek", "deepseek-chat", usage=response["usage"])
+
+CLI:
+    python -m cyberhound.llm_telemetry [--hours 24] [--export stats.jsonl]
+"""
+
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+TELEMETRY_ENABLED = os.getenv("LLM_TELEMETRY_ENABLED", "true").lower() == "true"
+TELEMETRY_PATH = os.getenv("LLM_TELEMETRY_PATH", "llm_calls.jsonl")
+WINDOW = 500  # records kept per site for the in-process rolling view
+
+# Latency histogram bucket upper bounds (seconds)
+BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, float("inf"))
+
+# USD per 1M tokens (input, output). Local models are free.
+PRICES: Dict[str, Tuple[float, float]] = {
+    "deepseek-chat": (0.27, 1.10),
+    "deepseek-reasoner": (0.55, 2.19),
+    "gemini-1.5-flash-001": (0.075, 0.30),
+}
+FREE_PROVIDERS = {"ollama", "cache"}
+
+_write_lock = threading.Lock()
+_rolling: Dict[str, deque] = {}
+_current: contextvars.ContextVar = contextvars.ContextVar("llm_call", default=None)
+
+
+def price_for(provider: str, model: str) -> Tuple[float, float]:
+    if provider in FREE_PROVIDERS:
+        return 0.0, 0.0
+    override = os.getenv("LLM_PRICE_" + re.sub(r"[^A-Z0-9]", "_", (model or "").upper()))
+    if override:
+        inp, out = override.split(",")
+        return float(inp), float(out)
+    return PRICES.get(model or "", (0.0, 0.0))
+
+
+def cost_usd(provider: str, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    inp, out = price_for(provider, model)
+    return (prompt_tokens * inp + completion_tokens * out) / 1_000_000
+
+
+class CallRecord:
+    """One logical LLM call from a call site, possibly spanning retries and provider hops."""
+
+    def __init__(self, site: str):
+        self.site = site
+        self.started = time.monotonic()
+        self.retries = 0
+        self.hops = 0
+        self.done = False
+
+    def retry(self):
+        self.retries += 1
+
+    def hop(self):
+        self.hops += 1
+
+    def finish(self, provider: str, model: str = "", usage: Optional[Dict[str, Any]] = None,
+               ok: bool = True, cached: bool = False, error: str = ""):
+        if self.done:
+            return
+        self.done = True
+        usage = usage or {}
+        prompt_tokens = int(usage.get("prompt_tokens") or 0)
+        completion_tokens = int(usage.get("completion_tokens") or 0)
+        _emit({
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "site": self.site,
+            "provider": provider,
+            "model": model,
+            "ok": ok,
+            "cached": cached,
+            "latency": round(time.monotonic() - self.started, 3),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "retries": self.retries,
+            "hops": self.hops,
+            "cost_usd": round(cost_usd(provider, model, prompt_tokens, completion_tokens), 6),
+            **({"error": error[:200]} if error else {}),
+        })
+
+    def fail(self, error: Exception):
+        self.finish("none", ok=False, error=str(error))
+
+
+def start(site: Optional[str]) -> CallRecord:
+    return CallRecord(site or "untagged")
+
+
+def current() -> Optional[CallRecord]:
+    """The call record of the enclosing llm.chat, if any (used by the legacy router)."""
+    return _current.get()
+
+
+@contextmanager
+def active(record: CallRecord):
+    """Make `record` visible to nested layers (incl. asyncio.to_thread) via current()."""
+    token = _current.set(record)
+    try:
+        yield record
+    finally:
+        _current.reset(token)
+
+
+def _emit(row: Dict[str, Any]):
+    if not TELEMETRY_ENABLED:
+        return
+    with _write_lock:
+        _rolling.setdefault(row["site"], deque(maxlen=WINDOW)).append(row)
+        try:
+            with open(TELEMETRY_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"[telemetry] ⚠️  Could not write {TELEMETRY_PATH}: {e}")
+
+
+# ── Aggregation ─────────────────────────────────────────────────────────────
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _histogram(latencies: List[float]) -> Dict[str, int]:
+    counts = {f"<={b:g}s" if b != float("inf") else ">120s": 0 for b in BUCKETS}
+    keys = list(counts)
+    for lat in latencies:
+        for key, bound in zip(keys, BUCKETS):
+            if lat <= bound:
+                counts[key] += 1
+                break
+    return counts
+
+
+def aggregate(rows: Iterator[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fold call records into one summary row per (site, provider, model)."""
+    groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault((row["site"], row["provider"], row.get("model", "")), []).append(row)
+
+    summary = []
+    for (site, provider, model), items in sorted(groups.items()):
+        latencies = [r["latency"] for r in items if r["ok"]]
+        summary.append({
+            "site": site,
+            "provider": provider,
+            "model": model,
+            "calls": len(items),
+            "errors": sum(1 for r in items if not r["ok"]),
+            "cached": sum(1 for r in items if r.get("cached")),
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "total_sec": round(sum(r["latency"] for r in items), 1),
+            "prompt_tokens": sum(r["prompt_tokens"] for r in items),
+            "completion_tokens": sum(r["completion_tokens"] for r in items),
+            "retries": sum(r["retries"] for r in items),
+            "hops": sum(r["hops"] for r in items),
+            "cost_usd": round(sum(r.get("cost_usd", 0) for r in items), 4),
+            "histogram": _histogram(latencies),
+        })
+    return summary
+
+
+def rolling_stats() -> List[Dict[str, Any]]:
+    """Summary of the last WINDOW calls per site seen by this process."""
+    with _write_lock:
+        rows = [r for window in _rolling.values() for r in window]
+    return aggregate(iter(rows))
+
+
+def read_ledger(path: str = TELEMETRY_PATH, since: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+    """Stream records from the JSONL ledger (skipping torn lines)."""
+    if not os.path.exists(path):
+        return
+    since_iso = since.isoformat(timespec="seconds") if since else ""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            if row.get("ts", "") >= since_iso:
+                yield row
+
+
+def print_report(summary: List[Dict[str, Any]]):
+    if not summary:
+        print("No LLM calls recorded yet.")
+        return
+
+    def fmt(v):
+        return f"{v:.2f}" if isinstance(v, float) else "-"
+
+    print(f"{'SITE':<16} {'PROVIDER':<10} {'MODEL':<20} {'CALLS':>6} {'ERR':>4} "
+          f"{'P50':>6} {'P95':>6} {'TIME(s)':>8} {'TOK IN':>8} {'TOK OUT':>8} {'RETRY':>5} {'HOPS':>5} {'COST $':>8}")
+    for row in summary:
+        print(f"{row['site']:<16} {row['provider']:<10} {row['model'][:20]:<20} {row['calls']:>6} "
+              f"{row['errors']:>4} {fmt(row['p50']):>6} {fmt(row['p95']):>6} {row['total_sec']:>8} "
+              f"{row['prompt_tokens']:>8} {row['completion_tokens']:>8} {row['retries']:>5} "
+              f"{row['hops']:>5} {row['cost_usd']:>8.4f}")
+
+    total_time = sum(r["total_sec"] for r in summary)
+    total_cost = sum(r["cost_usd"] for r in summary)
+    print(f"\n⏱  {total_time:.1f}s in LLM calls  💰 ${total_cost:.4f} spent")
+    by_site: Dict[str, List[float]] = {}
+    for r in summary:
+        acc = by_site.setdefault(r["site"], [0.0, 0.0])
+        acc[0] += r["total_sec"]
+        acc[1] += r["cost_usd"]
+    for site, (secs, cost) in sorted(by_site.items(), key=lambda kv: -kv[1][0]):
+        share = secs / total_time * 100 if total_time else 0
+        print(f"   {site:<16} {share:5.1f}% of time  ${cost:.4f}")
+
+
+def main(args: List[str]):
+    hours = float(args[args.index("--hours") + 1]) if "--hours" in args else None
+    since = datetime.fromtimestamp(time.time() - hours * 3600) if hours else None
+    summary = aggregate(read_ledger(TELEMETRY_PATH, since))
+    print(f"📈 LLM stats ({TELEMETRY_PATH}{f', last {hours:g}h' if hours else ''})\n")
+    print_report(summary)
+    if "--export" in args:
+        out = args[args.index("--export") + 1]
+        with open(out, "w", encoding="utf-8") as f:
+            for row in summary:
+                f.write(json.dumps(row) + "\n")
+        print(f"\n💾 Exported {len(summary)} rows to {out}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    main(sys.argv[1:])
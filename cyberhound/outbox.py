@@ -0,0 +1,469 @@
+"""
+Outbox — durable SQLite spool for outbound email, drained by a worker pool
+==========================================================================
+fire_touch_*, the strikers and the watchdog auto-responders used to send
+inline: a slow SMTP server stalled the whole phase and a crash mid-send lost
+the email. They now enqueue the fully built message here and return at once;
+background workers deliver it through the SMTP pool.
+
+  • Durable — the MIME message is stored in the spool (WAL SQLite) before
+    the producer returns. A job a worker was sending when its process died is
+    picked up again once its lease expires (delivery is at-least-once).
+  • Idempotent — every job has a key, outbox_key(recipient, touch). Enqueueing
+    the same touch for the same recipient twice is a no-op, even after delivery.
+  • Retries with exponential backoff and jitter (OUTBOX_BACKOFF_BASE_SEC ×
+    2^attempt, capped at OUTBOX_BACKOFF_MAX_SEC) on 4xx, disconnects and
+    timeouts. A permanent 5xx, or OUTBOX_MAX_ATTEMPTS failures, marks the job
+    failed.
+  • Per-recipient-domain concurrency cap (OUTBOX_DOMAIN_CONCURRENCY) across
+    every worker and process sharing the spool
+  • Delivery drives the CRM — a job can carry a deal update (stage, notes,
+    drip touch) that is applied only once the message has actually been
+    accepted. It can also carry stages that cancel it (e.g. a Touch 2 still
+    queued when the prospect replies is never sent). The message's
+    Message-ID is indexed against the recipient's deal on delivery, for
+    reply threading.
+  • Failures drive it too — a permanent bounce moves a PROSPECT deal to
+    CLOSED_LOST and a job that ran out of attempts pauses the deal's drip,
+    so the sequence scheduler stops re-claiming it; both are logged to the
+    `outcomes` event log (bounced / undeliverable)
+
+Env vars:
+  OUTBOX_PATH                — SQLite spool (default: .outbox.sqlite)
+  OUTBOX_WORKERS             — delivery threads per process (default: SMTP_POOL_SIZE)
+  OUTBOX_DOMAIN_CONCURRENCY  — in-flight sends per recipient domain (default: 2)
+  OUTBOX_MAX_ATTEMPTS        — attempts before a job is marked failed (default: 8)
+  OUTBOX_BACKOFF_BASE_SEC    — first retry delay (default: 30)
+  OUTBOX_BACKOFF_MAX_SEC     — longest retry delay (default: 3600)
+  OUTBOX_LEASE_SEC           — a claimed job is re-sent if not finished by then (default: 300)
+  OUTBOX_EXIT_DRAIN_SEC      — at exit, wait this long for this process's queued mail (default: 30)
+
+Usage:
+    from cyberhound.outbox import enqueue_email, outbox_key
+
+    enqueue_email(outbox_key("jane@acme.com", "touch_2"), msg, "jane@acme.com",
+                  deal={"email": "jane@acme.com", "name": "Acme", "stage": "PROSPECT",
+                        "notes": "Touch 2 sent", "touch": 2},
+                  skip_stages=["REPLIED", "CALLED", "CLOSED_WON"])
+
+CLI:
+  python -m cyberhound.outbox stats
+  python -m cyberhound.outbox run            # deliver forever (standalone worker)
+  python -m cyberhound.outbox drain          # deliver what is due, then exit
+  python -m cyberhound.outbox retry-failed   # re-queue failed jobs
+"""
+
+import atexit
+import email
+import json
+import os
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from email.message import Message
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from cyberhound.deal_store import email_key, get_deal_store
+    from cyberhound.deal_tracker import Stage, get_deal, record_outbound, upsert_deal
+    from cyberhound.domains import registrable_domain
+    from cyberhound.event_log import get_log
+    from cyberhound.smtp_pool import SMTP_POOL_SIZE, send_message
+except ImportError:  # imported flat via sys.path (autonomy_engine_v2)
+    from deal_store import email_key, get_deal_store
+    from deal_tracker import Stage, get_deal, record_outbound, upsert_deal
+    from domains import registrable_domain
+    from event_log import get_log
+    from smtp_pool import SMTP_POOL_SIZE, send_message
+
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", ".outbox.sqlite")
+OUTBOX_WORKERS = max(1, int(os.getenv("OUTBOX_WORKERS", SMTP_POOL_SIZE)))
+OUTBOX_DOMAIN_CONCURRENCY = max(1, int(os.getenv("OUTBOX_DOMAIN_CONCURRENCY", 2)))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+OUTBOX_BACKOFF_BASE_SEC = float(os.getenv("OUTBOX_BACKOFF_BASE_SEC", 30))
+OUTBOX_BACKOFF_MAX_SEC = float(os.getenv("OUTBOX_BACKOFF_MAX_SEC", 3600))
+OUTBOX_LEASE_SEC = float(os.getenv("OUTBOX_LEASE_SEC", 300))
+OUTBOX_EXIT_DRAIN_SEC = float(os.getenv("OUTBOX_EXIT_DRAIN_SEC", 30))
+OUTBOX_POLL_SEC = 2.0
+
+STATUSES = ("queued", "sending", "sent", "failed", "cancelled")
+
+
+def outbox_key(recipient: str, touch) -> str:
+    """Idempotency key: one job per (recipient, touch)."""
+    return f"{email_key(recipient)}:{touch}"
+
+
+def backoff_delay(attempts: int) -> float:
+    """Delay before retry number `attempts` (1-based): exponential, capped, with jitter."""
+    delay = min(OUTBOX_BACKOFF_BASE_SEC * 2 ** max(0, attempts - 1), OUTBOX_BACKOFF_MAX_SEC)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def is_permanent(error: BaseException) -> bool:
+    """5xx replies (and recipients all refused with 5xx) will not succeed on retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class Outbox:
+    """SQLite-backed outbound email spool."""
+
+    def __init__(self, path: str = OUTBOX_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id              INTEGER PRIMARY KEY,
+                key             TEXT NOT NULL UNIQUE,
+                recipient       TEXT NOT NULL,
+                domain          TEXT NOT NULL,
+                status          TEXT NOT NULL,
+                message         BLOB NOT NULL,
+                deal            TEXT,
+                skip_stages     TEXT,
+                attempts        INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                lease_until     REAL,
+                last_error      TEXT,
+                created_at      REAL NOT NULL,
+                sent_at         REAL
+            );
+            CREATE INDEX IF NOT EXISTS outbox_due ON outbox(status, next_attempt_at);
+            CREATE INDEX IF NOT EXISTS outbox_domain ON outbox(domain, status);
+        """)
+
+    @contextmanager
+    def transaction(self):
+        """BEGIN IMMEDIATE; nested calls join the outer transaction."""
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self
+                finally:
+                    self._depth -= 1
+                return
+            self._db.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield self
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            finally:
+                self._depth = 0
+
+    # ── Producers ───────────────────────────────────────────────────────────
+
+    def enqueue(self, key: str, msg: Message, recipient: str, deal: Optional[dict] = None,
+                skip_stages: Optional[Iterable[str]] = None) -> bool:
+        """Spool a message. Returns False if a job with this key already exists."""
+        now = time.time()
+        with self.transaction():
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO outbox(key, recipient, domain, status, message, deal, skip_stages, "
+                "next_attempt_at, created_at) VALUES (?, ?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (key, recipient, registrable_domain(recipient), msg.as_bytes(),
+                 json.dumps(deal, default=str) if deal else None,
+                 json.dumps([str(getattr(s, "value", s)) for s in skip_stages]) if skip_stages else None,
+                 now, now),
+            )
+            return cur.rowcount > 0
+
+    def exists(self, key: str) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM outbox WHERE key = ?", (key,)).fetchone() is not None
+
+    # ── Workers ─────────────────────────────────────────────────────────────
+
+    def claim(self) -> Optional[dict]:
+        """
+        Lease the most overdue deliverable job whose recipient domain is under
+        its concurrency cap. Expired leases (crashed senders) count as queued.
+        """
+        now = time.time()
+        with self.transaction():
+            row = self._db.execute(
+                """
+                SELECT id, key, recipient, message, deal, skip_stages, attempts FROM outbox o
+                WHERE ((status = 'queued' AND next_attempt_at <= :now)
+                       OR (status = 'sending' AND lease_until <= :now))
+                  AND (SELECT COUNT(*) FROM outbox s
+                       WHERE s.domain = o.domain AND s.status = 'sending' AND s.lease_until > :now) < :cap
+                ORDER BY next_attempt_at LIMIT 1
+                """,
+                {"now": now, "cap": OUTBOX_DOMAIN_CONCURRENCY},
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, key, recipient, message, deal, skip_stages, attempts = row
+            self._db.execute(
+                "UPDATE outbox SET status = 'sending', lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                (now + OUTBOX_LEASE_SEC, job_id),
+            )
+        return {
+            "id": job_id, "key": key, "recipient": recipient, "message": message,
+            "deal": json.loads(deal) if deal else None,
+            "skip_stages": json.loads(skip_stages) if skip_stages else [],
+            "attempts": attempts + 1,
+        }
+
+    def _finish(self, job_id: int, status: str, error: Optional[str] = None, keep_message: bool = False):
+        # Delivered/cancelled messages are dropped; the row stays for idempotency.
+        # Failed ones keep theirs so requeue_failed() can resend them.
+        with self.transaction():
+            self._db.execute(
+                "UPDATE outbox SET status = ?, last_error = ?, lease_until = NULL, "
+                "message = CASE WHEN ? THEN message ELSE X'' END, "
+                "sent_at = CASE WHEN ? = 'sent' THEN ? ELSE sent_at END WHERE id = ?",
+                (status, error, keep_message, status, time.time(), job_id),
+            )
+
+    def complete(self, job_id: int):
+        self._finish(job_id, "sent")
+
+    def cancel(self, job_id: int, reason: str):
+        self._finish(job_id, "cancelled", reason)
+
+    def fail(self, job_id: int, error: str):
+        self._finish(job_id, "failed", error, keep_message=True)
+
+    def retry(self, job_id: int, attempts: int, error: str) -> float:
+        """Re-queue after a transient failure. Returns the delay chosen."""
+        delay = backoff_delay(attempts)
+        with self.transaction():
+            self._db.execute(
+                "UPDATE outbox SET status = 'queued', lease_until = NULL, last_error = ?, "
+                "next_attempt_at = ? WHERE id = ?",
+                (error, time.time() + delay, job_id),
+            )
+        return delay
+
+    def requeue_failed(self) -> int:
+        """Give every failed job a fresh set of attempts."""
+        with self.transaction():
+            return self._db.execute(
+                "UPDATE outbox SET status = 'queued', attempts = 0, next_attempt_at = ? WHERE status = 'failed'",
+                (time.time(),),
+            ).rowcount
+
+    def next_due_at(self) -> Optional[float]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT MIN(CASE status WHEN 'queued' THEN next_attempt_at ELSE lease_until END) "
+                "FROM outbox WHERE status IN ('queued', 'sending')"
+            ).fetchone()[0]
+
+    def in_flight(self) -> int:
+        """Jobs currently leased by a live sender."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = 'sending' AND lease_until > ?", (time.time(),)
+            ).fetchone()[0]
+
+    def pending(self) -> int:
+        """Jobs not yet delivered, failed or cancelled."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status IN ('queued', 'sending')"
+            ).fetchone()[0]
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+            errors = self._db.execute(
+                "SELECT key, last_error FROM outbox WHERE status = 'failed' ORDER BY id DESC LIMIT 5"
+            ).fetchall()
+        next_at = self.next_due_at()
+        return {
+            "path": self.path,
+            **{status: counts.get(status, 0) for status in STATUSES},
+            "next_attempt_in_sec": round(max(0.0, next_at - time.time()), 1) if next_at else None,
+            "recent_failures": [{"key": k, "error": e} for k, e in errors],
+        }
+
+
+
+_outboxes: Dict[str, Outbox] = {}
+_outboxes_lock = threading.Lock()
+
+
+def get_outbox(path: Optional[str] = None) -> Outbox:
+    """Process-wide spool for `path` (default OUTBOX_PATH, opened on first use)."""
+    path = path or OUTBOX_PATH
+    outbox = _outboxes.get(path)
+    if outbox is None:
+        with _outboxes_lock:
+            outbox = _outboxes.get(path)
+            if outbox is None:
+                outbox = _outboxes[path] = Outbox(path)
+    return outbox
+
+
+# ── Delivery workers ────────────────────────────────────────────────────────
+
+_wake = threading.Event()
+_stop = threading.Event()
+_workers: List[threading.Thread] = []
+_workers_lock = threading.Lock()
+_enqueued_here = False
+
+
+def deliver(outbox: Outbox, job: dict) -> str:
+    """Send one claimed job and record the result. Returns its new status."""
+    recipient = job["recipient"]
+    if job["skip_stages"]:
+        deal = get_deal(recipient)
+        if deal and deal.get("stage") in job["skip_stages"]:
+            outbox.cancel(job["id"], f"deal at {deal['stage']}")
+            print(f"[outbox] ⏭️  {job['key']} cancelled — deal already at {deal['stage']}")
+            return "cancelled"
+    msg = email.message_from_bytes(job["message"])
+    try:
+        send_message(msg)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        permanent = is_permanent(e)
+        if permanent or job["attempts"] >= OUTBOX_MAX_ATTEMPTS:
+            outbox.fail(job["id"], error)
+            print(f"[outbox] ❌ {job['key']} failed after {job['attempts']} attempt(s): {error}")
+            try:
+                record_failure(job, error, bounced=permanent)
+            except Exception as e:
+                print(f"[outbox] ⚠️  deal update for {job['key']} failed: {e}")
+            return "failed"
+        delay = outbox.retry(job["id"], job["attempts"], error)
+        print(f"[outbox] ↻ {job['key']} retry in {delay:.0f}s ({error})")
+        return "queued"
+    outbox.complete(job["id"])
+    print(f"[outbox] ✅ delivered {job['key']}")
+    try:
+        record_outbound(msg["Message-ID"], recipient)
+        if job["deal"]:
+            upsert_deal(**job["deal"])
+    except Exception as e:
+        print(f"[outbox] ⚠️  deal update for {job['key']} failed: {e}")
+    return "sent"
+
+
+def record_failure(job: dict, error: str, bounced: bool):
+    """
+    Tell the CRM a job will not be delivered. A bounce (5xx) closes a
+    PROSPECT deal as lost; exhausted retries only pause its drip (a later
+    `retry-failed` delivery reschedules it). Either way an outcome is logged.
+    """
+    recipient = job["recipient"]
+    deal = get_deal(recipient)
+    if bounced and (deal is None and job["deal"] or deal and deal.get("stage") == Stage.PROSPECT):
+        name = (deal or job["deal"]).get("name") or recipient
+        upsert_deal(recipient, name, Stage.CLOSED_LOST, notes=f"Bounced ({job['key']}): {error[:200]}")
+    elif deal and deal.get("next_touch_at"):
+        get_deal_store().update(recipient, {"next_touch_at": None})
+    get_log("outcomes").append({
+        "lead_id": None,
+        "email": recipient,
+        "outcome": "bounced" if bounced else "undeliverable",
+        "notes": f"{job['key']}: {error[:200]}",
+        "logged_at": datetime.now().isoformat(),
+    })
+
+
+def _work():
+    outbox = get_outbox()
+    while not _stop.is_set():
+        try:
+            job = outbox.claim()
+        except Exception as e:
+            print(f"[outbox] ⚠️  claim error: {e}")
+            job = None
+        if job is not None:
+            deliver(outbox, job)
+            continue
+        next_at = outbox.next_due_at()
+        delay = OUTBOX_POLL_SEC if next_at is None else min(max(next_at - time.time(), 0.05), OUTBOX_POLL_SEC)
+        _wake.wait(delay)
+        _wake.clear()
+
+
+def start(workers: int = OUTBOX_WORKERS) -> List[threading.Thread]:
+    """Start the delivery threads for this process (idempotent)."""
+    with _workers_lock:
+        _workers[:] = [t for t in _workers if t.is_alive()]
+        _stop.clear()
+        while len(_workers) < workers:
+            thread = threading.Thread(target=_work, name=f"outbox-{len(_workers)}", daemon=True)
+            thread.start()
+            _workers.append(thread)
+    return list(_workers)
+
+
+def stop():
+    _stop.set()
+    _wake.set()
+
+
+def drain(timeout: float) -> int:
+    """Wait until nothing is due (or `timeout` passes). Returns the jobs still pending."""
+    outbox = get_outbox()
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        next_at = outbox.next_due_at()
+        if not outbox.in_flight() and (next_at is None or next_at > deadline):
+            break
+        time.sleep(0.1)
+    return outbox.pending()
+
+
+def enqueue_email(key: str, msg: Message, recipient: str, deal: Optional[dict] = None,
+                  skip_stages: Optional[Iterable[str]] = None) -> bool:
+    """Spool a message for background delivery. False if `key` was already queued or sent."""
+    global _enqueued_here
+    queued = get_outbox().enqueue(key, msg, recipient, deal=deal, skip_stages=skip_stages)
+    _enqueued_here = True
+    start()
+    _wake.set()
+    return queued
+
+
+@atexit.register
+def _drain_at_exit():
+    if not _enqueued_here or not _workers:
+        return
+    left = drain(OUTBOX_EXIT_DRAIN_SEC)
+    if left:
+        print(f"[outbox] 📮 {left} email(s) still queued in {OUTBOX_PATH} — delivered by the next run")
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    if cmd == "run":
+        start()
+        print(f"[outbox] 📮 {OUTBOX_WORKERS} worker(s) delivering from {OUTBOX_PATH}")
+        while True:
+            time.sleep(60)
+            print(f"[outbox] 💓 {get_outbox().pending()} pending")
+    elif cmd == "drain":
+        start()
+        print(f"[outbox] 📮 {drain(float(sys.argv[2]) if len(sys.argv) > 2 else 300)} pending")
+    elif cmd == "retry-failed":
+        print(f"[outbox] ↻ {get_outbox().requeue_failed()} failed job(s) re-queued")
+        start()
+        drain(300)
+    else:
+        print(json.dumps(get_outbox().stats(), indent=2))
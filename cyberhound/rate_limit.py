@@ -0,0 +1,210 @@
+"""
+Rate Limiter — adaptive token buckets shared across processes
+=============================================================
+One bucket per upstream host (LLM providers pointed at the same host share
+one; limits still come from the provider, see http_pool) or per account
+(smtp:<host>), stored in a small SQLite file, so the autonomy engine,
+task_runner and hermes_worker running side by side draw from the same budget
+instead of each sleeping a fixed 1–5 s between calls.
+
+  • acquire() reserves a token and returns how long to wait for it
+    (reservations queue fairly: tokens may go negative)
+  • penalize() on HTTP 429 / SMTP 421: halve the rate and honour Retry-After
+  • reward() on success: creep the rate back up (AIMD) to the configured ceiling
+
+Env vars:
+  RATE_LIMIT_PATH     — SQLite file (default: .rate_limits.sqlite, relative to the
+                        working directory). Processes only share a budget if they
+                        open the same file: point it at one absolute path for
+                        every worker (daemon, task_runner, hermes_worker)
+  RATE_LIMIT_<KEY>    — "rate_per_sec[,burst]", e.g. RATE_LIMIT_HERMES=2,4
+                        or RATE_LIMIT_SMTP=0.33,1 ("0" disables a bucket)
+
+Usage:
+    from cyberhound.rate_limit import acquire, aacquire, penalize, reward
+
+    acquire("hermes")              # blocks until a token is available
+    await aacquire("smtp")
+    penalize("hermes", retry_after=12)
+    acquire("api.example.com", limits_key="hermes")   # host bucket, hermes limits
+"""
+
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+RATE_LIMIT_PATH = os.getenv("RATE_LIMIT_PATH", ".rate_limits.sqlite")
+
+# Ceiling rate (tokens/sec) and burst per key. Unknown keys are unlimited.
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    "hermes": (2.0, 4.0),
+    "deepseek": (2.0, 4.0),
+    "openclaw": (5.0, 5.0),
+    "smtp": (1 / 3, 1.0),     # one email every ~3 s per SMTP account
+}
+
+MIN_RATE_FRACTION = 0.05   # penalize() never drops below 5% of the ceiling
+RECOVERY_STEP = 0.05       # reward() adds 5% of the ceiling per success
+
+_local = threading.local()
+
+
+def limits_for(key: str) -> Optional[Tuple[float, float]]:
+    """(rate, burst) for a key, or None when it is not rate limited."""
+    base = key.split(":", 1)[0]
+    for name in (key, base):
+        override = os.getenv("RATE_LIMIT_" + re.sub(r"[^A-Z0-9]", "_", name.upper()))
+        if override:
+            parts = [float(p) for p in override.split(",")]
+            if parts[0] <= 0:
+                return None
+            return parts[0], parts[1] if len(parts) > 1 else max(1.0, parts[0])
+    return DEFAULT_LIMITS.get(base)
+
+
+def _db() -> sqlite3.Connection:
+    # One connection per thread; SQLite serialises writers across processes
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(RATE_LIMIT_PATH, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                key           TEXT PRIMARY KEY,
+                tokens        REAL NOT NULL,
+                rate          REAL NOT NULL,
+                updated_at    REAL NOT NULL,
+                blocked_until REAL NOT NULL DEFAULT 0
+            )
+        """)
+        _local.conn = conn
+    return conn
+
+
+def _load(conn: sqlite3.Connection, key: str, ceiling: float, burst: float, now: float):
+    row = conn.execute(
+        "SELECT tokens, rate, updated_at, blocked_until FROM buckets WHERE key = ?", (key,)
+    ).fetchone()
+    if row is None:
+        return burst, ceiling, now, 0.0
+    tokens, rate, updated_at, blocked_until = row
+    rate = min(rate, ceiling)
+    tokens = min(burst, tokens + max(0.0, now - updated_at) * rate)
+    return tokens, rate, now, blocked_until
+
+
+def _store(conn, key, tokens, rate, now, blocked_until):
+    conn.execute(
+        "INSERT OR REPLACE INTO buckets(key, tokens, rate, updated_at, blocked_until) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (key, tokens, rate, now, blocked_until),
+    )
+
+
+def reserve(key: str, cost: float = 1.0, limits_key: Optional[str] = None) -> float:
+    """
+    Take `cost` tokens from the bucket and return the seconds to wait before
+    using them. `limits_key` names the limits when they differ from the bucket.
+    """
+    limits = limits_for(limits_key or key)
+    if not limits:
+        return 0.0
+    ceiling, burst = limits
+    conn = _db()
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        tokens, rate, now, blocked_until = _load(conn, key, ceiling, burst, now)
+        tokens -= cost
+        _store(conn, key, tokens, rate, now, blocked_until)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    wait = -tokens / rate if tokens < 0 else 0.0
+    return max(wait, blocked_until - now, 0.0)
+
+
+def acquire(key: str, cost: float = 1.0, limits_key: Optional[str] = None) -> float:
+    """Block until a token is available. Returns the time waited."""
+    wait = reserve(key, cost, limits_key)
+    if wait > 0:
+        time.sleep(wait)
+    return wait
+
+
+async def aacquire(key: str, cost: float = 1.0, limits_key: Optional[str] = None) -> float:
+    """Awaitable acquire()."""
+    wait = reserve(key, cost, limits_key)
+    if wait > 0:
+        await asyncio.sleep(wait)
+    return wait
+
+
+def penalize(key: str, retry_after: Optional[float] = None, limits_key: Optional[str] = None):
+    """Provider pushed back (429 / 421): halve the rate and pause the bucket."""
+    limits = limits_for(limits_key or key)
+    if not limits:
+        return
+    ceiling, burst = limits
+    conn = _db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        tokens, rate, now, blocked_until = _load(conn, key, ceiling, burst, time.time())
+        rate = max(ceiling * MIN_RATE_FRACTION, rate / 2)
+        pause = retry_after if retry_after is not None else 1 / rate
+        _store(conn, key, min(tokens, 0.0), rate, now, max(blocked_until, now + pause))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    print(f"[rate] 🐢 {key} throttled → {rate:.2f}/s, paused {pause:.1f}s")
+
+
+def reward(key: str, limits_key: Optional[str] = None):
+    """Successful call: additive increase back toward the configured ceiling."""
+    limits = limits_for(limits_key or key)
+    if not limits:
+        return
+    ceiling, burst = limits
+    conn = _db()
+    row = conn.execute("SELECT rate FROM buckets WHERE key = ?", (key,)).fetchone()
+    if row is None or row[0] >= ceiling:
+        return
+    conn.execute(
+        "UPDATE buckets SET rate = MIN(?, rate + ?) WHERE key = ?",
+        (ceiling, ceiling * RECOVERY_STEP, key),
+    )
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds form; HTTP dates fall back to None)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def observe_status(key: str, status: int, retry_after: Optional[str] = None,
+                   limits_key: Optional[str] = None):
+    """Feed an HTTP status back into the bucket."""
+    if status == 429 or (status == 503 and retry_after):
+        penalize(key, retry_after_seconds(retry_after), limits_key)
+    elif status < 400:
+        reward(key, limits_key)
+
+
+def bucket_stats() -> Dict[str, Dict[str, float]]:
+    rows = _db().execute("SELECT key, tokens, rate, blocked_until FROM buckets").fetchall()
+    now = time.time()
+    return {
+        key: {"tokens": round(tokens, 2), "rate": round(rate, 3),
+              "paused_for": round(max(0.0, blocked_until - now), 1)}
+        for key, tokens, rate, blocked_until in rows
+    }
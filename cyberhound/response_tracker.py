@@ -1,23 +1,27 @@
 """
 Response Tracker - Monitors Gmail for target replies
 Completes the autonomous Empire loop
+
+Each check is an incremental imap_sync pass (UID watermark, headers only).
 """
 import imaplib
-import email
-from email.header import decode_header
-import json
-import os
 import time
 from datetime import datetime
 from config import (
     IMAP_SERVER, IMAP_USER, IMAP_PASS,
     TRACKED_DOMAINS, check_config
 )
+try:
+    from cyberhound.event_log import get_log
+    from cyberhound.imap_sync import MailboxSync
+except ImportError:  # run as a script from cyberhound/
+    from event_log import get_log
+    from imap_sync import MailboxSync
 
 class EmpireWatchdog:
     def __init__(self):
         self.tracked_domains = TRACKED_DOMAINS
-        self.log_file = 'Empire_Comms.log'
+        self.comms_log = get_log('comms')
         self.gmail_user = IMAP_USER
         self.gmail_pass = IMAP_PASS
         
@@ -33,31 +37,18 @@ class EmpireWatchdog:
             return None
     
     def check_for_replies(self, mail):
-        """Scan inbox for target replies"""
-        mail.select('inbox')
-        
-        # Search for unread emails
-        _, search_data = mail.search(None, 'UNSEEN')
-        
+        """Scan new mail (since the last check) for target replies"""
         replies_found = []
         
-        for num in search_data[0].split():
-            _, data = mail.fetch(num, '(RFC822)')
-            raw_email = data[0][1]
-            email_message = email.message_from_bytes(raw_email)
-            
-            # Get sender
-            from_header = decode_header(email_message['From'])[0]
-            from_addr = from_header[0]
-            if isinstance(from_addr, bytes):
-                from_addr = from_addr.decode()
-            
-            # Check if from tracked domain
-            for domain in self.tracked_domains:
-                if domain in from_addr.lower():
-                    subject = decode_header(email_message['Subject'])[0][0]
-                    if isinstance(subject, bytes):
-                        subject = subject.decode()
+        with MailboxSync(mail, 'watchdog') as sync:
+            for message in sync.new_messages():
+                from_addr = message.from_addr
+                subject = message.subject
+                
+                # Check if from tracked domain
+                for domain in self.tracked_domains:
+                    if domain not in from_addr.lower():
+                        continue
                     
                     reply = {
                         'timestamp': str(datetime.now()),
@@ -92,19 +83,7 @@ class EmpireWatchdog:
         }
         
         # Append to log
-        if os.path.exists(self.log_file):
-            with open(self.log_file, 'r') as f:
-                try:
-                    logs = json.load(f)
-                except:
-                    logs = []
-        else:
-            logs = []
-        
-        logs.append(log_entry)
-        
-        with open(self.log_file, 'w') as f:
-            json.dump(logs, f, indent=2)
+        self.comms_log.append(log_entry)
     
     def watch(self, interval=60):
         """Main watchdog loop"""
@@ -112,7 +91,7 @@ class EmpireWatchdog:
         print("="*60)
         print(f"👁️  Monitoring: {', '.join(self.tracked_domains)}")
         print(f"🔄 Check interval: {interval} seconds")
-        print(f"📜 Log file: {self.log_file}")
+        print(f"📜 Log file: {self.comms_log.dir}")
         print("="*60)
         print("\nWaiting for target replies... (Ctrl+C to stop)\n")
         
@@ -5,43 +5,37 @@ When a target replies:
   2. Moves deal to REPLIED in deal_tracker
   3. Auto-fires the warm reply email within 5 minutes
   4. Prints a loud alert
+
+watch() waits on IMAP IDLE (imap_idle.watch_mailbox) so a reply is handled
+seconds after it lands, re-IDLEs before the server's 29-minute cutoff,
+reconnects with backoff when the session drops, and falls back to polling
+every `interval` seconds on servers without IDLE.
+
+Each check is an incremental imap_sync pass: only UIDs above the watchdog's
+watermark are fetched, headers only, and nothing is marked read.
+
+A reply is matched to its deal through the thread index (our Message-IDs in
+its In-Reply-To / References), falling back to an exact lookup of the sender
+address — never by domain substring, which could pick the wrong deal when
+several contacts share a domain.
 """
 import imaplib
-import email
-from email.header import decode_header
-import json
-import os
-import time
 from datetime import datetime
+from typing import Optional
 from cyberhound.config import IMAP_SERVER, IMAP_USER, IMAP_PASS, TRACKED_DOMAINS, check_config
-from cyberhound.deal_tracker import upsert_deal, get_deal, Stage, list_deals
-
-LOG_FILE = "Empire_Comms.log"
+from cyberhound.deal_tracker import upsert_deal, find_reply_deal, Stage
+from cyberhound.event_log import get_log
+from cyberhound.imap_idle import IMAP_IDLE, IMAP_TIMEOUT, watch_mailbox
+from cyberhound.imap_sync import MailboxSync
 
 class EmpireWatchdogV2:
     def __init__(self, auto_respond: bool = True):
         self.tracked_domains = TRACKED_DOMAINS
         self.auto_respond = auto_respond
-        self.processed_ids = self._load_processed_ids()
-
-    def _load_processed_ids(self) -> set:
-        """Load already-processed message IDs to avoid duplicate autoresponses"""
-        cache_file = ".watchdog_cache.json"
-        if os.path.exists(cache_file):
-            with open(cache_file) as f:
-                try:
-                    return set(json.load(f))
-                except:
-                    return set()
-        return set()
-
-    def _save_processed_ids(self):
-        with open(".watchdog_cache.json", "w") as f:
-            json.dump(list(self.processed_ids), f)
 
     def connect(self):
         try:
-            mail = imaplib.IMAP4_SSL(IMAP_SERVER)
+            mail = imaplib.IMAP4_SSL(IMAP_SERVER, timeout=IMAP_TIMEOUT)
             mail.login(IMAP_USER, IMAP_PASS)
             print("✅ Watchdog V2 connected to Gmail IMAP")
             return mail
@@ -49,135 +43,95 @@ class EmpireWatchdogV2:
             print(f"❌ Connection failed: {e}")
             return None
 
-    def _decode_str(self, value):
-        if isinstance(value, bytes):
-            return value.decode(errors="replace")
-        return value or ""
-
     def check_for_replies(self, mail) -> list:
-        mail.select("inbox")
-        _, search_data = mail.search(None, "UNSEEN")
         replies_found = []
+        with MailboxSync(mail, "watchdog_v2") as sync:
+            for msg in sync.new_messages():
+                reply = self._handle_message(msg)
+                if reply:
+                    replies_found.append(reply)
+        return replies_found
 
-        for num in search_data[0].split():
-            _, data = mail.fetch(num, "(RFC822)")
-            raw = data[0][1]
-            msg = email.message_from_bytes(raw)
-
-            from_raw = decode_header(msg.get("From", ""))[0]
-            from_addr = self._decode_str(from_raw[0])
-            msg_id = msg.get("Message-ID", str(num))
-
-            # Skip already processed
-            if msg_id in self.processed_ids:
-                continue
-
-            # Check against tracked domains
-            matched_domain = None
-            for domain in self.tracked_domains:
-                if domain.lower() in from_addr.lower():
-                    matched_domain = domain
-                    break
-
-            if not matched_domain:
-                continue
-
-            subject_raw = decode_header(msg.get("Subject", "No Subject"))[0]
-            subject = self._decode_str(subject_raw[0])
-
-            reply = {
-                "timestamp": str(datetime.now()),
-                "from": from_addr,
-                "subject": subject,
-                "domain": matched_domain,
-                "msg_id": msg_id
-            }
-            replies_found.append(reply)
-
-            # Loud alert
-            print("\n" + "🚨"*20)
-            print("  EMPIRE ALERT: TARGET REPLY DETECTED")
-            print("🚨"*20)
-            print(f"  FROM:    {from_addr}")
-            print(f"  SUBJECT: {subject}")
-            print(f"  DOMAIN:  {matched_domain}")
-            print(f"  TIME:    {datetime.now()}")
-            print("🚨"*20 + "\n")
-
-            # Log it
-            self._log(reply)
-
-            # Find matching deal and auto-respond
-            deals = list_deals()
-            matched_deal = next(
-                (d for d in deals if matched_domain.lower() in d["email"].lower()),
-                None
-            )
-
-            if matched_deal:
-                target_email = matched_deal["email"]
-                target_name = matched_deal["name"]
-
-                # Move to REPLIED stage
-                current_stage = matched_deal.get("stage")
-                if current_stage == Stage.PROSPECT:
-                    upsert_deal(target_email, target_name, Stage.REPLIED,
-                                notes=f"Replied {datetime.now().strftime('%Y-%m-%d %H:%M')} | Subject: {subject}")
-
-                # Auto fire response
-                if self.auto_respond and current_stage in [Stage.PROSPECT, Stage.REPLIED]:
-                    print(f"🤖 AUTO-RESPONDING to {target_name}...")
-                    from cyberhound.email_envoy_v2 import fire_reply_autoresponse
-                    fire_reply_autoresponse(target_email, target_name)
-                else:
-                    print(f"ℹ️  Deal already at {current_stage} — skipping auto-response")
-            else:
-                print(f"⚠️  No deal found for domain {matched_domain} — add manually")
+    def _handle_message(self, msg) -> Optional[dict]:
+        from_addr = msg.from_addr
+        msg_id = msg.message_id or f"uid:{msg.uid}"
 
-            self.processed_ids.add(msg_id)
-            self._save_processed_ids()
+        matched_deal = find_reply_deal(msg.in_reply_to, " ".join(msg.references), msg.sender)
+        # Tracked domains still raise an alert for mail from contacts with no deal yet
+        sender_domain = msg.sender.rpartition("@")[2]
+        matched_domain = next((d for d in self.tracked_domains
+                               if sender_domain == d.lower() or sender_domain.endswith("." + d.lower())), None)
 
-        return replies_found
+        if not matched_deal and not matched_domain:
+            return None
+
+        subject = msg.subject or "No Subject"
+
+        reply = {
+            "timestamp": str(datetime.now()),
+            "from": from_addr,
+            "subject": subject,
+            "domain": matched_domain or sender_domain,
+            "msg_id": msg_id,
+            "deal_id": matched_deal["id"] if matched_deal else None
+        }
+
+        # Loud alert
+        print("\n" + "🚨"*20)
+        print("  EMPIRE ALERT: TARGET REPLY DETECTED")
+        print("🚨"*20)
+        print(f"  FROM:    {from_addr}")
+        print(f"  SUBJECT: {subject}")
+        print(f"  DOMAIN:  {matched_domain or sender_domain}")
+        print(f"  TIME:    {datetime.now()}")
+        print("🚨"*20 + "\n")
+
+        # Log it
+        self._log(reply)
+
+        # Auto-respond on the matched deal
+        if matched_deal:
+            target_email = matched_deal["email"]
+            target_name = matched_deal["name"]
+
+            # Move to REPLIED stage
+            current_stage = matched_deal.get("stage")
+            if current_stage == Stage.PROSPECT:
+                upsert_deal(target_email, target_name, Stage.REPLIED,
+                            notes=f"Replied {datetime.now().strftime('%Y-%m-%d %H:%M')} | Subject: {subject}")
+
+            # Auto fire response
+            if self.auto_respond and current_stage in [Stage.PROSPECT, Stage.REPLIED]:
+                print(f"🤖 AUTO-RESPONDING to {target_name}...")
+                from cyberhound.email_envoy_v2 import fire_reply_autoresponse
+                fire_reply_autoresponse(target_email, target_name, reply_to=msg_id)
+            else:
+                print(f"ℹ️  Deal already at {current_stage} — skipping auto-response")
+        else:
+            print(f"⚠️  No deal found for {msg.sender} — add manually")
+
+        return reply
 
     def _log(self, entry: dict):
-        logs = []
-        if os.path.exists(LOG_FILE):
-            with open(LOG_FILE) as f:
-                try:
-                    logs = json.load(f)
-                except:
-                    logs = []
-        logs.append(entry)
-        with open(LOG_FILE, "w") as f:
-            json.dump(logs, f, indent=2)
+        get_log("comms").append(entry)
 
     def watch(self, interval: int = 60):
         print("⚡ EMPIRE WATCHDOG V2 — AUTO-CLOSING ENABLED")
         print("="*60)
         print(f"👁️  Tracking: {', '.join(self.tracked_domains)}")
         print(f"🤖 Auto-respond: {'ON' if self.auto_respond else 'OFF'}")
-        print(f"🔄 Interval: {interval}s")
+        print(f"🔄 Mode: {'IDLE push, ' if IMAP_IDLE else ''}polling fallback every {interval}s")
         print("="*60 + "\n")
 
-        mail = self.connect()
-        if not mail:
-            return
+        def scan(mail):
+            replies = self.check_for_replies(mail)
+            if not replies:
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] Scanning... no new replies")
 
         try:
-            while True:
-                replies = self.check_for_replies(mail)
-                if not replies:
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Scanning... no new replies")
-                time.sleep(interval)
+            watch_mailbox(self.connect, scan, poll_interval=interval, name="watchdog")
         except KeyboardInterrupt:
             print("\n🛑 Watchdog stopped")
-            mail.logout()
-        except Exception as e:
-            print(f"\n⚠️  Watchdog error: {e}")
-            try:
-                mail.logout()
-            except:
-                pass
 
 
 def main():
@@ -11,6 +11,12 @@ Full Autonomous Revenue Mode (bees + pipeline):
 
 Task Queue Worker (for Queen dispatches):
     python -m cyberhound.task_runner --loop
+
+LLM telemetry (latency, tokens, cost per call site):
+    python run.py llm-stats [--hours 24] [--export stats.jsonl]
+
+Startup cost of each subcommand (fresh interpreter, median of N runs):
+    python run.py bench-imports [status task-runner ...] [--runs 5]
 """
 
 import sys
@@ -23,24 +29,40 @@ def main():
 
     if cmd in ("autonomous", "auto", "loop"):
         from cyberhound.autonomy_engine import main_loop, run_scout, enrich_all_leads, run_striker, run_sequence
+        from cyberhound.http_pool import arun
         if "--loop" in args or cmd == "loop":
             print("🚀 Starting FULL AUTONOMOUS LOOP (Ctrl+C to stop)")
-            asyncio.run(main_loop())
+            arun(main_loop())
         else:
             print("🚀 Running one autonomous cycle...")
-            asyncio.run(run_scout())
-            asyncio.run(enrich_all_leads())
-            asyncio.run(run_striker())
-            asyncio.run(run_sequence())
+            arun(run_scout())
+            arun(enrich_all_leads())
+            arun(run_striker())
+            arun(run_sequence())
             print("✅ Autonomous cycle complete.")
         return
 
+    if cmd == "llm-stats":
+        from cyberhound.llm_telemetry import main as llm_stats
+        llm_stats(args)
+        return
+
+    if cmd == "bench-imports":
+        from cyberhound.bench.import_time import main as bench_imports
+        bench_imports(args)
+        return
+
+    if cmd in ("help", "--help", "h"):
+        print(__doc__)
+        return
+
     if cmd == "task-runner":
         from cyberhound.task_runner import run_once, run_loop
+        from cyberhound.http_pool import arun
         if "--loop" in args:
-            asyncio.run(run_loop())
+            arun(run_loop())
         else:
-            asyncio.run(run_once())
+            arun(run_once())
         return
 
     # Default to Hound pack
@@ -58,10 +80,6 @@ def main():
             print("\n👋 Goodbye!")
         return
     
-    if cmd in ("help", "--help", "h"):
-        print(__doc__)
-        return
-    
     # Hound commands
     asyncio.run(manager.run_command(cmd, args))
 
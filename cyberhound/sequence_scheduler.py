@@ -1,85 +1,128 @@
 """
 Sequence Scheduler - Drip Engine
-Run this daily (cron or Railway cron job).
 Automatically fires Touch 2 (Day 3) and Touch 3 (Day 7)
 for any PROSPECT who hasn't replied yet.
+
+Every deal carries touch_stage and next_touch_at in the deal store (indexed),
+so a pass only reads the deals that are due — O(due), not O(all deals) — and
+the daemon sleeps until the next touch is due instead of scanning once a day.
+A touch is claimed (next_touch_at pushed DRIP_RETRY_MIN ahead) before it is
+queued in the outbox, so concurrent schedulers never double-queue. The deal's
+touch_stage advances when the outbox delivers the email; if it has not by the
+time the claim expires, re-queueing is a no-op (same outbox key) and counts as
+skipped, not failed. A touch the
+outbox gives up on takes the deal out of due(): a bounce closes it as lost,
+exhausted retries pause its drip.
+
+Env vars:
+  DRIP_TOUCH_2_DAYS / DRIP_TOUCH_3_DAYS — see deal_store (default 3 / 7)
+  DRIP_RETRY_MIN         — retry a failed touch after this many minutes (default: 30)
+  SEQUENCE_MAX_SLEEP_SEC — longest daemon sleep, so touches scheduled by other
+                           processes are picked up (default: 300)
+
+CLI:
+  python -m cyberhound.sequence_scheduler          # one pass over due touches (cron-compatible)
+  python -m cyberhound.sequence_scheduler daemon   # run forever, waking when a touch is due
 """
-import json
-from datetime import datetime, timedelta
-from cyberhound.deal_tracker import list_deals, Stage
-from cyberhound.email_envoy_v2 import fire_touch_2, fire_touch_3
-
-TOUCH_2_DELAY_DAYS = 3
-TOUCH_3_DELAY_DAYS = 7
-
-def _days_since(date_str: str) -> int:
-    try:
-        created = datetime.fromisoformat(date_str)
-        return (datetime.now() - created).days
-    except:
-        return 0
-
-def _already_sent_touch(deal: dict, touch_num: int) -> bool:
-    """Check history to see if a given touch was already sent"""
-    for h in deal.get("history", []):
-        if f"Touch {touch_num} sent" in h.get("notes", ""):
-            return True
-    if f"Touch {touch_num} sent" in deal.get("notes", ""):
-        return True
-    return False
-
-def run_sequence():
-    print("⚡ SEQUENCE SCHEDULER — DRIP ENGINE")
-    print("="*60)
-    print(f"🕐 Running at {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-    print()
+import os
+import threading
+import time
+from datetime import datetime
+from cyberhound.deal_store import get_deal_store, next_touch
+from cyberhound.email_envoy_v2 import already_queued, fire_touch_2, fire_touch_3
+
+DRIP_RETRY_MIN = float(os.getenv("DRIP_RETRY_MIN", "30"))
+SEQUENCE_MAX_SLEEP_SEC = float(os.getenv("SEQUENCE_MAX_SLEEP_SEC", "300"))
+SEQUENCE_BATCH = 100
+
+TOUCHES = {2: fire_touch_2, 3: fire_touch_3}
 
-    prospects = list_deals(stage=Stage.PROSPECT)
-    print(f"📋 Active PROSPECTS: {len(prospects)}")
+_stop = threading.Event()
+_thread = None
+_thread_lock = threading.Lock()
 
-    touch2_sent = 0
-    touch3_sent = 0
+def _when(ts) -> str:
+    return datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M') if ts else "—"
+
+def run_sequence(quiet: bool = False) -> dict:
+    """Fire every touch that is due now. Returns counts per touch."""
+    store = get_deal_store()
+    queued = {touch: 0 for touch in TOUCHES}
+    failed = 0
     skipped = 0
 
-    for deal in prospects:
-        email = deal["email"]
-        name = deal["name"]
-        days = _days_since(deal["created_at"])
+    due = store.due(limit=SEQUENCE_BATCH)
+    if not due:
+        if not quiet:
+            print(f"⚡ SEQUENCE — no touches due (next: {_when(store.next_due_at())})")
+        return {"queued": queued, "failed": failed, "skipped": skipped}
 
-        print(f"\n  → {name} ({email}) — Day {days}")
+    print("⚡ SEQUENCE SCHEDULER — DRIP ENGINE")
+    print("="*60)
+    print(f"🕐 Running at {datetime.now().strftime('%Y-%m-%d %H:%M')}")
 
-        # Touch 3: Day 7+
-        if days >= TOUCH_3_DELAY_DAYS:
-            if not _already_sent_touch(deal, 3):
-                print(f"     🔥 Firing Touch 3 (Day {days} — final push)")
-                success = fire_touch_3(email, name)
-                if success:
-                    touch3_sent += 1
-            else:
-                print(f"     ⏭️  Touch 3 already sent")
+    seen = set()
+    while due:
+        for deal in due:
+            email = deal["email"]
+            name = deal["name"]
+            seen.add(email.lower())
+            touch = next_touch(deal)
+            fire = TOUCHES.get(touch)
+            # Claiming moves next_touch_at past the lease, so the deal leaves due() either way
+            if fire is None or not store.claim(email, int(deal.get("touch_stage") or 0), DRIP_RETRY_MIN * 60):
                 skipped += 1
-
-        # Touch 2: Day 3+
-        elif days >= TOUCH_2_DELAY_DAYS:
-            if not _already_sent_touch(deal, 2):
-                print(f"     📧 Firing Touch 2 (Day {days} — follow-up)")
-                success = fire_touch_2(email, name)
-                if success:
-                    touch2_sent += 1
-            else:
-                print(f"     ⏭️  Touch 2 already sent")
+                continue
+            print(f"\n  → {name} ({email}) — Touch {touch}")
+            if fire(email, name):
+                queued[touch] += 1
+            elif already_queued(email, f"touch_{touch}"):
                 skipped += 1
-
-        else:
-            days_to_touch2 = TOUCH_2_DELAY_DAYS - days
-            print(f"     ⏳ Touch 2 in {days_to_touch2} day(s)")
+                print(f"     ⏳ Touch {touch} still in the outbox")
+            else:
+                failed += 1
+                print(f"     ↻ Retry in {DRIP_RETRY_MIN:g} min")
+        due = [d for d in store.due(limit=SEQUENCE_BATCH) if d["email"].lower() not in seen]
 
     print("\n" + "="*60)
     print(f"✅ SEQUENCE RUN COMPLETE")
-    print(f"   Touch 2 sent: {touch2_sent}")
-    print(f"   Touch 3 sent: {touch3_sent}")
-    print(f"   Skipped:      {skipped}")
+    print(f"   Touch 2 queued: {queued[2]}")
+    print(f"   Touch 3 queued: {queued[3]}")
+    print(f"   Failed:         {failed}")
+    print(f"   Skipped:        {skipped}")
+    print(f"   Next due:       {_when(store.next_due_at())}")
     print("="*60 + "\n")
+    return {"queued": queued, "failed": failed, "skipped": skipped}
+
+def run_forever():
+    """Sleep until the next touch is due (at most SEQUENCE_MAX_SLEEP_SEC), fire, repeat."""
+    print(f"📅 Drip scheduler running (due-time, max sleep {SEQUENCE_MAX_SLEEP_SEC:g}s)")
+    while not _stop.is_set():
+        try:
+            run_sequence(quiet=True)
+            next_at = get_deal_store().next_due_at()
+        except Exception as e:
+            print(f"❌ Sequence error: {e}")
+            next_at = None
+        delay = SEQUENCE_MAX_SLEEP_SEC if next_at is None else next_at - time.time()
+        _stop.wait(min(max(delay, 1), SEQUENCE_MAX_SLEEP_SEC))
+
+def start() -> threading.Thread:
+    """Run the scheduler in a daemon thread (once per process)."""
+    global _thread
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _stop.clear()
+            _thread = threading.Thread(target=run_forever, name="drip-scheduler", daemon=True)
+            _thread.start()
+    return _thread
+
+def stop():
+    _stop.set()
 
 if __name__ == "__main__":
-    run_sequence()
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "daemon":
+        run_forever()
+    else:
+        run_sequence()
@@ -0,0 +1,320 @@
+"""
+SMTP Pool — persistent, authenticated SMTP sessions shared by every envoy
+=========================================================================
+The envoys used to open a fresh `smtplib.SMTP`, STARTTLS, log in, send one
+message and quit for every email, so a striker run spent most of its time in
+TCP/TLS/AUTH handshakes. Each SMTP account now gets one pool of logged-in
+connections that are reused across sends.
+
+  • Up to SMTP_POOL_SIZE parallel connections per account; send_many()
+    spreads a batch over them
+  • Keep-alive — a background thread NOOPs idle connections so they survive
+    between sends, and closes them after SMTP_MAX_IDLE_SEC. A connection idle
+    for longer than SMTP_KEEPALIVE_SEC is NOOP-checked again before reuse
+  • Transparent reconnect — on 421, a dropped connection or a socket timeout
+    the connection is discarded and the message retried on a fresh one
+    (SMTP_SEND_RETRIES times). Permanent errors (5xx, refused recipients,
+    auth) are raised to the caller and the connection is kept
+  • Every send draws from the account's shared rate-limit bucket
+    (`smtp:<host>`, see rate_limit): 421/45x penalize it, successes reward it
+  • Connections are recycled after SMTP_MAX_MSGS_PER_CONN messages
+  • stats() reports p50/p95 send latency over the last SMTP_LATENCY_SAMPLES
+    sends (checkout + rate-limit wait + SMTP transaction, retries included)
+
+Env vars:
+  SMTP_POOL_SIZE          — parallel connections per account (default: 2)
+  SMTP_KEEPALIVE_SEC      — NOOP idle connections this often (default: 60)
+  SMTP_MAX_IDLE_SEC       — close connections idle longer than this (default: 300)
+  SMTP_MAX_MSGS_PER_CONN  — recycle a connection after this many messages (default: 100)
+  SMTP_SEND_RETRIES       — reconnect-and-retry attempts on 421 / disconnects / timeouts (default: 2)
+  SMTP_TIMEOUT            — socket timeout in seconds (default: 30)
+
+Usage:
+    from cyberhound.smtp_pool import send_message, send_many, pool_stats
+
+    send_message(msg)                           # raises smtplib errors like SMTP.send_message
+    errors = send_many([msg1, msg2, msg3])      # None per delivered message, else the exception
+    send_message(msg, host="smtp.gmail.com", port=587, user=u, password=p)
+    print(pool_stats())
+"""
+
+import atexit
+import os
+import smtplib
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from cyberhound.config import SMTP_PASS, SMTP_PORT, SMTP_SERVER, SMTP_USER
+    from cyberhound.rate_limit import acquire, penalize, reward
+except ImportError:  # imported flat via sys.path (email_envoy, k_email_envoy)
+    from config import SMTP_PASS, SMTP_PORT, SMTP_SERVER, SMTP_USER
+    from rate_limit import acquire, penalize, reward
+
+SMTP_POOL_SIZE = max(1, int(os.getenv("SMTP_POOL_SIZE", 2)))
+SMTP_KEEPALIVE_SEC = float(os.getenv("SMTP_KEEPALIVE_SEC", 60))
+SMTP_MAX_IDLE_SEC = float(os.getenv("SMTP_MAX_IDLE_SEC", 300))
+SMTP_MAX_MSGS_PER_CONN = int(os.getenv("SMTP_MAX_MSGS_PER_CONN", 100))
+SMTP_SEND_RETRIES = int(os.getenv("SMTP_SEND_RETRIES", 2))
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 30))
+SMTP_LATENCY_SAMPLES = 2048
+
+THROTTLE_CODES = (421, 450, 451, 452, 454)  # server asked us to slow down
+
+
+def is_transient(error: BaseException) -> bool:
+    """True for failures a fresh connection can fix: 421, disconnects, timeouts, resets."""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code == 421
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    return isinstance(error, OSError)
+
+
+class _Connection:
+    __slots__ = ("smtp", "opened_at", "last_used", "sent")
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.opened_at = self.last_used = time.monotonic()
+        self.sent = 0
+
+    def close(self):
+        try:
+            self.smtp.quit()
+        except Exception:
+            try:
+                self.smtp.close()
+            except Exception:
+                pass
+
+
+class SMTPPool:
+    """Logged-in SMTP connections for one account (host, port, user)."""
+
+    def __init__(self, host: str, port: int, user: str = "", password: str = "",
+                 size: int = SMTP_POOL_SIZE):
+        self.host, self.port, self.user, self.password = host, int(port), user, password
+        self.size = size
+        self.bucket = f"smtp:{host}"
+        self._idle: Deque[_Connection] = deque()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._stats = {"sent": 0, "failed": 0, "connections": 0, "reconnects": 0, "noops": 0}
+        self._latencies: Deque[float] = deque(maxlen=SMTP_LATENCY_SAMPLES)
+
+    # ── Connections ─────────────────────────────────────────────────────────
+
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self._stats[key] += n
+
+    def _connect(self) -> _Connection:
+        if self.port == 465:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=SMTP_TIMEOUT)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+            smtp.ehlo()
+            if smtp.has_extn("starttls"):
+                smtp.starttls()
+                smtp.ehlo()
+        try:
+            if self.user:
+                smtp.login(self.user, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self._count("connections")
+        return _Connection(smtp)
+
+    def _alive(self, conn: _Connection) -> bool:
+        try:
+            self._count("noops")
+            return conn.smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _checkout(self) -> _Connection:
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    return self._connect()
+                idle = time.monotonic() - conn.last_used
+                if idle > SMTP_MAX_IDLE_SEC or (idle > SMTP_KEEPALIVE_SEC and not self._alive(conn)):
+                    conn.close()
+                    continue
+                return conn
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _checkin(self, conn: _Connection, reusable: bool):
+        try:
+            if reusable and conn.sent < SMTP_MAX_MSGS_PER_CONN:
+                conn.last_used = time.monotonic()
+                with self._lock:
+                    self._idle.append(conn)
+            else:
+                conn.close()
+        finally:
+            self._slots.release()
+
+    def keepalive(self):
+        """NOOP idle connections that are due, drop dead or long-idle ones."""
+        now = time.monotonic()
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        keep = []
+        for conn in idle:
+            age = now - conn.last_used
+            if age > SMTP_MAX_IDLE_SEC:
+                conn.close()
+            elif age < SMTP_KEEPALIVE_SEC or self._alive(conn):
+                keep.append(conn)
+            else:
+                conn.close()
+        with self._lock:
+            self._idle.extendleft(reversed(keep))
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            conn.close()
+
+    # ── Sending ─────────────────────────────────────────────────────────────
+
+    def send_message(self, msg: Message, from_addr: Optional[str] = None,
+                     to_addrs: Optional[Iterable[str]] = None):
+        """Send one message, reconnecting on transient failures. Raises like SMTP.send_message."""
+        attempt = 0
+        started = time.monotonic()
+        while True:
+            acquire(self.bucket)
+            conn = None
+            try:
+                conn = self._checkout()
+                conn.smtp.send_message(msg, from_addr=from_addr,
+                                       to_addrs=list(to_addrs) if to_addrs else None)
+            except Exception as e:
+                if isinstance(e, smtplib.SMTPResponseException) and e.smtp_code in THROTTLE_CODES:
+                    penalize(self.bucket)
+                transient = is_transient(e)
+                if conn is not None:
+                    self._checkin(conn, reusable=not transient)
+                if transient and attempt < SMTP_SEND_RETRIES:
+                    attempt += 1
+                    self._count("reconnects")
+                    continue
+                self._count("failed")
+                raise
+            conn.sent += 1
+            self._checkin(conn, reusable=True)
+            with self._lock:
+                self._stats["sent"] += 1
+                self._latencies.append(time.monotonic() - started)
+            reward(self.bucket)
+            return
+
+    def send_many(self, messages: List[Message]) -> List[Optional[Exception]]:
+        """Send a batch over up to `size` parallel connections. None per delivered message."""
+        def _one(msg: Message) -> Optional[Exception]:
+            try:
+                self.send_message(msg)
+                return None
+            except Exception as e:
+                return e
+
+        if len(messages) <= 1 or self.size == 1:
+            return [_one(msg) for msg in messages]
+        with ThreadPoolExecutor(max_workers=min(self.size, len(messages)),
+                                thread_name_prefix="smtp") as executor:
+            return list(executor.map(_one, messages))
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {**self._stats, "idle": len(self._idle), "size": self.size}
+        for pct in (50, 95):
+            stats[f"p{pct}_ms"] = (round(latencies[min(len(latencies) - 1, len(latencies) * pct // 100)] * 1000, 1)
+                                   if latencies else None)
+        return stats
+
+    def reset_stats(self):
+        """Zero the counters and latency samples (e.g. between benchmark phases)."""
+        with self._lock:
+            self._stats = dict.fromkeys(self._stats, 0)
+            self._latencies.clear()
+
+
+# ── Process-wide pools ──────────────────────────────────────────────────────
+
+_pools: Dict[Tuple[str, int, str], SMTPPool] = {}
+_pools_lock = threading.Lock()
+_keepalive_thread: Optional[threading.Thread] = None
+
+
+def _keepalive_loop():
+    while True:
+        time.sleep(max(1.0, SMTP_KEEPALIVE_SEC / 2))
+        for pool in list(_pools.values()):
+            try:
+                pool.keepalive()
+            except Exception as e:
+                print(f"[smtp] ⚠️  keepalive error: {e}")
+
+
+def get_pool(host: Optional[str] = None, port: Optional[int] = None,
+             user: Optional[str] = None, password: Optional[str] = None) -> SMTPPool:
+    """The shared pool for an account (defaults: SMTP_SERVER / SMTP_PORT / SMTP_USER from config)."""
+    global _keepalive_thread
+    host = host or SMTP_SERVER
+    port = int(port or SMTP_PORT)
+    user = SMTP_USER if user is None else user
+    key = (host, port, user)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = SMTPPool(host, port, user, SMTP_PASS if password is None else password)
+            if _keepalive_thread is None:
+                _keepalive_thread = threading.Thread(target=_keepalive_loop, name="smtp-keepalive", daemon=True)
+                _keepalive_thread.start()
+    return pool
+
+
+def send_message(msg: Message, from_addr: Optional[str] = None, to_addrs: Optional[Iterable[str]] = None,
+                 host: Optional[str] = None, port: Optional[int] = None,
+                 user: Optional[str] = None, password: Optional[str] = None):
+    """Send through the account's pool. Raises smtplib errors like SMTP.send_message."""
+    get_pool(host, port, user, password).send_message(msg, from_addr=from_addr, to_addrs=to_addrs)
+
+
+def send_many(messages: List[Message], host: Optional[str] = None, port: Optional[int] = None,
+              user: Optional[str] = None, password: Optional[str] = None) -> List[Optional[Exception]]:
+    """Send a batch in parallel over the account's pool. None per delivered message, else the error."""
+    return get_pool(host, port, user, password).send_many(messages)
+
+
+def pool_stats() -> Dict[str, Dict[str, float]]:
+    """Per-account counters: sent, failed, connections opened, reconnects, noops, idle, p50/p95 send ms."""
+    return {f"{user or '-'}@{host}:{port}": pool.stats() for (host, port, user), pool in list(_pools.items())}
+
+
+def close_all():
+    """QUIT every idle pooled connection (at exit, or before fork)."""
+    for pool in list(_pools.values()):
+        pool.close()
+
+
+atexit.register(close_all)
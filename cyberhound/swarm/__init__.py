@@ -2,6 +2,12 @@
 Cyberhound Swarm - Multi-agent coordination system
 """
 
-from .hound_manager import HoundManager
-
 __all__ = ['HoundManager']
+
+
+def __getattr__(name):
+    # Imported on demand so `import cyberhound.swarm.hounds...` does not pull in rich
+    if name == 'HoundManager':
+        from .hound_manager import HoundManager
+        return HoundManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
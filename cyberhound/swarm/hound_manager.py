@@ -3,24 +3,82 @@ HoundManager - Command center for managing the Cyberhound swarm.
 """
 
 import asyncio
+import importlib
 import json
+from collections.abc import Mapping
 from datetime import datetime
+from types import SimpleNamespace
 from typing import Dict, List, Optional
 
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
-from rich.layout import Layout
-from rich.live import Live
 from rich.text import Text
 from rich import box
 
-# Import active hounds
-from .hounds.saas_hound import SaaSHound
-from .hounds.upwork_hound import UpworkHound
-from .hounds.algora_hound import AlgoraHound
-from .hounds.codementor_hound import CodementorHound
-from .hounds.system_hound import SystemHound
+# Active hounds: key -> (module, class, display name, category, default config).
+# Hound modules pull in scrapers and API clients, so they are only imported
+# the first time a hound is actually used (hunt, repair, dashboard).
+HOUND_SPECS: Dict[str, tuple] = {
+    'saas': ('saas_hound', 'SaaSHound', 'SaaSHound', 'saas', {
+        'min_discount': 30,
+        'sources': ['appsumo', 'stacksocial', 'producthunt']
+    }),
+    'upwork': ('upwork_hound', 'UpworkHound', 'UpworkHound', 'freelance', {
+        'skills': ['python', 'react', 'nextjs', 'typescript'],
+        'min_hourly_rate': 50,
+        'min_fixed_budget': 1000
+    }),
+    'algora': ('algora_hound', 'AlgoraHound', 'AlgoraHound', 'bounty', {
+        'languages': ['python', 'typescript', 'javascript'],
+        'min_bounty': 100
+    }),
+    'codementor': ('codementor_hound', 'CodementorHound', 'CodementorHound', 'mentoring', {
+        'skills': ['python', 'react', 'typescript', 'debugging'],
+        'max_results': 8,
+    }),
+    'system': ('system_hound', 'SystemHound', 'SystemHound', 'maintenance', {
+        'projects': ['Vraie-Quebec', 'lambiance', 'ZyeuteV5'],
+        'auto_fix': False
+    }),
+}
+
+
+class HoundPack(Mapping):
+    """Read-only mapping of hound key -> hound, built on first access."""
+
+    def __init__(self, specs: Dict[str, tuple]):
+        self._specs = specs
+        self._loaded: Dict[str, object] = {}
+
+    def __getitem__(self, key: str):
+        hound = self._loaded.get(key)
+        if hound is None:
+            module, cls, _, _, config = self._specs[key]
+            hound_cls = getattr(importlib.import_module(f".hounds.{module}", __package__), cls)
+            hound = self._loaded[key] = hound_cls(dict(config))
+        return hound
+
+    def __contains__(self, key) -> bool:
+        return key in self._specs
+
+    def __iter__(self):
+        return iter(self._specs)
+
+    def __len__(self):
+        return len(self._specs)
+
+    def peek(self, key: str):
+        """The hound if it has been loaded, else an idle stand-in (no import)."""
+        hound = self._loaded.get(key)
+        if hound is not None:
+            return hound
+        _, _, name, category, _ = self._specs[key]
+        return SimpleNamespace(name=name, category=category, status="IDLE",
+                               bounties_found=0, last_hunt=None)
+
+    def peek_items(self):
+        return [(key, self.peek(key)) for key in self._specs]
 
 
 class HoundManager:
@@ -37,7 +95,7 @@ class HoundManager:
     
     def __init__(self):
         self.console = Console()
-        self.hounds: Dict[str, object] = {}
+        self.hounds = HoundPack(HOUND_SPECS)
         self.hunt_results: Dict[str, List[Dict]] = {}
         self.is_running = False
         
@@ -45,34 +103,8 @@ class HoundManager:
         self._initialize_hounds()
     
     def _initialize_hounds(self):
-        """Initialize all active hounds with default config"""
-        self.hounds['saas'] = SaaSHound({
-            'min_discount': 30,
-            'sources': ['appsumo', 'stacksocial', 'producthunt']
-        })
-        
-        self.hounds['upwork'] = UpworkHound({
-            'skills': ['python', 'react', 'nextjs', 'typescript'],
-            'min_hourly_rate': 50,
-            'min_fixed_budget': 1000
-        })
-        
-        self.hounds['algora'] = AlgoraHound({
-            'languages': ['python', 'typescript', 'javascript'],
-            'min_bounty': 100
-        })
-        
-        self.hounds['codementor'] = CodementorHound({
-            'skills': ['python', 'react', 'typescript', 'debugging'],
-            'max_results': 8,
-        })
-
-        self.hounds['system'] = SystemHound({
-            'projects': ['Vraie-Quebec', 'lambiance', 'ZyeuteV5'],
-            'auto_fix': False
-        })
-        
-        self.console.print(f"[green]✓[/green] {len(self.hounds)} hounds initialized and ready")
+        """Register the active hounds (each is imported and built on first use)"""
+        self.console.print(f"[green]✓[/green] {len(self.hounds)} hounds registered and ready")
     
     # ═══════════════════════════════════════════════════════════════
     # HUNT OPERATIONS
@@ -163,7 +195,7 @@ class HoundManager:
             'system': 'System health & auto-repair'
         }
         
-        for key, hound in self.hounds.items():
+        for key, hound in self.hounds.peek_items():
             color = status_colors.get(hound.status, "white")
             emoji = status_emojis.get(hound.status, "⚪")
             
@@ -303,7 +335,7 @@ class HoundManager:
         
         hot_found = False
         
-        for name, hound in self.hounds.items():
+        for name, hound in self.hounds.peek_items():
             hot_deals = []
             
             if hasattr(hound, 'get_hot_deals'):
@@ -340,7 +372,7 @@ class HoundManager:
         table.add_column("Last Hunt")
         
         total = 0
-        for name, hound in self.hounds.items():
+        for name, hound in self.hounds.peek_items():
             total += hound.bounties_found
             last = hound.last_hunt.strftime("%H:%M:%S") if hound.last_hunt else "Never"
             table.add_row(
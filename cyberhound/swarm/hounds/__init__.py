@@ -2,12 +2,18 @@
 Cyberhound Hounds - Specialized hunting agents
 """
 
+import importlib
+
 from .base_hound import BaseHound
-from .saas_hound import SaaSHound
-from .upwork_hound import UpworkHound
-from .algora_hound import AlgoraHound
-from .codementor_hound import CodementorHound
-from .system_hound import SystemHound
+
+# Hound classes are imported on first attribute access
+_HOUND_MODULES = {
+    'SaaSHound': 'saas_hound',
+    'UpworkHound': 'upwork_hound',
+    'AlgoraHound': 'algora_hound',
+    'CodementorHound': 'codementor_hound',
+    'SystemHound': 'system_hound',
+}
 
 __all__ = [
     'BaseHound',
@@ -17,3 +23,10 @@ __all__ = [
     'CodementorHound',
     'SystemHound',
 ]
+
+
+def __getattr__(name):
+    module = _HOUND_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
@@ -18,8 +18,6 @@ import time
 from datetime import datetime
 from typing import Any, Dict
 
-from supabase import create_client, Client
-
 try:
     from dotenv import load_dotenv
     load_dotenv()
@@ -29,10 +27,18 @@ except Exception:
 SUPABASE_URL = os.getenv("NEXT_PUBLIC_SUPABASE_URL") or os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise RuntimeError("Missing Supabase credentials for task runner")
+_supabase = None
+
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+def get_supabase():
+    """Supabase client, created on first use so importing this module has no side effects."""
+    global _supabase
+    if _supabase is None:
+        if not SUPABASE_URL or not SUPABASE_KEY:
+            raise RuntimeError("Missing Supabase credentials for task runner")
+        from supabase import create_client
+        _supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _supabase
 
 
 async def process_task(task: Dict[str, Any]) -> Dict[str, Any]:
@@ -106,6 +112,7 @@ async def process_task(task: Dict[str, Any]) -> Dict[str, Any]:
 
 
 async def claim_and_process_one() -> bool:
+    supabase = get_supabase()
     # Find a pending task (simple optimistic claim)
     resp = (
         supabase.table("agent_tasks")
@@ -181,7 +188,8 @@ async def run_loop(interval_seconds: int = 15):
 
 if __name__ == "__main__":
     import sys
+    from .http_pool import arun
     if "--loop" in sys.argv:
-        asyncio.run(run_loop())
+        arun(run_loop())
     else:
-        asyncio.run(run_once())
\ No newline at end of file
+        arun(run_once())
\ No newline at end of file
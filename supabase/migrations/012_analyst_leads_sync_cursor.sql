@@ -0,0 +1,5 @@
+-- Migration 012: analyst_leads incremental sync
+-- The Python lead mirror (cyberhound/lead_sync.py) pulls rows changed since its
+-- (updated_at, id) cursor; this index keeps each delta pull a range scan.
+
+CREATE INDEX IF NOT EXISTS idx_analyst_leads_updated_at ON analyst_leads(updated_at, id);